@@ -3,6 +3,7 @@ from __future__ import annotations
 from datetime import date
 from typing import Any, Protocol
 
+from teapoio.application.services.unidade_trabalho import AlteracoesEstado, UnidadeTrabalho
 from teapoio.domain.models.Perfil import Perfil
 from teapoio.domain.models.crianca import Crianca
 from teapoio.domain.models.responsavel import Responsavel
@@ -26,15 +27,31 @@ class PortaPersistenciaRelatorios(Protocol):
 		"""Persiste o estado atual da aplicacao."""
 
 
+class PortaPersistenciaIncremental(PortaPersistenciaRelatorios, Protocol):
+	"""Contrato opcional de repositorios capazes de gravar apenas o que mudou."""
+
+	def salvar_alteracoes(self, alteracoes: AlteracoesEstado) -> None:
+		"""Persiste apenas as entidades alteradas e as remocoes informadas."""
+
+
 class ServicoRelatorios:
 	"""Orquestra carregamento e persistencia de estado da aplicacao."""
 
 	def __init__(self, repositorio: PortaPersistenciaRelatorios) -> None:
 		self._repositorio = repositorio
+		self._unidade_trabalho = UnidadeTrabalho()
 
 	def carregar_estado_inicial(self) -> dict[str, Any]:
 		"""Carrega o estado inicial da aplicacao usando o repositorio."""
-		return self._repositorio.carregar_estado()
+		estado = self._repositorio.carregar_estado()
+		self._unidade_trabalho.registrar_estado(
+			responsaveis=estado["responsaveis"],
+			criancas=estado["criancas"],
+			rotinas=estado["rotinas"],
+			perfil=estado["perfil"],
+			data_calendario=estado["data_calendario"],
+		)
+		return estado
 
 	def salvar_estado_atual(
 		self,
@@ -43,12 +60,40 @@ class ServicoRelatorios:
 		rotinas: list[Rotina],
 		perfil: Perfil | None,
 		data_calendario: date,
-	) -> None:
-		"""Salva o estado atual da aplicacao usando o repositorio."""
-		self._repositorio.salvar_estado(
+	) -> bool:
+		"""Salva o estado atual da aplicacao usando o repositorio.
+
+		Nada e gravado quando nenhuma entidade mudou desde o ultimo salvamento.
+		Repositorios incrementais recebem apenas as alteracoes; os demais
+		recebem o estado completo. Retorna se houve gravacao.
+		"""
+		alteracoes = self._unidade_trabalho.coletar_alteracoes(
+			responsaveis=responsaveis,
+			criancas=criancas,
+			rotinas=rotinas,
+			perfil=perfil,
+			data_calendario=data_calendario,
+		)
+		if alteracoes.vazia:
+			return False
+
+		salvar_alteracoes = getattr(self._repositorio, "salvar_alteracoes", None)
+		if callable(salvar_alteracoes) and self._unidade_trabalho.possui_referencia:
+			salvar_alteracoes(alteracoes)
+		else:
+			self._repositorio.salvar_estado(
+				responsaveis=responsaveis,
+				criancas=criancas,
+				rotinas=rotinas,
+				perfil=perfil,
+				data_calendario=data_calendario,
+			)
+
+		self._unidade_trabalho.registrar_estado(
 			responsaveis=responsaveis,
 			criancas=criancas,
 			rotinas=rotinas,
 			perfil=perfil,
 			data_calendario=data_calendario,
 		)
+		return True
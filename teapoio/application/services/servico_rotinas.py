@@ -1,7 +1,10 @@
-from datetime import date
-from typing import Protocol
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Iterable, Protocol
 
+from teapoio.domain.models.indice_rotinas import IndiceRotinas
 from teapoio.domain.models.item_rotina import ItemRotina
+from teapoio.domain.models.modelo_rotina import ModeloRotina
 from teapoio.domain.models.rotina import Rotina
 
 
@@ -49,9 +52,27 @@ class FabricaRotinaPadrao:
 
 
 
+@dataclass
+class AlteracaoLoteRotina:
+	"""Alteracoes de itens pedidas para a rotina de uma crianca em uma data.
+
+	Itens existentes sao referenciados pelo indice (int) ou pelo id_item (str),
+	sempre em relacao a rotina antes do lote.
+	"""
+
+	id_crianca: str
+	data_referencia: date
+	adicionar: list[dict[str, Any]] = field(default_factory=list)
+	status: list[tuple[int | str, int | str]] = field(default_factory=list)
+	remover: list[int | str] = field(default_factory=list)
+
+
+
 class ServicoRotinas:
 	"""[SOLID: SRP, OCP, DIP] Casos de uso de rotina da camada de aplicacao."""
 
+	LIMITE_DIAS_MODELO = 366
+
 	def __init__(
 		self,
 		fabrica_item: FabricaItemRotina | None = None,
@@ -63,22 +84,35 @@ class ServicoRotinas:
 		self._fabrica_rotina = fabrica_rotina or FabricaRotinaPadrao()
 
 
-	def obter_ou_criar_rotina(
-		self,
-		rotinas: list[Rotina],
+	@staticmethod
+	def buscar_rotina(
+		rotinas: IndiceRotinas | list[Rotina],
 		id_crianca: str | int,
 		data_referencia: date,
-	) -> tuple[Rotina, bool]:
-		"""Obtém a rotina existente para a criança e data informadas, ou cria uma nova se não existir."""
-		rotina = next(
+	) -> Rotina | None:
+		"""Busca a rotina da criança na data informada; usa o índice quando disponível."""
+		if isinstance(rotinas, IndiceRotinas):
+			return rotinas.buscar(id_crianca, data_referencia)
+
+		id_normalizado = str(id_crianca)
+		return next(
 			(
 				rotina_existente
 				for rotina_existente in rotinas
-				if rotina_existente.id_crianca == str(id_crianca)
+				if rotina_existente.id_crianca == id_normalizado
 				and rotina_existente.data_referencia == data_referencia
 			),
 			None,
 		)
+
+	def obter_ou_criar_rotina(
+		self,
+		rotinas: IndiceRotinas | list[Rotina],
+		id_crianca: str | int,
+		data_referencia: date,
+	) -> tuple[Rotina, bool]:
+		"""Obtém a rotina existente para a criança e data informadas, ou cria uma nova se não existir."""
+		rotina = self.buscar_rotina(rotinas, id_crianca, data_referencia)
 		if rotina is not None:
 			return rotina, False
 
@@ -89,6 +123,41 @@ class ServicoRotinas:
 		rotinas.append(rotina)
 		return rotina, True
 
+	def obter_rotina_para_leitura(
+		self,
+		rotinas: IndiceRotinas | list[Rotina],
+		id_crianca: str | int,
+		data_referencia: date,
+	) -> Rotina:
+		"""Retorna a rotina existente ou uma rotina vazia que nao e indexada nem gravada.
+
+		A rotina vazia serve apenas para exibicao; ela so passa a existir quando
+		uma alteracao usa `obter_ou_criar_rotina` ou, depois de alterada, e
+		entregue a `indexar_rotina`.
+		"""
+		rotina = self.buscar_rotina(rotinas, id_crianca, data_referencia)
+		if rotina is not None:
+			return rotina
+		return self._fabrica_rotina.criar(
+			id_crianca=id_crianca,
+			data_referencia=data_referencia,
+		)
+
+	def indexar_rotina(
+		self,
+		rotinas: IndiceRotinas | list[Rotina],
+		rotina: Rotina,
+	) -> bool:
+		"""Inclui na colecao uma rotina obtida para leitura, se ela ainda nao estiver la.
+
+		Permite validar e alterar a rotina antes de cria-la, para que um pedido
+		recusado nao deixe uma rotina vazia gravada. Retorna se houve inclusao.
+		"""
+		if self.buscar_rotina(rotinas, rotina.id_crianca, rotina.data_referencia) is rotina:
+			return False
+		rotinas.append(rotina)
+		return True
+
 	def adicionar_item(
 		self,
 		rotina: Rotina,
@@ -118,3 +187,132 @@ class ServicoRotinas:
 	def remover_item(rotina: Rotina, indice: int) -> None:
 		"""Remove um item da rotina usando o método da própria rotina."""
 		rotina.remover_item(indice)
+
+	def aplicar_lote(
+		self,
+		rotinas: IndiceRotinas | list[Rotina],
+		alteracoes: list[AlteracaoLoteRotina],
+	) -> list[Rotina]:
+		"""Valida todas as alteracoes do lote e so entao as aplica, uma rotina por vez.
+
+		Se qualquer alteracao for invalida, nenhuma rotina e criada ou alterada;
+		uma alteracao sem itens para adicionar, status ou remover e invalida.
+		Retorna as rotinas afetadas, na ordem das alteracoes.
+		"""
+		planos = []
+		novas: list[Rotina] = []
+		chaves: set[tuple[str, date]] = set()
+		for posicao, alteracao in enumerate(alteracoes, start=1):
+			try:
+				if not (alteracao.adicionar or alteracao.status or alteracao.remover):
+					raise ValueError("Informe itens para adicionar, alterar status ou remover.")
+				chave = (str(alteracao.id_crianca), alteracao.data_referencia)
+				if chave in chaves:
+					raise ValueError("Rotina repetida no lote; agrupe as alteracoes da mesma data.")
+				chaves.add(chave)
+
+				rotina = self.buscar_rotina(rotinas, alteracao.id_crianca, alteracao.data_referencia)
+				if rotina is None:
+					rotina = self._fabrica_rotina.criar(
+						id_crianca=alteracao.id_crianca,
+						data_referencia=alteracao.data_referencia,
+					)
+					novas.append(rotina)
+
+				novos_itens = [
+					self._fabrica_item.criar(
+						nome=dados.get("nome", ""),
+						horario=dados.get("horario", ""),
+						observacao=dados.get("observacao", ""),
+						tags=dados.get("tags"),
+					)
+					for dados in alteracao.adicionar
+				]
+				status_itens = [
+					(self._resolver_item(rotina, referencia), status_code)
+					for referencia, status_code in alteracao.status
+				]
+				itens_removidos = [
+					self._resolver_item(rotina, referencia)
+					for referencia in alteracao.remover
+				]
+				rotina.validar_lote(novos_itens, status_itens, itens_removidos)
+			except (TypeError, ValueError, IndexError) as erro:
+				raise type(erro)(f"Alteracao {posicao}: {erro}") from erro
+			planos.append((rotina, novos_itens, status_itens, itens_removidos))
+
+		for rotina in novas:
+			rotinas.append(rotina)
+		for rotina, novos_itens, status_itens, itens_removidos in planos:
+			rotina.aplicar_lote(novos_itens, status_itens, itens_removidos)
+		return [rotina for rotina, *_ in planos]
+
+	def aplicar_modelo(
+		self,
+		rotinas: IndiceRotinas | list[Rotina],
+		id_crianca: str | int,
+		modelo: ModeloRotina,
+		data_inicio: date,
+		data_fim: date,
+		dias_semana: Iterable[int] | None = None,
+	) -> list[Rotina]:
+		"""Aplica o modelo a cada dia do intervalo (inclusivo) e retorna as rotinas alteradas.
+
+		`dias_semana` restringe os dias (0 = segunda ... 6 = domingo). Horarios
+		ja ocupados mantem o item existente, entao reaplicar o mesmo modelo nao
+		duplica itens. Cada rotina recebe os itens de uma so vez.
+		"""
+		if not isinstance(modelo, ModeloRotina):
+			raise TypeError("Modelo de rotina invalido.")
+		if data_fim < data_inicio:
+			raise ValueError("A data final deve ser igual ou posterior a data inicial.")
+		total_dias = (data_fim - data_inicio).days + 1
+		if total_dias > self.LIMITE_DIAS_MODELO:
+			raise ValueError(f"O intervalo deve ter no maximo {self.LIMITE_DIAS_MODELO} dias.")
+
+		dias_permitidos: set[int] | None = None
+		if dias_semana is not None:
+			dias_permitidos = set()
+			for dia in dias_semana:
+				if isinstance(dia, bool) or not isinstance(dia, int) or not 0 <= dia <= 6:
+					raise ValueError("Dias da semana devem ser inteiros de 0 (segunda) a 6 (domingo).")
+				dias_permitidos.add(dia)
+
+		alteradas: list[Rotina] = []
+		for deslocamento in range(total_dias):
+			data_referencia = data_inicio + timedelta(days=deslocamento)
+			if dias_permitidos is not None and data_referencia.weekday() not in dias_permitidos:
+				continue
+
+			rotina = self.buscar_rotina(rotinas, id_crianca, data_referencia)
+			nova = rotina is None
+			if nova:
+				rotina = self._fabrica_rotina.criar(
+					id_crianca=id_crianca,
+					data_referencia=data_referencia,
+				)
+
+			ocupados = {item.horario for item in rotina.itens}
+			novos_itens = [item for item in modelo.criar_itens() if item.horario not in ocupados]
+			if not novos_itens:
+				continue
+
+			rotina.aplicar_lote(novos_itens=novos_itens)
+			if nova:
+				# Indexada ja preenchida, para os observadores receberem um unico aviso.
+				rotinas.append(rotina)
+			alteradas.append(rotina)
+		return alteradas
+
+	@staticmethod
+	def _resolver_item(rotina: Rotina, referencia: int | str) -> ItemRotina:
+		if isinstance(referencia, bool) or not isinstance(referencia, (int, str)):
+			raise TypeError("Item deve ser referenciado por indice ou id_item.")
+		if isinstance(referencia, int):
+			rotina._validar_indice(referencia, len(rotina.itens))
+			return rotina.itens[referencia]
+
+		indice = rotina.indice_item(referencia)
+		if indice is None:
+			raise ValueError("Item nao encontrado na rotina.")
+		return rotina.itens[indice]
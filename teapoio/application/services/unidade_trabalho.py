@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Iterable
+
+from teapoio.domain.models.Perfil import Perfil
+from teapoio.domain.models.crianca import Crianca
+from teapoio.domain.models.responsavel import Responsavel
+from teapoio.domain.models.rotina import Rotina
+
+
+@dataclass(frozen=True)
+class AlteracoesEstado:
+	"""Entidades novas/alteradas e chaves removidas desde o ultimo salvamento."""
+
+	responsaveis: list[Responsavel] = field(default_factory=list)
+	criancas: list[Crianca] = field(default_factory=list)
+	rotinas: list[Rotina] = field(default_factory=list)
+	ids_responsaveis_removidos: list[str] = field(default_factory=list)
+	ids_criancas_removidas: list[str] = field(default_factory=list)
+	chaves_rotinas_removidas: list[tuple[str, date]] = field(default_factory=list)
+	perfil_alterado: bool = False
+	perfil: Perfil | None = None
+	data_calendario: date | None = None
+
+	@property
+	def vazia(self) -> bool:
+		return not (
+			self.responsaveis
+			or self.criancas
+			or self.rotinas
+			or self.ids_responsaveis_removidos
+			or self.ids_criancas_removidas
+			or self.chaves_rotinas_removidas
+			or self.perfil_alterado
+			or self.data_calendario is not None
+		)
+
+
+class UnidadeTrabalho:
+	"""[SOLID: SRP] Identifica entidades sujas pelos avisos do mixin Rastreavel.
+
+	A unidade se inscreve como observadora das entidades do ultimo estado
+	salvo e guarda as que avisam alguma alteracao, entao a coleta nao percorre
+	as versoes de todo o estado. Inclusoes e remocoes nas listas sao detectadas
+	comparando apenas as identidades dos itens.
+
+	Colecoes de rotinas observaveis (como o IndiceRotinas) sao acompanhadas
+	pelos avisos da propria colecao: rotinas pendentes que apenas foram
+	montadas (`rotina_carregada`) continuam limpas, e remocoes sem aviso sao
+	percebidas pela quantidade de chaves. Quando a colecao informada e outra,
+	a comparacao completa e feita uma unica vez e a nova colecao passa a ser
+	observada.
+	"""
+
+	def __init__(self) -> None:
+		self._membros: dict[str, dict[int, Any]] | None = None
+		self._sujas: dict[int, Any] = {}
+		self._colecao_rotinas: Any = None
+		self._chaves_rotinas: set[tuple[str, date]] = set()
+		self._rotinas_sujas: dict[tuple[str, date], Rotina] = {}
+		self._chaves_removidas: set[tuple[str, date]] = set()
+		self._perfil: tuple[Perfil | None, int] = (None, 0)
+		self._data_calendario: date | None = None
+
+	@property
+	def possui_referencia(self) -> bool:
+		"""Indica se ja existe um estado salvo/carregado para comparacao."""
+		return self._membros is not None
+
+	def entidade_alterada(self, entidade: Any) -> None:
+		"""Marca como suja a entidade (ou rotina indexada) que avisou uma alteracao."""
+		if isinstance(entidade, Rotina):
+			chave = self._chave_rotina(entidade)
+			self._rotinas_sujas[chave] = entidade
+			self._chaves_removidas.discard(chave)
+		else:
+			self._sujas[id(entidade)] = entidade
+
+	def rotina_carregada(self, rotina: Rotina) -> None:
+		"""Rotina montada a partir do registro salvo: continua limpa."""
+
+	def rotina_removida(self, rotina: Rotina) -> None:
+		chave = self._chave_rotina(rotina)
+		if self._rotinas_sujas.get(chave) is rotina:
+			del self._rotinas_sujas[chave]
+		self._chaves_removidas.add(chave)
+
+	def registrar_estado(
+		self,
+		responsaveis: list[Responsavel],
+		criancas: list[Crianca],
+		rotinas: list[Rotina],
+		perfil: Perfil | None,
+		data_calendario: date,
+	) -> None:
+		"""Marca o estado informado como persistido (limpo)."""
+		if self._membros is None:
+			self._membros = {"responsavel": {}, "crianca": {}, "rotina": {}}
+		self._sincronizar_membros("responsavel", responsaveis)
+		self._sincronizar_membros("crianca", criancas)
+		self._registrar_rotinas(rotinas)
+		self._sujas.clear()
+		self._perfil = (perfil, self._versao(perfil))
+		self._data_calendario = data_calendario
+
+	def coletar_alteracoes(
+		self,
+		responsaveis: list[Responsavel],
+		criancas: list[Crianca],
+		rotinas: list[Rotina],
+		perfil: Perfil | None,
+		data_calendario: date,
+	) -> AlteracoesEstado:
+		"""Retorna o que mudou desde o ultimo registrar_estado."""
+		if self._membros is None:
+			return AlteracoesEstado(
+				responsaveis=list(responsaveis),
+				criancas=list(criancas),
+				rotinas=list(rotinas),
+				perfil_alterado=True,
+				perfil=perfil,
+				data_calendario=data_calendario,
+			)
+
+		responsaveis_sujos, ids_responsaveis_removidos = self._comparar(
+			"responsavel", responsaveis, lambda item: item.id_responsavel
+		)
+		criancas_sujas, ids_criancas_removidas = self._comparar(
+			"crianca", criancas, lambda item: item.id_crianca
+		)
+		if self._observavel(rotinas) and rotinas is not self._colecao_rotinas:
+			self._adotar_colecao(rotinas)
+		if self._colecao_rotinas is not None and rotinas is self._colecao_rotinas:
+			rotinas_sujas, chaves_rotinas_removidas = self._comparar_rotinas_observadas(rotinas)
+		else:
+			rotinas_sujas, chaves_rotinas_removidas = self._comparar_rotinas(rotinas)
+		perfil_anterior, versao_perfil = self._perfil
+
+		return AlteracoesEstado(
+			responsaveis=responsaveis_sujos,
+			criancas=criancas_sujas,
+			rotinas=rotinas_sujas,
+			ids_responsaveis_removidos=ids_responsaveis_removidos,
+			ids_criancas_removidas=ids_criancas_removidas,
+			chaves_rotinas_removidas=chaves_rotinas_removidas,
+			perfil_alterado=(
+				perfil is not perfil_anterior or self._versao(perfil) != versao_perfil
+			),
+			perfil=perfil,
+			data_calendario=(
+				data_calendario if data_calendario != self._data_calendario else None
+			),
+		)
+
+	@staticmethod
+	def _observavel(rotinas: Any) -> bool:
+		return all(
+			callable(getattr(rotinas, nome, None))
+			for nome in ("inscrever_observador", "cancelar_observador", "carregadas", "chaves")
+		)
+
+	@staticmethod
+	def _rotinas_carregadas(rotinas: Iterable[Rotina]) -> Iterable[Rotina]:
+		carregadas = getattr(rotinas, "carregadas", None)
+		return carregadas() if callable(carregadas) else rotinas
+
+	@staticmethod
+	def _chave_rotina(rotina: Rotina) -> tuple[str, date]:
+		return rotina.id_crianca, rotina.data_referencia
+
+	@staticmethod
+	def _versao(entidade: Any) -> int:
+		return getattr(entidade, "versao_alteracao", 0)
+
+	@staticmethod
+	def _por_identidade(entidades: Iterable[Any]) -> dict[int, Any]:
+		# A referencia e mantida para que o id() nao seja reaproveitado.
+		itens = entidades if isinstance(entidades, list) else list(entidades)
+		return dict(zip(map(id, itens), itens))
+
+	def _sincronizar_membros(self, tipo: str, entidades: Iterable[Any]) -> None:
+		membros = self._membros[tipo]
+		atuais = self._por_identidade(entidades)
+		for identidade in membros.keys() - atuais.keys():
+			membros[identidade].cancelar_observador(self)
+		for identidade in atuais.keys() - membros.keys():
+			atuais[identidade].inscrever_observador(self)
+		self._membros[tipo] = atuais
+
+	def _comparar(
+		self,
+		tipo: str,
+		entidades: list[Any],
+		chave: Callable[[Any], Any],
+	) -> tuple[list[Any], list[Any]]:
+		membros = self._membros[tipo]
+		atuais = self._por_identidade(entidades)
+		novos = atuais.keys() - membros.keys()
+		candidatos = novos | (atuais.keys() & self._sujas.keys())
+		# A lista so e percorrida quando ha algo a informar, para manter a ordem.
+		sujas = [item for item in atuais.values() if id(item) in candidatos] if candidatos else []
+
+		removidos = membros.keys() - atuais.keys()
+		if not removidos:
+			return sujas, []
+		chaves_atuais = {chave(atuais[identidade]) for identidade in novos}
+		removidas = []
+		for identidade, item in membros.items():
+			chave_item = chave(item)
+			if identidade in removidos and chave_item not in chaves_atuais:
+				chaves_atuais.add(chave_item)
+				removidas.append(chave_item)
+		return sujas, removidas
+
+	def _comparar_rotinas(self, rotinas: Iterable[Rotina]) -> tuple[list[Rotina], list[tuple[str, date]]]:
+		"""Comparacao completa, usada para listas e para uma colecao ainda nao observada."""
+		carregadas = list(self._rotinas_carregadas(rotinas))
+		if self._colecao_rotinas is not None:
+			conhecidas = self._por_identidade(self._colecao_rotinas.carregadas())
+		else:
+			conhecidas = self._membros["rotina"]
+		sujas = [
+			rotina
+			for rotina in carregadas
+			if id(rotina) not in conhecidas
+			or self._rotinas_sujas.get(self._chave_rotina(rotina)) is rotina
+		]
+
+		chaves = getattr(rotinas, "chaves", None)
+		if callable(chaves):
+			# Inclui rotinas pendentes, que nao precisam ser montadas.
+			chaves_atuais = set(chaves())
+		else:
+			chaves_atuais = {self._chave_rotina(rotina) for rotina in carregadas}
+		return sujas, sorted(self._chaves_rotinas - chaves_atuais)
+
+	def _comparar_rotinas_observadas(self, rotinas: Any) -> tuple[list[Rotina], list[tuple[str, date]]]:
+		sujas = list(self._rotinas_sujas.values())
+		removidas = self._chaves_removidas & self._chaves_rotinas
+		novas = sum(1 for chave in self._rotinas_sujas if chave not in self._chaves_rotinas)
+		if len(self._chaves_rotinas) + novas - len(removidas) != len(rotinas):
+			# Alguma rotina saiu sem aviso (ex.: registro pendente invalido).
+			removidas = self._chaves_rotinas - set(rotinas.chaves())
+		return sujas, sorted(removidas)
+
+	def _adotar_colecao(self, rotinas: Any) -> None:
+		"""Passa a observar outra colecao, guardando o que ela tem de diferente."""
+		sujas, removidas = self._comparar_rotinas(rotinas)
+		self._observar_colecao(rotinas)
+		self._rotinas_sujas = {self._chave_rotina(rotina): rotina for rotina in sujas}
+		self._chaves_removidas = set(removidas)
+
+	def _observar_colecao(self, colecao: Any) -> None:
+		if colecao is self._colecao_rotinas:
+			return
+		if self._colecao_rotinas is not None:
+			self._colecao_rotinas.cancelar_observador(self)
+		if colecao is not None:
+			# A colecao repassa as alteracoes; as rotinas deixam de ser observadas uma a uma.
+			for rotina in self._membros["rotina"].values():
+				rotina.cancelar_observador(self)
+			self._membros["rotina"] = {}
+			colecao.inscrever_observador(self)
+		self._colecao_rotinas = colecao
+
+	def _registrar_rotinas(self, rotinas: Iterable[Rotina]) -> None:
+		if not self._observavel(rotinas):
+			self._observar_colecao(None)
+			self._sincronizar_membros("rotina", rotinas)
+			self._chaves_rotinas = {
+				self._chave_rotina(rotina) for rotina in self._membros["rotina"].values()
+			}
+		elif rotinas is not self._colecao_rotinas:
+			self._observar_colecao(rotinas)
+			self._chaves_rotinas = set(rotinas.chaves())
+		else:
+			self._chaves_rotinas -= self._chaves_removidas
+			self._chaves_rotinas.update(self._rotinas_sujas)
+			if len(self._chaves_rotinas) != len(rotinas):
+				self._chaves_rotinas = set(rotinas.chaves())
+		self._rotinas_sujas = {}
+		self._chaves_removidas = set()
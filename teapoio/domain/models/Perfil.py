@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from teapoio.domain.models.crianca import Crianca
 from teapoio.domain.models.perfil_sensorial import PerfilSensorial
+from teapoio.domain.models.rastreavel import Rastreavel
 from teapoio.domain.models.responsavel import Responsavel
 
 
-class Perfil:
+class Perfil(Rastreavel):
 	def __init__(self, responsavel: Responsavel, criancas: list[Crianca] | None = None) -> None:
 		"""Inicializa o perfil do responsável, garantindo que seja válido e permitindo a associação 
 		de crianças e seus perfis sensoriais."""
@@ -36,7 +37,10 @@ class Perfil:
 		self.criancas = [crianca for crianca in self.criancas if crianca.id_crianca != id_crianca]
 		if len(self.criancas) == tamanho_anterior:
 			return False
-		self._perfis_sensoriais.pop(id_crianca, None)
+		perfil_sensorial = self._perfis_sensoriais.pop(id_crianca, None)
+		if perfil_sensorial is not None:
+			perfil_sensorial.cancelar_observador(self)
+		self._registrar_alteracao()
 		return True
 
 
@@ -47,7 +51,12 @@ class Perfil:
 			raise ValueError("Perfil sensorial inválido.")
 		if self.buscar_crianca_por_id(perfil_sensorial.id_crianca) is None:
 			raise ValueError("Não existe criança com este id para vincular perfil sensorial.")
+		anterior = self._perfis_sensoriais.get(perfil_sensorial.id_crianca)
+		if anterior is not None:
+			anterior.cancelar_observador(self)
 		self._perfis_sensoriais[perfil_sensorial.id_crianca] = perfil_sensorial
+		perfil_sensorial.inscrever_observador(self)
+		self._registrar_alteracao()
 
 	def obter_perfil_sensorial(self, id_crianca: str) -> PerfilSensorial | None:
 		"""Obtém o perfil sensorial de uma criança pelo ID, retornando o perfil encontrado ou None."""
@@ -56,3 +65,7 @@ class Perfil:
 	def listar_perfis_sensoriais(self) -> dict[str, PerfilSensorial]:
 		"""Retorna um dicionário com os perfis sensoriais de todas as crianças do perfil."""
 		return dict(self._perfis_sensoriais)
+
+	def entidade_alterada(self, entidade: PerfilSensorial) -> None:
+		"""Propaga a alteração de um perfil sensorial como alteração do perfil."""
+		self._registrar_alteracao()
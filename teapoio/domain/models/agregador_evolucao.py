@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable
+
+from teapoio.domain.models.evolucao import Evolucao
+from teapoio.domain.models.rotina import Rotina
+
+
+class AgregadorEvolucao:
+	"""[SOLID: SRP] Agregados materializados de evolucao por crianca.
+
+	Guarda a Evolucao de cada dia e os totais por semana ISO e por mes. Cada
+	alteracao de rotina aplica apenas a diferenca do dia nos totais, entao as
+	consultas por periodo nao percorrem itens nem historico.
+	"""
+
+	def __init__(self, rotinas: Iterable[Rotina] = ()) -> None:
+		self._por_dia: dict[tuple[str, date], Evolucao] = {}
+		self._por_semana: dict[tuple[str, int, int], Evolucao] = {}
+		self._por_mes: dict[tuple[str, int, int], Evolucao] = {}
+		for rotina in rotinas:
+			self.entidade_alterada(rotina)
+
+
+	@staticmethod
+	def _chave_semana(id_crianca: str, data_referencia: date) -> tuple[str, int, int]:
+		ano_iso, semana_iso, _ = data_referencia.isocalendar()
+		return id_crianca, ano_iso, semana_iso
+
+
+	@staticmethod
+	def _chave_mes(id_crianca: str, data_referencia: date) -> tuple[str, int, int]:
+		return id_crianca, data_referencia.year, data_referencia.month
+
+
+	def entidade_alterada(self, rotina: Rotina) -> None:
+		"""Atualiza o dia da rotina e propaga a diferenca para semana e mes."""
+		self._atualizar_dia(rotina.id_crianca, rotina.data_referencia, rotina.obter_evolucao())
+
+
+	def rotina_removida(self, rotina: Rotina) -> None:
+		"""Retira dos totais a contribuicao da rotina removida."""
+		self._atualizar_dia(rotina.id_crianca, rotina.data_referencia, Evolucao.vazia())
+
+
+	def evolucao_dia(self, id_crianca: str, data_referencia: date) -> Evolucao:
+		return self._por_dia.get((str(id_crianca), data_referencia), Evolucao.vazia())
+
+
+	def evolucao_semana(self, id_crianca: str, data_referencia: date) -> Evolucao:
+		"""Retorna o total da semana ISO (segunda a domingo) que contem a data."""
+		return self._por_semana.get(
+			self._chave_semana(str(id_crianca), data_referencia),
+			Evolucao.vazia(),
+		)
+
+
+	def evolucao_mes(self, id_crianca: str, data_referencia: date) -> Evolucao:
+		"""Retorna o total do mes que contem a data."""
+		return self._por_mes.get(
+			self._chave_mes(str(id_crianca), data_referencia),
+			Evolucao.vazia(),
+		)
+
+
+	def _atualizar_dia(self, id_crianca: str, data_referencia: date, nova: Evolucao) -> None:
+		chave_dia = (id_crianca, data_referencia)
+		anterior = self._por_dia.get(chave_dia, Evolucao.vazia())
+		if nova == anterior:
+			return
+
+		if nova.total_itens:
+			self._por_dia[chave_dia] = nova
+		else:
+			self._por_dia.pop(chave_dia, None)
+
+		diferenca = nova - anterior
+		for totais, chave in (
+			(self._por_semana, self._chave_semana(id_crianca, data_referencia)),
+			(self._por_mes, self._chave_mes(id_crianca, data_referencia)),
+		):
+			total = totais.get(chave, Evolucao.vazia()) + diferenca
+			if total.total_itens:
+				totais[chave] = total
+			else:
+				totais.pop(chave, None)
@@ -1,5 +1,6 @@
 from datetime import date
 import uuid
+from teapoio.domain.models.modelo_rotina import ModeloRotina
 from teapoio.domain.models.pessoa import Pessoa
 from teapoio.domain.models.responsavel import Responsavel
 
@@ -38,6 +39,22 @@ class Crianca(Pessoa):
         # Validação de nível de suporte
         self.nivel_suporte = nivel_suporte
 
+        # Modelos de rotina reutilizáveis, indexados pelo nome
+        self._modelos_rotina: dict[str, ModeloRotina] = {}
+
+
+    @classmethod
+    def restaurar(cls, id_crianca: str, id_responsavel: str, nome: str, data_nascimento,
+                  nivel_suporte: int) -> "Crianca":
+        """Recria uma criança já validada e gravada pela aplicação, sem revalidar nome,
+        data e idade. O nível de suporte continua conferido pela property."""
+        crianca = cls._restaurar_pessoa(nome, data_nascimento, None)
+        crianca.id_crianca = id_crianca
+        crianca.id_responsavel = id_responsavel
+        crianca.nivel_suporte = nivel_suporte
+        crianca._modelos_rotina = {}
+        return crianca
+
 
     @staticmethod
     def _gerar_id_uuid(uuid_func=None) -> str:
@@ -76,4 +93,28 @@ class Crianca(Pessoa):
 
     def obter_status_idade(self) -> str:
         """Retorna status de idade da criança."""
-        return "Menor de idade"
\ No newline at end of file
+        return "Menor de idade"
+
+    def salvar_modelo_rotina(self, modelo: ModeloRotina) -> None:
+        """Cadastra ou substitui um modelo de rotina com o mesmo nome."""
+        if not isinstance(modelo, ModeloRotina):
+            raise TypeError("Modelo de rotina inválido.")
+        if self._modelos_rotina.get(modelo.nome) == modelo:
+            return
+        self._modelos_rotina[modelo.nome] = modelo
+        self._registrar_alteracao()
+
+    def obter_modelo_rotina(self, nome: str) -> ModeloRotina | None:
+        """Obtém um modelo de rotina pelo nome, ou None se não existir."""
+        return self._modelos_rotina.get(str(nome).strip())
+
+    def remover_modelo_rotina(self, nome: str) -> bool:
+        """Remove um modelo de rotina pelo nome, retornando True se removido."""
+        if self._modelos_rotina.pop(str(nome).strip(), None) is None:
+            return False
+        self._registrar_alteracao()
+        return True
+
+    def listar_modelos_rotina(self) -> list[ModeloRotina]:
+        """Retorna os modelos de rotina da criança, em ordem de cadastro."""
+        return list(self._modelos_rotina.values())
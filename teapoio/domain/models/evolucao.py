@@ -25,18 +25,19 @@ class Evolucao:
 	@classmethod
 	def a_partir_itens(cls, itens: Iterable[ItemRotina]) -> "Evolucao":
 		"""Cria uma instância de Evolucao a partir de uma coleção de itens de rotina."""
-		itens_lista = list(itens)
-		total = len(itens_lista)
-
-		concluidos = sum(
-			1 for item in itens_lista if item.status == ItemRotina.STATUS_CONCLUIDO
-		)
-		nao_realizados = sum(
-			1 for item in itens_lista if item.status == ItemRotina.STATUS_NAO_REALIZADO
-		)
-		pendentes = sum(
-			1 for item in itens_lista if item.status == ItemRotina.STATUS_PENDENTE
-		)
+		total = 0
+		concluidos = 0
+		nao_realizados = 0
+		pendentes = 0
+		for item in itens:
+			total += 1
+			status = item.status
+			if status == ItemRotina.STATUS_CONCLUIDO:
+				concluidos += 1
+			elif status == ItemRotina.STATUS_NAO_REALIZADO:
+				nao_realizados += 1
+			elif status == ItemRotina.STATUS_PENDENTE:
+				pendentes += 1
 
 		return cls(
 			total_itens=total,
@@ -46,6 +47,36 @@ class Evolucao:
 		)
 
 
+	@classmethod
+	def vazia(cls) -> "Evolucao":
+		"""Cria uma Evolucao sem itens, usada como ponto de partida de somas."""
+		return cls(total_itens=0, concluidos=0, nao_realizados=0, pendentes=0)
+
+
+	def __add__(self, outra: "Evolucao") -> "Evolucao":
+		"""Soma os contadores de duas evolucoes (ex.: dias de uma semana)."""
+		if not isinstance(outra, Evolucao):
+			return NotImplemented
+		return Evolucao(
+			total_itens=self.total_itens + outra.total_itens,
+			concluidos=self.concluidos + outra.concluidos,
+			nao_realizados=self.nao_realizados + outra.nao_realizados,
+			pendentes=self.pendentes + outra.pendentes,
+		)
+
+
+	def __sub__(self, outra: "Evolucao") -> "Evolucao":
+		"""Subtrai os contadores de outra evolucao, usado em atualizacoes incrementais."""
+		if not isinstance(outra, Evolucao):
+			return NotImplemented
+		return Evolucao(
+			total_itens=self.total_itens - outra.total_itens,
+			concluidos=self.concluidos - outra.concluidos,
+			nao_realizados=self.nao_realizados - outra.nao_realizados,
+			pendentes=self.pendentes - outra.pendentes,
+		)
+
+
 	def to_dict(self) -> dict:
 		"""
         Converte o objeto Evolucao em um dicionário.
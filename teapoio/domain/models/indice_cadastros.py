@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Iterable
+import unicodedata
+
+from teapoio.domain.models.crianca import Crianca
+from teapoio.domain.models.responsavel import Responsavel
+
+
+class IndiceCadastros:
+    """[SOLID: SRP] Indices em memoria de responsaveis e criancas.
+
+    Mantem dicionarios por id do responsavel, email, id da crianca e
+    responsavel -> criancas, preservando a ordem de cadastro, alem de listas
+    ordenadas de responsaveis por nome e por email para paginacao e busca por
+    prefixo. O indice observa as entidades cadastradas (mixin Rastreavel),
+    entao alteracoes de nome, email ou vinculo da crianca sao refletidas sem
+    reindexacao manual.
+    """
+
+    ORDEM_NOME = "nome"
+    ORDEM_EMAIL = "email"
+
+    def __init__(
+        self,
+        responsaveis: Iterable[Responsavel] = (),
+        criancas: Iterable[Crianca] = (),
+    ) -> None:
+        self._responsaveis: dict[str, Responsavel] = {}
+        self._responsaveis_por_email: dict[str, Responsavel] = {}
+        self._email_indexado: dict[str, str] = {}
+        self._criancas: dict[str, Crianca] = {}
+        self._criancas_por_responsavel: dict[str, dict[str, Crianca]] = {}
+        self._responsavel_indexado: dict[str, str] = {}
+        self._ordenacao: dict[str, list[tuple[str, str]]] = {
+            self.ORDEM_NOME: [],
+            self.ORDEM_EMAIL: [],
+        }
+        self._chaves_ordenacao: dict[str, dict[str, tuple[str, str]]] = {}
+
+        for responsavel in responsaveis:
+            self.adicionar_responsavel(responsavel)
+        for crianca in criancas:
+            self.adicionar_crianca(crianca)
+
+    @property
+    def responsaveis(self) -> list[Responsavel]:
+        return list(self._responsaveis.values())
+
+    @property
+    def criancas(self) -> list[Crianca]:
+        return list(self._criancas.values())
+
+    def adicionar_responsavel(self, responsavel: Responsavel) -> None:
+        """Indexa um responsavel; um id ja existente e substituido."""
+        if not isinstance(responsavel, Responsavel):
+            raise TypeError("O indice aceita apenas objetos do tipo Responsavel.")
+
+        self.remover_responsavel(responsavel.id_responsavel)
+        self._responsaveis[responsavel.id_responsavel] = responsavel
+        self._indexar_email(responsavel)
+        self._indexar_ordenacao(responsavel)
+        responsavel.inscrever_observador(self)
+
+    def remover_responsavel(self, id_responsavel: str) -> Responsavel | None:
+        responsavel = self._responsaveis.pop(id_responsavel, None)
+        if responsavel is None:
+            return None
+
+        self._desindexar_email(id_responsavel)
+        self._desindexar_ordenacao(id_responsavel)
+        responsavel.cancelar_observador(self)
+        return responsavel
+
+    def buscar_responsavel(self, id_responsavel: str) -> Responsavel | None:
+        return self._responsaveis.get(id_responsavel)
+
+    def buscar_responsavel_por_email(self, email: str | None) -> Responsavel | None:
+        if not email:
+            return None
+        return self._responsaveis_por_email.get(email.strip().lower())
+
+    def adicionar_crianca(self, crianca: Crianca) -> None:
+        """Indexa uma crianca; um id ja existente e substituido."""
+        if not isinstance(crianca, Crianca):
+            raise TypeError("O indice aceita apenas objetos do tipo Crianca.")
+
+        self.remover_crianca(crianca.id_crianca)
+        self._criancas[crianca.id_crianca] = crianca
+        self._indexar_vinculo(crianca)
+        crianca.inscrever_observador(self)
+
+    def remover_crianca(self, id_crianca: str) -> Crianca | None:
+        crianca = self._criancas.pop(id_crianca, None)
+        if crianca is None:
+            return None
+
+        self._desindexar_vinculo(id_crianca)
+        crianca.cancelar_observador(self)
+        return crianca
+
+    def buscar_crianca(self, id_crianca: str) -> Crianca | None:
+        return self._criancas.get(id_crianca)
+
+    def listar_criancas_responsavel(self, id_responsavel: str) -> list[Crianca]:
+        return list(self._criancas_por_responsavel.get(id_responsavel, {}).values())
+
+    @staticmethod
+    def normalizar_texto_busca(valor: str | None) -> str:
+        """Normaliza texto para ordenacao e busca: sem acentos e sem diferenca de caixa."""
+        decomposto = unicodedata.normalize("NFKD", valor or "")
+        return "".join(
+            caractere for caractere in decomposto if not unicodedata.combining(caractere)
+        ).casefold().strip()
+
+    def paginar_responsaveis(
+        self,
+        limite: int,
+        ordem: str = ORDEM_NOME,
+        apos: tuple[str, str] | None = None,
+        prefixo_nome: str = "",
+        prefixo_email: str = "",
+    ) -> tuple[list[Responsavel], tuple[str, str] | None]:
+        """Retorna uma pagina de responsaveis na ordem pedida e a posicao da proxima.
+
+        `apos` e a posicao (chave, id) do ultimo responsavel da pagina anterior.
+        Os prefixos sao comparados sem acento e sem diferenca de caixa; o
+        prefixo do campo de ordenacao limita a busca a uma faixa da lista.
+        """
+        if ordem not in self._ordenacao:
+            raise ValueError("Ordem invalida. Use 'nome' ou 'email'.")
+        if limite <= 0:
+            raise ValueError("O limite deve ser maior que zero.")
+
+        prefixos = {
+            self.ORDEM_NOME: self.normalizar_texto_busca(prefixo_nome),
+            self.ORDEM_EMAIL: self.normalizar_texto_busca(prefixo_email),
+        }
+        prefixo_ordem = prefixos.pop(ordem)
+        campo_filtro, prefixo_filtro = next(iter(prefixos.items()))
+        posicao_filtro = 0 if campo_filtro == self.ORDEM_NOME else 1
+
+        lista = self._ordenacao[ordem]
+        inicio = bisect_left(lista, (prefixo_ordem, ""))
+        if apos is not None:
+            inicio = max(inicio, bisect_right(lista, tuple(apos)))
+
+        pagina: list[Responsavel] = []
+        ultima: tuple[str, str] | None = None
+        for posicao in range(inicio, len(lista)):
+            chave, id_responsavel = lista[posicao]
+            if not chave.startswith(prefixo_ordem):
+                break
+            if prefixo_filtro and not self._chaves_ordenacao[id_responsavel][
+                posicao_filtro
+            ].startswith(prefixo_filtro):
+                continue
+            if len(pagina) == limite:
+                return pagina, ultima
+            pagina.append(self._responsaveis[id_responsavel])
+            ultima = (chave, id_responsavel)
+        return pagina, None
+
+    def entidade_alterada(self, entidade: Responsavel | Crianca) -> None:
+        """Reindexa email ou vinculo quando uma entidade cadastrada e alterada."""
+        if isinstance(entidade, Responsavel):
+            if self._email_indexado.get(entidade.id_responsavel) != entidade.email:
+                self._desindexar_email(entidade.id_responsavel)
+                self._indexar_email(entidade)
+            if self._chaves_ordenacao.get(entidade.id_responsavel) != self._chaves_responsavel(entidade):
+                self._desindexar_ordenacao(entidade.id_responsavel)
+                self._indexar_ordenacao(entidade)
+        elif isinstance(entidade, Crianca):
+            if self._responsavel_indexado.get(entidade.id_crianca) != entidade.id_responsavel:
+                self._desindexar_vinculo(entidade.id_crianca)
+                self._indexar_vinculo(entidade)
+
+    def _indexar_email(self, responsavel: Responsavel) -> None:
+        if not responsavel.email:
+            return
+        self._responsaveis_por_email[responsavel.email] = responsavel
+        self._email_indexado[responsavel.id_responsavel] = responsavel.email
+
+    def _desindexar_email(self, id_responsavel: str) -> None:
+        email = self._email_indexado.pop(id_responsavel, None)
+        if email is None:
+            return
+        indexado = self._responsaveis_por_email.get(email)
+        if indexado is not None and indexado.id_responsavel == id_responsavel:
+            del self._responsaveis_por_email[email]
+
+    @classmethod
+    def _chaves_responsavel(cls, responsavel: Responsavel) -> tuple[str, str]:
+        return (
+            cls.normalizar_texto_busca(responsavel.nome),
+            cls.normalizar_texto_busca(responsavel.email),
+        )
+
+    def _indexar_ordenacao(self, responsavel: Responsavel) -> None:
+        chaves = self._chaves_responsavel(responsavel)
+        self._chaves_ordenacao[responsavel.id_responsavel] = chaves
+        insort(self._ordenacao[self.ORDEM_NOME], (chaves[0], responsavel.id_responsavel))
+        insort(self._ordenacao[self.ORDEM_EMAIL], (chaves[1], responsavel.id_responsavel))
+
+    def _desindexar_ordenacao(self, id_responsavel: str) -> None:
+        chaves = self._chaves_ordenacao.pop(id_responsavel, None)
+        if chaves is None:
+            return
+        for ordem, chave in zip((self.ORDEM_NOME, self.ORDEM_EMAIL), chaves):
+            lista = self._ordenacao[ordem]
+            posicao = bisect_left(lista, (chave, id_responsavel))
+            if posicao < len(lista) and lista[posicao] == (chave, id_responsavel):
+                del lista[posicao]
+
+    def _indexar_vinculo(self, crianca: Crianca) -> None:
+        self._criancas_por_responsavel.setdefault(crianca.id_responsavel, {})[
+            crianca.id_crianca
+        ] = crianca
+        self._responsavel_indexado[crianca.id_crianca] = crianca.id_responsavel
+
+    def _desindexar_vinculo(self, id_crianca: str) -> None:
+        id_responsavel = self._responsavel_indexado.pop(id_crianca, None)
+        criancas = self._criancas_por_responsavel.get(id_responsavel)
+        if criancas is None:
+            return
+        criancas.pop(id_crianca, None)
+        if not criancas:
+            del self._criancas_por_responsavel[id_responsavel]
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from datetime import date
+from threading import RLock
+from typing import Any, Callable, Iterable, Iterator, Protocol
+
+from teapoio.domain.models.rotina import Rotina
+
+
+class ObservadorRotinas(Protocol):
+    """Contrato de quem acompanha as rotinas indexadas (ex.: agregados de evolucao)."""
+
+    def entidade_alterada(self, rotina: Rotina) -> None:
+        """Recebe uma rotina indexada que foi criada ou alterada."""
+
+    def rotina_removida(self, rotina: Rotina) -> None:
+        """Recebe uma rotina que deixou o indice."""
+
+
+def _avisar_carga(observador: ObservadorRotinas, rotina: Rotina) -> None:
+    # Observadores que distinguem carga de alteracao oferecem `rotina_carregada`.
+    rotina_carregada = getattr(observador, "rotina_carregada", None)
+    if callable(rotina_carregada):
+        rotina_carregada(rotina)
+    else:
+        observador.entidade_alterada(rotina)
+
+
+class _RotinaPendente:
+    """Registro persistido de uma rotina que ainda nao foi montada."""
+
+    __slots__ = ("registro", "carregar")
+
+    def __init__(self, registro: Any, carregar: Callable[[Any], Rotina | None]) -> None:
+        self.registro = registro
+        self.carregar = carregar
+
+
+class IndiceRotinas:
+    """[SOLID: SRP] Colecao de rotinas indexada por (id_crianca, data_referencia).
+
+    Comporta-se como a lista de rotinas usada antes (iteracao, len, append e
+    remove em ordem de insercao), mas tambem mantem, por crianca, as datas
+    ordenadas para buscas e consultas por periodo sem varrer todo o historico.
+    Inclusoes, alteracoes e remocoes de rotinas sao repassadas aos observadores.
+
+    Rotinas tambem podem ser indexadas como pendentes (`adicionar_pendente`):
+    apenas a chave e o registro persistido ficam em memoria, e a Rotina e
+    montada no primeiro acesso, quando os observadores a recebem como
+    alterada (ou em `rotina_carregada`, se o observador oferecer esse metodo).
+    Registros que nao resultam em rotina valida deixam o indice.
+    """
+
+    def __init__(
+        self,
+        rotinas: Iterable[Rotina] = (),
+        observadores: Iterable[ObservadorRotinas] = (),
+    ) -> None:
+        self._rotinas: dict[tuple[str, date], Rotina | _RotinaPendente] = {}
+        self._datas_por_crianca: dict[str, list[date]] = {}
+        self._observadores: list[ObservadorRotinas] = list(observadores)
+        # Leituras concorrentes podem montar rotinas pendentes ao mesmo tempo.
+        self._trava_carga = RLock()
+        for rotina in rotinas:
+            self.append(rotina)
+
+    @staticmethod
+    def _chave(id_crianca: str | int, data_referencia: date) -> tuple[str, date]:
+        return str(id_crianca).strip(), data_referencia
+
+    def __iter__(self) -> Iterator[Rotina]:
+        rotinas = [self._obter(chave) for chave in list(self._rotinas)]
+        return iter([rotina for rotina in rotinas if rotina is not None])
+
+    def __len__(self) -> int:
+        return len(self._rotinas)
+
+    def __contains__(self, rotina: object) -> bool:
+        if not isinstance(rotina, Rotina):
+            return False
+        return self._rotinas.get(self._chave(rotina.id_crianca, rotina.data_referencia)) is rotina
+
+    def __repr__(self) -> str:
+        return f"IndiceRotinas({list(self._rotinas.values())!r})"
+
+    def append(self, rotina: Rotina) -> None:
+        """Indexa uma rotina; uma rotina existente na mesma data e substituida."""
+        if not isinstance(rotina, Rotina):
+            raise TypeError("O indice aceita apenas objetos do tipo Rotina.")
+
+        chave = self._chave(rotina.id_crianca, rotina.data_referencia)
+        anterior = self._rotinas.get(chave)
+        if anterior is rotina:
+            return
+        if anterior is None:
+            self._indexar_data(chave)
+        elif not isinstance(anterior, _RotinaPendente):
+            self._desvincular(anterior)
+        self._rotinas[chave] = rotina
+        rotina.inscrever_observador(self)
+        self.entidade_alterada(rotina)
+
+    def remove(self, rotina: Rotina) -> None:
+        if rotina not in self:
+            raise ValueError("Rotina nao encontrada no indice.")
+        self.remover(rotina.id_crianca, rotina.data_referencia)
+
+    def remover(self, id_crianca: str | int, data_referencia: date) -> Rotina | None:
+        chave = self._chave(id_crianca, data_referencia)
+        with self._trava_carga:
+            rotina = self._rotinas.pop(chave, None)
+            if rotina is None:
+                return None
+            self._desindexar_data(chave)
+
+        if isinstance(rotina, _RotinaPendente):
+            # Os observadores nunca receberam a rotina pendente.
+            return rotina.carregar(rotina.registro)
+        self._desvincular(rotina)
+        return rotina
+
+    def remover_crianca(self, id_crianca: str | int) -> list[Rotina]:
+        """Remove e retorna todas as rotinas da crianca."""
+        id_normalizado = str(id_crianca).strip()
+        with self._trava_carga:
+            retiradas = [
+                self._rotinas.pop((id_normalizado, data_referencia))
+                for data_referencia in self._datas_por_crianca.pop(id_normalizado, [])
+            ]
+
+        removidas: list[Rotina] = []
+        for rotina in retiradas:
+            if isinstance(rotina, _RotinaPendente):
+                rotina = rotina.carregar(rotina.registro)
+                if rotina is not None:
+                    removidas.append(rotina)
+                continue
+            self._desvincular(rotina)
+            removidas.append(rotina)
+        return removidas
+
+    def adicionar_pendente(
+        self,
+        id_crianca: str | int,
+        data_referencia: date,
+        registro: Any,
+        carregar: Callable[[Any], Rotina | None],
+    ) -> None:
+        """Indexa o registro de uma rotina que so sera montada quando acessada.
+
+        `carregar` recebe o registro e retorna a Rotina (ou None se invalido).
+        Uma rotina existente na mesma data e substituida.
+        """
+        chave = self._chave(id_crianca, data_referencia)
+        with self._trava_carga:
+            anterior = self._rotinas.get(chave)
+            if anterior is None:
+                self._indexar_data(chave)
+            elif not isinstance(anterior, _RotinaPendente):
+                self._desvincular(anterior)
+            self._rotinas[chave] = _RotinaPendente(registro, carregar)
+
+    def carregadas(self) -> list[Rotina]:
+        """Retorna as rotinas ja montadas, sem montar as pendentes."""
+        with self._trava_carga:
+            valores = list(self._rotinas.values())
+        return [rotina for rotina in valores if not isinstance(rotina, _RotinaPendente)]
+
+    def pendentes(self) -> list[tuple[str, date, Any]]:
+        """Retorna (id_crianca, data_referencia, registro) das rotinas ainda nao montadas."""
+        with self._trava_carga:
+            itens = list(self._rotinas.items())
+        return [
+            (chave[0], chave[1], valor.registro)
+            for chave, valor in itens
+            if isinstance(valor, _RotinaPendente)
+        ]
+
+    def chaves(self) -> list[tuple[str, date]]:
+        """Retorna as chaves (id_crianca, data_referencia) de todas as rotinas indexadas."""
+        with self._trava_carga:
+            return list(self._rotinas)
+
+    def carregar_periodo(self, id_crianca: str | int, inicio: date, fim: date) -> None:
+        """Monta as rotinas pendentes do periodo, para que os observadores as conhecam."""
+        self.rotinas_no_periodo(id_crianca, inicio, fim)
+
+    def inscrever_observador(self, observador: ObservadorRotinas) -> None:
+        if not any(item is observador for item in self._observadores):
+            self._observadores.append(observador)
+
+    def cancelar_observador(self, observador: ObservadorRotinas) -> None:
+        self._observadores = [item for item in self._observadores if item is not observador]
+
+    def entidade_alterada(self, rotina: Rotina) -> None:
+        """Repassa aos observadores a alteracao de uma rotina indexada."""
+        for observador in tuple(self._observadores):
+            observador.entidade_alterada(rotina)
+
+    def _desvincular(self, rotina: Rotina) -> None:
+        rotina.cancelar_observador(self)
+        for observador in tuple(self._observadores):
+            observador.rotina_removida(rotina)
+
+    def _indexar_data(self, chave: tuple[str, date]) -> None:
+        datas = self._datas_por_crianca.setdefault(chave[0], [])
+        datas.insert(bisect_left(datas, chave[1]), chave[1])
+
+    def _desindexar_data(self, chave: tuple[str, date]) -> None:
+        datas = self._datas_por_crianca[chave[0]]
+        del datas[bisect_left(datas, chave[1])]
+        if not datas:
+            del self._datas_por_crianca[chave[0]]
+
+    def _obter(self, chave: tuple[str, date]) -> Rotina | None:
+        valor = self._rotinas.get(chave)
+        if not isinstance(valor, _RotinaPendente):
+            return valor
+
+        with self._trava_carga:
+            valor = self._rotinas.get(chave)
+            if not isinstance(valor, _RotinaPendente):
+                return valor
+
+            rotina = valor.carregar(valor.registro)
+            if rotina is None or self._chave(rotina.id_crianca, rotina.data_referencia) != chave:
+                del self._rotinas[chave]
+                self._desindexar_data(chave)
+                return None
+
+            self._rotinas[chave] = rotina
+            rotina.inscrever_observador(self)
+            for observador in tuple(self._observadores):
+                _avisar_carga(observador, rotina)
+            return rotina
+
+    def _rotinas_nas_datas(self, id_crianca: str, datas: list[date]) -> list[Rotina]:
+        rotinas = [self._obter((id_crianca, data_referencia)) for data_referencia in datas]
+        return [rotina for rotina in rotinas if rotina is not None]
+
+    def buscar(self, id_crianca: str | int, data_referencia: date) -> Rotina | None:
+        return self._obter(self._chave(id_crianca, data_referencia))
+
+    def rotinas_da_crianca(self, id_crianca: str | int) -> list[Rotina]:
+        """Retorna as rotinas da crianca em ordem crescente de data."""
+        id_normalizado = str(id_crianca).strip()
+        return self._rotinas_nas_datas(
+            id_normalizado,
+            list(self._datas_por_crianca.get(id_normalizado, [])),
+        )
+
+    def iterar_rotinas_da_crianca(
+        self,
+        id_crianca: str | int,
+        mais_recentes_primeiro: bool = False,
+    ) -> Iterator[Rotina]:
+        """Percorre as rotinas da crianca montando cada pendente so quando alcancada.
+
+        Util para verificacoes que podem parar na primeira rotina encontrada.
+        """
+        id_normalizado = str(id_crianca).strip()
+        datas = list(self._datas_por_crianca.get(id_normalizado, []))
+        if mais_recentes_primeiro:
+            datas.reverse()
+        for data_referencia in datas:
+            rotina = self._obter((id_normalizado, data_referencia))
+            if rotina is not None:
+                yield rotina
+
+    def rotinas_no_periodo(
+        self,
+        id_crianca: str | int,
+        inicio: date,
+        fim: date,
+    ) -> list[Rotina]:
+        """Retorna as rotinas da crianca entre inicio e fim (inclusive), em ordem de data.
+
+        O custo depende apenas da quantidade de dias no periodo, nao do historico.
+        """
+        if fim < inicio:
+            return []
+
+        id_normalizado = str(id_crianca).strip()
+        datas = self._datas_por_crianca.get(id_normalizado, [])
+        posicao_inicial = bisect_left(datas, inicio)
+        posicao_final = bisect_right(datas, fim, lo=posicao_inicial)
+        return self._rotinas_nas_datas(id_normalizado, datas[posicao_inicial:posicao_final])
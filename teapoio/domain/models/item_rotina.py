@@ -1,7 +1,10 @@
 import re
+from uuid import uuid4
 
+from teapoio.domain.models.rastreavel import Rastreavel
 
-class ItemRotina:
+
+class ItemRotina(Rastreavel):
     """[SOLID: SRP] Entidade focada apenas em regras do item da rotina."""
 
     STATUS_PENDENTE = "Pendente"
@@ -13,9 +16,17 @@ class ItemRotina:
     LIMITE_TAGS = 10
 
 
-    def __init__(self, nome: str, horario: str, observacao: str = "", tags: list[str] | None = None):
+    def __init__(
+        self,
+        nome: str,
+        horario: str,
+        observacao: str = "",
+        tags: list[str] | None = None,
+        id_item: str | None = None,
+    ):
         """Inicializa um item de rotina com nome, horário e status padrão."""
 
+        self.__id_item = self._validar_id_item(id_item)
         self.nome = nome
         self.horario = horario
         self.status = self.STATUS_PENDENTE
@@ -23,6 +34,54 @@ class ItemRotina:
         self.tags = tags
 
 
+    @classmethod
+    def restaurar(
+        cls,
+        id_item: str,
+        nome: str,
+        horario: str,
+        status: str,
+        observacao: str = "",
+        tags: list[str] | None = None,
+    ) -> "ItemRotina":
+        """Recria um item gravado pela aplicação sem repetir as validações dos campos."""
+        item = cls.__new__(cls)
+        item.__id_item = id_item
+        item.__nome = nome
+        item.__horario = horario
+        item.__status = status
+        item.__observacao = observacao
+        item.__tags = list(tags or [])
+        return item
+
+
+    @staticmethod
+    def _gerar_id_item() -> str:
+        # Ids apenas numericos seriam confundidos com o indice do item nas rotas.
+        while True:
+            id_item = uuid4().hex[:12]
+            if not id_item.isdigit():
+                return id_item
+
+
+    @classmethod
+    def _validar_id_item(cls, id_item: str | None) -> str:
+        if id_item is None:
+            return cls._gerar_id_item()
+        if not isinstance(id_item, str):
+            raise TypeError("O identificador do item deve ser uma string.")
+        id_limpo = id_item.strip()
+        if not id_limpo:
+            return cls._gerar_id_item()
+        return id_limpo
+
+
+    @property
+    def id_item(self) -> str:
+        """Retorna o identificador estável do item, que não muda com a ordenação da rotina."""
+        return self.__id_item
+
+
     @property
     def nome(self) -> str:
         """Retorna o nome do item de rotina."""
@@ -0,0 +1,76 @@
+from typing import Any, Iterable
+
+from teapoio.domain.models.item_rotina import ItemRotina
+
+
+class ModeloRotina:
+    """[SOLID: SRP] Dia de rotina reutilizavel de uma crianca.
+
+    Guarda apenas nome, horario, observacao e tags de cada item. O modelo e
+    imutavel; `criar_itens` gera itens novos, pendentes e com identificador
+    proprio, a cada aplicacao.
+    """
+
+    LIMITE_NOME = 60
+
+    def __init__(self, nome: str, itens: Iterable[ItemRotina]) -> None:
+        self._nome = self._validar_nome(nome)
+
+        horarios: set[str] = set()
+        dados_itens: list[tuple[str, str, str, tuple[str, ...]]] = []
+        for item in itens:
+            if not isinstance(item, ItemRotina):
+                raise TypeError("O modelo aceita apenas objetos do tipo ItemRotina.")
+            if item.horario in horarios:
+                raise ValueError(f"Ja existe um item cadastrado no horario {item.horario}.")
+            horarios.add(item.horario)
+            dados_itens.append((item.nome, item.horario, item.observacao, tuple(item.tags)))
+
+        if not dados_itens:
+            raise ValueError("O modelo de rotina deve ter ao menos um item.")
+        self._itens = tuple(sorted(dados_itens, key=lambda dados: dados[1]))
+
+    @classmethod
+    def a_partir_rotina(cls, nome: str, rotina: Any) -> "ModeloRotina":
+        """Cria um modelo com os itens de uma rotina existente, sem status nem ids."""
+        return cls(nome=nome, itens=rotina.itens)
+
+    @classmethod
+    def _validar_nome(cls, nome: str) -> str:
+        if not isinstance(nome, str):
+            raise TypeError("Nome do modelo deve ser uma string.")
+        nome_limpo = nome.strip()
+        if not nome_limpo:
+            raise ValueError("Nome do modelo nao pode ser vazio.")
+        if len(nome_limpo) > cls.LIMITE_NOME:
+            raise ValueError(f"Nome do modelo deve ter no maximo {cls.LIMITE_NOME} caracteres.")
+        return nome_limpo
+
+    @property
+    def nome(self) -> str:
+        return self._nome
+
+    @property
+    def itens(self) -> list[dict[str, Any]]:
+        return [
+            {"nome": nome, "horario": horario, "observacao": observacao, "tags": list(tags)}
+            for nome, horario, observacao, tags in self._itens
+        ]
+
+    def criar_itens(self) -> list[ItemRotina]:
+        """Retorna itens novos da rotina, na ordem de horario."""
+        return [
+            ItemRotina(nome=nome, horario=horario, observacao=observacao, tags=list(tags))
+            for nome, horario, observacao, tags in self._itens
+        ]
+
+    def __eq__(self, outro: object) -> bool:
+        if not isinstance(outro, ModeloRotina):
+            return NotImplemented
+        return self._nome == outro._nome and self._itens == outro._itens
+
+    def __hash__(self) -> int:
+        return hash((self._nome, self._itens))
+
+    def __repr__(self) -> str:
+        return f"ModeloRotina({self._nome!r}, {len(self._itens)} itens)"
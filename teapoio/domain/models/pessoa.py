@@ -3,8 +3,10 @@ from abc import ABC, abstractmethod
 import re
 import uuid
 
+from teapoio.domain.models.rastreavel import Rastreavel
 
-class Pessoa(ABC):
+
+class Pessoa(Rastreavel, ABC):
     """[SOLID: LSP, ISP] Classe base abstrata para tipos de pessoa."""
 
     def __init__(self, nome: str, data_nascimento: str, email: str = None):
@@ -14,6 +16,20 @@ class Pessoa(ABC):
         self.data_nascimento = self._validar_data_nascimento(data_nascimento)
         self.email = self._validar_email(email) if email else None
 
+    @classmethod
+    def _restaurar_pessoa(cls, nome: str, data_nascimento: datetime, email: str | None):
+        """Cria a instância com dados já validados, sem executar `__init__`.
+
+        Base dos construtores `restaurar` das subclasses, usados apenas para
+        registros gravados pela própria aplicação.
+        """
+        pessoa = cls.__new__(cls)
+        pessoa.id_pessoa = str(uuid.uuid4())[:6]
+        pessoa.nome = nome
+        pessoa.data_nascimento = data_nascimento
+        pessoa.email = email
+        return pessoa
+
     @staticmethod
     def _validar_nome(nome: str) -> str:
         """Valida o nome da pessoa, garantindo que seja uma string não vazia."""
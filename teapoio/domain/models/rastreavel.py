@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Any, Protocol
+
+
+class ObservadorAlteracoes(Protocol):
+    """Contrato para quem precisa ser avisado quando uma entidade muda."""
+
+    def entidade_alterada(self, entidade: Any) -> None:
+        """Recebe a entidade que teve algum atributo alterado."""
+
+
+class Rastreavel:
+    """[SOLID: SRP, OCP] Mixin que registra alteracoes reais nos atributos publicos.
+
+    Toda atribuicao a um atributo publico (inclusive via property) compara o
+    valor anterior com o novo; somente quando eles diferem a versao da entidade
+    e incrementada e os observadores inscritos sao avisados. Atribuicoes feitas
+    durante a construcao do objeto nao contam como alteracao.
+    """
+
+    def __setattr__(self, nome: str, valor: Any) -> None:
+        if nome.startswith("_"):
+            object.__setattr__(self, nome, valor)
+            return
+
+        ausente = object()
+        anterior = getattr(self, nome, ausente)
+        object.__setattr__(self, nome, valor)
+        if anterior is ausente:
+            return
+        if getattr(self, nome, ausente) != anterior:
+            self._registrar_alteracao()
+
+    @property
+    def versao_alteracao(self) -> int:
+        """Contador incrementado a cada alteracao real da entidade."""
+        return self.__dict__.get("_versao_alteracao", 0)
+
+    def inscrever_observador(self, observador: ObservadorAlteracoes) -> None:
+        observadores = self.__dict__.setdefault("_observadores", [])
+        if not any(item is observador for item in observadores):
+            observadores.append(observador)
+
+    def cancelar_observador(self, observador: ObservadorAlteracoes) -> None:
+        observadores = self.__dict__.get("_observadores", [])
+        self._observadores = [item for item in observadores if item is not observador]
+
+    def _registrar_alteracao(self) -> None:
+        self._versao_alteracao = self.versao_alteracao + 1
+        for observador in tuple(self.__dict__.get("_observadores", ())):
+            observador.entidade_alterada(self)
@@ -22,6 +22,14 @@ class Responsavel(Pessoa):
             raise ValueError("Responsável deve ter pelo menos 18 anos.")
 
 
+    @classmethod
+    def restaurar(cls, id_responsavel: str, nome: str, data_nascimento, email: str, senha: str):
+        """Recria um responsável já validado e gravado pela aplicação, sem revalidar os dados."""
+        responsavel = cls._restaurar_pessoa(nome, data_nascimento, email)
+        responsavel.senha = senha
+        responsavel.id_responsavel = id_responsavel
+        return responsavel
+
     @staticmethod
     def _validar_senha(senha: str) -> str:
         if not isinstance(senha, str):
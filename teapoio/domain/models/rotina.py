@@ -3,6 +3,7 @@ from typing import Iterable, List, Protocol
 
 from teapoio.domain.models.evolucao import Evolucao
 from teapoio.domain.models.item_rotina import ItemRotina
+from teapoio.domain.models.rastreavel import Rastreavel
 
 
 class ResolvedorStatusRotina(Protocol):
@@ -52,7 +53,7 @@ class CalculadoraEvolucaoPadrao:
         return Evolucao.a_partir_itens(itens)
 
 
-class Rotina:
+class Rotina(Rastreavel):
     """[SOLID: SRP, OCP, DIP] Entidade de rotina com regras de dominio.
 
     A classe suporta registro de sentimentos e emocoes detalhadas em escala.
@@ -103,6 +104,31 @@ class Rotina:
         self._emocao_escalas: dict[str, int] = {}
         self._resolvedor_status = resolvedor_status or ResolvedorStatusPadrao()
         self._calculadora_evolucao = calculadora_evolucao or CalculadoraEvolucaoPadrao()
+        self._evolucao_em_cache: tuple[int, Evolucao | None] = (-1, None)
+        self._versao_base = 0
+
+    @classmethod
+    def restaurar(
+        cls,
+        id_crianca: str,
+        data_referencia: date,
+        itens: Iterable[ItemRotina],
+        sentimento_dia: str | None = None,
+        emocoes: dict[str, int] | None = None,
+        versao: int = 0,
+    ) -> "Rotina":
+        """Recria uma rotina gravada pela aplicação com todos os itens de uma vez.
+
+        Não confere horários repetidos nem as escalas das emoções; os itens são
+        ordenados uma única vez e a rotina começa sem alterações pendentes.
+        """
+        rotina = cls(id_crianca=id_crianca, data_referencia=data_referencia, sentimento_dia=sentimento_dia)
+        rotina.itens[:] = sorted(itens, key=lambda item_rotina: item_rotina.horario)
+        for item in rotina.itens:
+            item.inscrever_observador(rotina)
+        rotina._emocao_escalas = dict(emocoes or {})
+        rotina.definir_versao(versao)
+        return rotina
 
     @classmethod
     def opcoes_sentimento_dia(cls) -> list[dict[str, str]]:
@@ -192,6 +218,26 @@ class Rotina:
         raise TypeError("data_referencia deve ser date, string valida ou None.")
 
 
+    @property
+    def versao(self) -> int:
+        """Retorna a versao da rotina, incrementada a cada alteracao e persistida."""
+        return self._versao_base + self.versao_alteracao
+
+    def definir_versao(self, versao: int) -> None:
+        """Define a versao atual da rotina (usado ao carregar dados persistidos)."""
+        if isinstance(versao, bool) or not isinstance(versao, int):
+            raise TypeError("A versao da rotina deve ser um numero inteiro.")
+        if versao < 0:
+            raise ValueError("A versao da rotina nao pode ser negativa.")
+        self._versao_base = versao - self.versao_alteracao
+
+    def indice_item(self, id_item: str) -> int | None:
+        """Retorna a posicao atual do item com o identificador informado."""
+        return next(
+            (indice for indice, item in enumerate(self.itens) if item.id_item == id_item),
+            None,
+        )
+
     @property
     def data_formatada(self) -> str:
         """Retorna a data de referência formatada como string no formato DD/MM/YYYY."""
@@ -244,11 +290,83 @@ class Rotina:
 
         self.itens.append(item)
         self.itens.sort(key=lambda item_rotina: item_rotina.horario)
+        item.inscrever_observador(self)
+        self._registrar_alteracao()
+
+    def validar_lote(
+        self,
+        novos_itens: Iterable[ItemRotina] = (),
+        status_itens: Iterable[tuple[ItemRotina, int | str]] = (),
+        itens_removidos: Iterable[ItemRotina] = (),
+    ) -> list[tuple[ItemRotina, str]]:
+        """Valida um lote de alteracoes sem alterar a rotina.
+
+        Status e remocoes se referem a itens ja presentes na rotina. Retorna os
+        status ja resolvidos para cada item.
+        """
+        presentes = {id(item) for item in self.itens}
+
+        status_resolvidos: list[tuple[ItemRotina, str]] = []
+        for item, status_code in status_itens:
+            if id(item) not in presentes:
+                raise ValueError("Item nao encontrado na rotina.")
+            status_resolvidos.append((item, self._resolvedor_status.resolver(status_code)))
+
+        removidos: set[int] = set()
+        for item in itens_removidos:
+            if id(item) not in presentes:
+                raise ValueError("Item nao encontrado na rotina.")
+            if id(item) in removidos:
+                raise ValueError("O mesmo item foi removido mais de uma vez.")
+            removidos.add(id(item))
+
+        horarios = {item.horario for item in self.itens if id(item) not in removidos}
+        for item in novos_itens:
+            if not isinstance(item, ItemRotina):
+                raise TypeError("A rotina aceita apenas objetos do tipo ItemRotina.")
+            if item.horario in horarios:
+                raise ValueError(f"Ja existe um item cadastrado no horario {item.horario}.")
+            horarios.add(item.horario)
+
+        return status_resolvidos
+
+    def aplicar_lote(
+        self,
+        novos_itens: Iterable[ItemRotina] = (),
+        status_itens: Iterable[tuple[ItemRotina, int | str]] = (),
+        itens_removidos: Iterable[ItemRotina] = (),
+    ) -> None:
+        """Aplica status, remocoes e inclusoes de uma vez, ou nenhuma se alguma for invalida.
+
+        Os novos itens entram com uma unica ordenacao da lista.
+        """
+        novos_itens = list(novos_itens)
+        itens_removidos = list(itens_removidos)
+        status_resolvidos = self.validar_lote(novos_itens, status_itens, itens_removidos)
+
+        for item, status in status_resolvidos:
+            item.status = status
+
+        if not novos_itens and not itens_removidos:
+            return
+
+        removidos = {id(item) for item in itens_removidos}
+        for item in itens_removidos:
+            item.cancelar_observador(self)
+        self.itens[:] = [item for item in self.itens if id(item) not in removidos]
+
+        for item in novos_itens:
+            item.inscrever_observador(self)
+        self.itens.extend(novos_itens)
+        self.itens.sort(key=lambda item_rotina: item_rotina.horario)
+        self._registrar_alteracao()
 
     def remover_item(self, indice):
         """Remove um item da rotina pelo índice."""
         self._validar_indice(indice, len(self.itens))
-        self.itens.pop(indice)
+        item = self.itens.pop(indice)
+        item.cancelar_observador(self)
+        self._registrar_alteracao()
 
     def editar_item(self, indice, novo_nome, novo_horario):
         """Edita um item da rotina pelo índice."""
@@ -272,8 +390,12 @@ class Rotina:
         return self.obter_evolucao().percentual_concluido
 
     def obter_evolucao(self) -> Evolucao:
-        """Obtém a evolução da rotina."""
-        return self._calculadora_evolucao.calcular(self.itens)
+        """Obtém a evolução da rotina, recalculando apenas após alguma alteração."""
+        versao, evolucao = self._evolucao_em_cache
+        if evolucao is None or versao != self.versao_alteracao:
+            evolucao = self._calculadora_evolucao.calcular(self.itens)
+            self._evolucao_em_cache = (self.versao_alteracao, evolucao)
+        return evolucao
 
     def obter_resumo_evolucao(self):
         """Obtém um resumo da evolução da rotina."""
@@ -295,12 +417,19 @@ class Rotina:
             raise ValueError(f"Emoção inválida. Permitidas: {permitidas}.")
         if not isinstance(escala, int) or escala < 1 or escala > 5:
             raise ValueError("Escala de emoção deve ser inteiro entre 1 e 5.")
+        if self._emocao_escalas.get(chave) == escala:
+            return
         self._emocao_escalas[chave] = escala
+        self._registrar_alteracao()
 
     def obter_emocoes(self) -> dict[str, int]:
         """Retorna cópia das emoções registradas e suas escalas."""
         return dict(self._emocao_escalas)
 
+    def entidade_alterada(self, entidade: ItemRotina) -> None:
+        """Propaga a alteração de um item como alteração da própria rotina."""
+        self._registrar_alteracao()
+
 def obter_sugestoes_tea():
     """Retorna uma lista de sugestões de itens de rotina comuns."""
     return [
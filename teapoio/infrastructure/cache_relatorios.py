@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from hashlib import sha256
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+import os
+import re
+from typing import Iterable, Iterator
+
+
+class CacheArtefatosRelatorio:
+    """[SOLID: SRP] Cache em disco de relatorios PDF enderecados pelo conteudo.
+
+    A chave e o hash SHA-256 das linhas que compoem o relatorio, entao um
+    relatorio com o mesmo conteudo e servido do disco sem nova renderizacao e
+    qualquer alteracao de rotina ou perfil gera uma chave nova. O diretorio e
+    limitado em bytes; os arquivos menos usados recentemente sao removidos.
+    """
+
+    LIMITE_BYTES_PADRAO = 50 * 1024 * 1024
+    EXTENSAO = ".pdf"
+    _PADRAO_CHAVE = re.compile(r"^[0-9a-f]{64}$")
+
+    def __init__(self, diretorio: str | Path, limite_bytes: int = LIMITE_BYTES_PADRAO) -> None:
+        if isinstance(limite_bytes, bool) or not isinstance(limite_bytes, int):
+            raise TypeError("O limite do cache deve ser um numero inteiro de bytes.")
+        if limite_bytes <= 0:
+            raise ValueError("O limite do cache deve ser maior que zero.")
+
+        self._diretorio = Path(diretorio)
+        self._limite_bytes = limite_bytes
+
+    @property
+    def diretorio(self) -> Path:
+        return self._diretorio
+
+    @staticmethod
+    def calcular_chave(partes: Iterable[str]) -> str:
+        """Calcula a chave de conteudo a partir das partes do relatorio."""
+        resumo = sha256()
+        for parte in partes:
+            resumo.update(str(parte).encode("utf-8"))
+            resumo.update(b"\n")
+        return resumo.hexdigest()
+
+    def buscar(self, chave: str) -> Path | None:
+        """Retorna o arquivo da chave, se existir, marcando-o como usado agora."""
+        caminho = self._caminho(chave)
+        try:
+            os.utime(caminho)
+        except FileNotFoundError:
+            return None
+        return caminho
+
+    def gravar(self, chave: str, blocos: Iterable[bytes]) -> Iterator[bytes]:
+        """Repassa os blocos do PDF e grava uma copia no cache.
+
+        O arquivo so entra no cache quando todos os blocos foram consumidos; uma
+        geracao interrompida descarta o arquivo temporario.
+        """
+        destino = self._caminho(chave)
+        self._diretorio.mkdir(parents=True, exist_ok=True)
+        temporario = NamedTemporaryFile(dir=self._diretorio, suffix=".tmp", delete=False)
+        completo = False
+        try:
+            for bloco in blocos:
+                temporario.write(bloco)
+                yield bloco
+            completo = True
+        finally:
+            temporario.close()
+            if completo:
+                os.replace(temporario.name, destino)
+                self._aplicar_limite()
+            else:
+                Path(temporario.name).unlink(missing_ok=True)
+
+    def _caminho(self, chave: str) -> Path:
+        if not self._PADRAO_CHAVE.match(str(chave)):
+            raise ValueError("Chave de cache invalida.")
+        return self._diretorio / f"{chave}{self.EXTENSAO}"
+
+    def _aplicar_limite(self) -> None:
+        arquivos: list[tuple[float, int, Path]] = []
+        for caminho in self._diretorio.glob(f"*{self.EXTENSAO}"):
+            try:
+                info = caminho.stat()
+            except FileNotFoundError:
+                continue
+            arquivos.append((info.st_mtime, info.st_size, caminho))
+
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= self._limite_bytes:
+                break
+            caminho.unlink(missing_ok=True)
+            total -= tamanho
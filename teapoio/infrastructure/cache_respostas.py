@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from hashlib import sha256
+from threading import Lock
+from typing import Hashable
+
+
+@dataclass(frozen=True)
+class RespostaEmCache:
+    """Corpo serializado de uma resposta e os metadados de revalidacao."""
+
+    geracao: int
+    corpo: bytes
+    mimetype: str
+    etag: str
+    modificado_em: datetime
+
+
+class CacheRespostas:
+    """[SOLID: SRP] Cache em memoria de respostas das rotas de leitura.
+
+    Cada entrada pertence a geracao do estado em que foi montada; enquanto a
+    geracao nao muda, a resposta e reaproveitada sem reconstruir os dicionarios.
+    O ETag padrao e o hash do corpo, igual em todos os processos que
+    compartilham o estado, e a data de modificacao so avanca quando o conteudo
+    de fato muda. As entradas menos usadas sao descartadas ao exceder o limite.
+    """
+
+    LIMITE_ENTRADAS_PADRAO = 1024
+
+    def __init__(self, limite_entradas: int = LIMITE_ENTRADAS_PADRAO) -> None:
+        if isinstance(limite_entradas, bool) or not isinstance(limite_entradas, int):
+            raise TypeError("O limite do cache de respostas deve ser um numero inteiro.")
+        if limite_entradas <= 0:
+            raise ValueError("O limite do cache de respostas deve ser maior que zero.")
+
+        self._limite_entradas = limite_entradas
+        self._entradas: OrderedDict[Hashable, RespostaEmCache] = OrderedDict()
+        self._trava = Lock()
+
+    def __len__(self) -> int:
+        with self._trava:
+            return len(self._entradas)
+
+    def buscar(self, chave: Hashable, geracao: int) -> RespostaEmCache | None:
+        """Retorna a entrada da chave se ela foi montada na geracao informada."""
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada.geracao != geracao:
+                return None
+            self._entradas.move_to_end(chave)
+            return entrada
+
+    def registrar(
+        self,
+        chave: Hashable,
+        geracao: int,
+        corpo: bytes,
+        mimetype: str,
+        etag: str | None = None,
+    ) -> RespostaEmCache:
+        etag = etag or sha256(corpo).hexdigest()[:32]
+        with self._trava:
+            anterior = self._entradas.get(chave)
+            if anterior is not None and anterior.etag == etag:
+                modificado_em = anterior.modificado_em
+            else:
+                # Last-Modified tem precisao de segundos.
+                modificado_em = datetime.now(timezone.utc).replace(microsecond=0)
+            entrada = RespostaEmCache(
+                geracao=geracao,
+                corpo=corpo,
+                mimetype=mimetype,
+                etag=etag,
+                modificado_em=modificado_em,
+            )
+            self._entradas[chave] = entrada
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self._limite_entradas:
+                self._entradas.popitem(last=False)
+            return entrada
+
+    def limpar(self) -> None:
+        with self._trava:
+            self._entradas.clear()
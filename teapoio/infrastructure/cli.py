@@ -7,6 +7,7 @@ from typing import List
 
 from teapoio.domain.models.Perfil import Perfil
 from teapoio.domain.models.crianca import Crianca
+from teapoio.domain.models.indice_rotinas import IndiceRotinas
 from teapoio.domain.models.responsavel import Responsavel
 from teapoio.application.services.servico_cadastro import ServicoCadastro
 from teapoio.application.services.servico_monitoramento import ServicoMonitoramento
@@ -41,7 +42,7 @@ class TeApoioCLI:
 
         self._responsaveis: List[Responsavel] = estado["responsaveis"]
         self._criancas: List[Crianca] = estado["criancas"]
-        self._rotinas: List[Rotina] = estado["rotinas"]
+        self._rotinas = IndiceRotinas(estado["rotinas"])
         self._servico_cadastro = servico_cadastro or ServicoCadastro()
         self._servico_monitoramento = servico_monitoramento or ServicoMonitoramento()
         self._servico_perfil = servico_perfil or ServicoPerfil()
@@ -944,12 +945,13 @@ class TeApoioCLI:
             print("Exclusão cancelada.")
             return
 
-        self._criancas, self._rotinas = self._servico_perfil.excluir_crianca(
+        self._criancas, rotinas = self._servico_perfil.excluir_crianca(
             criancas=self._criancas,
             rotinas=self._rotinas,
             perfil=self._perfil,
             id_crianca=id_crianca,
         )
+        self._rotinas = IndiceRotinas(rotinas)
         self._persistir_estado()
         print("Criança excluída com sucesso.")
 
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Condition, Lock
+from typing import IO, Iterator
+from uuid import uuid4
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class TravaLeituraEscrita:
+    """[SOLID: SRP] Trava que permite varios leitores ou um unico escritor.
+
+    Escritores tem preferencia: quando um escritor esta aguardando, novos
+    leitores esperam, evitando que uma sequencia de leituras bloqueie as
+    gravacoes indefinidamente. A trava nao e reentrante.
+    """
+
+    def __init__(self) -> None:
+        self._condicao = Condition(Lock())
+        self._leitores_ativos = 0
+        self._escritores_aguardando = 0
+        self._escritor_ativo = False
+
+    def adquirir_leitura(self) -> None:
+        with self._condicao:
+            while self._escritor_ativo or self._escritores_aguardando:
+                self._condicao.wait()
+            self._leitores_ativos += 1
+
+    def liberar_leitura(self) -> None:
+        with self._condicao:
+            if self._leitores_ativos <= 0:
+                raise RuntimeError("Nenhuma leitura ativa para liberar.")
+            self._leitores_ativos -= 1
+            if self._leitores_ativos == 0:
+                self._condicao.notify_all()
+
+    def adquirir_escrita(self) -> None:
+        with self._condicao:
+            self._escritores_aguardando += 1
+            try:
+                while self._escritor_ativo or self._leitores_ativos:
+                    self._condicao.wait()
+            finally:
+                self._escritores_aguardando -= 1
+            self._escritor_ativo = True
+
+    def liberar_escrita(self) -> None:
+        with self._condicao:
+            if not self._escritor_ativo:
+                raise RuntimeError("Nenhuma escrita ativa para liberar.")
+            self._escritor_ativo = False
+            self._condicao.notify_all()
+
+    @contextmanager
+    def leitura(self) -> Iterator[None]:
+        self.adquirir_leitura()
+        try:
+            yield
+        finally:
+            self.liberar_leitura()
+
+    @contextmanager
+    def escrita(self) -> Iterator[None]:
+        self.adquirir_escrita()
+        try:
+            yield
+        finally:
+            self.liberar_escrita()
+
+
+class TravaArquivo:
+    """Trava entre processos baseada em um arquivo.
+
+    Usa `fcntl.flock` (travas compartilhadas e exclusivas). No Windows usa
+    `msvcrt.locking`, que so oferece travas exclusivas; nesse caso a trava
+    compartilhada tambem e exclusiva.
+    """
+
+    def __init__(self, caminho: str | Path) -> None:
+        self._caminho = Path(caminho)
+
+    @property
+    def caminho(self) -> Path:
+        return self._caminho
+
+    @contextmanager
+    def compartilhada(self) -> Iterator[None]:
+        with self._travar(exclusiva=False):
+            yield
+
+    @contextmanager
+    def exclusiva(self) -> Iterator[None]:
+        with self._travar(exclusiva=True):
+            yield
+
+    def adquirir(self, exclusiva: bool) -> IO[bytes]:
+        """Adquire a trava e retorna o arquivo aberto, a ser passado para `liberar`."""
+        self._caminho.parent.mkdir(parents=True, exist_ok=True)
+        arquivo = self._caminho.open("a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX if exclusiva else fcntl.LOCK_SH)
+            else:
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+        except BaseException:
+            arquivo.close()
+            raise
+        return arquivo
+
+    @staticmethod
+    def liberar(arquivo: IO[bytes]) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+            else:
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            arquivo.close()
+
+    @contextmanager
+    def _travar(self, exclusiva: bool) -> Iterator[None]:
+        arquivo = self.adquirir(exclusiva)
+        try:
+            yield
+        finally:
+            self.liberar(arquivo)
+
+
+class SincronizadorProcessos:
+    """[SOLID: SRP] Coordena processos que compartilham o mesmo arquivo de estado.
+
+    Ao lado do arquivo de dados ficam uma trava (`.lock`) e um carimbo de
+    versao (`.versao`). Cada gravacao renova o carimbo; um processo cujo
+    carimbo conhecido difere do gravado sabe que outro processo alterou o
+    estado e precisa recarrega-lo antes de ler ou alterar.
+    """
+
+    def __init__(self, caminho_dados: str | Path) -> None:
+        caminho = Path(caminho_dados)
+        self.trava = TravaArquivo(caminho.with_name(f"{caminho.name}.lock"))
+        self._caminho_carimbo = caminho.with_name(f"{caminho.name}.versao")
+        self._versao_conhecida: str | None = None
+
+    def versao_gravada(self) -> str:
+        try:
+            return self._caminho_carimbo.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return ""
+
+    @property
+    def desatualizado(self) -> bool:
+        return self._versao_conhecida != self.versao_gravada()
+
+    def registrar_carregamento(self) -> None:
+        """Marca o estado em memoria como equivalente a versao gravada."""
+        self._versao_conhecida = self.versao_gravada()
+
+    def publicar_gravacao(self) -> None:
+        """Renova o carimbo apos uma gravacao. Deve ser chamado com a trava exclusiva."""
+        versao = uuid4().hex
+        temporario = self._caminho_carimbo.with_name(f"{self._caminho_carimbo.name}.tmp")
+        temporario.write_text(versao, encoding="utf-8")
+        temporario.replace(self._caminho_carimbo)
+        self._versao_conhecida = versao
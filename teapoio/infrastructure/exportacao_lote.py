@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import repeat
+import multiprocessing
+import os
+from typing import BinaryIO, Iterator, Sequence
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from teapoio.infrastructure.cache_relatorios import CacheArtefatosRelatorio
+from teapoio.infrastructure.relatorio_pdf import RelatorioPreparado
+
+
+def _renderizar_relatorio(relatorio: RelatorioPreparado, gerado_em: datetime) -> bytes:
+    # Funcao de modulo para poder ser enviada aos processos do pool.
+    return b"".join(relatorio.gerar_pdf(gerado_em))
+
+
+class ExportadorLoteRelatorios:
+    """[SOLID: SRP] Gera os relatorios de varias criancas em um unico arquivo ZIP.
+
+    Relatorios ja presentes no cache sao copiados do disco; os demais sao
+    renderizados em um pool de processos, em que cada processo monta os estilos
+    do reportlab uma unica vez e os reaproveita em todos os relatorios que
+    recebe. Cada PDF novo tambem e gravado no cache.
+    """
+
+    def __init__(
+        self,
+        cache: CacheArtefatosRelatorio,
+        max_processos: int | None = None,
+    ) -> None:
+        if max_processos is not None and max_processos <= 0:
+            raise ValueError("O numero de processos deve ser maior que zero.")
+
+        self._cache = cache
+        self._max_processos = max_processos or os.cpu_count() or 1
+
+    def exportar_zip(
+        self,
+        relatorios: Sequence[RelatorioPreparado],
+        destino: BinaryIO,
+        gerado_em: datetime | None = None,
+    ) -> int:
+        """Escreve no destino um ZIP com um PDF por relatorio e retorna a quantidade."""
+        momento = gerado_em or datetime.now()
+        # Relatorios com conteudo identico aparecem com os respectivos nomes.
+        nomes_por_chave: dict[str, list[str]] = {}
+        unicos: dict[str, RelatorioPreparado] = {}
+        for relatorio in relatorios:
+            nomes = nomes_por_chave.setdefault(relatorio.chave, [])
+            if relatorio.nome_arquivo not in nomes:
+                nomes.append(relatorio.nome_arquivo)
+            unicos.setdefault(relatorio.chave, relatorio)
+
+        pendentes: list[RelatorioPreparado] = []
+        with ZipFile(destino, "w", compression=ZIP_DEFLATED) as arquivo_zip:
+            for chave, relatorio in unicos.items():
+                artefato = self._cache.buscar(chave)
+                if artefato is None:
+                    pendentes.append(relatorio)
+                elif len(nomes_por_chave[chave]) == 1:
+                    arquivo_zip.write(artefato, arcname=relatorio.nome_arquivo)
+                else:
+                    # Lido uma vez: o cache pode descartar o arquivo entre as copias.
+                    pdf = artefato.read_bytes()
+                    for nome in nomes_por_chave[chave]:
+                        arquivo_zip.writestr(nome, pdf)
+
+            for relatorio, pdf in self._renderizar(pendentes, momento):
+                for nome in nomes_por_chave[relatorio.chave]:
+                    arquivo_zip.writestr(nome, pdf)
+                for _ in self._cache.gravar(relatorio.chave, [pdf]):
+                    pass
+        return sum(len(nomes) for nomes in nomes_por_chave.values())
+
+    def _renderizar(
+        self,
+        relatorios: list[RelatorioPreparado],
+        gerado_em: datetime,
+    ) -> Iterator[tuple[RelatorioPreparado, bytes]]:
+        processos = min(self._max_processos, len(relatorios))
+        if processos <= 1:
+            for relatorio in relatorios:
+                yield relatorio, _renderizar_relatorio(relatorio, gerado_em)
+            return
+
+        # "spawn" evita copiar, via fork, as threads e travas do servidor web.
+        contexto = multiprocessing.get_context("spawn")
+        tamanho_lote = max(1, len(relatorios) // (processos * 4))
+        with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as executor:
+            resultados = executor.map(
+                _renderizar_relatorio,
+                relatorios,
+                repeat(gerado_em),
+                chunksize=tamanho_lote,
+            )
+            yield from zip(relatorios, resultados)
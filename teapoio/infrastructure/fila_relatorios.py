@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from threading import Lock
+from typing import Any
+from uuid import uuid4
+
+from teapoio.infrastructure.cache_relatorios import CacheArtefatosRelatorio
+from teapoio.infrastructure.relatorio_pdf import RelatorioPreparado
+
+
+@dataclass
+class TarefaRelatorio:
+    """Estado de uma geracao de relatorio enfileirada."""
+
+    id_tarefa: str
+    id_crianca: str
+    data_referencia: date
+    relatorio: RelatorioPreparado
+    status: str
+    criada_em: datetime = field(default_factory=datetime.now)
+    concluida_em: datetime | None = None
+    erro: str = ""
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id_tarefa": self.id_tarefa,
+            "id_crianca": self.id_crianca,
+            "data": self.data_referencia.isoformat(),
+            "periodo": self.relatorio.periodo,
+            "status": self.status,
+            "nome_arquivo": self.relatorio.nome_arquivo,
+            "criada_em": self.criada_em.isoformat(timespec="seconds"),
+            "concluida_em": (
+                self.concluida_em.isoformat(timespec="seconds")
+                if self.concluida_em is not None
+                else None
+            ),
+            "erro": self.erro or None,
+        }
+
+
+class FilaRelatorios:
+    """[SOLID: SRP] Fila local que gera relatorios PDF em segundo plano.
+
+    As tarefas recebem o conteudo ja preparado na requisicao e sao renderizadas
+    por um pool de threads, gravando o PDF no cache de artefatos. Relatorios
+    cujo conteudo ja esta em cache sao concluidos sem nova renderizacao.
+    """
+
+    STATUS_PENDENTE = "pendente"
+    STATUS_PROCESSANDO = "processando"
+    STATUS_CONCLUIDO = "concluido"
+    STATUS_ERRO = "erro"
+    LIMITE_TAREFAS_PADRAO = 1000
+
+    def __init__(
+        self,
+        cache: CacheArtefatosRelatorio,
+        max_trabalhadores: int = 2,
+        limite_tarefas: int = LIMITE_TAREFAS_PADRAO,
+    ) -> None:
+        if max_trabalhadores <= 0:
+            raise ValueError("A fila precisa de ao menos um trabalhador.")
+        if limite_tarefas <= 0:
+            raise ValueError("O limite de tarefas deve ser maior que zero.")
+
+        self._cache = cache
+        self._limite_tarefas = limite_tarefas
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_trabalhadores,
+            thread_name_prefix="teapoio-relatorio",
+        )
+        self._tarefas: OrderedDict[str, TarefaRelatorio] = OrderedDict()
+        self._futuros: dict[str, Future[None]] = {}
+        self._trava = Lock()
+
+    def enfileirar(
+        self,
+        relatorio: RelatorioPreparado,
+        id_crianca: str,
+        data_referencia: date,
+    ) -> TarefaRelatorio:
+        tarefa = TarefaRelatorio(
+            id_tarefa=uuid4().hex,
+            id_crianca=id_crianca,
+            data_referencia=data_referencia,
+            relatorio=relatorio,
+            status=self.STATUS_PENDENTE,
+        )
+        with self._trava:
+            self._tarefas[tarefa.id_tarefa] = tarefa
+            self._descartar_excedentes()
+            self._futuros[tarefa.id_tarefa] = self._executor.submit(self._processar, tarefa)
+        return tarefa
+
+    def obter(self, id_tarefa: str) -> TarefaRelatorio | None:
+        with self._trava:
+            return self._tarefas.get(id_tarefa)
+
+    def aguardar(self, id_tarefa: str, timeout: float | None = None) -> TarefaRelatorio | None:
+        """Bloqueia ate a tarefa terminar (ou o timeout expirar) e retorna seu estado."""
+        with self._trava:
+            futuro = self._futuros.get(id_tarefa)
+        if futuro is not None:
+            futuro.exception(timeout=timeout)
+        return self.obter(id_tarefa)
+
+    def caminho_artefato(self, tarefa: TarefaRelatorio) -> Path | None:
+        """Retorna o PDF de uma tarefa concluida, se ainda estiver no cache."""
+        if tarefa.status != self.STATUS_CONCLUIDO:
+            return None
+        return self._cache.buscar(tarefa.relatorio.chave)
+
+    def encerrar(self, aguardar: bool = True) -> None:
+        self._executor.shutdown(wait=aguardar, cancel_futures=not aguardar)
+
+    def _processar(self, tarefa: TarefaRelatorio) -> None:
+        tarefa.status = self.STATUS_PROCESSANDO
+        try:
+            if self._cache.buscar(tarefa.relatorio.chave) is None:
+                for _ in self._cache.gravar(tarefa.relatorio.chave, tarefa.relatorio.gerar_pdf()):
+                    pass
+        except Exception as erro:
+            tarefa.erro = str(erro) or erro.__class__.__name__
+            tarefa.status = self.STATUS_ERRO
+        else:
+            tarefa.status = self.STATUS_CONCLUIDO
+        finally:
+            tarefa.concluida_em = datetime.now()
+            with self._trava:
+                self._futuros.pop(tarefa.id_tarefa, None)
+
+    def _descartar_excedentes(self) -> None:
+        # Remove as tarefas finalizadas mais antigas; pendentes nunca sao descartadas.
+        excedente = len(self._tarefas) - self._limite_tarefas
+        if excedente <= 0:
+            return
+        for id_tarefa, tarefa in list(self._tarefas.items()):
+            if excedente <= 0:
+                break
+            if tarefa.status in (self.STATUS_CONCLUIDO, self.STATUS_ERRO):
+                del self._tarefas[id_tarefa]
+                excedente -= 1
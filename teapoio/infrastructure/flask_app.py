@@ -1,31 +1,102 @@
 from __future__ import annotations
 
+import base64
 import calendar
 from collections import Counter
 from datetime import date, datetime
+from contextlib import contextmanager
 from datetime import timedelta
+from functools import wraps
+import json
 import os
-from typing import Any
-
-from flask import Flask, Response, flash, jsonify, redirect, render_template, request, session, url_for
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from threading import Lock
+from typing import Any, Callable, Iterable, Iterator
+
+from flask import (
+    Flask,
+    Response,
+    flash,
+    g,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    session,
+    url_for,
+)
 
 from teapoio.application.services.servico_cadastro import ServicoCadastro
 from teapoio.application.services.servico_monitoramento import ServicoMonitoramento
 from teapoio.application.services.servico_perfil import ServicoPerfil
-from teapoio.application.services.servico_relatorios import ServicoRelatorios
-from teapoio.application.services.servico_rotinas import ServicoRotinas
+from teapoio.application.services.servico_relatorios import (
+    PortaPersistenciaRelatorios,
+    ServicoRelatorios,
+)
+from teapoio.application.services.servico_rotinas import (
+    AlteracaoLoteRotina,
+    ServicoRotinas,
+)
 from teapoio.domain.models.Perfil import Perfil
+from teapoio.domain.models.agregador_evolucao import AgregadorEvolucao
 from teapoio.domain.models.crianca import Crianca
+from teapoio.domain.models.evolucao import Evolucao
+from teapoio.domain.models.indice_cadastros import IndiceCadastros
+from teapoio.domain.models.indice_rotinas import IndiceRotinas
 from teapoio.domain.models.item_rotina import ItemRotina
+from teapoio.domain.models.modelo_rotina import ModeloRotina
 from teapoio.domain.models.responsavel import Responsavel
 from teapoio.domain.models.rotina import Rotina, obter_sugestoes_tea
+from teapoio.infrastructure.cache_relatorios import CacheArtefatosRelatorio
+from teapoio.infrastructure.cache_respostas import CacheRespostas
+from teapoio.infrastructure.concorrencia import (
+    SincronizadorProcessos,
+    TravaArquivo,
+    TravaLeituraEscrita,
+)
+from teapoio.infrastructure.exportacao_lote import ExportadorLoteRelatorios
+from teapoio.infrastructure.fila_relatorios import FilaRelatorios
+from teapoio.infrastructure.mixins.exportavel_json import obter_codec_json
+from teapoio.infrastructure.persistencia_adiada import PersistidorAdiado
 from teapoio.infrastructure.persistence.Relatorio import RepositorioRelatorio
+from teapoio.infrastructure.persistence.repositorio_familias import RepositorioRelatorioFamilias
+from teapoio.infrastructure.persistence.repositorio_journal import RepositorioRelatorioJournal
+from teapoio.infrastructure.persistence.repositorio_sqlite import RepositorioRelatorioSqlite
+from teapoio.infrastructure.relatorio_pdf import (
+    PERIODOS_RELATORIO,
+    RelatorioPreparado,
+    intervalo_periodo,
+)
 
 
 def _erro(mensagem: str, status_code: int):
     return jsonify({"erro": mensagem}), status_code
 
 
+def _resposta_rotina(dados: dict[str, Any], rotina: Rotina, status_code: int = 200) -> Response:
+    """Monta a resposta JSON de uma rotina com a versao atual no cabecalho ETag."""
+    resposta = jsonify(dados)
+    resposta.status_code = status_code
+    resposta.set_etag(str(rotina.versao))
+    return resposta
+
+
+def _conflito_versao_rotina(rotina: Rotina) -> Response | None:
+    """Retorna 409 quando o If-Match enviado nao corresponde a versao atual da rotina."""
+    if not request.if_match or request.if_match.contains(str(rotina.versao)):
+        return None
+    return _resposta_rotina(
+        {
+            "erro": "A rotina foi alterada por outra requisicao. Recarregue e tente novamente.",
+            "versao_atual": rotina.versao,
+        },
+        rotina,
+        409,
+    )
+
+
 def _normalizar_lista_strings(payload: dict[str, Any], campo: str) -> list[str]:
     valor = payload.get(campo, [])
     if valor is None:
@@ -43,6 +114,70 @@ def _normalizar_lista_strings(payload: dict[str, Any], campo: str) -> list[str]:
     return lista
 
 
+LIMITE_DIAS_HISTORICO = 366
+LIMITE_PAGINA_PADRAO = 50
+LIMITE_PAGINA_MAXIMO = 200
+CAMPOS_RESPONSAVEL = ("id_responsavel", "nome", "data_nascimento", "email")
+
+
+def _parse_limite(valor: str | None) -> int:
+    if valor is None or not valor.strip():
+        return LIMITE_PAGINA_PADRAO
+    texto = valor.strip()
+    if not texto.isdigit() or not 1 <= int(texto) <= LIMITE_PAGINA_MAXIMO:
+        raise ValueError(f"Limite deve ser um inteiro entre 1 e {LIMITE_PAGINA_MAXIMO}.")
+    return int(texto)
+
+
+def _parse_campos(valor: str | None, permitidos: tuple[str, ...]) -> tuple[str, ...]:
+    if valor is None or not valor.strip():
+        return permitidos
+    campos = tuple(campo.strip() for campo in valor.split(",") if campo.strip())
+    invalidos = [campo for campo in campos if campo not in permitidos]
+    if invalidos or not campos:
+        raise ValueError(f"Campos invalidos. Permitidos: {', '.join(permitidos)}.")
+    return campos
+
+
+def _codificar_cursor(ordem: str, posicao: tuple[str, str]) -> str:
+    texto = json.dumps([ordem, *posicao], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(texto.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decodificar_cursor(cursor: str | None, ordem: str) -> tuple[str, str] | None:
+    """Retorna a posicao (chave, id) guardada no cursor opaco da pagina anterior."""
+    if cursor is None or not cursor.strip():
+        return None
+    try:
+        texto = base64.urlsafe_b64decode(cursor.strip() + "=" * (-len(cursor.strip()) % 4))
+        ordem_cursor, chave, id_registro = json.loads(texto.decode("utf-8"))
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError("Cursor invalido.") from None
+    if ordem_cursor != ordem or not isinstance(chave, str) or not isinstance(id_registro, str):
+        raise ValueError("Cursor invalido para a ordem informada.")
+    return chave, id_registro
+
+
+def _lista_objetos(payload: dict[str, Any], campo: str) -> list[dict[str, Any]]:
+    valor = payload.get(campo, [])
+    if valor is None:
+        return []
+    if not isinstance(valor, list) or not all(isinstance(item, dict) for item in valor):
+        raise ValueError(f"Campo '{campo}' deve ser uma lista de objetos.")
+    return valor
+
+
+def _referencia_item(dados: dict[str, Any]) -> int | str:
+    """Retorna o id_item informado ou, na falta dele, o indice do item."""
+    id_item = dados.get("id_item")
+    if isinstance(id_item, str) and id_item.strip():
+        return id_item.strip()
+    indice = dados.get("indice")
+    if isinstance(indice, bool) or not isinstance(indice, int):
+        raise ValueError("Informe 'id_item' ou 'indice' para cada item.")
+    return indice
+
+
 def _parse_data(valor: str | None, padrao: date | None = None) -> date:
     if valor is None or not valor.strip():
         return padrao or date.today()
@@ -185,7 +320,8 @@ def _dados_calendario(mes: int, ano: int, data_selecionada: date) -> dict[str, A
 
 
 def _resumo_periodo_rotinas(
-    rotinas: list[Rotina],
+    rotinas: IndiceRotinas,
+    agregador: AgregadorEvolucao,
     id_crianca: str,
     data_base: date,
     periodo: str,
@@ -199,57 +335,40 @@ def _resumo_periodo_rotinas(
         inicio = date(data_base.year, data_base.month, 1)
         fim = date(data_base.year, data_base.month, dia_final)
         titulo = "Mes"
+    rotinas.carregar_periodo(id_crianca, inicio, fim)
 
-    total = 0
-    concluidos = 0
-    pendentes = 0
-    nao_realizados = 0
-
-    for rotina in rotinas:
-        if rotina.id_crianca != id_crianca:
-            continue
-        if not (inicio <= rotina.data_referencia <= fim):
-            continue
-
-        for item in rotina.itens:
-            total += 1
-            if item.status == ItemRotina.STATUS_CONCLUIDO:
-                concluidos += 1
-            elif item.status == ItemRotina.STATUS_NAO_REALIZADO:
-                nao_realizados += 1
-            else:
-                pendentes += 1
+    if periodo == "semana":
+        evolucao = agregador.evolucao_semana(id_crianca, data_base)
+    else:
+        evolucao = agregador.evolucao_mes(id_crianca, data_base)
 
-    percentual = (concluidos / total * 100) if total else 0.0
     return {
         "titulo": titulo,
         "inicio": inicio.strftime("%d/%m/%Y"),
         "fim": fim.strftime("%d/%m/%Y"),
-        "total_itens": total,
-        "concluidos": concluidos,
-        "pendentes": pendentes,
-        "nao_realizados": nao_realizados,
-        "percentual_concluido": percentual,
+        **evolucao.to_dict(),
     }
 
 
 def _resumo_sentimentos_mes(
-    rotinas: list[Rotina],
+    rotinas: IndiceRotinas,
     id_crianca: str,
     data_base: date,
 ) -> dict[str, Any]:
-    dia_final = calendar.monthrange(data_base.year, data_base.month)[1]
-    inicio = date(data_base.year, data_base.month, 1)
-    fim = date(data_base.year, data_base.month, dia_final)
+    inicio, fim = intervalo_periodo(data_base, "mes")
+    return _resumo_sentimentos_periodo(rotinas, id_crianca, inicio, fim)
+
 
-    rotinas_mes = [
-        rotina
-        for rotina in rotinas
-        if rotina.id_crianca == id_crianca and inicio <= rotina.data_referencia <= fim
-    ]
+def _resumo_sentimentos_periodo(
+    rotinas: IndiceRotinas,
+    id_crianca: str,
+    inicio: date,
+    fim: date,
+) -> dict[str, Any]:
+    rotinas_periodo = rotinas.rotinas_no_periodo(id_crianca, inicio, fim)
 
     contador: Counter[str] = Counter()
-    for rotina in rotinas_mes:
+    for rotina in rotinas_periodo:
         if rotina.sentimento_dia:
             contador[rotina.sentimento_dia] += 1
 
@@ -277,13 +396,53 @@ def _resumo_sentimentos_mes(
     return {
         "inicio": inicio.strftime("%d/%m/%Y"),
         "fim": fim.strftime("%d/%m/%Y"),
-        "dias_com_rotina": len(rotinas_mes),
+        "dias_com_rotina": len(rotinas_periodo),
         "dias_com_sentimento": sum(contador.values()),
         "sentimento_mais_frequente": sentimento_mais_frequente,
         "distribuicao": distribuicao,
     }
 
 
+def _resumo_itens_periodo(
+    rotinas: IndiceRotinas,
+    agregador: AgregadorEvolucao,
+    id_crianca: str,
+    inicio: date,
+    fim: date,
+) -> dict[str, Any]:
+    """Soma os totais mensais ja agregados de cada mes entre inicio e fim."""
+    evolucao = Evolucao.vazia()
+    mes_corrente = date(inicio.year, inicio.month, 1)
+    ultimo_dia = calendar.monthrange(fim.year, fim.month)[1]
+    rotinas.carregar_periodo(id_crianca, mes_corrente, date(fim.year, fim.month, ultimo_dia))
+    while mes_corrente <= fim:
+        evolucao = evolucao + agregador.evolucao_mes(id_crianca, mes_corrente)
+        if mes_corrente.month == 12:
+            mes_corrente = date(mes_corrente.year + 1, 1, 1)
+        else:
+            mes_corrente = date(mes_corrente.year, mes_corrente.month + 1, 1)
+    return evolucao.to_dict()
+
+
+def _linhas_detalhe_diario(rotinas: Iterable[Rotina]) -> Iterator[str]:
+    """Gera, sob demanda, as linhas do detalhe de cada dia com rotina no periodo."""
+    yield ""
+    yield "DETALHE POR DIA"
+    possui_rotina = False
+    for rotina in rotinas:
+        possui_rotina = True
+        evolucao = rotina.obter_evolucao()
+        yield (
+            f"{rotina.data_formatada} - Sentimento: {rotina.sentimento_dia_info['label']} - "
+            f"{evolucao.concluidos}/{evolucao.total_itens} concluidos "
+            f"({evolucao.percentual_concluido:.1f}%)"
+        )
+        for item in rotina.itens:
+            yield f"    {item.horario} {item.nome} - {item.status}"
+    if not possui_rotina:
+        yield "- Nenhuma rotina registrada no periodo."
+
+
 def _aplicar_alertas_tempo(
     rotina: dict[str, Any],
     data_ref: date,
@@ -332,361 +491,338 @@ def _aplicar_alertas_tempo(
     return lembretes
 
 
-def _gerar_pdf_simples(linhas: list[str]) -> bytes:
-    def _escapar_pdf_texto(valor: str) -> str:
-        return valor.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
-
-    comandos: list[str] = []
-    y = 800
-    for linha in linhas:
-        texto = _escapar_pdf_texto(linha)
-        comandos.append(f"BT /F1 10 Tf 40 {y} Td ({texto}) Tj ET")
-        y -= 14
-        if y < 40:
-            break
-
-    stream = "\n".join(comandos).encode("latin-1", errors="replace")
-
-    objetos = [
-        b"1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n",
-        b"2 0 obj << /Type /Pages /Kids [3 0 R] /Count 1 >> endobj\n",
-        b"3 0 obj << /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >> endobj\n",
-        b"4 0 obj << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> endobj\n",
-        f"5 0 obj << /Length {len(stream)} >> stream\n".encode("ascii")
-        + stream
-        + b"\nendstream\nendobj\n",
-    ]
-
-    pdf = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
-    offsets = [0]
-    for objeto in objetos:
-        offsets.append(len(pdf))
-        pdf += objeto
-
-    xref_inicio = len(pdf)
-    pdf += f"xref\n0 {len(offsets)}\n".encode("ascii")
-    pdf += b"0000000000 65535 f \n"
-    for offset in offsets[1:]:
-        pdf += f"{offset:010d} 00000 n \n".encode("ascii")
-
-    pdf += (
-        f"trailer << /Size {len(offsets)} /Root 1 0 R >>\n"
-        f"startxref\n{xref_inicio}\n%%EOF"
-    ).encode("ascii")
-    return pdf
-
-
-def _linha_barra_textual(texto: str) -> bool:
-    conteudo = texto.strip()
-    if not conteudo:
-        return False
-    if conteudo == "Sem sentimentos registrados no mes.":
-        return True
-    return "|" in conteudo and "(" in conteudo and conteudo.endswith(")")
-
-
-def _eh_titulo_grafico_sentimentos(texto: str) -> bool:
-    conteudo = texto.strip().casefold()
-    return "grafico" in conteudo and "sentimentos" in conteudo and "barras" in conteudo
-
-
-def _gerar_pdf_fallback_com_grafico(
-    linhas: list[str],
-    distribuicao_sentimentos: list[dict[str, Any]],
-) -> bytes:
-    def _escapar_pdf_texto(valor: str) -> str:
-        return valor.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
-
-    comandos: list[str] = []
-    y = 800.0
-    ignorar_barras_textuais = False
-
-    for linha in linhas:
-        conteudo = str(linha).strip()
-
-        if not conteudo:
-            y -= 8
-            ignorar_barras_textuais = False
-            if y < 55:
-                break
-            continue
-
-        if _eh_titulo_grafico_sentimentos(conteudo):
-            texto = _escapar_pdf_texto(conteudo)
-            comandos.append(f"0 0 0 rg BT /F1 10 Tf 40 {y:.2f} Td ({texto}) Tj ET")
-            y -= 14
-
-            chart_left = 62.0
-            chart_bottom = max(95.0, y - 110.0)
-            chart_width = 450.0
-            chart_height = 92.0
-
-            # eixo horizontal
-            comandos.append(
-                f"0.80 0.80 0.80 rg {chart_left:.2f} {chart_bottom:.2f} {chart_width:.2f} 0.8 re f"
-            )
-            # eixo vertical
-            comandos.append(
-                f"0.80 0.80 0.80 rg {chart_left:.2f} {chart_bottom:.2f} 0.8 {chart_height:.2f} re f"
-            )
-
-            valores = [int(item.get("quantidade", 0)) for item in distribuicao_sentimentos]
-            rotulos = [str(item.get("label", "")).strip() for item in distribuicao_sentimentos]
-            maximo = max(valores, default=0)
-
-            if maximo <= 0 or not valores:
-                aviso = _escapar_pdf_texto("Sem sentimentos registrados no mes.")
-                comandos.append(
-                    f"0 0 0 rg BT /F1 9 Tf {chart_left + 8:.2f} {chart_bottom + 36:.2f} Td ({aviso}) Tj ET"
+def _criar_repositorio(config: dict[str, Any]) -> PortaPersistenciaRelatorios:
+    """Escolhe o adaptador de persistencia conforme DATA_BACKEND (ou TEAPOIO_DATA_BACKEND)."""
+    caminho_arquivo = config.get("DATA_FILE")
+    backend = str(
+        config.get("DATA_BACKEND") or os.getenv("TEAPOIO_DATA_BACKEND", "") or "json"
+    ).strip().lower()
+
+    # JSON_CODEC e JSON_INDENTADO ausentes mantem TEAPOIO_JSON_CODEC e TEAPOIO_JSON_INDENTADO.
+    codec_json = obter_codec_json(config.get("JSON_CODEC"))
+    json_indentado = config.get("JSON_INDENTADO")
+    if json_indentado is not None:
+        json_indentado = bool(json_indentado)
+
+    carga_rotinas = str(
+        config.get("CARGA_ROTINAS") or os.getenv("TEAPOIO_CARGA_ROTINAS", "") or "completa"
+    ).strip().lower()
+    if carga_rotinas not in ("completa", "sob_demanda"):
+        raise ValueError(
+            f"CARGA_ROTINAS invalido: {carga_rotinas}. Use 'completa' ou 'sob_demanda'."
+        )
+    rotinas_sob_demanda = carga_rotinas == "sob_demanda"
+
+    if backend == "json":
+        return RepositorioRelatorio(
+            caminho_arquivo=caminho_arquivo,
+            codec_json=codec_json,
+            json_indentado=json_indentado,
+            rotinas_sob_demanda=rotinas_sob_demanda,
+        )
+    if backend == "journal":
+        return RepositorioRelatorioJournal(
+            caminho_arquivo=caminho_arquivo,
+            codec_json=codec_json,
+            json_indentado=json_indentado,
+            rotinas_sob_demanda=rotinas_sob_demanda,
+            limite_registros=int(
+                config.get(
+                    "JOURNAL_LIMITE_REGISTROS",
+                    RepositorioRelatorioJournal.LIMITE_REGISTROS_PADRAO,
                 )
-            else:
-                total = max(1, len(valores))
-                slot = chart_width / total
-                bar_width = max(18.0, min(50.0, slot * 0.56))
-
-                for indice, quantidade in enumerate(valores):
-                    x = chart_left + (indice * slot) + ((slot - bar_width) / 2)
-                    altura = 0.0
-                    if quantidade > 0:
-                        altura = max(3.0, (quantidade / maximo) * chart_height)
-
-                    if altura > 0:
-                        comandos.append(
-                            f"0.06 0.46 0.43 rg {x:.2f} {chart_bottom:.2f} {bar_width:.2f} {altura:.2f} re f"
-                        )
-
-                    qtd_txt = _escapar_pdf_texto(str(quantidade))
-                    comandos.append(
-                        f"0 0 0 rg BT /F1 8 Tf {x + 2:.2f} {chart_bottom + altura + 4:.2f} Td ({qtd_txt}) Tj ET"
-                    )
-
-                    rotulo = _escapar_pdf_texto(rotulos[indice][:12])
-                    comandos.append(
-                        f"0 0 0 rg BT /F1 7 Tf {x - 2:.2f} {chart_bottom - 10:.2f} Td ({rotulo}) Tj ET"
-                    )
+            ),
+        )
+    if backend == "familias":
+        # Na primeira execucao o JSON existente e dividido em um arquivo por familia.
+        return RepositorioRelatorioFamilias(
+            caminho_arquivo=caminho_arquivo,
+            diretorio_familias=config.get("FAMILIAS_DIR"),
+            codec_json=codec_json,
+            json_indentado=json_indentado,
+            rotinas_sob_demanda=rotinas_sob_demanda,
+        )
+    if backend == "sqlite":
+        # Na primeira execucao o banco e populado a partir do JSON existente.
+        caminho_json = (
+            Path(caminho_arquivo)
+            if caminho_arquivo
+            else RepositorioRelatorio._caminho_arquivo_padrao()
+        )
+        caminho_sqlite = config.get("SQLITE_FILE") or caminho_json.with_suffix(".sqlite3")
+        return RepositorioRelatorioSqlite(
+            caminho_arquivo=caminho_sqlite,
+            caminho_json_migracao=caminho_json,
+        )
 
-            y = chart_bottom - 20
-            ignorar_barras_textuais = True
-            if y < 55:
-                break
-            continue
+    raise ValueError(
+        f"DATA_BACKEND invalido: {backend}. Use 'json', 'journal', 'familias' ou 'sqlite'."
+    )
 
-        if ignorar_barras_textuais and _linha_barra_textual(conteudo):
-            continue
 
-        ignorar_barras_textuais = False
-        texto = _escapar_pdf_texto(conteudo)
-        comandos.append(f"0 0 0 rg BT /F1 10 Tf 40 {y:.2f} Td ({texto}) Tj ET")
-        y -= 14
-        if y < 40:
-            break
-
-    stream = "\n".join(comandos).encode("latin-1", errors="replace")
-
-    objetos = [
-        b"1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n",
-        b"2 0 obj << /Type /Pages /Kids [3 0 R] /Count 1 >> endobj\n",
-        b"3 0 obj << /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >> endobj\n",
-        b"4 0 obj << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> endobj\n",
-        f"5 0 obj << /Length {len(stream)} >> stream\n".encode("ascii")
-        + stream
-        + b"\nendstream\nendobj\n",
-    ]
-
-    pdf = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
-    offsets = [0]
-    for objeto in objetos:
-        offsets.append(len(pdf))
-        pdf += objeto
-
-    xref_inicio = len(pdf)
-    pdf += f"xref\n0 {len(offsets)}\n".encode("ascii")
-    pdf += b"0000000000 65535 f \n"
-    for offset in offsets[1:]:
-        pdf += f"{offset:010d} 00000 n \n".encode("ascii")
-
-    pdf += (
-        f"trailer << /Size {len(offsets)} /Root 1 0 R >>\n"
-        f"startxref\n{xref_inicio}\n%%EOF"
-    ).encode("ascii")
-    return pdf
-
-
-def _gerar_pdf_com_grafico(
-    linhas: list[str],
-    distribuicao_sentimentos: list[dict[str, Any]],
-) -> bytes:
-    try:
-        from io import BytesIO
-
-        from reportlab.graphics.charts.barcharts import VerticalBarChart
-        from reportlab.graphics.shapes import Drawing, String
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
-    except Exception:
-        return _gerar_pdf_fallback_com_grafico(linhas, distribuicao_sentimentos)
-
-    def _escapar_html(texto: str) -> str:
-        return texto.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-
-    def _desenho_grafico() -> Drawing:
-        desenho = Drawing(520, 240)
-        rotulos = [str(item.get("label", "")).strip() for item in distribuicao_sentimentos]
-        valores = [int(item.get("quantidade", 0)) for item in distribuicao_sentimentos]
-
-        if not valores or max(valores, default=0) <= 0:
-            desenho.add(
-                String(
-                    24,
-                    120,
-                    "Sem sentimentos registrados no mes.",
-                    fontName="Helvetica",
-                    fontSize=10,
-                    fillColor=colors.HexColor("#1f2a2c"),
-                )
+def _criar_cache_relatorios(config: dict[str, Any]) -> CacheArtefatosRelatorio:
+    """Cria o cache de PDFs em RELATORIO_CACHE_DIR (padrao: ao lado do arquivo de dados)."""
+    diretorio = config.get("RELATORIO_CACHE_DIR")
+    if not diretorio:
+        caminho_dados = config.get("DATA_FILE")
+        base = (
+            Path(caminho_dados)
+            if caminho_dados
+            else RepositorioRelatorio._caminho_arquivo_padrao()
+        )
+        diretorio = base.parent / "relatorios_pdf"
+    return CacheArtefatosRelatorio(
+        diretorio,
+        limite_bytes=int(
+            config.get(
+                "RELATORIO_CACHE_LIMITE_BYTES",
+                CacheArtefatosRelatorio.LIMITE_BYTES_PADRAO,
             )
-            return desenho
-
-        grafico = VerticalBarChart()
-        grafico.x = 38
-        grafico.y = 46
-        grafico.width = 450
-        grafico.height = 155
-        grafico.data = [valores]
-        grafico.strokeColor = colors.HexColor("#9aa7a9")
-        grafico.valueAxis.valueMin = 0
-        maximo = max(valores)
-        grafico.valueAxis.valueMax = maximo + 1
-        grafico.valueAxis.valueStep = max(1, (maximo + 1 + 4) // 5)
-        grafico.categoryAxis.categoryNames = rotulos
-        grafico.categoryAxis.labels.angle = 20
-        grafico.categoryAxis.labels.dy = -14
-        grafico.categoryAxis.labels.fontName = "Helvetica"
-        grafico.categoryAxis.labels.fontSize = 8
-        grafico.bars[0].fillColor = colors.HexColor("#0f766e")
-        grafico.bars[0].strokeColor = colors.HexColor("#0b5d57")
-        desenho.add(grafico)
-        return desenho
-
-    buffer = BytesIO()
-    documento = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        leftMargin=34,
-        rightMargin=34,
-        topMargin=34,
-        bottomMargin=34,
-        title="Relatorio TeApoio",
-        pageCompression=0,
-    )
-
-    estilos_base = getSampleStyleSheet()
-    estilo_titulo = ParagraphStyle(
-        "TeApoioTitulo",
-        parent=estilos_base["Heading1"],
-        fontName="Helvetica-Bold",
-        fontSize=16,
-        leading=18,
-        spaceAfter=8,
-    )
-    estilo_secao = ParagraphStyle(
-        "TeApoioSecao",
-        parent=estilos_base["Heading3"],
-        fontName="Helvetica-Bold",
-        fontSize=11,
-        leading=14,
-        spaceBefore=4,
-        spaceAfter=4,
-    )
-    estilo_texto = ParagraphStyle(
-        "TeApoioTexto",
-        parent=estilos_base["Normal"],
-        fontName="Helvetica",
-        fontSize=10,
-        leading=13,
-        spaceAfter=2,
+        ),
     )
 
-    historia: list[Any] = []
-    titulo_renderizado = False
-    ignorar_barras_textuais = False
-    for linha in linhas:
-        texto = str(linha)
-        conteudo = texto.strip()
 
-        if not conteudo:
-            ignorar_barras_textuais = False
-            historia.append(Spacer(1, 5))
-            continue
-
-        if _eh_titulo_grafico_sentimentos(conteudo):
-            historia.append(Paragraph(_escapar_html(conteudo), estilo_secao))
-            historia.append(_desenho_grafico())
-            historia.append(Spacer(1, 8))
-            ignorar_barras_textuais = True
-            continue
+def _criar_sincronizador(config: dict[str, Any]) -> SincronizadorProcessos | None:
+    """Ativa a coordenacao entre processos com MULTIPROCESSO (ou TEAPOIO_MULTIPROCESSO)."""
+    ativo = config.get("MULTIPROCESSO")
+    if ativo is None:
+        ativo = os.getenv("TEAPOIO_MULTIPROCESSO", "").strip().lower() in ("1", "true", "sim")
+    if not ativo:
+        return None
 
-        if ignorar_barras_textuais and _linha_barra_textual(conteudo):
-            continue
-
-        if not titulo_renderizado:
-            historia.append(Paragraph(_escapar_html(conteudo), estilo_titulo))
-            titulo_renderizado = True
-            continue
+    caminho_arquivo = config.get("DATA_FILE")
+    return SincronizadorProcessos(
+        Path(caminho_arquivo)
+        if caminho_arquivo
+        else RepositorioRelatorio._caminho_arquivo_padrao()
+    )
 
-        if ":" not in conteudo and (len(conteudo) <= 38 or conteudo.isupper()):
-            historia.append(Paragraph(_escapar_html(conteudo), estilo_secao))
-        else:
-            historia.append(Paragraph(_escapar_html(conteudo), estilo_texto))
 
-    try:
-        documento.build(historia)
-        return buffer.getvalue()
-    except Exception:
-        return _gerar_pdf_fallback_com_grafico(linhas, distribuicao_sentimentos)
+DURABILIDADE_IMEDIATA = "imediata"
+DURABILIDADE_AGRUPADA = "agrupada"
+
+
+def _configurar_durabilidade(
+    config: dict[str, Any],
+    estado: "EstadoApi",
+    sincronizador: SincronizadorProcessos | None,
+) -> None:
+    """Escolhe a durabilidade por PERSISTENCIA_DURABILIDADE (ou TEAPOIO_PERSISTENCIA_DURABILIDADE).
+
+    `imediata` (padrao) grava antes de responder; `agrupada` responde logo e
+    grava em segundo plano. Com varios processos a gravacao continua imediata,
+    pois o carimbo de versao e publicado ao fim de cada requisicao.
+    """
+    durabilidade = str(
+        config.get("PERSISTENCIA_DURABILIDADE")
+        or os.getenv("TEAPOIO_PERSISTENCIA_DURABILIDADE", "")
+        or DURABILIDADE_IMEDIATA
+    ).strip().lower()
+    if durabilidade not in (DURABILIDADE_IMEDIATA, DURABILIDADE_AGRUPADA):
+        raise ValueError(f"Durabilidade de persistencia desconhecida: {durabilidade}.")
+    if durabilidade == DURABILIDADE_IMEDIATA or sincronizador is not None:
+        return
+
+    estado.adiar_persistencia(
+        janela_segundos=float(
+            config.get(
+                "PERSISTENCIA_JANELA_MS",
+                PersistidorAdiado.JANELA_SEGUNDOS_PADRAO * 1000,
+            )
+        )
+        / 1000,
+        limite_marcacoes=int(
+            config.get(
+                "PERSISTENCIA_LIMITE_ALTERACOES",
+                PersistidorAdiado.LIMITE_MARCACOES_PADRAO,
+            )
+        ),
+    )
 
 
 class EstadoApi:
-    """Mantem estado de dominio em memoria e persiste no mesmo JSON da CLI."""
-
-    def __init__(self, caminho_arquivo: str | None = None) -> None:
-        repositorio = RepositorioRelatorio(caminho_arquivo=caminho_arquivo)
+    """Mantem estado de dominio em memoria e persiste no mesmo JSON da CLI.
+
+    O acesso concorrente e coordenado por `trava`: leituras podem ocorrer em
+    paralelo e alteracoes sao exclusivas. A gravacao em disco e serializada.
+    `geracao` muda a cada alteracao persistida, recarga ou troca do perfil
+    ativo e identifica o conteudo atual. Com `adiar_persistencia`, `persistir` apenas agenda a
+    gravacao, feita em segundo plano sob a trava de leitura.
+    """
+
+    def __init__(
+        self,
+        caminho_arquivo: str | None = None,
+        repositorio: PortaPersistenciaRelatorios | None = None,
+    ) -> None:
+        repositorio = repositorio or RepositorioRelatorio(caminho_arquivo=caminho_arquivo)
         self._servico_relatorios = ServicoRelatorios(repositorio=repositorio)
-        estado = self._servico_relatorios.carregar_estado_inicial()
-
-        self.responsaveis: list[Responsavel] = estado["responsaveis"]
-        self.criancas: list[Crianca] = estado["criancas"]
-        self.rotinas: list[Rotina] = estado["rotinas"]
-        self.perfil: Perfil | None = estado["perfil"]
-        self.data_calendario: date = estado["data_calendario"]
+        self.gravacoes = 0
+        self.geracao = 0
+        self._perfil: Perfil | None = None
+        self.recarregar()
 
         self.servico_cadastro = ServicoCadastro()
         self.servico_monitoramento = ServicoMonitoramento()
         self.servico_perfil = ServicoPerfil()
         self.servico_rotinas = ServicoRotinas()
 
+        self.trava = TravaLeituraEscrita()
+        self._trava_persistencia = Lock()
+        self.persistidor: PersistidorAdiado | None = None
+
+    def recarregar(self) -> None:
+        """Substitui o estado em memoria pelo estado gravado no repositorio."""
+        estado = self._servico_relatorios.carregar_estado_inicial()
+
+        self._indice_cadastros = IndiceCadastros(
+            responsaveis=estado["responsaveis"],
+            criancas=estado["criancas"],
+        )
+        self.rotinas = estado["rotinas"]
+        self.perfil = estado["perfil"]
+        self.data_calendario: date = estado["data_calendario"]
+        self.geracao += 1
+
     def persistir(self) -> None:
-        self._servico_relatorios.salvar_estado_atual(
-            responsaveis=self.responsaveis,
-            criancas=self.criancas,
-            rotinas=self.rotinas,
-            perfil=self.perfil,
-            data_calendario=self.data_calendario,
+        """Grava o estado; chamado com a trava de escrita adquirida."""
+        if self.persistidor is not None:
+            # A memoria ja mudou: invalida as leituras agora e grava depois.
+            self.geracao += 1
+            self.persistidor.marcar()
+            return
+        if self._gravar():
+            self.geracao += 1
+
+    def adiar_persistencia(
+        self,
+        janela_segundos: float = PersistidorAdiado.JANELA_SEGUNDOS_PADRAO,
+        limite_marcacoes: int = PersistidorAdiado.LIMITE_MARCACOES_PADRAO,
+    ) -> None:
+        """Passa a agrupar as gravacoes em segundo plano."""
+        if self.persistidor is None:
+            self.persistidor = PersistidorAdiado(
+                self._gravar_em_segundo_plano,
+                janela_segundos=janela_segundos,
+                limite_marcacoes=limite_marcacoes,
+            )
+
+    def encerrar_persistencia(self) -> None:
+        """Grava o que estiver pendente e volta a gravar a cada alteracao."""
+        persistidor, self.persistidor = self.persistidor, None
+        if persistidor is not None:
+            persistidor.encerrar()
+
+    def _gravar_em_segundo_plano(self) -> bool:
+        # Leituras continuam em paralelo; alteracoes esperam o fim da gravacao.
+        with self.trava.leitura():
+            return self._gravar()
+
+    def _gravar(self) -> bool:
+        with self._trava_persistencia:
+            gravou = self._servico_relatorios.salvar_estado_atual(
+                responsaveis=self.responsaveis,
+                criancas=self.criancas,
+                rotinas=self.rotinas,
+                perfil=self.perfil,
+                data_calendario=self.data_calendario,
+            )
+            if gravou:
+                self.gravacoes += 1
+            return gravou
+
+    @property
+    def perfil(self) -> Perfil | None:
+        return self._perfil
+
+    @perfil.setter
+    def perfil(self, perfil: Perfil | None) -> None:
+        # Trocar o perfil ativo muda as respostas mesmo antes de gravar.
+        if perfil is not self._perfil:
+            self._perfil = perfil
+            self.geracao += 1
+
+    @property
+    def responsaveis(self) -> list[Responsavel]:
+        return self._indice_cadastros.responsaveis
+
+    @responsaveis.setter
+    def responsaveis(self, responsaveis: list[Responsavel]) -> None:
+        self._indice_cadastros = IndiceCadastros(
+            responsaveis=responsaveis,
+            criancas=self._indice_cadastros.criancas,
         )
 
-    def buscar_responsavel(self, id_responsavel: str) -> Responsavel | None:
-        return next(
-            (r for r in self.responsaveis if r.id_responsavel == id_responsavel),
-            None,
+    @property
+    def criancas(self) -> list[Crianca]:
+        return self._indice_cadastros.criancas
+
+    @criancas.setter
+    def criancas(self, criancas: list[Crianca]) -> None:
+        self._indice_cadastros = IndiceCadastros(
+            responsaveis=self._indice_cadastros.responsaveis,
+            criancas=criancas,
         )
 
+    @property
+    def rotinas(self) -> IndiceRotinas:
+        return self._rotinas
+
+    @rotinas.setter
+    def rotinas(self, rotinas: list[Rotina] | IndiceRotinas) -> None:
+        self.agregador_evolucao = AgregadorEvolucao()
+        if isinstance(rotinas, IndiceRotinas) and rotinas.pendentes():
+            # Carga sob demanda: o agregador recebe cada rotina quando ela e montada.
+            for rotina in rotinas.carregadas():
+                self.agregador_evolucao.entidade_alterada(rotina)
+            rotinas.inscrever_observador(self.agregador_evolucao)
+            self._rotinas = rotinas
+            return
+        self._rotinas = IndiceRotinas(rotinas, observadores=[self.agregador_evolucao])
+
+    def adicionar_responsavel(self, responsavel: Responsavel) -> None:
+        self._indice_cadastros.adicionar_responsavel(responsavel)
+
+    def adicionar_crianca(self, crianca: Crianca) -> None:
+        self._indice_cadastros.adicionar_crianca(crianca)
+
+    def remover_crianca(self, id_crianca: str) -> None:
+        """Remove a crianca do indice, do perfil ativo e as rotinas associadas."""
+        self._indice_cadastros.remover_crianca(id_crianca)
+        self._rotinas.remover_crianca(id_crianca)
+        if self.perfil is not None:
+            self.perfil.remover_crianca(id_crianca)
+
+    def buscar_responsavel(self, id_responsavel: str) -> Responsavel | None:
+        return self._indice_cadastros.buscar_responsavel(id_responsavel)
+
     def buscar_crianca(self, id_crianca: str) -> Crianca | None:
-        return next((c for c in self.criancas if c.id_crianca == id_crianca), None)
+        return self._indice_cadastros.buscar_crianca(id_crianca)
+
+    def paginar_responsaveis(self, **filtros: Any) -> tuple[list[Responsavel], tuple[str, str] | None]:
+        return self._indice_cadastros.paginar_responsaveis(**filtros)
 
     def listar_criancas_responsavel(self, id_responsavel: str) -> list[Crianca]:
-        return [c for c in self.criancas if c.id_responsavel == id_responsavel]
+        return self._indice_cadastros.listar_criancas_responsavel(id_responsavel)
+
+    def validar_email_disponivel(self, email: str, id_responsavel_atual: str | None = None) -> None:
+        """Valida o email e garante que nenhum outro responsavel o utilize."""
+        email_normalizado = Responsavel._validar_email(email)
+        existente = self._indice_cadastros.buscar_responsavel_por_email(email_normalizado)
+        if existente is not None and existente.id_responsavel != id_responsavel_atual:
+            raise ValueError("Ja existe responsavel cadastrado com este email.")
+
+    def autenticar_responsavel(self, id_responsavel: str, senha: str) -> Responsavel | None:
+        responsavel = self.buscar_responsavel(id_responsavel)
+        if responsavel is None or not responsavel.confere_senha(senha):
+            return None
+        return responsavel
+
+    def buscar_perfil_responsavel(self, id_responsavel: str) -> Perfil | None:
+        """Retorna o perfil ativo se ele for do responsavel, sem trocar o perfil ativo."""
+        if self.perfil is not None and self.perfil.responsavel.id_responsavel == id_responsavel:
+            return self.perfil
+        return None
 
     def obter_perfil_responsavel(self, responsavel: Responsavel) -> Perfil:
         if self.perfil is None:
@@ -726,6 +862,7 @@ class EstadoApi:
     @staticmethod
     def item_para_dict(item: ItemRotina) -> dict[str, Any]:
         return {
+            "id_item": item.id_item,
             "nome": item.nome,
             "horario": item.horario,
             "status": item.status,
@@ -738,6 +875,7 @@ class EstadoApi:
         return {
             "id_crianca": rotina.id_crianca,
             "data_referencia": rotina.data_referencia.isoformat(),
+            "versao": rotina.versao,
             "sentimento_dia": rotina.sentimento_dia,
             "sentimento_dia_info": rotina.sentimento_dia_info,
             "itens": [self.item_para_dict(item) for item in rotina.itens],
@@ -746,6 +884,18 @@ class EstadoApi:
             "resumo": resumo,
         }
 
+    def rotina_resumo_para_dict(self, rotina: Rotina) -> dict[str, Any]:
+        return {
+            "data_referencia": rotina.data_referencia.isoformat(),
+            "versao": rotina.versao,
+            "sentimento_dia": rotina.sentimento_dia,
+            **self.servico_monitoramento.obter_resumo_rotina(rotina),
+        }
+
+    @staticmethod
+    def modelo_rotina_para_dict(modelo: ModeloRotina) -> dict[str, Any]:
+        return {"nome": modelo.nome, "itens": modelo.itens}
+
     @staticmethod
     def perfil_sensorial_para_dict(perfil_sensorial) -> dict[str, Any]:
         return {
@@ -760,6 +910,10 @@ class EstadoApi:
         }
 
 
+# Rotas que adquirem a trava do estado na propria view, por um trecho delimitado.
+_ENDPOINTS_TRAVA_NA_VIEW = frozenset({"exportar_relatorios_lote"})
+
+
 def create_app(config: dict[str, Any] | None = None) -> Flask:
     app = Flask(__name__)
     if config:
@@ -784,7 +938,118 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
     app.config["SECRET_KEY"] = secret_key
     app.secret_key = secret_key
 
-    estado = EstadoApi(caminho_arquivo=app.config.get("DATA_FILE"))
+    sincronizador = _criar_sincronizador(app.config)
+    if sincronizador is None:
+        estado = EstadoApi(repositorio=_criar_repositorio(app.config))
+    else:
+        with sincronizador.trava.exclusiva():
+            estado = EstadoApi(repositorio=_criar_repositorio(app.config))
+            sincronizador.registrar_carregamento()
+    _configurar_durabilidade(app.config, estado, sincronizador)
+    app.extensions["teapoio_estado"] = estado
+    cache_relatorios = _criar_cache_relatorios(app.config)
+    fila_relatorios = FilaRelatorios(
+        cache_relatorios,
+        max_trabalhadores=int(app.config.get("RELATORIO_TRABALHADORES", 2)),
+    )
+
+    def _sincronizar_estado() -> None:
+        # Chamado com a trava de escrita local e a trava do arquivo adquiridas.
+        if sincronizador is not None and sincronizador.desatualizado:
+            estado.recarregar()
+            sincronizador.registrar_carregamento()
+
+    def _sincronizar_para_leitura() -> None:
+        if sincronizador is not None and sincronizador.desatualizado:
+            with estado.trava.escrita(), sincronizador.trava.compartilhada():
+                _sincronizar_estado()
+
+    @contextmanager
+    def _leitura_estado() -> Iterator[None]:
+        """Trava de leitura para rotas de `_ENDPOINTS_TRAVA_NA_VIEW`."""
+        _sincronizar_para_leitura()
+        with estado.trava.leitura():
+            yield
+
+    @app.before_request
+    def _adquirir_trava_estado():
+        if request.endpoint in _ENDPOINTS_TRAVA_NA_VIEW:
+            return
+        if request.method in ("GET", "HEAD", "OPTIONS"):
+            _sincronizar_para_leitura()
+            estado.trava.adquirir_leitura()
+            g.modo_trava_estado = "leitura"
+            return
+
+        estado.trava.adquirir_escrita()
+        g.modo_trava_estado = "escrita"
+        if sincronizador is not None:
+            g.trava_arquivo_estado = sincronizador.trava.adquirir(exclusiva=True)
+            _sincronizar_estado()
+            g.gravacoes_antes = estado.gravacoes
+
+    @app.teardown_request
+    def _liberar_trava_estado(_erro: BaseException | None) -> None:
+        modo = g.pop("modo_trava_estado", None)
+        trava_arquivo = g.pop("trava_arquivo_estado", None)
+        gravacoes_antes = g.pop("gravacoes_antes", estado.gravacoes)
+        try:
+            if trava_arquivo is not None:
+                try:
+                    if sincronizador is not None and estado.gravacoes != gravacoes_antes:
+                        sincronizador.publicar_gravacao()
+                finally:
+                    TravaArquivo.liberar(trava_arquivo)
+        finally:
+            if modo == "leitura":
+                estado.trava.liberar_leitura()
+            elif modo == "escrita":
+                estado.trava.liberar_escrita()
+
+    cache_respostas = CacheRespostas(
+        int(app.config.get("RESPOSTAS_CACHE_LIMITE", CacheRespostas.LIMITE_ENTRADAS_PADRAO))
+    )
+
+    def _cache_resposta(view: Callable[..., Any]) -> Callable[..., Response]:
+        """Reaproveita a resposta 200 da rota enquanto o estado nao mudar.
+
+        A resposta sai com ETag e Last-Modified e responde 304 a revalidacoes
+        com If-None-Match ou If-Modified-Since.
+        """
+
+        @wraps(view)
+        def envolvida(*args: Any, **kwargs: Any) -> Response:
+            chave = (request.endpoint, request.full_path)
+            entrada = cache_respostas.buscar(chave, estado.geracao)
+            if entrada is None:
+                resposta = app.make_response(view(*args, **kwargs))
+                if resposta.status_code != 200:
+                    return resposta
+                etag, _ = resposta.get_etag()
+                entrada = cache_respostas.registrar(
+                    chave,
+                    estado.geracao,
+                    resposta.get_data(),
+                    resposta.mimetype,
+                    etag=etag,
+                )
+
+            resposta = Response(entrada.corpo, mimetype=entrada.mimetype)
+            resposta.set_etag(entrada.etag)
+            resposta.last_modified = entrada.modificado_em
+            resposta.cache_control.no_cache = True
+            return resposta.make_conditional(request)
+
+        return envolvida
+
+    exportador_lote = ExportadorLoteRelatorios(
+        cache_relatorios,
+        max_processos=(
+            int(app.config["RELATORIO_PROCESSOS"])
+            if app.config.get("RELATORIO_PROCESSOS")
+            else None
+        ),
+    )
 
     def _responsavel_sessao() -> Responsavel | None:
         id_responsavel = str(session.get("responsavel_id", "")).strip()
@@ -798,6 +1063,27 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
             return None
         return responsavel
 
+    def _data_calendario_sessao() -> date:
+        # A data escolhida no calendario fica na sessao, para que as paginas
+        # sejam apenas leitura; sem escolha, vale a data gravada no estado.
+        try:
+            return date.fromisoformat(str(session.get("data_calendario", "")))
+        except ValueError:
+            return estado.data_calendario
+
+    def _rotina_para_alteracao(
+        id_crianca: str,
+        data_ref: date,
+    ) -> tuple[Rotina, Response | None]:
+        # O If-Match e conferido antes de criar a rotina; uma rotina nova so e
+        # indexada (indexar_rotina) depois que a alteracao for aceita.
+        rotina = estado.servico_rotinas.obter_rotina_para_leitura(
+            estado.rotinas,
+            id_crianca,
+            data_ref,
+        )
+        return rotina, _conflito_versao_rotina(rotina)
+
     def _crianca_sessao(responsavel: Responsavel | None) -> Crianca | None:
         id_crianca = str(session.get("crianca_id", "")).strip()
         if not id_crianca:
@@ -825,12 +1111,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
 
     def _dados_perfil_responsavel(responsavel: Responsavel) -> dict[str, Any]:
         criancas = estado.listar_criancas_responsavel(responsavel.id_responsavel)
-        perfil_ativo = (
-            estado.perfil
-            if estado.perfil is not None
-            and estado.perfil.responsavel.id_responsavel == responsavel.id_responsavel
-            else None
-        )
+        perfil_ativo = estado.buscar_perfil_responsavel(responsavel.id_responsavel)
 
         criancas_payload: list[dict[str, Any]] = []
         for crianca in criancas:
@@ -865,10 +1146,22 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
 
         ids_criancas = {crianca.id_crianca for crianca in criancas_responsavel}
         tem_crianca = bool(ids_criancas)
-        tem_rotina = any(
-            rotina.id_crianca in ids_criancas and bool(rotina.itens)
-            for rotina in estado.rotinas
-        )
+        # Percorre do dia mais recente e para ao achar uma observacao (que ja
+        # implica uma rotina com itens), sem montar o historico inteiro.
+        tem_rotina = False
+        tem_observacao = False
+        for id_crianca in ids_criancas:
+            for rotina in estado.rotinas.iterar_rotinas_da_crianca(
+                id_crianca, mais_recentes_primeiro=True
+            ):
+                tem_rotina = tem_rotina or bool(rotina.itens)
+                tem_observacao = any(
+                    (item.observacao or "").strip() for item in rotina.itens
+                )
+                if tem_observacao:
+                    break
+            if tem_observacao:
+                break
 
         perfil_ativo = (
             estado.perfil
@@ -883,13 +1176,6 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
                 for id_crianca in ids_criancas
             )
 
-        tem_observacao = any(
-            (item.observacao or "").strip()
-            for rotina in estado.rotinas
-            if rotina.id_crianca in ids_criancas
-            for item in rotina.itens
-        )
-
         passos = [
             {"titulo": "Cadastre a primeira crianca", "feito": tem_crianca, "secao": "criancas"},
             {"titulo": "Monte a primeira rotina", "feito": tem_rotina, "secao": "rotina"},
@@ -899,6 +1185,141 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
         completo = all(item["feito"] for item in passos)
         return {"mostrar": not completo, "passos": passos}
 
+    def _preparar_relatorio(
+        responsavel: Responsavel,
+        crianca: Crianca,
+        data_ref: date,
+        periodo: str,
+    ) -> RelatorioPreparado:
+        rotina = estado.servico_rotinas.obter_rotina_para_leitura(
+            estado.rotinas,
+            crianca.id_crianca,
+            data_ref,
+        )
+
+        # Somente leitura: gerar o relatorio nao troca o perfil ativo.
+        perfil = estado.buscar_perfil_responsavel(responsavel.id_responsavel)
+        perfil_sensorial = (
+            perfil.obter_perfil_sensorial(crianca.id_crianca) if perfil is not None else None
+        )
+        resumo = estado.servico_monitoramento.obter_resumo_rotina(rotina)
+        inicio_periodo, fim_periodo = intervalo_periodo(data_ref, periodo)
+        if periodo == "mes":
+            resumo_itens = _resumo_periodo_rotinas(
+                estado.rotinas,
+                estado.agregador_evolucao,
+                crianca.id_crianca,
+                data_ref,
+                "mes",
+            )
+            titulo_resumo = "RESUMO MENSAL"
+            rotulo_periodo = "no mes"
+            referencia = f"Mes de referencia: {_mes_nome_pt_br(data_ref.month)}/{data_ref.year}"
+        else:
+            resumo_itens = _resumo_itens_periodo(
+                estado.rotinas,
+                estado.agregador_evolucao,
+                crianca.id_crianca,
+                inicio_periodo,
+                fim_periodo,
+            )
+            if periodo == "trimestre":
+                titulo_resumo = "RESUMO TRIMESTRAL"
+                rotulo_periodo = "no trimestre"
+                referencia = (
+                    f"Trimestre de referencia: {(data_ref.month - 1) // 3 + 1}o/{data_ref.year}"
+                )
+            else:
+                titulo_resumo = "RESUMO ANUAL"
+                rotulo_periodo = "no ano"
+                referencia = f"Ano de referencia: {data_ref.year}"
+
+        resumo_sentimentos = _resumo_sentimentos_periodo(
+            estado.rotinas,
+            crianca.id_crianca,
+            inicio_periodo,
+            fim_periodo,
+        )
+
+        distribuicao_periodo = resumo_sentimentos["distribuicao"]
+
+        linhas = [
+            "",
+            "DADOS PRINCIPAIS",
+            f"Responsavel: {responsavel.nome}",
+            f"Email: {responsavel.email}",
+            f"Crianca: {crianca.nome} (ID {crianca.id_crianca})",
+            referencia,
+            "",
+            titulo_resumo,
+            f"- Periodo analisado: {resumo_sentimentos['inicio']} ate {resumo_sentimentos['fim']}",
+            f"- Dias com rotina registrada: {resumo_sentimentos['dias_com_rotina']}",
+            f"- Dias com sentimento registrado: {resumo_sentimentos['dias_com_sentimento']}",
+            f"- Itens {rotulo_periodo}: {resumo_itens['total_itens']}",
+            f"- Concluidos: {resumo_itens['concluidos']}",
+            f"- Pendentes: {resumo_itens['pendentes']}",
+            f"- Nao realizados: {resumo_itens['nao_realizados']}",
+            f"- Percentual concluido {rotulo_periodo}: {resumo_itens['percentual_concluido']:.1f}%",
+            "",
+            f"GRAFICO DE SENTIMENTOS {rotulo_periodo.upper()} (BARRAS)",
+        ]
+
+        linhas.extend(
+            [
+                "",
+                "DETALHE DO DIA SELECIONADO",
+                f"Data da rotina: {data_ref.strftime('%d/%m/%Y')}",
+                f"Sentimento do dia: {rotina.sentimento_dia_info['label']}",
+                "",
+                "RESUMO DA ROTINA DO DIA",
+                f"- Concluidos: {resumo['concluidos']}",
+                f"- Pendentes: {resumo['pendentes']}",
+                f"- Nao realizados: {resumo['nao_realizados']}",
+                f"Percentual concluido: {resumo['percentual_concluido']:.1f}%",
+            ]
+        )
+
+        linhas.extend(["", "PERFIL SENSORIAL"])
+        if perfil_sensorial is None:
+            linhas.append("- Nao cadastrado.")
+        else:
+            linhas.extend(
+                [
+                    "- Hipersensibilidades: "
+                    + (", ".join(perfil_sensorial.hipersensibilidades) or "Nao informado"),
+                    "- Hipossensibilidades: "
+                    + (", ".join(perfil_sensorial.hipossensibilidades) or "Nao informado"),
+                    "- Hiperfocos: "
+                    + (", ".join(perfil_sensorial.hiperfocos) or "Nao informado"),
+                    "- Seletividade alimentar: "
+                    + (", ".join(perfil_sensorial.seletividade_alimentar) or "Nao informado"),
+                    "- Estrategias de regulacao: "
+                    + (", ".join(perfil_sensorial.estrategias_regulacao) or "Nao informado"),
+                ]
+            )
+
+        if periodo != "mes":
+            linhas.extend(
+                _linhas_detalhe_diario(
+                    estado.rotinas.rotinas_no_periodo(
+                        crianca.id_crianca,
+                        inicio_periodo,
+                        fim_periodo,
+                    )
+                )
+            )
+
+        nome_arquivo = f"relatorio_{crianca.id_crianca}_{data_ref.isoformat()}.pdf"
+        if periodo != "mes":
+            nome_arquivo = f"relatorio_{crianca.id_crianca}_{periodo}_{data_ref.isoformat()}.pdf"
+
+        return RelatorioPreparado(
+            periodo=periodo,
+            nome_arquivo=nome_arquivo,
+            linhas=tuple(linhas),
+            distribuicao_sentimentos=tuple(distribuicao_periodo),
+        )
+
     @app.get("/")
     def pagina_inicial():
         responsavel = _responsavel_sessao()
@@ -935,24 +1356,24 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
                 if data_ref > date.today():
                     raise ValueError("Nao e permitido selecionar data no futuro.")
 
-                estado.data_calendario = data_ref
-                rotina, criada = estado.servico_rotinas.obter_ou_criar_rotina(
-                    rotinas=estado.rotinas,
-                    id_crianca=crianca.id_crianca,
-                    data_referencia=data_ref,
+                session["data_calendario"] = data_ref.isoformat()
+                rotina = estado.servico_rotinas.obter_rotina_para_leitura(
+                    estado.rotinas,
+                    crianca.id_crianca,
+                    data_ref,
                 )
-                if criada:
-                    estado.persistir()
                 rotina_exibicao = estado.rotina_para_dict(rotina)
                 evolucao_periodo = {
                     "semana": _resumo_periodo_rotinas(
                         estado.rotinas,
+                        estado.agregador_evolucao,
                         crianca.id_crianca,
                         data_ref,
                         "semana",
                     ),
                     "mes": _resumo_periodo_rotinas(
                         estado.rotinas,
+                        estado.agregador_evolucao,
                         crianca.id_crianca,
                         data_ref,
                         "mes",
@@ -964,10 +1385,11 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
 
         if secao == "rotina":
             hoje = date.today()
+            data_calendario = _data_calendario_sessao()
             cal_mes_raw = request.args.get("cal_mes")
             cal_ano_raw = request.args.get("cal_ano")
-            cal_mes = estado.data_calendario.month
-            cal_ano = estado.data_calendario.year
+            cal_mes = data_calendario.month
+            cal_ano = data_calendario.year
             try:
                 if cal_mes_raw is not None:
                     cal_mes = int(str(cal_mes_raw).strip())
@@ -978,13 +1400,13 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
                 if cal_ano != hoje.year:
                     raise ValueError
             except ValueError:
-                cal_mes = estado.data_calendario.month
-                cal_ano = estado.data_calendario.year
+                cal_mes = data_calendario.month
+                cal_ano = data_calendario.year
 
             calendario_exibicao = _dados_calendario(
                 mes=cal_mes,
                 ano=cal_ano,
-                data_selecionada=estado.data_calendario,
+                data_selecionada=data_calendario,
             )
 
         return render_template(
@@ -992,7 +1414,6 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
             secao=secao,
             responsavel_selecionado=responsavel,
             crianca_selecionada=crianca,
-            responsaveis=estado.responsaveis,
             criancas_responsavel=criancas_responsavel,
             rotina_exibicao=rotina_exibicao,
             data_rotina=data_rotina,
@@ -1014,7 +1435,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
         senha = request.form.get("senha", "")
 
         try:
-            estado.servico_cadastro.validar_email_disponivel(estado.responsaveis, email)
+            estado.validar_email_disponivel(email)
             responsavel, perfil = estado.servico_cadastro.cadastrar_responsavel(
                 nome=nome,
                 data_nascimento=data_nascimento,
@@ -1025,7 +1446,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
             flash(str(erro), "erro")
             return redirect(url_for("pagina_inicial", secao="cadastro"))
 
-        estado.responsaveis.append(responsavel)
+        estado.adicionar_responsavel(responsavel)
         estado.perfil = perfil
         estado.persistir()
         session["responsavel_id"] = responsavel.id_responsavel
@@ -1037,11 +1458,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
     def web_selecionar_responsavel():
         id_responsavel = str(request.form.get("id_responsavel", "")).strip()
         senha = request.form.get("senha", "")
-        responsavel = estado.servico_cadastro.validar_responsavel_por_credenciais(
-            estado.responsaveis,
-            id_responsavel,
-            senha,
-        )
+        responsavel = estado.autenticar_responsavel(id_responsavel, senha)
         if responsavel is None:
             flash("ID ou senha invalidos.", "erro")
             return redirect(url_for("pagina_inicial", secao="login"))
@@ -1076,7 +1493,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
             flash(str(erro), "erro")
             return redirect(url_for("pagina_inicial", secao="criancas"))
 
-        estado.criancas.append(crianca)
+        estado.adicionar_crianca(crianca)
         perfil = estado.obter_perfil_responsavel(responsavel)
         estado.servico_perfil.vincular_crianca_ao_perfil(perfil, crianca)
         estado.persistir()
@@ -1156,12 +1573,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
             )
             return redirect(url_for("pagina_inicial", secao="criancas"))
 
-        estado.criancas, estado.rotinas = estado.servico_perfil.excluir_crianca(
-            criancas=estado.criancas,
-            rotinas=estado.rotinas,
-            perfil=estado.perfil,
-            id_crianca=id_crianca,
-        )
+        estado.remover_crianca(id_crianca)
         if session.get("crianca_id") == id_crianca:
             session.pop("crianca_id", None)
         estado.persistir()
@@ -1182,15 +1594,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
         try:
             email_limpo = email.strip()
             if email_limpo:
-                outros_responsaveis = [
-                    item
-                    for item in estado.responsaveis
-                    if item.id_responsavel != responsavel.id_responsavel
-                ]
-                estado.servico_cadastro.validar_email_disponivel(
-                    outros_responsaveis,
-                    email_limpo,
-                )
+                estado.validar_email_disponivel(email_limpo, responsavel.id_responsavel)
 
             estado.servico_cadastro.editar_responsavel(
                 responsavel=responsavel,
@@ -1269,8 +1673,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
                 raise ValueError("Nao e permitido selecionar data no futuro.")
             if data_ref.year != date.today().year:
                 raise ValueError(f"Ano deve ser o atual ({date.today().year}).")
-            estado.data_calendario = data_ref
-            estado.persistir()
+            session["data_calendario"] = data_ref.isoformat()
         except ValueError as erro:
             flash(str(erro), "erro")
             return redirect(url_for("pagina_inicial", secao="rotina"))
@@ -1285,13 +1688,12 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
             flash("Selecione uma crianca antes de usar o calendario.", "erro")
             return redirect(url_for("pagina_inicial", secao="criancas"))
 
-        estado.data_calendario = date.today()
-        estado.persistir()
+        session["data_calendario"] = date.today().isoformat()
         return redirect(
             url_for(
                 "pagina_inicial",
                 secao="rotina",
-                data_rotina=estado.data_calendario.isoformat(),
+                data_rotina=session["data_calendario"],
             )
         )
 
@@ -1413,11 +1815,16 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
 
         id_crianca_url = str(request.args.get("id_crianca", "")).strip()
         data_texto = str(request.args.get("data", "")).strip()
-        data_ref = _parse_data(data_texto, padrao=estado.data_calendario)
+        data_ref = _parse_data(data_texto, padrao=_data_calendario_sessao())
         if data_ref > date.today():
             flash("Nao e permitido exportar relatorio com data futura.", "erro")
             return redirect(url_for("pagina_inicial", secao="rotina"))
 
+        periodo = str(request.args.get("periodo", "mes")).strip().lower() or "mes"
+        if periodo not in PERIODOS_RELATORIO:
+            flash("Periodo de relatorio invalido. Use mes, trimestre ou ano.", "erro")
+            return redirect(url_for("pagina_inicial", secao="rotina"))
+
         crianca = next(
             (
                 item
@@ -1433,95 +1840,34 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
                 criancas_responsavel[0],
             )
 
-        rotina, criada = estado.servico_rotinas.obter_ou_criar_rotina(
-            rotinas=estado.rotinas,
-            id_crianca=crianca.id_crianca,
-            data_referencia=data_ref,
-        )
-        if criada:
-            estado.persistir()
-
-        perfil = estado.obter_perfil_responsavel(responsavel)
-        perfil_sensorial = perfil.obter_perfil_sensorial(crianca.id_crianca)
-        resumo = estado.servico_monitoramento.obter_resumo_rotina(rotina)
-        resumo_mes_itens = _resumo_periodo_rotinas(
-            estado.rotinas,
-            crianca.id_crianca,
-            data_ref,
-            "mes",
-        )
-        resumo_mes_sentimentos = _resumo_sentimentos_mes(
-            estado.rotinas,
-            crianca.id_crianca,
-            data_ref,
-        )
-
-        distribuicao_mes = resumo_mes_sentimentos["distribuicao"]
-
-        linhas = [
-            "Relatorio TeApoio - Visao Geral",
-            f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}",
-            "",
-            "DADOS PRINCIPAIS",
-            f"Responsavel: {responsavel.nome}",
-            f"Email: {responsavel.email}",
-            f"Crianca: {crianca.nome} (ID {crianca.id_crianca})",
-            f"Mes de referencia: {_mes_nome_pt_br(data_ref.month)}/{data_ref.year}",
-            "",
-            "RESUMO MENSAL",
-            f"- Periodo analisado: {resumo_mes_sentimentos['inicio']} ate {resumo_mes_sentimentos['fim']}",
-            f"- Dias com rotina registrada: {resumo_mes_sentimentos['dias_com_rotina']}",
-            f"- Dias com sentimento registrado: {resumo_mes_sentimentos['dias_com_sentimento']}",
-            f"- Itens no mes: {resumo_mes_itens['total_itens']}",
-            f"- Concluidos: {resumo_mes_itens['concluidos']}",
-            f"- Pendentes: {resumo_mes_itens['pendentes']}",
-            f"- Nao realizados: {resumo_mes_itens['nao_realizados']}",
-            f"- Percentual concluido no mes: {resumo_mes_itens['percentual_concluido']:.1f}%",
-            "",
-            "GRAFICO DE SENTIMENTOS NO MES (BARRAS)",
-        ]
-
-        linhas.extend(
-            [
-                "",
-                "DETALHE DO DIA SELECIONADO",
-                f"Data da rotina: {data_ref.strftime('%d/%m/%Y')}",
-                f"Sentimento do dia: {rotina.sentimento_dia_info['label']}",
-                "",
-                "RESUMO DA ROTINA DO DIA",
-                f"- Concluidos: {resumo['concluidos']}",
-                f"- Pendentes: {resumo['pendentes']}",
-                f"- Nao realizados: {resumo['nao_realizados']}",
-                f"Percentual concluido: {resumo['percentual_concluido']:.1f}%",
-            ]
-        )
-
-        linhas.extend(["", "PERFIL SENSORIAL"])
-        if perfil_sensorial is None:
-            linhas.append("- Nao cadastrado.")
-        else:
-            linhas.extend(
-                [
-                    "- Hipersensibilidades: "
-                    + (", ".join(perfil_sensorial.hipersensibilidades) or "Nao informado"),
-                    "- Hipossensibilidades: "
-                    + (", ".join(perfil_sensorial.hipossensibilidades) or "Nao informado"),
-                    "- Hiperfocos: "
-                    + (", ".join(perfil_sensorial.hiperfocos) or "Nao informado"),
-                    "- Seletividade alimentar: "
-                    + (", ".join(perfil_sensorial.seletividade_alimentar) or "Nao informado"),
-                    "- Estrategias de regulacao: "
-                    + (", ".join(perfil_sensorial.estrategias_regulacao) or "Nao informado"),
-                ]
+        relatorio = _preparar_relatorio(responsavel, crianca, data_ref, periodo)
+
+        # O conteudo e enderecado pelo hash: se o cliente ja tem esta versao,
+        # basta confirmar, mesmo que o arquivo tenha saido do cache em disco.
+        if relatorio.chave in request.if_none_match:
+            resposta = Response(status=304)
+            resposta.set_etag(relatorio.chave)
+            return resposta
+
+        artefato = cache_relatorios.buscar(relatorio.chave)
+        if artefato is not None:
+            return send_file(
+                artefato,
+                mimetype="application/pdf",
+                as_attachment=True,
+                download_name=relatorio.nome_arquivo,
+                etag=relatorio.chave,
             )
 
-        pdf_bytes = _gerar_pdf_com_grafico(linhas, distribuicao_mes)
-        nome_arquivo = f"relatorio_{crianca.id_crianca}_{data_ref.isoformat()}.pdf"
-        return Response(
-            pdf_bytes,
+        resposta = Response(
+            cache_relatorios.gravar(relatorio.chave, relatorio.gerar_pdf()),
             mimetype="application/pdf",
-            headers={"Content-Disposition": f'attachment; filename="{nome_arquivo}"'},
+            headers={
+                "Content-Disposition": f'attachment; filename="{relatorio.nome_arquivo}"'
+            },
         )
+        resposta.set_etag(relatorio.chave)
+        return resposta
 
     @app.post("/web/rotina/item/status")
     def web_alterar_status_item_rotina():
@@ -1601,14 +1947,10 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
         try:
             data_ref = _parse_data(data_texto)
             indice = int(indice_texto)
-            rotina = next(
-                (
-                    item
-                    for item in estado.rotinas
-                    if item.id_crianca == crianca.id_crianca
-                    and item.data_referencia == data_ref
-                ),
-                None,
+            rotina = estado.servico_rotinas.buscar_rotina(
+                estado.rotinas,
+                crianca.id_crianca,
+                data_ref,
             )
             if rotina is None:
                 raise ValueError("Rotina nao encontrada para a data informada.")
@@ -1631,6 +1973,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
                     "health": "/health",
                     "responsaveis": "/responsaveis",
                     "sugestoes_rotina": "/sugestoes-rotina",
+                    "relatorios": "/relatorios",
                 },
             }
         )
@@ -1640,21 +1983,51 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
         return jsonify({"status": "ok"})
 
     @app.get("/sugestoes-rotina")
+    @_cache_resposta
     def listar_sugestoes_rotina():
         return jsonify({"sugestoes": obter_sugestoes_tea()})
 
     @app.get("/responsaveis")
+    @_cache_resposta
     def listar_responsaveis():
+        prefixo_nome = request.args.get("nome", "")
+        prefixo_email = request.args.get("email", "")
+        ordem = request.args.get(
+            "ordem",
+            IndiceCadastros.ORDEM_EMAIL if prefixo_email and not prefixo_nome else IndiceCadastros.ORDEM_NOME,
+        )
+        try:
+            limite = _parse_limite(request.args.get("limite"))
+            campos = _parse_campos(request.args.get("campos"), CAMPOS_RESPONSAVEL)
+            apos = _decodificar_cursor(request.args.get("cursor"), ordem)
+            responsaveis, proxima = estado.paginar_responsaveis(
+                limite=limite,
+                ordem=ordem,
+                apos=apos,
+                prefixo_nome=prefixo_nome,
+                prefixo_email=prefixo_email,
+            )
+        except ValueError as erro:
+            return _erro(str(erro), 400)
+
         return jsonify(
             {
                 "responsaveis": [
-                    estado.responsavel_para_dict(responsavel)
-                    for responsavel in estado.responsaveis
-                ]
+                    {
+                        campo: valor
+                        for campo, valor in estado.responsavel_para_dict(responsavel).items()
+                        if campo in campos
+                    }
+                    for responsavel in responsaveis
+                ],
+                "proximo_cursor": (
+                    _codificar_cursor(ordem, proxima) if proxima is not None else None
+                ),
             }
         )
 
     @app.get("/responsaveis/<id_responsavel>")
+    @_cache_resposta
     def obter_responsavel(id_responsavel: str):
         responsavel = estado.buscar_responsavel(id_responsavel)
         if responsavel is None:
@@ -1675,10 +2048,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
             return _erro("Corpo JSON invalido.", 400)
 
         try:
-            estado.servico_cadastro.validar_email_disponivel(
-                estado.responsaveis,
-                payload.get("email", ""),
-            )
+            estado.validar_email_disponivel(payload.get("email", ""))
             responsavel, perfil = estado.servico_cadastro.cadastrar_responsavel(
                 nome=payload.get("nome", ""),
                 data_nascimento=payload.get("data_nascimento", ""),
@@ -1688,7 +2058,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
         except (TypeError, ValueError) as erro:
             return _erro(str(erro), 400)
 
-        estado.responsaveis.append(responsavel)
+        estado.adicionar_responsavel(responsavel)
         estado.perfil = perfil
         estado.persistir()
         return (
@@ -1716,7 +2086,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
         except (TypeError, ValueError) as erro:
             return _erro(str(erro), 400)
 
-        estado.criancas.append(crianca)
+        estado.adicionar_crianca(crianca)
         perfil = estado.obter_perfil_responsavel(responsavel)
         estado.servico_perfil.vincular_crianca_ao_perfil(perfil, crianca)
         estado.persistir()
@@ -1767,12 +2137,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
         if crianca is None:
             return _erro("Crianca nao encontrada.", 404)
 
-        estado.criancas, estado.rotinas = estado.servico_perfil.excluir_crianca(
-            criancas=estado.criancas,
-            rotinas=estado.rotinas,
-            perfil=estado.perfil,
-            id_crianca=id_crianca,
-        )
+        estado.remover_crianca(id_crianca)
         estado.persistir()
         return jsonify({"mensagem": "Crianca excluida com sucesso."})
 
@@ -1827,6 +2192,7 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
         )
 
     @app.get("/criancas/<id_crianca>/perfil-sensorial")
+    @_cache_resposta
     def obter_perfil_sensorial(id_crianca: str):
         if estado.perfil is None:
             return _erro("Perfil sensorial nao encontrado.", 404)
@@ -1843,7 +2209,115 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
             }
         )
 
+    @app.get("/criancas/<id_crianca>/modelos-rotina")
+    @_cache_resposta
+    def listar_modelos_rotina(id_crianca: str):
+        crianca = estado.buscar_crianca(id_crianca)
+        if crianca is None:
+            return _erro("Crianca nao encontrada.", 404)
+
+        return jsonify(
+            {
+                "modelos": [
+                    estado.modelo_rotina_para_dict(modelo)
+                    for modelo in crianca.listar_modelos_rotina()
+                ]
+            }
+        )
+
+    @app.put("/criancas/<id_crianca>/modelos-rotina/<nome>")
+    def salvar_modelo_rotina(id_crianca: str, nome: str):
+        crianca = estado.buscar_crianca(id_crianca)
+        if crianca is None:
+            return _erro("Crianca nao encontrada.", 404)
+
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return _erro("Corpo JSON invalido.", 400)
+
+        try:
+            if payload.get("a_partir_de"):
+                data_origem = _parse_data(payload["a_partir_de"])
+                rotina = estado.servico_rotinas.buscar_rotina(
+                    estado.rotinas, id_crianca, data_origem
+                )
+                if rotina is None:
+                    return _erro("Rotina de origem nao encontrada para a data informada.", 404)
+                modelo = ModeloRotina.a_partir_rotina(nome, rotina)
+            else:
+                modelo = ModeloRotina(
+                    nome=nome,
+                    itens=[
+                        ItemRotina(
+                            nome=dados.get("nome", ""),
+                            horario=dados.get("horario", ""),
+                            observacao=str(dados.get("observacao", "")),
+                            tags=_normalizar_lista_strings(dados, "tags"),
+                        )
+                        for dados in _lista_objetos(payload, "itens")
+                    ],
+                )
+            novo = crianca.obter_modelo_rotina(modelo.nome) is None
+            crianca.salvar_modelo_rotina(modelo)
+        except (TypeError, ValueError) as erro:
+            return _erro(str(erro), 400)
+
+        estado.persistir()
+        return jsonify({"modelo": estado.modelo_rotina_para_dict(modelo)}), 201 if novo else 200
+
+    @app.delete("/criancas/<id_crianca>/modelos-rotina/<nome>")
+    def remover_modelo_rotina(id_crianca: str, nome: str):
+        crianca = estado.buscar_crianca(id_crianca)
+        if crianca is None:
+            return _erro("Crianca nao encontrada.", 404)
+        if not crianca.remover_modelo_rotina(nome):
+            return _erro("Modelo de rotina nao encontrado.", 404)
+
+        estado.persistir()
+        return jsonify({"mensagem": "Modelo de rotina removido com sucesso."})
+
+    @app.post("/criancas/<id_crianca>/modelos-rotina/<nome>/aplicar")
+    def aplicar_modelo_rotina(id_crianca: str, nome: str):
+        crianca = estado.buscar_crianca(id_crianca)
+        if crianca is None:
+            return _erro("Crianca nao encontrada.", 404)
+        modelo = crianca.obter_modelo_rotina(nome)
+        if modelo is None:
+            return _erro("Modelo de rotina nao encontrado.", 404)
+
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return _erro("Corpo JSON invalido.", 400)
+
+        try:
+            data_inicio = _parse_data(payload.get("inicio"), padrao=estado.data_calendario)
+            data_fim = _parse_data(payload.get("fim"), padrao=data_inicio)
+            dias_semana = payload.get("dias_semana")
+            if dias_semana is not None and not isinstance(dias_semana, list):
+                raise ValueError("Campo 'dias_semana' deve ser uma lista de inteiros.")
+            rotinas = estado.servico_rotinas.aplicar_modelo(
+                rotinas=estado.rotinas,
+                id_crianca=id_crianca,
+                modelo=modelo,
+                data_inicio=data_inicio,
+                data_fim=data_fim,
+                dias_semana=dias_semana,
+            )
+        except (TypeError, ValueError) as erro:
+            return _erro(str(erro), 400)
+
+        if rotinas:
+            estado.persistir()
+        return jsonify(
+            {
+                "modelo": modelo.nome,
+                "rotinas_alteradas": len(rotinas),
+                "datas": [rotina.data_referencia.isoformat() for rotina in rotinas],
+            }
+        )
+
     @app.get("/rotinas/<id_crianca>")
+    @_cache_resposta
     def obter_rotina(id_crianca: str):
         crianca = estado.buscar_crianca(id_crianca)
         if crianca is None:
@@ -1857,15 +2331,46 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
         except ValueError as erro:
             return _erro(str(erro), 400)
 
-        rotina, criada = estado.servico_rotinas.obter_ou_criar_rotina(
-            rotinas=estado.rotinas,
-            id_crianca=id_crianca,
-            data_referencia=data_ref,
+        rotina = estado.servico_rotinas.obter_rotina_para_leitura(
+            estado.rotinas,
+            id_crianca,
+            data_ref,
         )
-        if criada:
-            estado.persistir()
+        return _resposta_rotina({"rotina": estado.rotina_para_dict(rotina)}, rotina)
+
+    @app.get("/rotinas/<id_crianca>/historico")
+    def historico_rotinas(id_crianca: str):
+        crianca = estado.buscar_crianca(id_crianca)
+        if crianca is None:
+            return _erro("Crianca nao encontrada.", 404)
+
+        detalhe = request.args.get("detalhe", "resumo")
+        if detalhe not in ("resumo", "completo"):
+            return _erro("Detalhe invalido. Use 'resumo' ou 'completo'.", 400)
+
+        try:
+            fim = _parse_data(request.args.get("fim"), padrao=estado.data_calendario)
+            inicio = _parse_data(request.args.get("inicio"), padrao=fim.replace(day=1))
+        except ValueError as erro:
+            return _erro(str(erro), 400)
+        if fim < inicio:
+            return _erro("A data final deve ser igual ou posterior a data inicial.", 400)
+        if (fim - inicio).days >= LIMITE_DIAS_HISTORICO:
+            return _erro(f"O intervalo deve ter no maximo {LIMITE_DIAS_HISTORICO} dias.", 400)
+
+        # Os dicionarios sao montados sob a trava de leitura; so a serializacao
+        # acontece durante o envio, depois que a trava ja foi liberada.
+        para_dict = estado.rotina_para_dict if detalhe == "completo" else estado.rotina_resumo_para_dict
+        registros = [
+            para_dict(rotina)
+            for rotina in estado.rotinas.rotinas_no_periodo(id_crianca, inicio, fim)
+        ]
 
-        return jsonify({"rotina": estado.rotina_para_dict(rotina)})
+        def _linhas() -> Iterator[str]:
+            for registro in registros:
+                yield json.dumps(registro, ensure_ascii=False) + "\n"
+
+        return Response(_linhas(), mimetype="application/x-ndjson")
 
     @app.post("/rotinas/<id_crianca>/itens")
     def adicionar_item_rotina(id_crianca: str):
@@ -1879,11 +2384,9 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
 
         try:
             data_ref = _parse_data(payload.get("data"), padrao=estado.data_calendario)
-            rotina, _ = estado.servico_rotinas.obter_ou_criar_rotina(
-                rotinas=estado.rotinas,
-                id_crianca=id_crianca,
-                data_referencia=data_ref,
-            )
+            rotina, conflito = _rotina_para_alteracao(id_crianca, data_ref)
+            if conflito is not None:
+                return conflito
             item = estado.servico_rotinas.adicionar_item(
                 rotina=rotina,
                 nome_item=payload.get("nome", ""),
@@ -1891,14 +2394,96 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
                 observacao=str(payload.get("observacao", "")),
                 tags=_normalizar_lista_strings(payload, "tags"),
             )
+            estado.servico_rotinas.indexar_rotina(estado.rotinas, rotina)
         except (TypeError, ValueError) as erro:
             return _erro(str(erro), 400)
 
         estado.persistir()
-        return jsonify({"item": estado.item_para_dict(item)}), 201
+        return _resposta_rotina(
+            {"item": estado.item_para_dict(item), "versao": rotina.versao},
+            rotina,
+            201,
+        )
+
+    @app.post("/rotinas/lote")
+    def aplicar_lote_rotinas():
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return _erro("Corpo JSON invalido.", 400)
+
+        grupos = payload.get("rotinas")
+        if not isinstance(grupos, list) or not grupos:
+            return _erro("Campo 'rotinas' deve ser uma lista nao vazia.", 400)
+
+        alteracoes: list[AlteracaoLoteRotina] = []
+        try:
+            for grupo in grupos:
+                if not isinstance(grupo, dict):
+                    raise ValueError("Cada rotina do lote deve ser um objeto JSON.")
+
+                id_crianca = str(grupo.get("id_crianca", "")).strip()
+                if estado.buscar_crianca(id_crianca) is None:
+                    return _erro(f"Crianca nao encontrada: {id_crianca}.", 404)
+                data_ref = _parse_data(grupo.get("data"), padrao=estado.data_calendario)
+
+                versao = grupo.get("versao")
+                if versao is not None:
+                    if isinstance(versao, bool) or not isinstance(versao, int):
+                        raise ValueError("Campo 'versao' deve ser um numero inteiro.")
+                    rotina = estado.servico_rotinas.buscar_rotina(
+                        estado.rotinas, id_crianca, data_ref
+                    )
+                    versao_atual = rotina.versao if rotina is not None else 0
+                    if versao != versao_atual:
+                        return jsonify(
+                            {
+                                "erro": "A rotina foi alterada por outra requisicao. Recarregue e tente novamente.",
+                                "id_crianca": id_crianca,
+                                "data": data_ref.isoformat(),
+                                "versao_atual": versao_atual,
+                            }
+                        ), 409
+
+                adicionar = []
+                for dados in _lista_objetos(grupo, "adicionar"):
+                    adicionar.append(
+                        {
+                            "nome": dados.get("nome", ""),
+                            "horario": dados.get("horario", ""),
+                            "observacao": str(dados.get("observacao", "")),
+                            "tags": _normalizar_lista_strings(dados, "tags"),
+                        }
+                    )
+                alteracoes.append(
+                    AlteracaoLoteRotina(
+                        id_crianca=id_crianca,
+                        data_referencia=data_ref,
+                        adicionar=adicionar,
+                        status=[
+                            (_referencia_item(dados), dados.get("status"))
+                            for dados in _lista_objetos(grupo, "status")
+                        ],
+                        remover=[
+                            _referencia_item(dados)
+                            for dados in _lista_objetos(grupo, "remover")
+                        ],
+                    )
+                )
+
+            rotinas = estado.servico_rotinas.aplicar_lote(estado.rotinas, alteracoes)
+        except (TypeError, ValueError, IndexError) as erro:
+            return _erro(str(erro), 400)
+
+        estado.persistir()
+        return jsonify({"rotinas": [estado.rotina_para_dict(rotina) for rotina in rotinas]})
 
     @app.patch("/rotinas/<id_crianca>/itens/<int:indice>/status")
-    def marcar_status_item_rotina(id_crianca: str, indice: int):
+    @app.patch("/rotinas/<id_crianca>/itens/<id_item>/status")
+    def marcar_status_item_rotina(
+        id_crianca: str,
+        indice: int | None = None,
+        id_item: str | None = None,
+    ):
         crianca = estado.buscar_crianca(id_crianca)
         if crianca is None:
             return _erro("Crianca nao encontrada.", 404)
@@ -1909,11 +2494,17 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
 
         try:
             data_ref = _parse_data(payload.get("data"), padrao=estado.data_calendario)
-            rotina, _ = estado.servico_rotinas.obter_ou_criar_rotina(
-                rotinas=estado.rotinas,
-                id_crianca=id_crianca,
-                data_referencia=data_ref,
-            )
+            rotina = estado.servico_rotinas.buscar_rotina(estado.rotinas, id_crianca, data_ref)
+            if rotina is None:
+                return _erro("Rotina nao encontrada para a data informada.", 404)
+
+            conflito = _conflito_versao_rotina(rotina)
+            if conflito is not None:
+                return conflito
+            if id_item is not None:
+                indice = rotina.indice_item(id_item)
+                if indice is None:
+                    return _erro("Item nao encontrado na rotina.", 404)
             status = estado.servico_rotinas.marcar_status(
                 rotina=rotina,
                 indice=indice,
@@ -1923,10 +2514,23 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
             return _erro(str(erro), 400)
 
         estado.persistir()
-        return jsonify({"indice": indice, "status": status})
+        return _resposta_rotina(
+            {
+                "indice": indice,
+                "id_item": rotina.itens[indice].id_item,
+                "status": status,
+                "versao": rotina.versao,
+            },
+            rotina,
+        )
 
     @app.delete("/rotinas/<id_crianca>/itens/<int:indice>")
-    def remover_item_rotina(id_crianca: str, indice: int):
+    @app.delete("/rotinas/<id_crianca>/itens/<id_item>")
+    def remover_item_rotina(
+        id_crianca: str,
+        indice: int | None = None,
+        id_item: str | None = None,
+    ):
         crianca = estado.buscar_crianca(id_crianca)
         if crianca is None:
             return _erro("Crianca nao encontrada.", 404)
@@ -1936,24 +2540,26 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
                 request.args.get("data"),
                 padrao=estado.data_calendario,
             )
-            rotina = next(
-                (
-                    item
-                    for item in estado.rotinas
-                    if item.id_crianca == id_crianca
-                    and item.data_referencia == data_ref
-                ),
-                None,
-            )
+            rotina = estado.servico_rotinas.buscar_rotina(estado.rotinas, id_crianca, data_ref)
             if rotina is None:
                 return _erro("Rotina nao encontrada para a data informada.", 404)
 
+            conflito = _conflito_versao_rotina(rotina)
+            if conflito is not None:
+                return conflito
+            if id_item is not None:
+                indice = rotina.indice_item(id_item)
+                if indice is None:
+                    return _erro("Item nao encontrado na rotina.", 404)
             estado.servico_rotinas.remover_item(rotina=rotina, indice=indice)
         except (TypeError, ValueError, IndexError) as erro:
             return _erro(str(erro), 400)
 
         estado.persistir()
-        return jsonify({"mensagem": "Item removido com sucesso."})
+        return _resposta_rotina(
+            {"mensagem": "Item removido com sucesso.", "versao": rotina.versao},
+            rotina,
+        )
 
     @app.patch("/rotinas/<id_crianca>/sentimento")
     def atualizar_sentimento_rotina(id_crianca: str):
@@ -1967,17 +2573,23 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
 
         try:
             data_ref = _parse_data(payload.get("data"), padrao=estado.data_calendario)
-            rotina, _ = estado.servico_rotinas.obter_ou_criar_rotina(
-                rotinas=estado.rotinas,
-                id_crianca=id_crianca,
-                data_referencia=data_ref,
-            )
+            rotina, conflito = _rotina_para_alteracao(id_crianca, data_ref)
+            if conflito is not None:
+                return conflito
             rotina.atualizar_sentimento_dia(payload.get("sentimento", ""))
+            estado.servico_rotinas.indexar_rotina(estado.rotinas, rotina)
         except (TypeError, ValueError) as erro:
             return _erro(str(erro), 400)
 
         estado.persistir()
-        return jsonify({"sentimento_dia": rotina.sentimento_dia, "sentimento_dia_info": rotina.sentimento_dia_info})
+        return _resposta_rotina(
+            {
+                "sentimento_dia": rotina.sentimento_dia,
+                "sentimento_dia_info": rotina.sentimento_dia_info,
+                "versao": rotina.versao,
+            },
+            rotina,
+        )
 
     @app.patch("/rotinas/<id_crianca>/emocao")
     def registrar_emocao_rotina(id_crianca: str):
@@ -1991,20 +2603,146 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
 
         try:
             data_ref = _parse_data(payload.get("data"), padrao=estado.data_calendario)
-            rotina, _ = estado.servico_rotinas.obter_ou_criar_rotina(
-                rotinas=estado.rotinas,
-                id_crianca=id_crianca,
-                data_referencia=data_ref,
-            )
+            rotina, conflito = _rotina_para_alteracao(id_crianca, data_ref)
+            if conflito is not None:
+                return conflito
             emot = payload.get("emocao")
             escala = payload.get("escala")
             if emot is None or escala is None:
                 raise ValueError("Campos 'emocao' e 'escala' sao obrigatorios.")
             rotina.registrar_emocao(emot, int(escala))
+            estado.servico_rotinas.indexar_rotina(estado.rotinas, rotina)
         except (TypeError, ValueError) as erro:
             return _erro(str(erro), 400)
 
         estado.persistir()
-        return jsonify({"emocoes": rotina.obter_emocoes()}), 200
+        return _resposta_rotina(
+            {"emocoes": rotina.obter_emocoes(), "versao": rotina.versao},
+            rotina,
+        )
+
+    @app.post("/relatorios")
+    def enfileirar_relatorio():
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return _erro("Corpo JSON invalido.", 400)
+
+        crianca = estado.buscar_crianca(str(payload.get("id_crianca", "")).strip())
+        if crianca is None:
+            return _erro("Crianca nao encontrada.", 404)
+        responsavel = estado.buscar_responsavel(crianca.id_responsavel)
+        if responsavel is None:
+            return _erro("Responsavel nao encontrado.", 404)
+
+        periodo = str(payload.get("periodo", "mes")).strip().lower() or "mes"
+        if periodo not in PERIODOS_RELATORIO:
+            return _erro("Periodo invalido. Use 'mes', 'trimestre' ou 'ano'.", 400)
+
+        try:
+            data_ref = _parse_data(payload.get("data"), padrao=estado.data_calendario)
+        except ValueError as erro:
+            return _erro(str(erro), 400)
+        if data_ref > date.today():
+            return _erro("Nao e permitido exportar relatorio com data futura.", 400)
+
+        tarefa = fila_relatorios.enfileirar(
+            _preparar_relatorio(responsavel, crianca, data_ref, periodo),
+            id_crianca=crianca.id_crianca,
+            data_referencia=data_ref,
+        )
+        url_status = url_for("obter_tarefa_relatorio", id_tarefa=tarefa.id_tarefa)
+        return (
+            jsonify({"tarefa": tarefa.to_dict(), "url_status": url_status}),
+            202,
+            {"Location": url_status},
+        )
+
+    @app.get("/relatorios/<id_tarefa>")
+    def obter_tarefa_relatorio(id_tarefa: str):
+        tarefa = fila_relatorios.obter(id_tarefa)
+        if tarefa is None:
+            return _erro("Tarefa de relatorio nao encontrada.", 404)
+
+        resposta: dict[str, Any] = {"tarefa": tarefa.to_dict()}
+        if tarefa.status == FilaRelatorios.STATUS_CONCLUIDO:
+            resposta["url_download"] = url_for(
+                "baixar_tarefa_relatorio",
+                id_tarefa=tarefa.id_tarefa,
+            )
+        return jsonify(resposta)
+
+    @app.get("/relatorios/<id_tarefa>/pdf")
+    def baixar_tarefa_relatorio(id_tarefa: str):
+        tarefa = fila_relatorios.obter(id_tarefa)
+        if tarefa is None:
+            return _erro("Tarefa de relatorio nao encontrada.", 404)
+        if tarefa.status == FilaRelatorios.STATUS_ERRO:
+            return _erro(f"Falha ao gerar relatorio: {tarefa.erro}", 500)
+        if tarefa.status != FilaRelatorios.STATUS_CONCLUIDO:
+            return _erro("Relatorio ainda em processamento.", 409)
+
+        artefato = fila_relatorios.caminho_artefato(tarefa)
+        if artefato is None:
+            return _erro("Arquivo do relatorio expirou. Solicite um novo relatorio.", 410)
+
+        return send_file(
+            artefato,
+            mimetype="application/pdf",
+            as_attachment=True,
+            download_name=tarefa.relatorio.nome_arquivo,
+            etag=tarefa.relatorio.chave,
+        )
+
+    @app.post("/relatorios/lote")
+    def exportar_relatorios_lote():
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return _erro("Corpo JSON invalido.", 400)
+
+        periodo = str(payload.get("periodo", "mes")).strip().lower() or "mes"
+        if periodo not in PERIODOS_RELATORIO:
+            return _erro("Periodo invalido. Use 'mes', 'trimestre' ou 'ano'.", 400)
+
+        # So a montagem dos relatorios le o estado; a renderizacao do lote
+        # acontece fora da trava e nao bloqueia as demais requisicoes.
+        with _leitura_estado():
+            try:
+                data_ref = _parse_data(payload.get("data"), padrao=estado.data_calendario)
+            except ValueError as erro:
+                return _erro(str(erro), 400)
+            if data_ref > date.today():
+                return _erro("Nao e permitido exportar relatorio com data futura.", 400)
+
+            # Sem id_responsavel, exporta todas as criancas cadastradas.
+            id_responsavel = str(payload.get("id_responsavel", "") or "").strip()
+            if id_responsavel:
+                responsavel = estado.buscar_responsavel(id_responsavel)
+                if responsavel is None:
+                    return _erro("Responsavel nao encontrado.", 404)
+                criancas = estado.listar_criancas_responsavel(id_responsavel)
+            else:
+                criancas = list(estado.criancas)
+
+            relatorios: list[RelatorioPreparado] = []
+            for crianca in criancas:
+                responsavel = estado.buscar_responsavel(crianca.id_responsavel)
+                if responsavel is None:
+                    continue
+                relatorios.append(
+                    _preparar_relatorio(responsavel, crianca, data_ref, periodo)
+                )
+        if not relatorios:
+            return _erro("Nenhuma crianca encontrada para exportar.", 404)
+
+        arquivo_zip = SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        exportador_lote.exportar_zip(relatorios, arquivo_zip)
+        arquivo_zip.seek(0)
+        nome_arquivo = f"relatorios_{id_responsavel or 'todos'}_{periodo}_{data_ref.isoformat()}.zip"
+        return send_file(
+            arquivo_zip,
+            mimetype="application/zip",
+            as_attachment=True,
+            download_name=nome_arquivo,
+        )
 
     return app
@@ -3,48 +3,132 @@ from __future__ import annotations
 import json
 import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Protocol
+
+try:
+	import orjson
+except ImportError:  # dependencia opcional
+	orjson = None
+
+
+class CodecJson(Protocol):
+	"""Contrato de codificacao usado na leitura e escrita dos arquivos JSON."""
+
+	nome: str
+
+	def codificar(self, payload: Any, indentado: bool = False) -> bytes:
+		"""Retorna o payload em JSON UTF-8."""
+
+	def decodificar(self, conteudo: bytes) -> Any:
+		"""Interpreta JSON UTF-8; conteudo invalido levanta ValueError."""
+
+
+class CodecJsonPadrao:
+	"""[SOLID: OCP] Codec baseado no modulo json da biblioteca padrao."""
+
+	nome = "json"
+
+	def codificar(self, payload: Any, indentado: bool = False) -> bytes:
+		if indentado:
+			conteudo = json.dumps(payload, ensure_ascii=False, indent=2)
+		else:
+			conteudo = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+		return conteudo.encode("utf-8")
+
+	def decodificar(self, conteudo: bytes) -> Any:
+		return json.loads(conteudo)
+
+
+class CodecJsonOrjson:
+	"""[SOLID: OCP] Codec baseado no orjson, que gera bytes diretamente.
+
+	Datas e dataclasses nao sao convertidas automaticamente, como no codec
+	padrao, para que os dois produzam o mesmo arquivo.
+	"""
+
+	nome = "orjson"
+
+	def __init__(self) -> None:
+		if orjson is None:
+			raise RuntimeError("O pacote orjson nao esta instalado.")
+		self._opcoes = (
+			orjson.OPT_NON_STR_KEYS
+			| orjson.OPT_PASSTHROUGH_DATETIME
+			| orjson.OPT_PASSTHROUGH_DATACLASS
+		)
+
+	def codificar(self, payload: Any, indentado: bool = False) -> bytes:
+		opcoes = (self._opcoes | orjson.OPT_INDENT_2) if indentado else self._opcoes
+		return orjson.dumps(payload, option=opcoes)
+
+	def decodificar(self, conteudo: bytes) -> Any:
+		return orjson.loads(conteudo)
+
+
+CODECS_JSON = ("auto", CodecJsonPadrao.nome, CodecJsonOrjson.nome)
+
+
+def obter_codec_json(nome: str | None = None) -> CodecJson:
+	"""Escolhe o codec por nome ou por TEAPOIO_JSON_CODEC.
+
+	`auto` (padrao) usa o orjson quando instalado e a biblioteca padrao caso
+	contrario; pedir `orjson` sem o pacote tambem recai na biblioteca padrao.
+	"""
+	nome_codec = str(nome or os.getenv("TEAPOIO_JSON_CODEC", "") or "auto").strip().lower()
+	if nome_codec not in CODECS_JSON:
+		raise ValueError(f"Codec JSON desconhecido: {nome_codec}.")
+	if nome_codec != CodecJsonPadrao.nome and orjson is not None:
+		return CodecJsonOrjson()
+	return CodecJsonPadrao()
 
 
 class ExportavelJsonMixin:
-	"""Utilitario compartilhado para leitura e escrita de JSON."""
+	"""Utilitario compartilhado para leitura e escrita de JSON.
 
-	@staticmethod
-	def _ler_json_arquivo(caminho_arquivo: Path, fallback: Any) -> Any:
+	Os arquivos sao gravados compactos; `json_indentado` (ou
+	TEAPOIO_JSON_INDENTADO=1) gera a versao legivel. O codec pode ser trocado
+	por instancia em `codec_json`.
+	"""
+
+	codec_json: CodecJson = obter_codec_json()
+	json_indentado: bool = os.getenv("TEAPOIO_JSON_INDENTADO", "").strip().lower() in ("1", "true", "sim")
+
+	def _ler_json_arquivo(self, caminho_arquivo: Path, fallback: Any) -> Any:
 		if not caminho_arquivo.exists():
 			return fallback
 
 		try:
-			with caminho_arquivo.open("r", encoding="utf-8") as arquivo:
-				return json.load(arquivo)
-		except (OSError, json.JSONDecodeError):
+			return self.codec_json.decodificar(caminho_arquivo.read_bytes())
+		except (OSError, ValueError):
 			return fallback
 
-	@staticmethod
-	def _escrever_json_arquivo(caminho_arquivo: Path, payload: Any) -> None:
+	def _escrever_json_arquivo(self, caminho_arquivo: Path, payload: Any) -> None:
 		caminho_arquivo.parent.mkdir(parents=True, exist_ok=True)
-		conteudo = json.dumps(payload, ensure_ascii=False, indent=2)
-		if not conteudo.endswith("\n"):
-			conteudo += "\n"
+		conteudo = self.codec_json.codificar(payload, indentado=self.json_indentado)
 
 		arquivo_temporario = caminho_arquivo.with_suffix(
 			f"{caminho_arquivo.suffix}.tmp"
 		)
 
-		with arquivo_temporario.open("w", encoding="utf-8") as arquivo:
-			arquivo.write(conteudo)
-			arquivo.flush()
-			os.fsync(arquivo.fileno())
+		with arquivo_temporario.open("wb") as arquivo:
+			self._gravar_conteudo(arquivo, conteudo)
 
 		try:
 			arquivo_temporario.replace(caminho_arquivo)
 		except OSError:
 			# Fallback para ambientes onde replace atomico falha (ex.: lock do OneDrive).
-			with caminho_arquivo.open("w", encoding="utf-8") as arquivo_destino:
-				arquivo_destino.write(conteudo)
-				arquivo_destino.flush()
-				os.fsync(arquivo_destino.fileno())
+			with caminho_arquivo.open("wb") as arquivo_destino:
+				self._gravar_conteudo(arquivo_destino, conteudo)
 			try:
 				arquivo_temporario.unlink(missing_ok=True)
 			except OSError:
 				pass
+
+	@staticmethod
+	def _gravar_conteudo(arquivo: Any, conteudo: bytes) -> None:
+		# A quebra de linha final e escrita a parte para nao copiar o conteudo.
+		arquivo.write(conteudo)
+		if not conteudo.endswith(b"\n"):
+			arquivo.write(b"\n")
+		arquivo.flush()
+		os.fsync(arquivo.fileno())
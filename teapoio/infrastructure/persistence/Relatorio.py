@@ -2,19 +2,33 @@ from __future__ import annotations
 
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
+from teapoio.application.services.unidade_trabalho import AlteracoesEstado
 from teapoio.domain.models.Perfil import Perfil
 from teapoio.domain.models.crianca import Crianca
+from teapoio.domain.models.indice_rotinas import IndiceRotinas
 from teapoio.domain.models.item_rotina import ItemRotina
+from teapoio.domain.models.modelo_rotina import ModeloRotina
 from teapoio.domain.models.perfil_sensorial import PerfilSensorial
 from teapoio.domain.models.responsavel import Responsavel
 from teapoio.domain.models.rotina import Rotina
-from teapoio.infrastructure.mixins.exportavel_json import ExportavelJsonMixin
+from teapoio.infrastructure.mixins.exportavel_json import CodecJson, ExportavelJsonMixin
 
 
 class SerializadorEstadoRelatorio:
-    """Converte estado da aplicacao entre objetos de dominio e dicionarios JSON."""
+    """Converte estado da aplicacao entre objetos de dominio e dicionarios JSON.
+
+    O payload gravado leva `versao_esquema`. Payloads com a versao atual foram
+    escritos pela propria aplicacao e sao montados pelos construtores
+    `restaurar`, sem repetir as validacoes de dominio; registros que nao tem a
+    forma esperada, payloads antigos e importacoes passam pela validacao
+    completa (inclusive as rotinas pedidas sob demanda).
+    """
+
+    TIPOS_REGISTRO = ("responsavel", "crianca", "rotina", "meta")
+    VERSAO_ESQUEMA = 1
+    _ERROS_RESTAURACAO = (AttributeError, KeyError, TypeError, ValueError)
 
     @staticmethod
     def estado_vazio() -> dict[str, Any]:
@@ -26,6 +40,19 @@ class SerializadorEstadoRelatorio:
             "data_calendario": date.today(),
         }
 
+    @staticmethod
+    def registros_vazios() -> dict[str, dict[str, Any]]:
+        return {tipo: {} for tipo in SerializadorEstadoRelatorio.TIPOS_REGISTRO}
+
+    @staticmethod
+    def chave_rotina(id_crianca: str, data_referencia: date | str) -> str:
+        data_texto = (
+            data_referencia.isoformat()
+            if isinstance(data_referencia, date)
+            else str(data_referencia).strip()
+        )
+        return f"{str(id_crianca).strip()}|{data_texto}"
+
     def serializar_estado(
         self,
         responsaveis: list[Responsavel],
@@ -34,31 +61,262 @@ class SerializadorEstadoRelatorio:
         perfil: Perfil | None,
         data_calendario: date,
     ) -> dict[str, Any]:
-        criancas_por_responsavel: dict[str, list[Crianca]] = {}
-        for crianca in criancas:
-            criancas_por_responsavel.setdefault(crianca.id_responsavel, []).append(crianca)
+        return self.montar_payload(
+            self.serializar_registros(
+                responsaveis=responsaveis,
+                criancas=criancas,
+                rotinas=rotinas,
+                perfil=perfil,
+                data_calendario=data_calendario,
+            )
+        )
 
+    def serializar_registros(
+        self,
+        responsaveis: list[Responsavel],
+        criancas: list[Crianca],
+        rotinas: list[Rotina],
+        perfil: Perfil | None,
+        data_calendario: date,
+    ) -> dict[str, dict[str, Any]]:
+        """Serializa o estado em registros independentes, indexados por tipo e chave."""
         return {
-            "responsaveis": [
-                self._serializar_responsavel(
-                    item,
-                    criancas_por_responsavel.get(item.id_responsavel, []),
-                )
+            "responsavel": {
+                item.id_responsavel: self._serializar_dados_responsavel(item)
                 for item in responsaveis
-            ],
-            "rotinas": [self._serializar_rotina(item) for item in rotinas],
-            "perfil": self._serializar_perfil(perfil),
-            "data_calendario": data_calendario.isoformat(),
+            },
+            "crianca": {
+                item.id_crianca: self._serializar_crianca(item)
+                for item in criancas
+            },
+            "rotina": self._serializar_registros_rotinas(rotinas),
+            "meta": {
+                "perfil": self._serializar_perfil(perfil),
+                "data_calendario": data_calendario.isoformat(),
+            },
         }
 
-    def desserializar_estado(self, dados: Any) -> dict[str, Any]:
+    def _serializar_registros_rotinas(self, rotinas: list[Rotina] | IndiceRotinas) -> dict[str, Any]:
+        if not isinstance(rotinas, IndiceRotinas):
+            return {
+                self.chave_rotina(item.id_crianca, item.data_referencia): self._serializar_rotina(item)
+                for item in rotinas
+            }
+
+        # Rotinas ainda nao montadas nao mudaram: o registro lido e regravado como esta.
+        registros = {
+            self.chave_rotina(item.id_crianca, item.data_referencia): self._serializar_rotina(item)
+            for item in rotinas.carregadas()
+        }
+        for id_crianca, data_referencia, registro in rotinas.pendentes():
+            registros[self.chave_rotina(id_crianca, data_referencia)] = registro
+        return registros
+
+    def registros_de_payload(self, dados: Any) -> dict[str, dict[str, Any]]:
+        """Converte o payload do arquivo JSON em registros indexados por tipo e chave."""
+        registros = self.registros_vazios()
         if not isinstance(dados, dict):
-            return self.estado_vazio()
+            return registros
+
+        responsaveis_brutos = dados.get("responsaveis", [])
+        if isinstance(responsaveis_brutos, list):
+            for bruto in responsaveis_brutos:
+                if not isinstance(bruto, dict):
+                    continue
+                id_responsavel = str(bruto.get("id_responsavel", "")).strip()
+                if not id_responsavel:
+                    continue
+                registros["responsavel"][id_responsavel] = {
+                    campo: valor
+                    for campo, valor in bruto.items()
+                    if campo not in ("criancas", "aviso_crianca")
+                }
+
+        for bruto in self._coletar_criancas_brutas(dados):
+            registros["crianca"][str(bruto.get("id_crianca")).strip()] = bruto
+
+        rotinas_brutas = dados.get("rotinas", [])
+        if isinstance(rotinas_brutas, list):
+            for bruto in rotinas_brutas:
+                if not isinstance(bruto, dict):
+                    continue
+                chave = self.chave_rotina(
+                    bruto.get("id_crianca", ""),
+                    bruto.get("data_referencia", ""),
+                )
+                registros["rotina"][chave] = bruto
+
+        registros["meta"]["perfil"] = dados.get("perfil")
+        if "data_calendario" in dados:
+            registros["meta"]["data_calendario"] = dados.get("data_calendario")
+        return registros
+
+    @staticmethod
+    def calcular_alteracoes(
+        registros_anteriores: dict[str, dict[str, Any]],
+        registros_atuais: dict[str, dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """Compara dois conjuntos de registros e retorna as operacoes de upsert/remocao."""
+        alteracoes: list[dict[str, Any]] = []
+        for tipo in SerializadorEstadoRelatorio.TIPOS_REGISTRO:
+            anteriores = registros_anteriores.get(tipo, {})
+            atuais = registros_atuais.get(tipo, {})
+            for chave, dados in atuais.items():
+                if chave not in anteriores or anteriores[chave] != dados:
+                    alteracoes.append({"op": "upsert", "tipo": tipo, "chave": chave, "dados": dados})
+            if tipo == "meta":
+                continue
+            for chave in anteriores:
+                if chave not in atuais:
+                    alteracoes.append({"op": "remover", "tipo": tipo, "chave": chave})
+        return alteracoes
+
+    def alteracoes_de_entidades(
+        self,
+        registros_anteriores: dict[str, dict[str, Any]],
+        alteracoes: AlteracoesEstado,
+    ) -> list[dict[str, Any]]:
+        """Serializa apenas as entidades sujas e descarta as que nao mudaram de fato."""
+        registros_sujos: dict[str, dict[str, Any]] = {
+            "responsavel": {
+                item.id_responsavel: self._serializar_dados_responsavel(item)
+                for item in alteracoes.responsaveis
+            },
+            "crianca": {
+                item.id_crianca: self._serializar_crianca(item)
+                for item in alteracoes.criancas
+            },
+            "rotina": {
+                self.chave_rotina(item.id_crianca, item.data_referencia): self._serializar_rotina(item)
+                for item in alteracoes.rotinas
+            },
+            "meta": {},
+        }
+        if alteracoes.perfil_alterado:
+            registros_sujos["meta"]["perfil"] = self._serializar_perfil(alteracoes.perfil)
+        if alteracoes.data_calendario is not None:
+            registros_sujos["meta"]["data_calendario"] = alteracoes.data_calendario.isoformat()
+
+        resultado: list[dict[str, Any]] = []
+        for tipo, registros_tipo in registros_sujos.items():
+            anteriores = registros_anteriores.get(tipo, {})
+            for chave, dados in registros_tipo.items():
+                if chave not in anteriores or anteriores[chave] != dados:
+                    resultado.append({"op": "upsert", "tipo": tipo, "chave": chave, "dados": dados})
+
+        remocoes = (
+            ("responsavel", alteracoes.ids_responsaveis_removidos),
+            ("crianca", alteracoes.ids_criancas_removidas),
+            (
+                "rotina",
+                [self.chave_rotina(*chave) for chave in alteracoes.chaves_rotinas_removidas],
+            ),
+        )
+        for tipo, chaves in remocoes:
+            anteriores = registros_anteriores.get(tipo, {})
+            for chave in chaves:
+                if chave in anteriores:
+                    resultado.append({"op": "remover", "tipo": tipo, "chave": chave})
+        return resultado
+
+    @staticmethod
+    def aplicar_alteracao(registros: dict[str, dict[str, Any]], alteracao: Any) -> bool:
+        """Aplica uma operacao de upsert/remocao nos registros; retorna False se for invalida."""
+        if not isinstance(alteracao, dict):
+            return False
+
+        tipo = alteracao.get("tipo")
+        chave = alteracao.get("chave")
+        if tipo not in SerializadorEstadoRelatorio.TIPOS_REGISTRO or not isinstance(chave, str):
+            return False
+
+        registros_tipo = registros.setdefault(tipo, {})
+        operacao = alteracao.get("op")
+        if operacao == "upsert":
+            registros_tipo[chave] = alteracao.get("dados")
+            return True
+        if operacao == "remover":
+            registros_tipo.pop(chave, None)
+            return True
+        return False
+
+    def montar_payload(self, registros: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        """Monta o payload do arquivo JSON (criancas aninhadas no responsavel) a partir dos registros."""
+        criancas_por_responsavel: dict[str, list[dict[str, Any]]] = {}
+        for bruto in registros.get("crianca", {}).values():
+            id_responsavel = str(bruto.get("id_responsavel", "")).strip()
+            criancas_por_responsavel.setdefault(id_responsavel, []).append(bruto)
+
+        responsaveis: list[dict[str, Any]] = []
+        for id_responsavel, bruto in registros.get("responsavel", {}).items():
+            criancas_responsavel = criancas_por_responsavel.get(id_responsavel, [])
+            payload = {**bruto, "criancas": criancas_responsavel}
+            if not criancas_responsavel:
+                payload["aviso_crianca"] = "crianca nao cadastrada"
+            responsaveis.append(payload)
+
+        meta = registros.get("meta", {})
+        return {
+            "versao_esquema": self.VERSAO_ESQUEMA,
+            "responsaveis": responsaveis,
+            "rotinas": list(registros.get("rotina", {}).values()),
+            "perfil": meta.get("perfil"),
+            "data_calendario": meta.get("data_calendario") or date.today().isoformat(),
+        }
+
+    def registros_validados(self, estado: dict[str, Any]) -> dict[str, dict[str, Any]]:
+        """Refaz os registros a partir das entidades de uma carga validada.
+
+        Usado depois de carregar um payload nao confiavel: registros recusados
+        pela validacao nao podem ser regravados com `versao_esquema`, senao
+        voltariam ao estado pela restauracao sem validacao.
+        """
+        return self.serializar_registros(
+            responsaveis=estado["responsaveis"],
+            criancas=estado["criancas"],
+            rotinas=estado["rotinas"],
+            perfil=estado["perfil"],
+            data_calendario=estado["data_calendario"],
+        )
+
+    def payload_confiavel(self, dados: Any) -> bool:
+        """Indica se o payload foi gravado pela aplicacao no esquema atual."""
+        return isinstance(dados, dict) and dados.get("versao_esquema") == self.VERSAO_ESQUEMA
+
+    def desserializar_estado(
+        self,
+        dados: Any,
+        rotinas_sob_demanda: bool = False,
+        confiavel: bool | None = None,
+    ) -> dict[str, Any]:
+        """Monta as entidades do payload.
+
+        Com `rotinas_sob_demanda`, as rotinas sao devolvidas em um IndiceRotinas
+        com os registros pendentes, montados apenas quando acessados.
+        `confiavel` padrao e decidido por `payload_confiavel`; use False para
+        validar dados importados.
+        """
+        if not isinstance(dados, dict):
+            estado = self.estado_vazio()
+            if rotinas_sob_demanda:
+                estado["rotinas"] = IndiceRotinas()
+            return estado
+
+        if confiavel is None:
+            confiavel = self.payload_confiavel(dados)
+        if confiavel:
+            desserializar_responsavel = self._restaurar_responsavel
+            desserializar_crianca = self._restaurar_crianca
+            desserializar_rotina = self._restaurar_rotina
+        else:
+            desserializar_responsavel = self._desserializar_responsavel
+            desserializar_crianca = self._desserializar_crianca
+            desserializar_rotina = self._desserializar_rotina
 
         responsaveis: list[Responsavel] = []
         responsaveis_por_id: dict[str, Responsavel] = {}
         for bruto in dados.get("responsaveis", []):
-            responsavel = self._desserializar_responsavel(bruto)
+            responsavel = desserializar_responsavel(bruto)
             if responsavel is None:
                 continue
             responsaveis.append(responsavel)
@@ -66,7 +324,7 @@ class SerializadorEstadoRelatorio:
 
         criancas: list[Crianca] = []
         for bruto in self._coletar_criancas_brutas(dados):
-            crianca = self._desserializar_crianca(bruto, responsaveis_por_id)
+            crianca = desserializar_crianca(bruto, responsaveis_por_id)
             if crianca is None:
                 continue
             criancas.append(crianca)
@@ -78,12 +336,19 @@ class SerializadorEstadoRelatorio:
             responsaveis_por_id=responsaveis_por_id,
         )
 
-        rotinas: list[Rotina] = []
-        for bruto in dados.get("rotinas", []):
-            rotina = self._desserializar_rotina(bruto)
-            if rotina is None:
-                continue
-            rotinas.append(rotina)
+        rotinas: list[Rotina] | IndiceRotinas
+        if rotinas_sob_demanda and confiavel:
+            rotinas = self._indexar_rotinas_pendentes(dados.get("rotinas", []), desserializar_rotina)
+        else:
+            # Payloads nao confiaveis sao validados por inteiro, mesmo sob demanda.
+            rotinas = []
+            for bruto in dados.get("rotinas", []):
+                rotina = desserializar_rotina(bruto)
+                if rotina is None:
+                    continue
+                rotinas.append(rotina)
+            if rotinas_sob_demanda:
+                rotinas = IndiceRotinas(rotinas)
 
         return {
             "responsaveis": responsaveis,
@@ -113,25 +378,15 @@ class SerializadorEstadoRelatorio:
 
         raise ValueError("Data de nascimento fora de formato esperado.")
 
-    def _serializar_responsavel(
-        self,
-        responsavel: Responsavel,
-        criancas_responsavel: list[Crianca],
-    ) -> dict[str, Any]:
-        payload = {
+    @staticmethod
+    def _serializar_dados_responsavel(responsavel: Responsavel) -> dict[str, Any]:
+        return {
             "id_responsavel": responsavel.id_responsavel,
             "nome": responsavel.nome,
             "data_nascimento": responsavel.data_nascimento.strftime("%d/%m/%Y"),
             "email": responsavel.email,
             "senha": responsavel.senha,
-            "criancas": [
-                self._serializar_crianca(item)
-                for item in criancas_responsavel
-            ],
         }
-        if not criancas_responsavel:
-            payload["aviso_crianca"] = "crianca nao cadastrada"
-        return payload
 
     @staticmethod
     def _coletar_criancas_brutas(dados: dict[str, Any]) -> list[dict[str, Any]]:
@@ -180,6 +435,80 @@ class SerializadorEstadoRelatorio:
 
         return criancas_unicas
 
+    @staticmethod
+    def _texto_confiavel(bruto: dict[str, Any], campo: str) -> str:
+        valor = bruto[campo]
+        if not isinstance(valor, str):
+            raise TypeError(f"Campo {campo} deveria ser texto.")
+        return valor
+
+    @staticmethod
+    def _data_nascimento_confiavel(valor: str) -> datetime:
+        dia, mes, ano = valor.split("/")
+        return datetime(int(ano), int(mes), int(dia))
+
+    def _restaurar_responsavel(self, bruto: Any) -> Responsavel | None:
+        try:
+            return Responsavel.restaurar(
+                id_responsavel=self._texto_confiavel(bruto, "id_responsavel"),
+                nome=self._texto_confiavel(bruto, "nome"),
+                data_nascimento=self._data_nascimento_confiavel(
+                    self._texto_confiavel(bruto, "data_nascimento")
+                ),
+                email=self._texto_confiavel(bruto, "email"),
+                senha=self._texto_confiavel(bruto, "senha"),
+            )
+        except self._ERROS_RESTAURACAO:
+            return self._desserializar_responsavel(bruto)
+
+    def _restaurar_crianca(
+        self,
+        bruto: Any,
+        responsaveis_por_id: dict[str, Responsavel],
+    ) -> Crianca | None:
+        try:
+            crianca = Crianca.restaurar(
+                id_crianca=self._texto_confiavel(bruto, "id_crianca"),
+                id_responsavel=self._texto_confiavel(bruto, "id_responsavel"),
+                nome=self._texto_confiavel(bruto, "nome"),
+                data_nascimento=self._data_nascimento_confiavel(
+                    self._texto_confiavel(bruto, "data_nascimento")
+                ),
+                nivel_suporte=bruto["nivel_suporte"],
+            )
+        except self._ERROS_RESTAURACAO:
+            return self._desserializar_crianca(bruto, responsaveis_por_id)
+
+        self._carregar_modelos_rotina(crianca, bruto.get("modelos_rotina", []))
+        return crianca
+
+    def _restaurar_rotina(self, bruto: Any) -> Rotina | None:
+        try:
+            itens = [
+                ItemRotina.restaurar(
+                    id_item=self._texto_confiavel(bruto_item, "id_item"),
+                    nome=self._texto_confiavel(bruto_item, "nome"),
+                    horario=self._texto_confiavel(bruto_item, "horario"),
+                    status=self._texto_confiavel(bruto_item, "status"),
+                    observacao=self._texto_confiavel(bruto_item, "observacao"),
+                    tags=bruto_item["tags"],
+                )
+                for bruto_item in bruto["itens"]
+            ]
+            emocoes = bruto.get("emocoes") or {}
+            if not isinstance(emocoes, dict):
+                raise TypeError("Emocoes deveriam ser um objeto.")
+            return Rotina.restaurar(
+                id_crianca=self._texto_confiavel(bruto, "id_crianca"),
+                data_referencia=date.fromisoformat(self._texto_confiavel(bruto, "data_referencia")),
+                itens=itens,
+                sentimento_dia=bruto.get("sentimento_dia"),
+                emocoes=emocoes,
+                versao=bruto.get("versao", 0),
+            )
+        except self._ERROS_RESTAURACAO:
+            return self._desserializar_rotina(bruto)
+
     def _desserializar_responsavel(self, bruto: Any) -> Responsavel | None:
         if not isinstance(bruto, dict):
             return None
@@ -203,13 +532,19 @@ class SerializadorEstadoRelatorio:
             return None
 
     def _serializar_crianca(self, crianca: Crianca) -> dict[str, Any]:
-        return {
+        payload: dict[str, Any] = {
             "id_crianca": crianca.id_crianca,
             "id_responsavel": crianca.id_responsavel,
             "nome": crianca.nome,
             "data_nascimento": crianca.data_nascimento.strftime("%d/%m/%Y"),
             "nivel_suporte": crianca.nivel_suporte,
         }
+        modelos = crianca.listar_modelos_rotina()
+        if modelos:
+            payload["modelos_rotina"] = [
+                {"nome": modelo.nome, "itens": modelo.itens} for modelo in modelos
+            ]
+        return payload
 
     def _desserializar_crianca(
         self,
@@ -226,7 +561,7 @@ class SerializadorEstadoRelatorio:
         responsavel = responsaveis_por_id.get(id_responsavel) or id_responsavel
 
         try:
-            return Crianca(
+            crianca = Crianca(
                 nome=bruto.get("nome"),
                 data_nascimento=self._normalizar_data_nascimento(
                     bruto.get("data_nascimento")
@@ -238,6 +573,30 @@ class SerializadorEstadoRelatorio:
         except (TypeError, ValueError):
             return None
 
+        self._carregar_modelos_rotina(crianca, bruto.get("modelos_rotina", []))
+        return crianca
+
+    def _carregar_modelos_rotina(self, crianca: Crianca, modelos_brutos: Any) -> None:
+        if isinstance(modelos_brutos, list):
+            for bruto_modelo in modelos_brutos:
+                modelo = self._desserializar_modelo_rotina(bruto_modelo)
+                if modelo is not None:
+                    crianca.salvar_modelo_rotina(modelo)
+
+    def _desserializar_modelo_rotina(self, bruto: Any) -> ModeloRotina | None:
+        if not isinstance(bruto, dict) or not isinstance(bruto.get("itens"), list):
+            return None
+
+        itens = [
+            item
+            for item in map(self._desserializar_item_rotina, bruto["itens"])
+            if item is not None
+        ]
+        try:
+            return ModeloRotina(nome=bruto.get("nome"), itens=itens)
+        except (TypeError, ValueError):
+            return None
+
     def _serializar_perfil(self, perfil: Perfil | None) -> dict[str, Any] | None:
         if perfil is None:
             return None
@@ -321,6 +680,7 @@ class SerializadorEstadoRelatorio:
             "id_crianca": rotina.id_crianca,
             "data_referencia": rotina.data_referencia.isoformat(),
             "sentimento_dia": rotina.sentimento_dia,
+            "versao": rotina.versao,
             "itens": [self._serializar_item_rotina(item) for item in rotina.itens],
         }
         emocoes = rotina.obter_emocoes()
@@ -331,6 +691,7 @@ class SerializadorEstadoRelatorio:
     @staticmethod
     def _serializar_item_rotina(item: ItemRotina) -> dict[str, Any]:
         return {
+            "id_item": item.id_item,
             "nome": item.nome,
             "horario": item.horario,
             "status": item.status,
@@ -338,6 +699,28 @@ class SerializadorEstadoRelatorio:
             "tags": item.tags,
         }
 
+    def _indexar_rotinas_pendentes(
+        self,
+        rotinas_brutas: Any,
+        desserializar_rotina: Callable[[Any], Rotina | None],
+    ) -> IndiceRotinas:
+        indice = IndiceRotinas()
+        if not isinstance(rotinas_brutas, list):
+            return indice
+
+        for bruto in rotinas_brutas:
+            if not isinstance(bruto, dict):
+                continue
+            id_crianca = str(bruto.get("id_crianca") or "").strip()
+            if not id_crianca:
+                continue
+            try:
+                data_referencia = self._desserializar_data_referencia(bruto.get("data_referencia"))
+            except ValueError:
+                continue
+            indice.adicionar_pendente(id_crianca, data_referencia, bruto, desserializar_rotina)
+        return indice
+
     def _desserializar_rotina(self, bruto: Any) -> Rotina | None:
         if not isinstance(bruto, dict):
             return None
@@ -364,7 +747,7 @@ class SerializadorEstadoRelatorio:
 
         itens_brutos = bruto.get("itens", [])
         if not isinstance(itens_brutos, list):
-            return rotina
+            itens_brutos = []
 
         for bruto_item in itens_brutos:
             item = self._desserializar_item_rotina(bruto_item)
@@ -375,6 +758,9 @@ class SerializadorEstadoRelatorio:
             except ValueError:
                 continue
 
+        versao = bruto.get("versao")
+        if isinstance(versao, int) and not isinstance(versao, bool) and versao >= 0:
+            rotina.definir_versao(versao)
         return rotina
 
     @staticmethod
@@ -393,11 +779,13 @@ class SerializadorEstadoRelatorio:
             else:
                 tags = []
 
+            id_item = bruto.get("id_item")
             item = ItemRotina(
                 nome=bruto.get("nome"),
                 horario=bruto.get("horario"),
                 observacao=observacao if isinstance(observacao, str) else "",
                 tags=tags,
+                id_item=id_item if isinstance(id_item, str) else None,
             )
             status = bruto.get("status")
             if isinstance(status, str):
@@ -445,6 +833,9 @@ class RepositorioRelatorio(ExportavelJsonMixin):
         self,
         caminho_arquivo: str | Path | None = None,
         serializador: SerializadorEstadoRelatorio | None = None,
+        codec_json: CodecJson | None = None,
+        json_indentado: bool | None = None,
+        rotinas_sob_demanda: bool = False,
     ) -> None:
         self._caminho_arquivo = (
             self._caminho_arquivo_padrao()
@@ -452,10 +843,18 @@ class RepositorioRelatorio(ExportavelJsonMixin):
             else Path(caminho_arquivo)
         )
         self._serializador = serializador or SerializadorEstadoRelatorio()
+        self._rotinas_sob_demanda = rotinas_sob_demanda
+        if codec_json is not None:
+            self.codec_json = codec_json
+        if json_indentado is not None:
+            self.json_indentado = json_indentado
 
     def carregar_estado(self) -> dict[str, Any]:
         dados = self._ler_json_arquivo(caminho_arquivo=self._caminho_arquivo, fallback=None)
-        estado = self._serializador.desserializar_estado(dados)
+        estado = self._serializador.desserializar_estado(
+            dados,
+            rotinas_sob_demanda=self._rotinas_sob_demanda,
+        )
 
         # Se arquivo estiver ausente, vazio ou invalido, recria com estrutura valida.
         if not isinstance(dados, dict) or not dados:
@@ -0,0 +1,518 @@
+from __future__ import annotations
+
+from datetime import date
+import hashlib
+from pathlib import Path
+import re
+from typing import Any
+
+from teapoio.application.services.unidade_trabalho import AlteracoesEstado
+from teapoio.domain.models.Perfil import Perfil
+from teapoio.domain.models.crianca import Crianca
+from teapoio.domain.models.responsavel import Responsavel
+from teapoio.domain.models.rotina import Rotina
+from teapoio.infrastructure.mixins.exportavel_json import CodecJson
+from teapoio.infrastructure.persistence.Relatorio import (
+    RepositorioRelatorio,
+    SerializadorEstadoRelatorio,
+)
+
+
+class RepositorioRelatorioFamilias(RepositorioRelatorio):
+    """Persistencia do estado em um arquivo JSON por familia (id_responsavel).
+
+    Cada arquivo da familia tem o mesmo formato do RepositorioRelatorio,
+    restrito ao responsavel, suas criancas e as rotinas delas; o perfil ativo
+    fica no arquivo da familia do seu responsavel. O `indice.json` guarda a
+    data do calendario, a ordem dos responsaveis e, para consulta sem abrir as
+    familias, o email e o arquivo de cada responsavel e a familia de cada
+    crianca. Cada salvamento reescreve apenas os arquivos das familias
+    alteradas e atualiza so as entradas do indice dessas chaves; o indice so e
+    reescrito quando alguma delas muda. Registros sem responsavel conhecido
+    ficam em `sem_familia.json`.
+
+    `carregar_estado` ainda le todas as familias, pois a aplicacao mantem o
+    estado completo em memoria; `carregar_familia` le uma unica familia, para
+    arquivamento ou inspecao fora da aplicacao.
+    """
+
+    NOME_INDICE = "indice.json"
+    NOME_SEM_FAMILIA = "sem_familia.json"
+    FAMILIA_AUSENTE = ""
+    _PADRAO_ID_ARQUIVO = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+    def __init__(
+        self,
+        caminho_arquivo: str | Path | None = None,
+        serializador: SerializadorEstadoRelatorio | None = None,
+        diretorio_familias: str | Path | None = None,
+        codec_json: CodecJson | None = None,
+        json_indentado: bool | None = None,
+        rotinas_sob_demanda: bool = False,
+    ) -> None:
+        super().__init__(
+            caminho_arquivo=caminho_arquivo,
+            serializador=serializador,
+            codec_json=codec_json,
+            json_indentado=json_indentado,
+            rotinas_sob_demanda=rotinas_sob_demanda,
+        )
+        # O arquivo unico (caminho_arquivo) so e lido para a migracao inicial.
+        self._diretorio = (
+            self._caminho_arquivo.with_suffix(".familias")
+            if diretorio_familias is None
+            else Path(diretorio_familias)
+        )
+        self._registros: dict[str, dict[str, Any]] | None = None
+        # Registros de cada arquivo de familia, pelo nome do arquivo.
+        self._familias: dict[str, dict[str, dict[str, Any]]] = {}
+        # (tipo, chave) -> nome do arquivo em que o registro esta gravado.
+        self._locais: dict[tuple[str, str], str] = {}
+        # Indice em memoria: entradas das familias por id_responsavel (na ordem
+        # do arquivo), familia de cada crianca e data do calendario.
+        self._indice: dict[str, Any] | None = None
+        self._ids_por_email: dict[str, str] = {}
+        # Arquivo da familia que guarda o perfil ativo.
+        self._arquivo_perfil: str | None = None
+
+    @property
+    def diretorio_familias(self) -> Path:
+        return self._diretorio
+
+    def caminho_familia(self, id_responsavel: str) -> Path:
+        """Retorna o arquivo em que a familia do responsavel e gravada."""
+        return self._diretorio / self._nome_arquivo_familia(str(id_responsavel))
+
+    def id_responsavel_por_email(self, email: str) -> str | None:
+        """Consulta o indice global; nao abre nenhum arquivo de familia."""
+        self._obter_indice()
+        return self._ids_por_email.get(self._normalizar_email(email))
+
+    def id_responsavel_da_crianca(self, id_crianca: str) -> str | None:
+        return self._obter_indice()["criancas"].get(str(id_crianca))
+
+    def carregar_familia(self, id_responsavel: str) -> dict[str, Any]:
+        """Carrega apenas a familia informada, com a data do indice.
+
+        O perfil so vem junto quando o perfil ativo e o desta familia.
+        """
+        dados = self._ler_json_arquivo(self.caminho_familia(id_responsavel), fallback=None)
+        registros = self._serializador.registros_de_payload(dados)
+        registros["meta"]["data_calendario"] = self._obter_indice()["data_calendario"]
+        return self._serializador.desserializar_estado(
+            self._serializador.montar_payload(registros),
+            rotinas_sob_demanda=self._rotinas_sob_demanda,
+            confiavel=self._serializador.payload_confiavel(dados),
+        )
+
+    def carregar_estado(self) -> dict[str, Any]:
+        if not self._possui_arquivos_familia():
+            self._migrar_arquivo_unico()
+
+        indice = self._ler_json_arquivo(self._caminho_indice, fallback=None)
+        registros = self._serializador.registros_vazios()
+        confiavel = True
+        self._familias = {}
+        self._locais = {}
+        for caminho in self._arquivos_familia_em_ordem(indice):
+            dados = self._ler_json_arquivo(caminho, fallback=None)
+            confiavel = confiavel and self._serializador.payload_confiavel(dados)
+            registros_familia = self._serializador.registros_de_payload(dados)
+            self._familias[caminho.name] = registros_familia
+            for tipo in ("responsavel", "crianca", "rotina"):
+                for chave, bruto in registros_familia[tipo].items():
+                    registros[tipo][chave] = bruto
+                    self._locais[(tipo, chave)] = caminho.name
+
+        registros["meta"]["perfil"] = self._localizar_perfil()
+        migrar_perfil = (
+            registros["meta"]["perfil"] is None
+            and isinstance(indice, dict)
+            and indice.get("perfil") is not None
+        )
+        if migrar_perfil:
+            # Indices antigos guardavam o perfil; ele passa para o arquivo da familia.
+            registros["meta"]["perfil"] = indice["perfil"]
+        if isinstance(indice, dict) and "data_calendario" in indice:
+            registros["meta"]["data_calendario"] = indice["data_calendario"]
+
+        estado = self._serializador.desserializar_estado(
+            self._serializador.montar_payload(registros),
+            rotinas_sob_demanda=self._rotinas_sob_demanda,
+            confiavel=confiavel,
+        )
+        if not confiavel:
+            # As familias sao regravadas como confiaveis: so os registros validados ficam.
+            registros = self._substituir_por_validados(
+                self._serializador.registros_validados(estado)
+            )
+        self._registros = registros
+        if migrar_perfil:
+            for nome_arquivo in self._mover_perfil(registros, registros["meta"]["perfil"]):
+                self._gravar_familia(nome_arquivo)
+
+        # O indice e derivado dos arquivos das familias; refeito se estiver defasado.
+        self._definir_indice(self._montar_indice(registros))
+        if indice != self._payload_indice():
+            self._escrever_json_arquivo(self._caminho_indice, self._payload_indice())
+
+        return estado
+
+    def salvar_estado(
+        self,
+        responsaveis: list[Responsavel],
+        criancas: list[Crianca],
+        rotinas: list[Rotina],
+        perfil: Perfil | None,
+        data_calendario: date,
+    ) -> None:
+        registros_atuais = self._serializador.serializar_registros(
+            responsaveis=responsaveis,
+            criancas=criancas,
+            rotinas=rotinas,
+            perfil=perfil,
+            data_calendario=data_calendario,
+        )
+        alteracoes = self._serializador.calcular_alteracoes(
+            self._obter_registros(),
+            registros_atuais,
+        )
+        self._registrar_alteracoes(alteracoes)
+
+    def salvar_alteracoes(self, alteracoes: AlteracoesEstado) -> None:
+        """Reescreve somente os arquivos das familias com entidades sujas."""
+        self._registrar_alteracoes(
+            self._serializador.alteracoes_de_entidades(self._obter_registros(), alteracoes)
+        )
+
+    @property
+    def _caminho_indice(self) -> Path:
+        return self._diretorio / self.NOME_INDICE
+
+    def _possui_arquivos_familia(self) -> bool:
+        return self._diretorio.is_dir() and any(self._diretorio.glob("*.json"))
+
+    def _arquivos_familia_em_ordem(self, indice: Any) -> list[Path]:
+        """Arquivos das familias na ordem dos responsaveis do indice.
+
+        Arquivos fora do indice (gravados antes de uma falha na escrita do
+        indice, ou `sem_familia.json`) vem depois, em ordem de nome.
+        """
+        nomes: list[str] = []
+        if isinstance(indice, dict) and isinstance(indice.get("familias"), list):
+            for entrada in indice["familias"]:
+                if isinstance(entrada, dict) and isinstance(entrada.get("arquivo"), str):
+                    nomes.append(entrada["arquivo"])
+
+        existentes = {
+            caminho.name: caminho
+            for caminho in self._diretorio.glob("*.json")
+            if caminho.name != self.NOME_INDICE
+        }
+        ordenados = [existentes.pop(nome) for nome in dict.fromkeys(nomes) if nome in existentes]
+        return ordenados + [existentes[nome] for nome in sorted(existentes)]
+
+    def _migrar_arquivo_unico(self) -> None:
+        """Divide o arquivo unico do modo json (se existir) nos arquivos das familias.
+
+        O arquivo antigo e validado como no modo json e todas as rotinas sao
+        montadas, para que nenhum registro entre nas familias sem validacao.
+        """
+        dados = self._ler_json_arquivo(caminho_arquivo=self._caminho_arquivo, fallback=None)
+        estado = self._serializador.desserializar_estado(dados)
+        self._registros = self._serializador.registros_vazios()
+        self._familias = {}
+        self._locais = {}
+        self._indice = None
+        self._ids_por_email = {}
+        self._arquivo_perfil = None
+        self.salvar_estado(
+            responsaveis=estado["responsaveis"],
+            criancas=estado["criancas"],
+            rotinas=estado["rotinas"],
+            perfil=estado["perfil"],
+            data_calendario=estado["data_calendario"],
+        )
+
+    def _substituir_por_validados(
+        self,
+        validados: dict[str, dict[str, Any]],
+    ) -> dict[str, dict[str, Any]]:
+        for (tipo, chave), nome_arquivo in list(self._locais.items()):
+            registros_familia = self._familias[nome_arquivo][tipo]
+            if chave in validados[tipo]:
+                registros_familia[chave] = validados[tipo][chave]
+            else:
+                del registros_familia[chave]
+                del self._locais[(tipo, chave)]
+        if self._arquivo_perfil is not None:
+            self._familias[self._arquivo_perfil]["meta"]["perfil"] = validados["meta"]["perfil"]
+        return validados
+
+    def _localizar_perfil(self) -> Any:
+        """Retorna o perfil gravado nas familias e guarda qual arquivo o contem."""
+        self._arquivo_perfil = None
+        perfil = None
+        for nome_arquivo, registros_familia in self._familias.items():
+            if registros_familia["meta"].get("perfil") is None:
+                continue
+            if self._arquivo_perfil is None:
+                perfil = registros_familia["meta"]["perfil"]
+                self._arquivo_perfil = nome_arquivo
+            else:
+                # Copia deixada por uma gravacao interrompida; vale a da primeira familia.
+                registros_familia["meta"]["perfil"] = None
+        return perfil
+
+    def _obter_registros(self) -> dict[str, dict[str, Any]]:
+        if self._registros is None:
+            self.carregar_estado()
+        return self._registros
+
+    def _obter_indice(self) -> dict[str, Any]:
+        if self._indice is None:
+            indice = self._ler_json_arquivo(self._caminho_indice, fallback=None)
+            if self._serializador.payload_confiavel(indice) and isinstance(indice.get("familias"), list):
+                self._definir_indice(indice)
+            else:
+                self._definir_indice(self._montar_indice(self._obter_registros()))
+        return self._indice
+
+    def _definir_indice(self, indice: dict[str, Any]) -> None:
+        familias: dict[str, dict[str, Any]] = {}
+        for entrada in indice.get("familias", []):
+            if isinstance(entrada, dict) and isinstance(entrada.get("id_responsavel"), str):
+                familias[entrada["id_responsavel"]] = entrada
+        criancas = indice.get("criancas")
+        self._indice = {
+            "familias": familias,
+            "criancas": dict(criancas) if isinstance(criancas, dict) else {},
+            "data_calendario": indice.get("data_calendario"),
+        }
+        self._ids_por_email = {}
+        for id_responsavel, entrada in familias.items():
+            if entrada.get("email"):
+                self._ids_por_email.setdefault(self._normalizar_email(entrada["email"]), id_responsavel)
+
+    def _payload_indice(self) -> dict[str, Any]:
+        return {
+            "versao_esquema": self._serializador.VERSAO_ESQUEMA,
+            "familias": list(self._indice["familias"].values()),
+            "criancas": self._indice["criancas"],
+            "data_calendario": self._indice["data_calendario"],
+        }
+
+    def _registrar_alteracoes(self, alteracoes: list[dict[str, Any]]) -> None:
+        if not alteracoes:
+            return
+
+        registros = self._obter_registros()
+        indice = self._obter_indice()
+        arquivos_alterados: set[str] = set()
+        criancas_afetadas: set[str] = set()
+        indice_alterado = False
+        for alteracao in alteracoes:
+            if not self._serializador.aplicar_alteracao(registros, alteracao):
+                continue
+            tipo = alteracao["tipo"]
+            chave = alteracao["chave"]
+            if tipo == "meta":
+                if chave == "perfil":
+                    arquivos_alterados.update(self._mover_perfil(registros, alteracao.get("dados")))
+                elif chave == "data_calendario" and indice["data_calendario"] != alteracao.get("dados"):
+                    indice["data_calendario"] = alteracao.get("dados")
+                    indice_alterado = True
+                continue
+
+            arquivos_alterados.update(self._aplicar_na_familia(registros, alteracao))
+            if tipo == "responsavel":
+                if self._atualizar_familia_no_indice(registros, chave, criancas_afetadas):
+                    indice_alterado = True
+            elif tipo == "crianca":
+                criancas_afetadas.add(chave)
+
+        for id_crianca in criancas_afetadas:
+            if self._atualizar_crianca_no_indice(registros, id_crianca):
+                indice_alterado = True
+
+        for nome_arquivo in arquivos_alterados:
+            self._gravar_familia(nome_arquivo)
+        if indice_alterado:
+            self._escrever_json_arquivo(self._caminho_indice, self._payload_indice())
+
+    def _atualizar_familia_no_indice(
+        self,
+        registros: dict[str, dict[str, Any]],
+        id_responsavel: str,
+        criancas_afetadas: set[str],
+    ) -> bool:
+        """Atualiza a entrada do responsavel no indice; retorna True se ela mudou."""
+        familias = self._indice["familias"]
+        anterior = familias.get(id_responsavel)
+        bruto = registros["responsavel"].get(id_responsavel)
+        entrada = None if bruto is None else self._entrada_familia(id_responsavel, bruto)
+        if entrada == anterior:
+            return False
+
+        if anterior is not None and anterior.get("email"):
+            email = self._normalizar_email(anterior["email"])
+            if self._ids_por_email.get(email) == id_responsavel:
+                del self._ids_por_email[email]
+        if entrada is None:
+            del familias[id_responsavel]
+        else:
+            familias[id_responsavel] = entrada
+            if entrada["email"]:
+                self._ids_por_email.setdefault(self._normalizar_email(entrada["email"]), id_responsavel)
+
+        if (anterior is None) != (entrada is None):
+            # Criancas ja gravadas com este responsavel entram ou saem da familia dele.
+            for nome_arquivo in (self._nome_arquivo_familia(id_responsavel), self.NOME_SEM_FAMILIA):
+                criancas_afetadas.update(self._familias.get(nome_arquivo, {}).get("crianca", {}))
+        return True
+
+    def _atualizar_crianca_no_indice(
+        self,
+        registros: dict[str, dict[str, Any]],
+        id_crianca: str,
+    ) -> bool:
+        """Atualiza a familia da crianca no indice; retorna True se ela mudou."""
+        criancas = self._indice["criancas"]
+        familia = self._familia_do_registro(registros, "crianca", registros["crianca"].get(id_crianca))
+        if familia == self.FAMILIA_AUSENTE:
+            return criancas.pop(id_crianca, None) is not None
+        if criancas.get(id_crianca) == familia:
+            return False
+        criancas[id_crianca] = familia
+        return True
+
+    def _mover_perfil(self, registros: dict[str, dict[str, Any]], perfil: Any) -> set[str]:
+        """Guarda o perfil no arquivo da familia do responsavel dele; retorna os arquivos a regravar."""
+        alteradas: set[str] = set()
+        if self._arquivo_perfil is not None:
+            if self._arquivo_perfil in self._familias:
+                self._familias[self._arquivo_perfil]["meta"]["perfil"] = None
+            alteradas.add(self._arquivo_perfil)
+            self._arquivo_perfil = None
+        if isinstance(perfil, dict):
+            id_responsavel = str(perfil.get("id_responsavel", "")).strip()
+            familia = self._nome_arquivo_familia(
+                id_responsavel if id_responsavel in registros["responsavel"] else self.FAMILIA_AUSENTE
+            )
+            self._familias.setdefault(familia, self._serializador.registros_vazios())["meta"]["perfil"] = perfil
+            self._arquivo_perfil = familia
+            alteradas.add(familia)
+        return alteradas
+
+    def _aplicar_na_familia(
+        self,
+        registros: dict[str, dict[str, Any]],
+        alteracao: dict[str, Any],
+    ) -> set[str]:
+        """Move o registro para o arquivo da familia; retorna os arquivos a regravar."""
+        tipo = alteracao["tipo"]
+        chave = alteracao["chave"]
+        anterior = self._locais.pop((tipo, chave), None)
+        alteradas: set[str] = set()
+        if anterior is not None:
+            self._familias.get(anterior, {}).get(tipo, {}).pop(chave, None)
+            alteradas.add(anterior)
+        if alteracao["op"] != "upsert":
+            return alteradas
+
+        dados = alteracao.get("dados")
+        familia = self._nome_arquivo_familia(self._familia_do_registro(registros, tipo, dados))
+        registros_familia = self._familias.setdefault(
+            familia,
+            self._serializador.registros_vazios(),
+        )
+        registros_familia[tipo][chave] = dados
+        self._locais[(tipo, chave)] = familia
+        alteradas.add(familia)
+
+        if tipo == "crianca" and anterior is not None and anterior != familia:
+            # Crianca transferida: as rotinas dela acompanham a nova familia.
+            rotinas_anteriores = self._familias.get(anterior, {}).get("rotina", {})
+            for chave_rotina, bruto in list(rotinas_anteriores.items()):
+                if isinstance(bruto, dict) and str(bruto.get("id_crianca", "")).strip() == chave:
+                    registros_familia["rotina"][chave_rotina] = rotinas_anteriores.pop(chave_rotina)
+                    self._locais[("rotina", chave_rotina)] = familia
+        return alteradas
+
+    def _familia_do_registro(
+        self,
+        registros: dict[str, dict[str, Any]],
+        tipo: str,
+        dados: Any,
+    ) -> str:
+        if not isinstance(dados, dict):
+            return self.FAMILIA_AUSENTE
+        if tipo == "responsavel":
+            return str(dados.get("id_responsavel", "")).strip()
+
+        if tipo == "rotina":
+            dados = registros["crianca"].get(str(dados.get("id_crianca", "")).strip())
+            if not isinstance(dados, dict):
+                return self.FAMILIA_AUSENTE
+        id_responsavel = str(dados.get("id_responsavel", "")).strip()
+        if id_responsavel in registros["responsavel"]:
+            return id_responsavel
+        return self.FAMILIA_AUSENTE
+
+    def _gravar_familia(self, nome_arquivo: str) -> None:
+        caminho = self._diretorio / nome_arquivo
+        registros_familia = self._familias.get(nome_arquivo)
+        if not registros_familia or not (
+            any(registros_familia[tipo] for tipo in ("responsavel", "crianca", "rotina"))
+            or registros_familia["meta"].get("perfil") is not None
+        ):
+            self._familias.pop(nome_arquivo, None)
+            try:
+                caminho.unlink(missing_ok=True)
+            except OSError:
+                pass
+            return
+
+        payload = self._serializador.montar_payload(registros_familia)
+        del payload["data_calendario"]
+        if payload["perfil"] is None:
+            del payload["perfil"]
+        self._escrever_json_arquivo(caminho, payload)
+
+    def _montar_indice(self, registros: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        meta = registros.get("meta", {})
+        return {
+            "versao_esquema": self._serializador.VERSAO_ESQUEMA,
+            # Lista na ordem de cadastro, usada tambem para carregar as familias.
+            "familias": [
+                self._entrada_familia(id_responsavel, bruto)
+                for id_responsavel, bruto in registros.get("responsavel", {}).items()
+            ],
+            "criancas": {
+                id_crianca: familia
+                for id_crianca, bruto in registros.get("crianca", {}).items()
+                if (familia := self._familia_do_registro(registros, "crianca", bruto))
+                != self.FAMILIA_AUSENTE
+            },
+            "data_calendario": meta.get("data_calendario") or date.today().isoformat(),
+        }
+
+    def _entrada_familia(self, id_responsavel: str, bruto: Any) -> dict[str, Any]:
+        return {
+            "id_responsavel": id_responsavel,
+            "email": bruto.get("email") if isinstance(bruto, dict) else None,
+            "arquivo": self._nome_arquivo_familia(id_responsavel),
+        }
+
+    @staticmethod
+    def _normalizar_email(email: Any) -> str:
+        return str(email).strip().lower()
+
+    @classmethod
+    def _nome_arquivo_familia(cls, familia: str) -> str:
+        if familia == cls.FAMILIA_AUSENTE:
+            return cls.NOME_SEM_FAMILIA
+        if cls._PADRAO_ID_ARQUIVO.match(familia):
+            return f"familia_{familia}.json"
+        # Ids importados podem ter caracteres invalidos em nomes de arquivo.
+        return f"familia_{hashlib.sha1(familia.encode('utf-8')).hexdigest()[:16]}.json"
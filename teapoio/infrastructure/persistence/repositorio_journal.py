@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import os
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from teapoio.application.services.unidade_trabalho import AlteracoesEstado
+from teapoio.domain.models.Perfil import Perfil
+from teapoio.domain.models.crianca import Crianca
+from teapoio.domain.models.responsavel import Responsavel
+from teapoio.domain.models.rotina import Rotina
+from teapoio.infrastructure.mixins.exportavel_json import CodecJson
+from teapoio.infrastructure.persistence.Relatorio import (
+    RepositorioRelatorio,
+    SerializadorEstadoRelatorio,
+)
+
+
+class RepositorioRelatorioJournal(RepositorioRelatorio):
+    """Persistencia em snapshot JSON com journal append-only de alteracoes.
+
+    Cada salvamento acrescenta ao journal apenas os registros que mudaram desde
+    o ultimo salvamento. O snapshot (mesmo formato do RepositorioRelatorio) so e
+    reescrito na compactacao, quando o journal atinge o limite de registros.
+    """
+
+    LIMITE_REGISTROS_PADRAO = 500
+
+    def __init__(
+        self,
+        caminho_arquivo: str | Path | None = None,
+        serializador: SerializadorEstadoRelatorio | None = None,
+        caminho_journal: str | Path | None = None,
+        limite_registros: int = LIMITE_REGISTROS_PADRAO,
+        codec_json: CodecJson | None = None,
+        json_indentado: bool | None = None,
+        rotinas_sob_demanda: bool = False,
+    ) -> None:
+        super().__init__(
+            caminho_arquivo=caminho_arquivo,
+            serializador=serializador,
+            codec_json=codec_json,
+            json_indentado=json_indentado,
+            rotinas_sob_demanda=rotinas_sob_demanda,
+        )
+        if not isinstance(limite_registros, int) or limite_registros < 1:
+            raise ValueError("Limite de registros do journal deve ser inteiro positivo.")
+
+        self._caminho_journal = (
+            self._caminho_arquivo.with_suffix(f"{self._caminho_arquivo.suffix}.journal")
+            if caminho_journal is None
+            else Path(caminho_journal)
+        )
+        self._limite_registros = limite_registros
+        self._registros: dict[str, dict[str, Any]] | None = None
+        self._total_registros_journal = 0
+
+    @property
+    def caminho_journal(self) -> Path:
+        return self._caminho_journal
+
+    def carregar_estado(self) -> dict[str, Any]:
+        dados = self._ler_json_arquivo(caminho_arquivo=self._caminho_arquivo, fallback=None)
+        registros = self._serializador.registros_de_payload(dados)
+        total_aplicados = self._reaplicar_journal(registros)
+
+        # O journal e sempre escrito pela aplicacao; a confianca depende do snapshot.
+        confiavel = not isinstance(dados, dict) or self._serializador.payload_confiavel(dados)
+        estado = self._serializador.desserializar_estado(
+            self._serializador.montar_payload(registros),
+            rotinas_sob_demanda=self._rotinas_sob_demanda,
+            confiavel=confiavel,
+        )
+        if not confiavel:
+            # A compactacao grava os registros como confiaveis: so os validados ficam.
+            registros = self._serializador.registros_validados(estado)
+        self._registros = registros
+        self._total_registros_journal = total_aplicados
+
+        # Sem snapshot valido e sem journal: recria o arquivo com estrutura valida.
+        if (not isinstance(dados, dict) or not dados) and total_aplicados == 0:
+            self.compactar()
+
+        return estado
+
+    def salvar_estado(
+        self,
+        responsaveis: list[Responsavel],
+        criancas: list[Crianca],
+        rotinas: list[Rotina],
+        perfil: Perfil | None,
+        data_calendario: date,
+    ) -> None:
+        registros_atuais = self._serializador.serializar_registros(
+            responsaveis=responsaveis,
+            criancas=criancas,
+            rotinas=rotinas,
+            perfil=perfil,
+            data_calendario=data_calendario,
+        )
+        alteracoes = self._serializador.calcular_alteracoes(
+            self._obter_registros(),
+            registros_atuais,
+        )
+        self._registrar_alteracoes(alteracoes)
+
+    def salvar_alteracoes(self, alteracoes: AlteracoesEstado) -> None:
+        """Acrescenta ao journal somente as entidades sujas informadas."""
+        self._registrar_alteracoes(
+            self._serializador.alteracoes_de_entidades(self._obter_registros(), alteracoes)
+        )
+
+    def compactar(self) -> None:
+        """Reescreve o snapshot com o estado atual e descarta o journal."""
+        registros = self._obter_registros()
+        self._escrever_json_arquivo(
+            caminho_arquivo=self._caminho_arquivo,
+            payload=self._serializador.montar_payload(registros),
+        )
+        if self._caminho_journal.exists():
+            with self._caminho_journal.open("w", encoding="utf-8") as arquivo:
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+        self._total_registros_journal = 0
+
+    def _registrar_alteracoes(self, alteracoes: list[dict[str, Any]]) -> None:
+        if not alteracoes:
+            return
+
+        registros = self._obter_registros()
+        # Cada registro ocupa uma linha, sempre compacto.
+        conteudo = b"".join(
+            self.codec_json.codificar(alteracao) + b"\n"
+            for alteracao in alteracoes
+        )
+        self._caminho_journal.parent.mkdir(parents=True, exist_ok=True)
+        with self._caminho_journal.open("ab") as arquivo:
+            arquivo.write(conteudo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+        for alteracao in alteracoes:
+            self._serializador.aplicar_alteracao(registros, alteracao)
+        self._total_registros_journal += len(alteracoes)
+
+        if self._total_registros_journal >= self._limite_registros:
+            self.compactar()
+
+    def _obter_registros(self) -> dict[str, dict[str, Any]]:
+        if self._registros is None:
+            self.carregar_estado()
+        return self._registros
+
+    def _reaplicar_journal(self, registros: dict[str, dict[str, Any]]) -> int:
+        if not self._caminho_journal.exists():
+            return 0
+
+        total = 0
+        fim_linhas_completas = 0
+        linha_truncada = False
+        try:
+            with self._caminho_journal.open("rb") as arquivo:
+                for linha in arquivo:
+                    if not linha.endswith(b"\n"):
+                        linha_truncada = True
+                        break
+                    fim_linhas_completas += len(linha)
+                    try:
+                        alteracao = self.codec_json.decodificar(linha)
+                    except ValueError:
+                        continue
+                    if self._serializador.aplicar_alteracao(registros, alteracao):
+                        total += 1
+        except OSError:
+            return total
+
+        if linha_truncada:
+            # Linha final truncada por falha durante a escrita: e descartada para
+            # que o proximo registro nao seja gravado colado a ela.
+            try:
+                with self._caminho_journal.open("r+b") as arquivo:
+                    arquivo.truncate(fim_linhas_completas)
+                    arquivo.flush()
+                    os.fsync(arquivo.fileno())
+            except OSError:
+                pass
+        return total
@@ -0,0 +1,559 @@
+from __future__ import annotations
+
+from contextlib import closing
+from datetime import date
+import json
+from pathlib import Path
+import sqlite3
+import sys
+from typing import Any
+
+from teapoio.application.services.unidade_trabalho import AlteracoesEstado
+from teapoio.domain.models.Perfil import Perfil
+from teapoio.domain.models.crianca import Crianca
+from teapoio.domain.models.responsavel import Responsavel
+from teapoio.domain.models.rotina import Rotina
+from teapoio.infrastructure.mixins.exportavel_json import ExportavelJsonMixin
+from teapoio.infrastructure.persistence.Relatorio import SerializadorEstadoRelatorio
+
+
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS responsaveis (
+    id_responsavel TEXT PRIMARY KEY,
+    nome TEXT NOT NULL,
+    data_nascimento TEXT NOT NULL,
+    email TEXT,
+    senha TEXT NOT NULL,
+    posicao INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_responsaveis_email ON responsaveis (email);
+
+CREATE TABLE IF NOT EXISTS criancas (
+    id_crianca TEXT PRIMARY KEY,
+    id_responsavel TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    data_nascimento TEXT NOT NULL,
+    nivel_suporte INTEGER NOT NULL,
+    posicao INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_criancas_responsavel ON criancas (id_responsavel);
+
+CREATE TABLE IF NOT EXISTS perfis_sensoriais (
+    id_crianca TEXT PRIMARY KEY,
+    nome TEXT NOT NULL,
+    data_nascimento TEXT NOT NULL,
+    hipersensibilidades TEXT NOT NULL,
+    hipossensibilidades TEXT NOT NULL,
+    hiperfocos TEXT NOT NULL,
+    seletividade_alimentar TEXT NOT NULL,
+    estrategias_regulacao TEXT NOT NULL,
+    posicao INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS rotinas (
+    id_crianca TEXT NOT NULL,
+    data_referencia TEXT NOT NULL,
+    sentimento_dia TEXT NOT NULL DEFAULT '',
+    posicao INTEGER NOT NULL DEFAULT 0,
+    versao INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (id_crianca, data_referencia)
+);
+
+CREATE TABLE IF NOT EXISTS itens_rotina (
+    id_crianca TEXT NOT NULL,
+    data_referencia TEXT NOT NULL,
+    horario TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    status TEXT NOT NULL,
+    observacao TEXT NOT NULL DEFAULT '',
+    tags TEXT NOT NULL DEFAULT '[]',
+    id_item TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (id_crianca, data_referencia, horario)
+);
+
+CREATE TABLE IF NOT EXISTS emocoes_rotina (
+    id_crianca TEXT NOT NULL,
+    data_referencia TEXT NOT NULL,
+    emocao TEXT NOT NULL,
+    escala INTEGER NOT NULL,
+    PRIMARY KEY (id_crianca, data_referencia, emocao)
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+# Colunas acrescentadas depois da primeira versao do esquema: (tabela, coluna, definicao).
+COLUNAS_ADICIONAIS = (
+    ("rotinas", "versao", "INTEGER NOT NULL DEFAULT 0"),
+    ("itens_rotina", "id_item", "TEXT NOT NULL DEFAULT ''"),
+    ("criancas", "modelos_rotina", "TEXT NOT NULL DEFAULT ''"),
+)
+
+CAMPOS_LISTA_PERFIL_SENSORIAL = (
+    "hipersensibilidades",
+    "hipossensibilidades",
+    "hiperfocos",
+    "seletividade_alimentar",
+    "estrategias_regulacao",
+)
+
+
+class RepositorioRelatorioSqlite(ExportavelJsonMixin):
+    """Implementacao de persistencia do estado em tabelas SQLite (modo WAL).
+
+    Cada salvamento grava apenas as linhas das entidades que mudaram desde o
+    ultimo carregamento/salvamento, dentro de uma unica transacao.
+    """
+
+    @staticmethod
+    def _caminho_arquivo_padrao() -> Path:
+        return Path(__file__).resolve().parents[3] / "teapoio_data.sqlite3"
+
+    def __init__(
+        self,
+        caminho_arquivo: str | Path | None = None,
+        serializador: SerializadorEstadoRelatorio | None = None,
+        caminho_json_migracao: str | Path | None = None,
+    ) -> None:
+        self._caminho_arquivo = (
+            self._caminho_arquivo_padrao()
+            if caminho_arquivo is None
+            else Path(caminho_arquivo)
+        )
+        self._caminho_json_migracao = (
+            Path(caminho_json_migracao) if caminho_json_migracao is not None else None
+        )
+        self._serializador = serializador or SerializadorEstadoRelatorio()
+        self._registros: dict[str, dict[str, Any]] | None = None
+
+    @property
+    def caminho_arquivo(self) -> Path:
+        return self._caminho_arquivo
+
+    def carregar_estado(self) -> dict[str, Any]:
+        banco_novo = not self._caminho_arquivo.exists()
+        self._inicializar_banco()
+
+        if (
+            banco_novo
+            and self._caminho_json_migracao is not None
+            and self._caminho_json_migracao.exists()
+        ):
+            self.migrar_de_json(self._caminho_json_migracao)
+
+        registros = self._ler_registros()
+        self._registros = registros
+        return self._serializador.desserializar_estado(
+            self._serializador.montar_payload(registros)
+        )
+
+    def salvar_estado(
+        self,
+        responsaveis: list[Responsavel],
+        criancas: list[Crianca],
+        rotinas: list[Rotina],
+        perfil: Perfil | None,
+        data_calendario: date,
+    ) -> None:
+        registros_atuais = self._serializador.serializar_registros(
+            responsaveis=responsaveis,
+            criancas=criancas,
+            rotinas=rotinas,
+            perfil=perfil,
+            data_calendario=data_calendario,
+        )
+        alteracoes = self._serializador.calcular_alteracoes(
+            self._obter_registros(),
+            registros_atuais,
+        )
+        self._aplicar_alteracoes(alteracoes)
+
+    def salvar_alteracoes(self, alteracoes: AlteracoesEstado) -> None:
+        """Grava somente as linhas das entidades sujas informadas."""
+        self._aplicar_alteracoes(
+            self._serializador.alteracoes_de_entidades(self._obter_registros(), alteracoes)
+        )
+
+    def migrar_de_json(self, caminho_json: str | Path) -> int:
+        """Importa o estado de um arquivo JSON legado, validando cada registro.
+
+        Retorna a quantidade de linhas de entidade gravadas.
+        """
+        dados = self._ler_json_arquivo(caminho_arquivo=Path(caminho_json), fallback=None)
+        estado = self._serializador.desserializar_estado(dados, confiavel=False)
+        registros = self._serializador.serializar_registros(
+            responsaveis=estado["responsaveis"],
+            criancas=estado["criancas"],
+            rotinas=estado["rotinas"],
+            perfil=estado["perfil"],
+            data_calendario=estado["data_calendario"],
+        )
+
+        self._inicializar_banco()
+        alteracoes = self._serializador.calcular_alteracoes(
+            self._obter_registros(),
+            registros,
+        )
+        self._aplicar_alteracoes(alteracoes)
+        return len(alteracoes)
+
+    def _conectar(self) -> sqlite3.Connection:
+        conexao = sqlite3.connect(self._caminho_arquivo, timeout=30)
+        conexao.execute("PRAGMA foreign_keys = ON")
+        return conexao
+
+    def _inicializar_banco(self) -> None:
+        self._caminho_arquivo.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._conectar()) as conexao:
+            conexao.execute("PRAGMA journal_mode = WAL")
+            conexao.executescript(ESQUEMA_SQLITE)
+            for tabela, coluna, definicao in COLUNAS_ADICIONAIS:
+                colunas = {linha[1] for linha in conexao.execute(f"PRAGMA table_info({tabela})")}
+                if coluna not in colunas:
+                    conexao.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}")
+            conexao.commit()
+
+    def _obter_registros(self) -> dict[str, dict[str, Any]]:
+        if self._registros is None:
+            self._inicializar_banco()
+            self._registros = self._ler_registros()
+        return self._registros
+
+    def _aplicar_alteracoes(self, alteracoes: list[dict[str, Any]]) -> None:
+        if not alteracoes:
+            return
+
+        registros = self._obter_registros()
+        # Mantem a ordem de insercao do estado em memoria ao recarregar.
+        posicoes = {
+            tipo: {chave: indice for indice, chave in enumerate(registros.get(tipo, {}))}
+            for tipo in ("responsavel", "crianca", "rotina")
+        }
+        with closing(self._conectar()) as conexao:
+            with conexao:
+                for alteracao in alteracoes:
+                    self._executar_alteracao(conexao, alteracao, registros, posicoes)
+
+        for alteracao in alteracoes:
+            self._serializador.aplicar_alteracao(registros, alteracao)
+
+    def _executar_alteracao(
+        self,
+        conexao: sqlite3.Connection,
+        alteracao: dict[str, Any],
+        registros: dict[str, dict[str, Any]],
+        posicoes: dict[str, dict[str, int]],
+    ) -> None:
+        tipo = alteracao["tipo"]
+        chave = alteracao["chave"]
+        dados = alteracao.get("dados")
+        posicoes_tipo = posicoes.get(tipo, {})
+        posicao = posicoes_tipo.setdefault(chave, len(posicoes_tipo))
+
+        if alteracao["op"] == "remover":
+            if tipo == "responsavel":
+                conexao.execute("DELETE FROM responsaveis WHERE id_responsavel = ?", (chave,))
+            elif tipo == "crianca":
+                conexao.execute("DELETE FROM criancas WHERE id_crianca = ?", (chave,))
+            elif tipo == "rotina":
+                self._remover_rotina(conexao, *self._separar_chave_rotina(chave))
+            return
+
+        if tipo == "responsavel":
+            conexao.execute(
+                """
+                INSERT INTO responsaveis (id_responsavel, nome, data_nascimento, email, senha, posicao)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id_responsavel) DO UPDATE SET
+                    nome = excluded.nome,
+                    data_nascimento = excluded.data_nascimento,
+                    email = excluded.email,
+                    senha = excluded.senha
+                """,
+                (
+                    chave,
+                    dados["nome"],
+                    dados["data_nascimento"],
+                    dados.get("email"),
+                    dados["senha"],
+                    posicao,
+                ),
+            )
+        elif tipo == "crianca":
+            conexao.execute(
+                """
+                INSERT INTO criancas (
+                    id_crianca, id_responsavel, nome, data_nascimento, nivel_suporte, posicao, modelos_rotina
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id_crianca) DO UPDATE SET
+                    id_responsavel = excluded.id_responsavel,
+                    nome = excluded.nome,
+                    data_nascimento = excluded.data_nascimento,
+                    nivel_suporte = excluded.nivel_suporte,
+                    modelos_rotina = excluded.modelos_rotina
+                """,
+                (
+                    chave,
+                    dados["id_responsavel"],
+                    dados["nome"],
+                    dados["data_nascimento"],
+                    int(dados["nivel_suporte"]),
+                    posicao,
+                    (
+                        json.dumps(dados["modelos_rotina"], ensure_ascii=False)
+                        if dados.get("modelos_rotina")
+                        else ""
+                    ),
+                ),
+            )
+        elif tipo == "rotina":
+            self._gravar_rotina(conexao, dados, posicao)
+        elif tipo == "meta" and chave == "perfil":
+            self._gravar_perfil(conexao, dados, registros["meta"].get("perfil"))
+        elif tipo == "meta":
+            conexao.execute(
+                "INSERT INTO meta (chave, valor) VALUES (?, ?) "
+                "ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor",
+                (chave, json.dumps(dados, ensure_ascii=False)),
+            )
+
+    @staticmethod
+    def _separar_chave_rotina(chave: str) -> tuple[str, str]:
+        id_crianca, _, data_referencia = chave.partition("|")
+        return id_crianca, data_referencia
+
+    @staticmethod
+    def _remover_rotina(conexao: sqlite3.Connection, id_crianca: str, data_referencia: str) -> None:
+        for tabela in ("itens_rotina", "emocoes_rotina", "rotinas"):
+            conexao.execute(
+                f"DELETE FROM {tabela} WHERE id_crianca = ? AND data_referencia = ?",
+                (id_crianca, data_referencia),
+            )
+
+    def _gravar_rotina(self, conexao: sqlite3.Connection, dados: dict[str, Any], posicao: int) -> None:
+        id_crianca = str(dados["id_crianca"])
+        data_referencia = str(dados["data_referencia"])
+        conexao.execute(
+            """
+            INSERT INTO rotinas (id_crianca, data_referencia, sentimento_dia, posicao, versao)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (id_crianca, data_referencia) DO UPDATE SET
+                sentimento_dia = excluded.sentimento_dia,
+                versao = excluded.versao
+            """,
+            (
+                id_crianca,
+                data_referencia,
+                dados.get("sentimento_dia") or "",
+                posicao,
+                int(dados.get("versao") or 0),
+            ),
+        )
+        conexao.execute(
+            "DELETE FROM itens_rotina WHERE id_crianca = ? AND data_referencia = ?",
+            (id_crianca, data_referencia),
+        )
+        conexao.execute(
+            "DELETE FROM emocoes_rotina WHERE id_crianca = ? AND data_referencia = ?",
+            (id_crianca, data_referencia),
+        )
+        conexao.executemany(
+            """
+            INSERT INTO itens_rotina (
+                id_crianca, data_referencia, horario, nome, status, observacao, tags, id_item
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    id_crianca,
+                    data_referencia,
+                    item["horario"],
+                    item["nome"],
+                    item["status"],
+                    item.get("observacao") or "",
+                    json.dumps(item.get("tags") or [], ensure_ascii=False),
+                    item.get("id_item") or "",
+                )
+                for item in dados.get("itens", [])
+            ],
+        )
+        conexao.executemany(
+            "INSERT INTO emocoes_rotina (id_crianca, data_referencia, emocao, escala) VALUES (?, ?, ?, ?)",
+            [
+                (id_crianca, data_referencia, emocao, int(escala))
+                for emocao, escala in (dados.get("emocoes") or {}).items()
+            ],
+        )
+
+    @staticmethod
+    def _gravar_perfil(
+        conexao: sqlite3.Connection,
+        dados: dict[str, Any] | None,
+        dados_anteriores: dict[str, Any] | None,
+    ) -> None:
+        conexao.execute(
+            "INSERT INTO meta (chave, valor) VALUES ('perfil_id_responsavel', ?) "
+            "ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor",
+            (json.dumps(dados["id_responsavel"] if dados else None),),
+        )
+
+        anteriores = {
+            item["id_crianca"]: item
+            for item in (dados_anteriores or {}).get("perfis_sensoriais", [])
+        }
+        atuais = {
+            item["id_crianca"]: item
+            for item in (dados or {}).get("perfis_sensoriais", [])
+        }
+
+        for id_crianca in anteriores.keys() - atuais.keys():
+            conexao.execute("DELETE FROM perfis_sensoriais WHERE id_crianca = ?", (id_crianca,))
+
+        for posicao, (id_crianca, item) in enumerate(atuais.items()):
+            if anteriores.get(id_crianca) == item:
+                continue
+            conexao.execute(
+                """
+                INSERT INTO perfis_sensoriais (
+                    id_crianca, nome, data_nascimento, hipersensibilidades, hipossensibilidades,
+                    hiperfocos, seletividade_alimentar, estrategias_regulacao, posicao
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id_crianca) DO UPDATE SET
+                    nome = excluded.nome,
+                    data_nascimento = excluded.data_nascimento,
+                    hipersensibilidades = excluded.hipersensibilidades,
+                    hipossensibilidades = excluded.hipossensibilidades,
+                    hiperfocos = excluded.hiperfocos,
+                    seletividade_alimentar = excluded.seletividade_alimentar,
+                    estrategias_regulacao = excluded.estrategias_regulacao
+                """,
+                (
+                    id_crianca,
+                    item["nome"],
+                    item["data_nascimento"],
+                    *(
+                        json.dumps(item.get(campo) or [], ensure_ascii=False)
+                        for campo in CAMPOS_LISTA_PERFIL_SENSORIAL
+                    ),
+                    posicao,
+                ),
+            )
+
+    def _ler_registros(self) -> dict[str, dict[str, Any]]:
+        registros = self._serializador.registros_vazios()
+        with closing(self._conectar()) as conexao:
+            conexao.row_factory = sqlite3.Row
+
+            for linha in conexao.execute(
+                "SELECT id_responsavel, nome, data_nascimento, email, senha "
+                "FROM responsaveis ORDER BY posicao, rowid"
+            ):
+                registros["responsavel"][linha["id_responsavel"]] = dict(linha)
+
+            for linha in conexao.execute(
+                "SELECT id_crianca, id_responsavel, nome, data_nascimento, nivel_suporte, modelos_rotina "
+                "FROM criancas ORDER BY posicao, rowid"
+            ):
+                dados = dict(linha)
+                modelos_rotina = dados.pop("modelos_rotina")
+                if modelos_rotina:
+                    dados["modelos_rotina"] = json.loads(modelos_rotina)
+                registros["crianca"][linha["id_crianca"]] = dados
+
+            itens_por_rotina: dict[tuple[str, str], list[dict[str, Any]]] = {}
+            for linha in conexao.execute(
+                "SELECT id_crianca, data_referencia, nome, horario, status, observacao, tags, id_item "
+                "FROM itens_rotina ORDER BY id_crianca, data_referencia, horario"
+            ):
+                itens_por_rotina.setdefault(
+                    (linha["id_crianca"], linha["data_referencia"]), []
+                ).append(
+                    {
+                        "id_item": linha["id_item"],
+                        "nome": linha["nome"],
+                        "horario": linha["horario"],
+                        "status": linha["status"],
+                        "observacao": linha["observacao"],
+                        "tags": json.loads(linha["tags"]),
+                    }
+                )
+
+            emocoes_por_rotina: dict[tuple[str, str], dict[str, int]] = {}
+            for linha in conexao.execute(
+                "SELECT id_crianca, data_referencia, emocao, escala FROM emocoes_rotina"
+            ):
+                emocoes_por_rotina.setdefault(
+                    (linha["id_crianca"], linha["data_referencia"]), {}
+                )[linha["emocao"]] = linha["escala"]
+
+            for linha in conexao.execute(
+                "SELECT id_crianca, data_referencia, sentimento_dia, versao "
+                "FROM rotinas ORDER BY posicao, rowid"
+            ):
+                chave_rotina = (linha["id_crianca"], linha["data_referencia"])
+                payload: dict[str, Any] = {
+                    "id_crianca": linha["id_crianca"],
+                    "data_referencia": linha["data_referencia"],
+                    "sentimento_dia": linha["sentimento_dia"],
+                    "versao": linha["versao"],
+                    "itens": itens_por_rotina.get(chave_rotina, []),
+                }
+                emocoes = emocoes_por_rotina.get(chave_rotina)
+                if emocoes:
+                    payload["emocoes"] = emocoes
+                registros["rotina"][
+                    self._serializador.chave_rotina(*chave_rotina)
+                ] = payload
+
+            meta = {
+                linha["chave"]: json.loads(linha["valor"])
+                for linha in conexao.execute("SELECT chave, valor FROM meta")
+            }
+
+            perfil = None
+            id_responsavel_perfil = meta.pop("perfil_id_responsavel", None)
+            if id_responsavel_perfil:
+                perfis_sensoriais = []
+                for linha in conexao.execute(
+                    "SELECT * FROM perfis_sensoriais ORDER BY posicao, rowid"
+                ):
+                    perfis_sensoriais.append(
+                        {
+                            "id_crianca": linha["id_crianca"],
+                            "nome": linha["nome"],
+                            "data_nascimento": linha["data_nascimento"],
+                            **{
+                                campo: json.loads(linha[campo])
+                                for campo in CAMPOS_LISTA_PERFIL_SENSORIAL
+                            },
+                        }
+                    )
+                perfil = {
+                    "id_responsavel": id_responsavel_perfil,
+                    "perfis_sensoriais": perfis_sensoriais,
+                }
+
+        registros["meta"]["perfil"] = perfil
+        if "data_calendario" in meta:
+            registros["meta"]["data_calendario"] = meta["data_calendario"]
+        return registros
+
+
+def migrar_json_para_sqlite(caminho_json: str | Path, caminho_sqlite: str | Path) -> int:
+    """Migra (uma unica vez) o arquivo JSON legado para um banco SQLite."""
+    repositorio = RepositorioRelatorioSqlite(caminho_arquivo=caminho_sqlite)
+    return repositorio.migrar_de_json(caminho_json)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python -m teapoio.infrastructure.persistence.repositorio_sqlite <origem.json> <destino.sqlite3>")
+        sys.exit(1)
+    total = migrar_json_para_sqlite(sys.argv[1], sys.argv[2])
+    print(f"Migracao concluida: {total} registros gravados.")
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import atexit
+from threading import Condition, Lock, Thread
+from time import monotonic
+from typing import Callable
+
+
+class PersistidorAdiado:
+    """[SOLID: SRP] Agrupa pedidos de gravacao e os executa em segundo plano.
+
+    `marcar` apenas registra que o estado mudou. Uma thread grava depois de
+    `janela_segundos` contados a partir da primeira marcacao pendente, ou antes
+    disso quando `limite_marcacoes` alteracoes se acumulam; todas as alteracoes
+    do intervalo saem em uma unica gravacao. O prazo nao e renovado a cada
+    marcacao, entao uma sequencia continua de alteracoes nao adia a gravacao
+    indefinidamente. Se a gravacao falhar, as alteracoes continuam pendentes e
+    sao tentadas de novo na janela seguinte. `encerrar` grava o que restar e e
+    chamado tambem na saida do processo.
+    """
+
+    JANELA_SEGUNDOS_PADRAO = 0.2
+    LIMITE_MARCACOES_PADRAO = 100
+
+    def __init__(
+        self,
+        gravar: Callable[[], object],
+        janela_segundos: float = JANELA_SEGUNDOS_PADRAO,
+        limite_marcacoes: int = LIMITE_MARCACOES_PADRAO,
+    ) -> None:
+        if janela_segundos < 0:
+            raise ValueError("A janela de gravacao nao pode ser negativa.")
+        if isinstance(limite_marcacoes, bool) or not isinstance(limite_marcacoes, int):
+            raise TypeError("O limite de alteracoes pendentes deve ser um numero inteiro.")
+        if limite_marcacoes <= 0:
+            raise ValueError("O limite de alteracoes pendentes deve ser maior que zero.")
+
+        self._gravar = gravar
+        self._janela_segundos = janela_segundos
+        self._limite_marcacoes = limite_marcacoes
+        self._condicao = Condition(Lock())
+        # Serializa as gravacoes da thread com as feitas por `descarregar`.
+        self._trava_gravacao = Lock()
+        self._pendentes = 0
+        self._prazo: float | None = None
+        self._encerrado = False
+        self._thread: Thread | None = None
+        self.ultimo_erro: BaseException | None = None
+        atexit.register(self.encerrar)
+
+    @property
+    def pendentes(self) -> int:
+        with self._condicao:
+            return self._pendentes
+
+    def marcar(self) -> None:
+        """Registra uma alteracao a gravar; nao bloqueia pela gravacao."""
+        with self._condicao:
+            if self._encerrado:
+                raise RuntimeError("O persistidor ja foi encerrado.")
+            if self._pendentes == 0:
+                self._prazo = monotonic() + self._janela_segundos
+            self._pendentes += 1
+            if self._thread is None:
+                self._thread = Thread(
+                    target=self._executar,
+                    name="teapoio-persistencia",
+                    daemon=True,
+                )
+                self._thread.start()
+            self._condicao.notify()
+
+    def descarregar(self) -> bool:
+        """Grava imediatamente as alteracoes pendentes; retorna se houve gravacao.
+
+        Nao deve ser chamado por quem segura a trava que a funcao de gravacao
+        precisa adquirir.
+        """
+        with self._trava_gravacao:
+            with self._condicao:
+                pendentes = self._pendentes
+                self._pendentes = 0
+                self._prazo = None
+            if not pendentes:
+                return False
+            try:
+                self._gravar()
+            except BaseException:
+                self._devolver_pendentes(pendentes)
+                raise
+            return True
+
+    def encerrar(self) -> None:
+        """Para a thread e grava as alteracoes que ainda estiverem pendentes."""
+        with self._condicao:
+            self._encerrado = True
+            thread = self._thread
+            self._condicao.notify()
+        if thread is not None:
+            thread.join()
+        atexit.unregister(self.encerrar)
+        self.descarregar()
+
+    def _executar(self) -> None:
+        while True:
+            with self._condicao:
+                while not self._encerrado and not self._pronto_para_gravar():
+                    espera = None
+                    if self._prazo is not None:
+                        espera = max(self._prazo - monotonic(), 0)
+                    self._condicao.wait(espera)
+                if self._encerrado:
+                    return
+            try:
+                self.descarregar()
+            except Exception as erro:
+                # Mantem a thread viva; `descarregar` ja devolveu as pendencias.
+                self.ultimo_erro = erro
+                with self._condicao:
+                    self._condicao.wait_for(
+                        lambda: self._encerrado,
+                        timeout=self._janela_segundos or self.JANELA_SEGUNDOS_PADRAO,
+                    )
+            else:
+                self.ultimo_erro = None
+
+    def _pronto_para_gravar(self) -> bool:
+        if self._pendentes == 0:
+            return False
+        if self._pendentes >= self._limite_marcacoes:
+            return True
+        return self._prazo is not None and monotonic() >= self._prazo
+
+    def _devolver_pendentes(self, pendentes: int) -> None:
+        with self._condicao:
+            if self._pendentes == 0:
+                self._prazo = monotonic() + self._janela_segundos
+            self._pendentes += pendentes
@@ -0,0 +1,484 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import chain
+from tempfile import SpooledTemporaryFile
+import calendar
+import textwrap
+from typing import Any, Iterable, Iterator
+
+from teapoio.infrastructure.cache_relatorios import CacheArtefatosRelatorio
+
+
+PERIODOS_RELATORIO = ("mes", "trimestre", "ano")
+# Incrementar ao mudar o layout, para invalidar PDFs ja guardados em cache.
+VERSAO_LAYOUT_RELATORIO = "1"
+TAMANHO_BLOCO_STREAM = 64 * 1024
+
+
+def intervalo_periodo(data_base: date, periodo: str) -> tuple[date, date]:
+    """Retorna inicio e fim (inclusive) do mes, trimestre ou ano que contem a data."""
+    if periodo == "mes":
+        dia_final = calendar.monthrange(data_base.year, data_base.month)[1]
+        return date(data_base.year, data_base.month, 1), date(data_base.year, data_base.month, dia_final)
+    if periodo == "trimestre":
+        mes_inicial = ((data_base.month - 1) // 3) * 3 + 1
+        mes_final = mes_inicial + 2
+        dia_final = calendar.monthrange(data_base.year, mes_final)[1]
+        return date(data_base.year, mes_inicial, 1), date(data_base.year, mes_final, dia_final)
+    if periodo == "ano":
+        return date(data_base.year, 1, 1), date(data_base.year, 12, 31)
+
+    permitidos = ", ".join(f"'{item}'" for item in PERIODOS_RELATORIO)
+    raise ValueError(f"Periodo invalido. Use {permitidos}.")
+
+
+def _linha_barra_textual(texto: str) -> bool:
+    conteudo = texto.strip()
+    if not conteudo:
+        return False
+    if conteudo == "Sem sentimentos registrados no mes.":
+        return True
+    return "|" in conteudo and "(" in conteudo and conteudo.endswith(")")
+
+
+def _eh_titulo_grafico_sentimentos(texto: str) -> bool:
+    conteudo = texto.strip().casefold()
+    return "grafico" in conteudo and "sentimentos" in conteudo and "barras" in conteudo
+
+
+def _escapar_pdf_texto(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+class EscritorPdfPaginado:
+    """Escreve um PDF (Helvetica, A4) pagina a pagina, devolvendo os bytes de cada parte.
+
+    Apenas os offsets dos objetos ficam em memoria; o conteudo de cada pagina
+    e liberado assim que ela e emitida.
+    """
+
+    LARGURA_PAGINA = 595
+    ALTURA_PAGINA = 842
+    _OBJETO_CATALOGO = 1
+    _OBJETO_PAGINAS = 2
+    _OBJETO_FONTE = 3
+
+    def __init__(self) -> None:
+        self._offsets: dict[int, int] = {}
+        self._paginas: list[int] = []
+        self._posicao = 0
+        self._proximo_objeto = 4
+
+    def iniciar(self) -> bytes:
+        return self._emitir(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def adicionar_pagina(self, comandos: list[str]) -> bytes:
+        stream = "\n".join(comandos).encode("latin-1", errors="replace")
+        numero_conteudo = self._reservar_objeto()
+        numero_pagina = self._reservar_objeto()
+        self._paginas.append(numero_pagina)
+
+        conteudo = self._objeto(
+            numero_conteudo,
+            f"<< /Length {len(stream)} >> stream\n".encode("ascii")
+            + stream
+            + b"\nendstream",
+        )
+        pagina = self._objeto(
+            numero_pagina,
+            (
+                f"<< /Type /Page /Parent {self._OBJETO_PAGINAS} 0 R "
+                f"/MediaBox [0 0 {self.LARGURA_PAGINA} {self.ALTURA_PAGINA}] "
+                f"/Resources << /Font << /F1 {self._OBJETO_FONTE} 0 R >> >> "
+                f"/Contents {numero_conteudo} 0 R >>"
+            ).encode("ascii"),
+        )
+        return conteudo + pagina
+
+    def finalizar(self) -> bytes:
+        kids = " ".join(f"{numero} 0 R" for numero in self._paginas)
+        partes = [
+            self._objeto(
+                self._OBJETO_PAGINAS,
+                f"<< /Type /Pages /Kids [{kids}] /Count {len(self._paginas)} >>".encode("ascii"),
+            ),
+            self._objeto(
+                self._OBJETO_CATALOGO,
+                f"<< /Type /Catalog /Pages {self._OBJETO_PAGINAS} 0 R >>".encode("ascii"),
+            ),
+            self._objeto(
+                self._OBJETO_FONTE,
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+            ),
+        ]
+
+        xref_inicio = self._posicao
+        total_objetos = self._proximo_objeto
+        linhas_xref = [f"xref\n0 {total_objetos}\n", "0000000000 65535 f \n"]
+        linhas_xref.extend(
+            f"{self._offsets[numero]:010d} 00000 n \n" for numero in range(1, total_objetos)
+        )
+        linhas_xref.append(
+            f"trailer << /Size {total_objetos} /Root {self._OBJETO_CATALOGO} 0 R >>\n"
+            f"startxref\n{xref_inicio}\n%%EOF"
+        )
+        partes.append(self._emitir("".join(linhas_xref).encode("ascii")))
+        return b"".join(partes)
+
+    def _reservar_objeto(self) -> int:
+        numero = self._proximo_objeto
+        self._proximo_objeto += 1
+        return numero
+
+    def _objeto(self, numero: int, corpo: bytes) -> bytes:
+        self._offsets[numero] = self._posicao
+        return self._emitir(f"{numero} 0 obj ".encode("ascii") + corpo + b"\nendobj\n")
+
+    def _emitir(self, dados: bytes) -> bytes:
+        self._posicao += len(dados)
+        return dados
+
+
+def _comandos_grafico_sentimentos(
+    distribuicao_sentimentos: list[dict[str, Any]],
+    chart_bottom: float,
+) -> list[str]:
+    chart_left = 62.0
+    chart_width = 450.0
+    chart_height = 92.0
+
+    comandos = [
+        # eixo horizontal
+        f"0.80 0.80 0.80 rg {chart_left:.2f} {chart_bottom:.2f} {chart_width:.2f} 0.8 re f",
+        # eixo vertical
+        f"0.80 0.80 0.80 rg {chart_left:.2f} {chart_bottom:.2f} 0.8 {chart_height:.2f} re f",
+    ]
+
+    valores = [int(item.get("quantidade", 0)) for item in distribuicao_sentimentos]
+    rotulos = [str(item.get("label", "")).strip() for item in distribuicao_sentimentos]
+    maximo = max(valores, default=0)
+
+    if maximo <= 0 or not valores:
+        aviso = _escapar_pdf_texto("Sem sentimentos registrados no mes.")
+        comandos.append(
+            f"0 0 0 rg BT /F1 9 Tf {chart_left + 8:.2f} {chart_bottom + 36:.2f} Td ({aviso}) Tj ET"
+        )
+        return comandos
+
+    total = max(1, len(valores))
+    slot = chart_width / total
+    bar_width = max(18.0, min(50.0, slot * 0.56))
+
+    for indice, quantidade in enumerate(valores):
+        x = chart_left + (indice * slot) + ((slot - bar_width) / 2)
+        altura = 0.0
+        if quantidade > 0:
+            altura = max(3.0, (quantidade / maximo) * chart_height)
+
+        if altura > 0:
+            comandos.append(
+                f"0.06 0.46 0.43 rg {x:.2f} {chart_bottom:.2f} {bar_width:.2f} {altura:.2f} re f"
+            )
+
+        qtd_txt = _escapar_pdf_texto(str(quantidade))
+        comandos.append(
+            f"0 0 0 rg BT /F1 8 Tf {x + 2:.2f} {chart_bottom + altura + 4:.2f} Td ({qtd_txt}) Tj ET"
+        )
+
+        rotulo = _escapar_pdf_texto(rotulos[indice][:12])
+        comandos.append(
+            f"0 0 0 rg BT /F1 7 Tf {x - 2:.2f} {chart_bottom - 10:.2f} Td ({rotulo}) Tj ET"
+        )
+    return comandos
+
+
+def gerar_pdf_paginado(
+    linhas: Iterable[str],
+    distribuicao_sentimentos: list[dict[str, Any]],
+) -> Iterator[bytes]:
+    """Gera o PDF sem dependencias externas, emitindo uma pagina por vez.
+
+    As linhas sao consumidas sob demanda (podem vir de um gerador) e nenhum
+    conteudo e descartado: ao atingir a margem inferior uma nova pagina e aberta.
+    """
+    topo = 800.0
+    base = 40.0
+    altura_linha = 14.0
+    altura_grafico = 14.0 + 110.0 + 20.0
+    largura_maxima = 95
+
+    escritor = EscritorPdfPaginado()
+    yield escritor.iniciar()
+
+    comandos: list[str] = []
+    y = topo
+    ignorar_barras_textuais = False
+
+    for linha in linhas:
+        conteudo = str(linha).strip()
+
+        if not conteudo:
+            y -= 8
+            ignorar_barras_textuais = False
+            continue
+
+        if _eh_titulo_grafico_sentimentos(conteudo):
+            if y - altura_grafico < base:
+                yield escritor.adicionar_pagina(comandos)
+                comandos, y = [], topo
+
+            texto = _escapar_pdf_texto(conteudo)
+            comandos.append(f"0 0 0 rg BT /F1 10 Tf 40 {y:.2f} Td ({texto}) Tj ET")
+            y -= 14
+            chart_bottom = y - 110.0
+            comandos.extend(_comandos_grafico_sentimentos(distribuicao_sentimentos, chart_bottom))
+            y = chart_bottom - 20
+            ignorar_barras_textuais = True
+            continue
+
+        if ignorar_barras_textuais and _linha_barra_textual(conteudo):
+            continue
+
+        ignorar_barras_textuais = False
+        recuo = len(str(linha)) - len(str(linha).lstrip())
+        for trecho in textwrap.wrap(conteudo, largura_maxima - recuo) or [conteudo]:
+            if y < base:
+                yield escritor.adicionar_pagina(comandos)
+                comandos, y = [], topo
+            texto = _escapar_pdf_texto(trecho)
+            comandos.append(f"0 0 0 rg BT /F1 10 Tf {40 + recuo * 5} {y:.2f} Td ({texto}) Tj ET")
+            y -= altura_linha
+
+    yield escritor.adicionar_pagina(comandos)
+    yield escritor.finalizar()
+
+
+@lru_cache(maxsize=1)
+def _estilos_reportlab() -> tuple[Any, Any, Any]:
+    """Monta uma unica vez, por processo, os estilos de titulo, secao e texto."""
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    estilos_base = getSampleStyleSheet()
+    estilo_titulo = ParagraphStyle(
+        "TeApoioTitulo",
+        parent=estilos_base["Heading1"],
+        fontName="Helvetica-Bold",
+        fontSize=16,
+        leading=18,
+        spaceAfter=8,
+    )
+    estilo_secao = ParagraphStyle(
+        "TeApoioSecao",
+        parent=estilos_base["Heading3"],
+        fontName="Helvetica-Bold",
+        fontSize=11,
+        leading=14,
+        spaceBefore=4,
+        spaceAfter=4,
+    )
+    estilo_texto = ParagraphStyle(
+        "TeApoioTexto",
+        parent=estilos_base["Normal"],
+        fontName="Helvetica",
+        fontSize=10,
+        leading=13,
+        spaceAfter=2,
+    )
+
+    return estilo_titulo, estilo_secao, estilo_texto
+
+
+def _historia_reportlab(
+    linhas: Iterable[str],
+    distribuicao_sentimentos: list[dict[str, Any]],
+) -> list[Any]:
+    from reportlab.graphics.charts.barcharts import VerticalBarChart
+    from reportlab.graphics.shapes import Drawing, String
+    from reportlab.lib import colors
+    from reportlab.platypus import Paragraph, Spacer
+
+    def _escapar_html(texto: str) -> str:
+        return texto.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+    def _desenho_grafico() -> Drawing:
+        desenho = Drawing(520, 240)
+        rotulos = [str(item.get("label", "")).strip() for item in distribuicao_sentimentos]
+        valores = [int(item.get("quantidade", 0)) for item in distribuicao_sentimentos]
+
+        if not valores or max(valores, default=0) <= 0:
+            desenho.add(
+                String(
+                    24,
+                    120,
+                    "Sem sentimentos registrados no mes.",
+                    fontName="Helvetica",
+                    fontSize=10,
+                    fillColor=colors.HexColor("#1f2a2c"),
+                )
+            )
+            return desenho
+
+        grafico = VerticalBarChart()
+        grafico.x = 38
+        grafico.y = 46
+        grafico.width = 450
+        grafico.height = 155
+        grafico.data = [valores]
+        grafico.strokeColor = colors.HexColor("#9aa7a9")
+        grafico.valueAxis.valueMin = 0
+        maximo = max(valores)
+        grafico.valueAxis.valueMax = maximo + 1
+        grafico.valueAxis.valueStep = max(1, (maximo + 1 + 4) // 5)
+        grafico.categoryAxis.categoryNames = rotulos
+        grafico.categoryAxis.labels.angle = 20
+        grafico.categoryAxis.labels.dy = -14
+        grafico.categoryAxis.labels.fontName = "Helvetica"
+        grafico.categoryAxis.labels.fontSize = 8
+        grafico.bars[0].fillColor = colors.HexColor("#0f766e")
+        grafico.bars[0].strokeColor = colors.HexColor("#0b5d57")
+        desenho.add(grafico)
+        return desenho
+
+    estilo_titulo, estilo_secao, estilo_texto = _estilos_reportlab()
+
+    historia: list[Any] = []
+    titulo_renderizado = False
+    ignorar_barras_textuais = False
+    for linha in linhas:
+        texto = str(linha)
+        conteudo = texto.strip()
+
+        if not conteudo:
+            ignorar_barras_textuais = False
+            historia.append(Spacer(1, 5))
+            continue
+
+        if _eh_titulo_grafico_sentimentos(conteudo):
+            historia.append(Paragraph(_escapar_html(conteudo), estilo_secao))
+            historia.append(_desenho_grafico())
+            historia.append(Spacer(1, 8))
+            ignorar_barras_textuais = True
+            continue
+
+        if ignorar_barras_textuais and _linha_barra_textual(conteudo):
+            continue
+
+        if not titulo_renderizado:
+            historia.append(Paragraph(_escapar_html(conteudo), estilo_titulo))
+            titulo_renderizado = True
+            continue
+
+        if ":" not in conteudo and (len(conteudo) <= 38 or conteudo.isupper()):
+            historia.append(Paragraph(_escapar_html(conteudo), estilo_secao))
+        else:
+            historia.append(Paragraph(_escapar_html(conteudo), estilo_texto))
+    return historia
+
+
+def gerar_pdf_com_grafico(
+    linhas: list[str],
+    distribuicao_sentimentos: list[dict[str, Any]],
+) -> Iterator[bytes]:
+    """Gera o PDF com reportlab e devolve o arquivo em blocos.
+
+    O documento e escrito em um arquivo temporario (em memoria ate 1 MB) e
+    lido em blocos; sem reportlab, ou em caso de erro, usa o gerador paginado.
+    """
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate
+    except Exception:
+        yield from gerar_pdf_paginado(linhas, distribuicao_sentimentos)
+        return
+
+    arquivo = SpooledTemporaryFile(max_size=1024 * 1024)
+    try:
+        documento = SimpleDocTemplate(
+            arquivo,
+            pagesize=A4,
+            leftMargin=34,
+            rightMargin=34,
+            topMargin=34,
+            bottomMargin=34,
+            title="Relatorio TeApoio",
+            pageCompression=0,
+        )
+        try:
+            documento.build(_historia_reportlab(linhas, distribuicao_sentimentos))
+        except Exception:
+            arquivo.close()
+            yield from gerar_pdf_paginado(linhas, distribuicao_sentimentos)
+            return
+
+        arquivo.seek(0)
+        while True:
+            bloco = arquivo.read(TAMANHO_BLOCO_STREAM)
+            if not bloco:
+                break
+            yield bloco
+    finally:
+        arquivo.close()
+
+
+def gerar_pdf_relatorio(
+    linhas: Iterable[str],
+    distribuicao_sentimentos: list[dict[str, Any]],
+    periodo: str = "mes",
+) -> Iterator[bytes]:
+    """Escolhe o motor do relatorio conforme o periodo.
+
+    Relatorios mensais usam o layout do reportlab. Trimestres e anos, com
+    detalhe diario, usam o gerador paginado, que consome as linhas sob demanda
+    e emite o PDF pagina a pagina sem montar o documento inteiro em memoria.
+    """
+    if periodo == "mes":
+        return gerar_pdf_com_grafico(list(linhas), distribuicao_sentimentos)
+    return gerar_pdf_paginado(linhas, distribuicao_sentimentos)
+
+
+@dataclass(frozen=True)
+class RelatorioPreparado:
+    """Conteudo de um relatorio pronto para renderizar.
+
+    Guarda apenas textos e numeros, sem entidades do dominio, entao pode ser
+    renderizado fora da requisicao. A chave identifica o conteudo no cache e
+    nao inclui o cabecalho com a data de geracao.
+    """
+
+    periodo: str
+    nome_arquivo: str
+    linhas: tuple[str, ...]
+    distribuicao_sentimentos: tuple[dict[str, Any], ...]
+    chave: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        if self.periodo not in PERIODOS_RELATORIO:
+            permitidos = ", ".join(f"'{item}'" for item in PERIODOS_RELATORIO)
+            raise ValueError(f"Periodo invalido. Use {permitidos}.")
+
+        chave = CacheArtefatosRelatorio.calcular_chave(
+            chain(
+                [VERSAO_LAYOUT_RELATORIO, self.periodo],
+                (
+                    f"{item.get('codigo')}={item.get('quantidade')}"
+                    for item in self.distribuicao_sentimentos
+                ),
+                self.linhas,
+            )
+        )
+        object.__setattr__(self, "chave", chave)
+
+    def gerar_pdf(self, gerado_em: datetime | None = None) -> Iterator[bytes]:
+        momento = gerado_em or datetime.now()
+        cabecalho = [
+            "Relatorio TeApoio - Visao Geral",
+            f"Gerado em: {momento.strftime('%d/%m/%Y %H:%M')}",
+        ]
+        return gerar_pdf_relatorio(
+            chain(cabecalho, self.linhas),
+            list(self.distribuicao_sentimentos),
+            self.periodo,
+        )
@@ -1,6 +1,13 @@
 from teapoio.infrastructure.flask_app import create_app
 from teapoio.domain.models.item_rotina import ItemRotina
+from teapoio.infrastructure.persistence.Relatorio import RepositorioRelatorio
 from datetime import date, datetime, timedelta
+import io
+import json
+import pytest
+import threading
+import time
+import zipfile
 
 
 def test_api_raiz_retorna_resumo(tmp_path):
@@ -122,6 +129,682 @@ def test_api_fluxo_rotina_item_e_status(tmp_path):
     assert rotina["itens"][0]["status"] == ItemRotina.STATUS_CONCLUIDO
 
 
+def test_api_rotina_usa_versao_e_id_item_para_detectar_conflitos(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+
+    resposta_item = client.post(
+        f"/rotinas/{id_crianca}/itens",
+        json={"data": "2026-03-07", "nome": "Escovar os dentes", "horario": "08:00"},
+    )
+    assert resposta_item.status_code == 201
+    id_item = resposta_item.get_json()["item"]["id_item"]
+    etag_inicial = resposta_item.headers["ETag"]
+
+    resposta_anterior = client.post(
+        f"/rotinas/{id_crianca}/itens",
+        json={"data": "2026-03-07", "nome": "Acordar", "horario": "07:00"},
+        headers={"If-Match": etag_inicial},
+    )
+    assert resposta_anterior.status_code == 201
+    etag_atual = resposta_anterior.headers["ETag"]
+    assert etag_atual != etag_inicial
+
+    resposta_conflito = client.patch(
+        f"/rotinas/{id_crianca}/itens/{id_item}/status",
+        json={"data": "2026-03-07", "status": 1},
+        headers={"If-Match": etag_inicial},
+    )
+    assert resposta_conflito.status_code == 409
+    assert resposta_conflito.headers["ETag"] == etag_atual
+    assert resposta_conflito.get_json()["versao_atual"] == resposta_anterior.get_json()["versao"]
+
+    resposta_status = client.patch(
+        f"/rotinas/{id_crianca}/itens/{id_item}/status",
+        json={"data": "2026-03-07", "status": 1},
+        headers={"If-Match": etag_atual},
+    )
+    assert resposta_status.status_code == 200
+    payload_status = resposta_status.get_json()
+    assert payload_status["indice"] == 1
+    assert payload_status["id_item"] == id_item
+    assert payload_status["status"] == ItemRotina.STATUS_CONCLUIDO
+
+    resposta_inexistente = client.delete(
+        f"/rotinas/{id_crianca}/itens/naoexiste?data=2026-03-07",
+    )
+    assert resposta_inexistente.status_code == 404
+
+    recarregado = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    ).test_client()
+    resposta_rotina = recarregado.get(f"/rotinas/{id_crianca}?data=2026-03-07")
+    rotina = resposta_rotina.get_json()["rotina"]
+    assert resposta_rotina.headers["ETag"] == resposta_status.headers["ETag"]
+    assert rotina["versao"] == payload_status["versao"]
+    assert [item["id_item"] for item in rotina["itens"]][1] == id_item
+
+    resposta_remocao = recarregado.delete(
+        f"/rotinas/{id_crianca}/itens/{id_item}?data=2026-03-07",
+        headers={"If-Match": resposta_rotina.headers["ETag"]},
+    )
+    assert resposta_remocao.status_code == 200
+    rotina = recarregado.get(f"/rotinas/{id_crianca}?data=2026-03-07").get_json()["rotina"]
+    assert [item["nome"] for item in rotina["itens"]] == ["Acordar"]
+
+
+def test_api_alteracao_recusada_nao_cria_rotina_vazia(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+    estado = app.extensions["teapoio_estado"]
+
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+
+    resposta_conflito = client.post(
+        f"/rotinas/{id_crianca}/itens",
+        json={"data": "2026-03-07", "nome": "Escovar os dentes", "horario": "08:00"},
+        headers={"If-Match": '"3"'},
+    )
+    assert resposta_conflito.status_code == 409
+    assert resposta_conflito.get_json()["versao_atual"] == 0
+
+    resposta_status = client.patch(
+        f"/rotinas/{id_crianca}/itens/0/status",
+        json={"data": "2026-03-07", "status": 1},
+    )
+    assert resposta_status.status_code == 404
+
+    resposta_emocao = client.patch(
+        f"/rotinas/{id_crianca}/emocao",
+        json={"data": "2026-03-07", "emocao": "feliz"},
+    )
+    assert resposta_emocao.status_code == 400
+    assert len(estado.rotinas) == 0
+
+    resposta_item = client.post(
+        f"/rotinas/{id_crianca}/itens",
+        json={"data": "2026-03-07", "nome": "Escovar os dentes", "horario": "08:00"},
+        headers={"If-Match": '"0"'},
+    )
+    assert resposta_item.status_code == 201
+    assert [rotina.data_referencia for rotina in estado.rotinas] == [date(2026, 3, 7)]
+    estado_salvo = json.loads((tmp_path / "estado_api.json").read_text(encoding="utf-8"))
+    assert len(estado_salvo["rotinas"]) == 1
+
+
+def test_api_leituras_respondem_304_ate_alteracao_do_estado(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+
+    id_responsavel = _criar_responsavel(client)
+
+    resposta = client.get("/responsaveis")
+    assert resposta.status_code == 200
+    etag = resposta.headers["ETag"]
+    assert "no-cache" in resposta.headers["Cache-Control"]
+    assert resposta.headers["Last-Modified"]
+
+    revalidacao = client.get("/responsaveis", headers={"If-None-Match": etag})
+    assert revalidacao.status_code == 304
+    assert revalidacao.data == b""
+
+    por_data = client.get(
+        "/responsaveis",
+        headers={"If-Modified-Since": resposta.headers["Last-Modified"]},
+    )
+    assert por_data.status_code == 304
+
+    detalhe = client.get(f"/responsaveis/{id_responsavel}")
+    assert detalhe.get_json()["criancas"] == []
+
+    id_crianca = _criar_crianca(client, id_responsavel)
+
+    detalhe = client.get(
+        f"/responsaveis/{id_responsavel}",
+        headers={"If-None-Match": detalhe.headers["ETag"]},
+    )
+    assert detalhe.status_code == 200
+    assert [item["id_crianca"] for item in detalhe.get_json()["criancas"]] == [id_crianca]
+
+    # A listagem de responsaveis nao mudou, entao continua valida.
+    revalidacao = client.get("/responsaveis", headers={"If-None-Match": etag})
+    assert revalidacao.status_code == 304
+
+    rotina = client.get(f"/rotinas/{id_crianca}?data=2026-03-07")
+    assert rotina.status_code == 200
+    etag_rotina = rotina.headers["ETag"]
+    assert client.get(
+        f"/rotinas/{id_crianca}?data=2026-03-07",
+        headers={"If-None-Match": etag_rotina},
+    ).status_code == 304
+
+    client.post(
+        f"/rotinas/{id_crianca}/itens",
+        json={"data": "2026-03-07", "nome": "Escovar os dentes", "horario": "08:00"},
+    )
+    rotina = client.get(
+        f"/rotinas/{id_crianca}?data=2026-03-07",
+        headers={"If-None-Match": etag_rotina},
+    )
+    assert rotina.status_code == 200
+    assert [item["nome"] for item in rotina.get_json()["rotina"]["itens"]] == ["Escovar os dentes"]
+
+    assert client.get("/sugestoes-rotina").headers["ETag"]
+    assert client.get("/responsaveis/999").status_code == 404
+
+
+def test_api_durabilidade_agrupada_grava_em_segundo_plano(tmp_path, monkeypatch):
+    arquivo = tmp_path / "estado_api.json"
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(arquivo),
+            "PERSISTENCIA_DURABILIDADE": "agrupada",
+            "PERSISTENCIA_JANELA_MS": 60000,
+        }
+    )
+    client = app.test_client()
+    estado = app.extensions["teapoio_estado"]
+
+    gravacoes = []
+    salvar_original = RepositorioRelatorio.salvar_estado
+
+    def salvar_contando(self, *args, **kwargs):
+        gravacoes.append(1)
+        return salvar_original(self, *args, **kwargs)
+
+    monkeypatch.setattr(RepositorioRelatorio, "salvar_estado", salvar_contando)
+
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+    for indice in range(5):
+        resposta = client.post(
+            f"/rotinas/{id_crianca}/itens",
+            json={"data": "2026-03-07", "nome": f"Atividade {indice}", "horario": f"{8 + indice:02d}:00"},
+        )
+        assert resposta.status_code == 201
+
+    assert gravacoes == []
+    resposta = client.get(f"/rotinas/{id_crianca}?data=2026-03-07")
+    assert len(resposta.get_json()["rotina"]["itens"]) == 5
+
+    estado.encerrar_persistencia()
+    assert gravacoes == [1]
+    dados = json.loads(arquivo.read_text(encoding="utf-8"))
+    assert len(dados["rotinas"][0]["itens"]) == 5
+
+    resposta = client.post(
+        f"/rotinas/{id_crianca}/itens",
+        json={"data": "2026-03-07", "nome": "Jantar", "horario": "19:00"},
+    )
+    assert resposta.status_code == 201
+    assert gravacoes == [1, 1]
+
+
+def test_api_durabilidade_desconhecida_e_rejeitada(tmp_path):
+    with pytest.raises(ValueError):
+        create_app(
+            {
+                "TESTING": True,
+                "DATA_FILE": str(tmp_path / "estado_api.json"),
+                "PERSISTENCIA_DURABILIDADE": "eventual",
+            }
+        )
+
+
+def test_api_carga_sob_demanda_monta_apenas_rotinas_consultadas(tmp_path):
+    config = {
+        "TESTING": True,
+        "DATA_FILE": str(tmp_path / "estado_api.json"),
+        "CARGA_ROTINAS": "sob_demanda",
+    }
+    client = create_app(config).test_client()
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+    for dia in (2, 3, 20):
+        resposta = client.post(
+            f"/rotinas/{id_crianca}/itens",
+            json={"data": f"2026-03-{dia:02d}", "nome": "Escovar os dentes", "horario": "08:00"},
+        )
+        assert resposta.status_code == 201
+
+    app = create_app(config)
+    client = app.test_client()
+    estado = app.extensions["teapoio_estado"]
+    assert len(estado.rotinas.pendentes()) == 3
+
+    resposta = client.get(f"/rotinas/{id_crianca}?data=2026-03-03")
+    assert resposta.status_code == 200
+    assert resposta.get_json()["rotina"]["itens"][0]["nome"] == "Escovar os dentes"
+    assert len(estado.rotinas.pendentes()) == 2
+
+    estado.rotinas.carregar_periodo(id_crianca, date(2026, 3, 1), date(2026, 3, 31))
+    assert estado.agregador_evolucao.evolucao_mes(id_crianca, date(2026, 3, 1)).total_itens == 3
+
+
+def test_web_onboarding_nao_monta_historico_inteiro_com_carga_sob_demanda(tmp_path):
+    config = {
+        "TESTING": True,
+        "DATA_FILE": str(tmp_path / "estado_api.json"),
+        "CARGA_ROTINAS": "sob_demanda",
+    }
+    client = create_app(config).test_client()
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+    for dia in range(1, 11):
+        resposta = client.post(
+            f"/rotinas/{id_crianca}/itens",
+            json={
+                "data": f"2026-03-{dia:02d}",
+                "nome": "Escovar os dentes",
+                "horario": "08:00",
+                "observacao": "Com apoio visual" if dia == 10 else "",
+            },
+        )
+        assert resposta.status_code == 201
+
+    app = create_app(config)
+    client = app.test_client()
+    estado = app.extensions["teapoio_estado"]
+    with client.session_transaction() as sessao:
+        sessao["responsavel_id"] = id_responsavel
+
+    resposta = client.get("/")
+
+    assert resposta.status_code == 200
+    assert len(estado.rotinas.carregadas()) == 1
+    assert len(estado.rotinas.pendentes()) == 9
+
+
+def test_api_lote_de_rotinas_grava_uma_unica_vez(tmp_path, monkeypatch):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+
+    gravacoes = []
+    salvar_original = RepositorioRelatorio.salvar_estado
+
+    def salvar_contando(self, *args, **kwargs):
+        gravacoes.append(1)
+        return salvar_original(self, *args, **kwargs)
+
+    monkeypatch.setattr(RepositorioRelatorio, "salvar_estado", salvar_contando)
+
+    itens = [
+        {"nome": f"Atividade {indice}", "horario": f"{7 + indice:02d}:00"}
+        for indice in range(15)
+    ]
+    resposta = client.post(
+        "/rotinas/lote",
+        json={"rotinas": [{"id_crianca": id_crianca, "data": "2026-03-07", "adicionar": itens}]},
+    )
+    assert resposta.status_code == 200
+    assert len(gravacoes) == 1
+    rotina = resposta.get_json()["rotinas"][0]
+    assert len(rotina["itens"]) == 15
+    primeiro, segundo = rotina["itens"][0]["id_item"], rotina["itens"][1]["id_item"]
+
+    resposta_invalida = client.post(
+        "/rotinas/lote",
+        json={
+            "rotinas": [
+                {
+                    "id_crianca": id_crianca,
+                    "data": "2026-03-07",
+                    "status": [{"id_item": primeiro, "status": 1}],
+                    "adicionar": [{"nome": "Repetido", "horario": "08:00"}],
+                }
+            ]
+        },
+    )
+    assert resposta_invalida.status_code == 400
+    assert len(gravacoes) == 1
+
+    resposta_conflito = client.post(
+        "/rotinas/lote",
+        json={
+            "rotinas": [
+                {"id_crianca": id_crianca, "data": "2026-03-07", "versao": 0, "remover": [{"indice": 0}]}
+            ]
+        },
+    )
+    assert resposta_conflito.status_code == 409
+    assert resposta_conflito.get_json()["versao_atual"] == rotina["versao"]
+    for versao_invalida in (str(rotina["versao"]), float(rotina["versao"]), True):
+        resposta_versao = client.post(
+            "/rotinas/lote",
+            json={
+                "rotinas": [
+                    {
+                        "id_crianca": id_crianca,
+                        "data": "2026-03-07",
+                        "versao": versao_invalida,
+                        "remover": [{"indice": 0}],
+                    }
+                ]
+            },
+        )
+        assert resposta_versao.status_code == 400
+
+    resposta = client.post(
+        "/rotinas/lote",
+        json={
+            "rotinas": [
+                {
+                    "id_crianca": id_crianca,
+                    "data": "2026-03-07",
+                    "versao": rotina["versao"],
+                    "status": [{"id_item": primeiro, "status": 1}],
+                    "remover": [{"id_item": segundo}],
+                },
+                {"id_crianca": id_crianca, "data": "2026-03-08", "adicionar": itens[:2]},
+            ]
+        },
+    )
+    assert resposta.status_code == 200
+    assert len(gravacoes) == 2
+    dia, dia_seguinte = resposta.get_json()["rotinas"]
+    assert len(dia["itens"]) == 14
+    assert dia["itens"][0]["status"] == ItemRotina.STATUS_CONCLUIDO
+    assert segundo not in [item["id_item"] for item in dia["itens"]]
+    assert [item["nome"] for item in dia_seguinte["itens"]] == ["Atividade 0", "Atividade 1"]
+
+    assert client.post("/rotinas/lote", json={"rotinas": []}).status_code == 400
+    assert client.post(
+        "/rotinas/lote",
+        json={"rotinas": [{"id_crianca": id_crianca, "data": "2026-01-05"}]},
+    ).status_code == 400
+    assert len(gravacoes) == 2
+    assert app.extensions["teapoio_estado"].rotinas.buscar(id_crianca, date(2026, 1, 5)) is None
+    assert client.post(
+        "/rotinas/lote",
+        json={"rotinas": [{"id_crianca": "999", "adicionar": itens[:1]}]},
+    ).status_code == 404
+
+
+def test_api_modelo_rotina_aplicado_em_intervalo_com_uma_gravacao(tmp_path, monkeypatch):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+    for nome, horario in (("Acordar", "07:00"), ("Escovar os dentes", "07:30")):
+        client.post(
+            f"/rotinas/{id_crianca}/itens",
+            json={"data": "2026-03-02", "nome": nome, "horario": horario},
+        )
+
+    resposta = client.put(
+        f"/criancas/{id_crianca}/modelos-rotina/Dia de escola",
+        json={"a_partir_de": "2026-03-02"},
+    )
+    assert resposta.status_code == 201
+    assert [item["horario"] for item in resposta.get_json()["modelo"]["itens"]] == ["07:00", "07:30"]
+
+    gravacoes = []
+    salvar_original = RepositorioRelatorio.salvar_estado
+
+    def salvar_contando(self, *args, **kwargs):
+        gravacoes.append(1)
+        return salvar_original(self, *args, **kwargs)
+
+    monkeypatch.setattr(RepositorioRelatorio, "salvar_estado", salvar_contando)
+
+    resposta = client.post(
+        f"/criancas/{id_crianca}/modelos-rotina/Dia de escola/aplicar",
+        json={"inicio": "2026-03-02", "fim": "2026-03-31", "dias_semana": [0, 1, 2, 3, 4]},
+    )
+    assert resposta.status_code == 200
+    payload = resposta.get_json()
+    # O dia de origem ja tinha os itens e fica de fora.
+    assert payload["rotinas_alteradas"] == 21
+    assert "2026-03-02" not in payload["datas"]
+    assert "2026-03-07" not in payload["datas"]
+    assert len(gravacoes) == 1
+
+    reaplicacao = client.post(
+        f"/criancas/{id_crianca}/modelos-rotina/Dia de escola/aplicar",
+        json={"inicio": "2026-03-02", "fim": "2026-03-31"},
+    )
+    assert reaplicacao.get_json()["rotinas_alteradas"] == 8
+    assert len(gravacoes) == 2
+
+    rotina = client.get(f"/rotinas/{id_crianca}?data=2026-03-20").get_json()["rotina"]
+    assert [item["nome"] for item in rotina["itens"]] == ["Acordar", "Escovar os dentes"]
+    assert all(item["status"] == ItemRotina.STATUS_PENDENTE for item in rotina["itens"])
+
+    recarregado = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    ).test_client()
+    modelos = recarregado.get(f"/criancas/{id_crianca}/modelos-rotina").get_json()["modelos"]
+    assert [modelo["nome"] for modelo in modelos] == ["Dia de escola"]
+
+    assert client.post(
+        f"/criancas/{id_crianca}/modelos-rotina/Dia de escola/aplicar",
+        json={"inicio": "2026-03-31", "fim": "2026-03-01"},
+    ).status_code == 400
+    assert client.put(
+        f"/criancas/{id_crianca}/modelos-rotina/Vazio",
+        json={"itens": []},
+    ).status_code == 400
+    assert client.delete(f"/criancas/{id_crianca}/modelos-rotina/Dia de escola").status_code == 200
+    assert client.post(
+        f"/criancas/{id_crianca}/modelos-rotina/Dia de escola/aplicar",
+        json={"inicio": "2026-03-02"},
+    ).status_code == 404
+
+
+def test_api_lista_responsaveis_paginada_com_filtro_e_campos(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+
+    for nome, email in (
+        ("Maria Silva", "maria@example.com"),
+        ("Marcos Lima", "marcos@example.com"),
+        ("Ana Costa", "ana@example.com"),
+    ):
+        resposta = client.post(
+            "/responsaveis",
+            json={"nome": nome, "data_nascimento": "01/01/1985", "email": email, "senha": "senha123"},
+        )
+        assert resposta.status_code == 201
+
+    primeira = client.get("/responsaveis?limite=2&campos=nome").get_json()
+    assert primeira["responsaveis"] == [{"nome": "Ana Costa"}, {"nome": "Marcos Lima"}]
+    assert primeira["proximo_cursor"]
+
+    segunda = client.get(
+        f"/responsaveis?limite=2&campos=nome&cursor={primeira['proximo_cursor']}"
+    ).get_json()
+    assert segunda == {"responsaveis": [{"nome": "Maria Silva"}], "proximo_cursor": None}
+
+    por_nome = client.get("/responsaveis?nome=mar").get_json()
+    assert [item["email"] for item in por_nome["responsaveis"]] == [
+        "marcos@example.com",
+        "maria@example.com",
+    ]
+    por_email = client.get("/responsaveis?email=ANA&campos=id_responsavel,email").get_json()
+    assert [set(item) for item in por_email["responsaveis"]] == [{"id_responsavel", "email"}]
+
+    assert client.get("/responsaveis?limite=0").status_code == 400
+    assert client.get("/responsaveis?campos=senha").status_code == 400
+    assert client.get("/responsaveis?cursor=invalido").status_code == 400
+    assert client.get(
+        f"/responsaveis?ordem=email&cursor={primeira['proximo_cursor']}"
+    ).status_code == 400
+
+
+def test_api_historico_rotinas_transmite_linhas_sem_gravar(tmp_path, monkeypatch):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+    resposta = client.post(
+        "/rotinas/lote",
+        json={
+            "rotinas": [
+                {
+                    "id_crianca": id_crianca,
+                    "data": data,
+                    "adicionar": [{"nome": "Escovar os dentes", "horario": "08:00"}],
+                }
+                for data in ("2026-03-10", "2026-03-02", "2026-04-01")
+            ]
+        },
+    )
+    assert resposta.status_code == 200
+    client.patch(
+        f"/rotinas/{id_crianca}/itens/0/status",
+        json={"data": "2026-03-10", "status": 1},
+    )
+
+    gravacoes = []
+    monkeypatch.setattr(
+        RepositorioRelatorio,
+        "salvar_estado",
+        lambda self, *args, **kwargs: gravacoes.append(1),
+    )
+
+    resposta = client.get(f"/rotinas/{id_crianca}/historico?inicio=2026-03-01&fim=2026-03-31")
+    assert resposta.status_code == 200
+    assert resposta.mimetype == "application/x-ndjson"
+    linhas = [json.loads(linha) for linha in resposta.get_data(as_text=True).splitlines()]
+    assert [linha["data_referencia"] for linha in linhas] == ["2026-03-02", "2026-03-10"]
+    assert linhas[1]["concluidos"] == 1
+    assert linhas[1]["percentual_concluido"] == 100.0
+    assert "itens" not in linhas[0]
+
+    completo = client.get(
+        f"/rotinas/{id_crianca}/historico?inicio=2026-03-01&fim=2026-04-30&detalhe=completo"
+    )
+    linhas = [json.loads(linha) for linha in completo.get_data(as_text=True).splitlines()]
+    assert len(linhas) == 3
+    assert linhas[2]["itens"][0]["nome"] == "Escovar os dentes"
+
+    vazio = client.get(f"/rotinas/{id_crianca}/historico?inicio=2026-05-01&fim=2026-05-31")
+    assert vazio.status_code == 200
+    assert vazio.get_data() == b""
+    assert gravacoes == []
+
+    assert client.get(
+        f"/rotinas/{id_crianca}/historico?inicio=2026-03-31&fim=2026-03-01"
+    ).status_code == 400
+    assert client.get(
+        f"/rotinas/{id_crianca}/historico?inicio=2025-01-01&fim=2026-03-01"
+    ).status_code == 400
+    assert client.get(f"/rotinas/{id_crianca}/historico?detalhe=tudo").status_code == 400
+    assert client.get("/rotinas/999/historico").status_code == 404
+
+
+def test_visualizar_dia_sem_rotina_nao_cria_nem_grava(tmp_path, monkeypatch):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+
+    client.post(
+        "/web/responsavel/cadastrar",
+        data={
+            "nome": "Maria Silva",
+            "data_nascimento": "01/01/1985",
+            "email": "maria@example.com",
+            "senha": "maria123",
+        },
+    )
+    client.post(
+        "/web/crianca/cadastrar",
+        data={"nome": "Ana Souza", "data_nascimento": "10/07/2015", "nivel_suporte": "2"},
+    )
+    id_crianca = _extrair_primeiro_id_crianca_html(
+        client.get("/?secao=criancas").get_data(as_text=True)
+    )
+
+    gravacoes = []
+    salvar_original = RepositorioRelatorio.salvar_estado
+
+    def salvar_contando(self, *args, **kwargs):
+        gravacoes.append(1)
+        return salvar_original(self, *args, **kwargs)
+
+    monkeypatch.setattr(RepositorioRelatorio, "salvar_estado", salvar_contando)
+
+    hoje = date.today()
+    for dias in range(3):
+        data_texto = (hoje - timedelta(days=dias)).isoformat()
+        pagina = client.get(f"/?secao=rotina&data_rotina={data_texto}")
+        assert pagina.status_code == 200
+        rotina = client.get(f"/rotinas/{id_crianca}?data={data_texto}")
+        assert rotina.get_json()["rotina"]["itens"] == []
+        assert rotina.headers["ETag"] == '"0"'
+    pdf = client.get(f"/web/relatorio/pdf?id_crianca={id_crianca}&data={hoje.isoformat()}")
+    assert pdf.status_code == 200
+
+    assert gravacoes == []
+    estado_salvo = json.loads((tmp_path / "estado_api.json").read_text(encoding="utf-8"))
+    assert estado_salvo.get("rotinas", []) == []
+
+    resposta = client.post(
+        f"/rotinas/{id_crianca}/itens",
+        json={"data": hoje.isoformat(), "nome": "Escovar os dentes", "horario": "08:00"},
+        headers={"If-Match": '"0"'},
+    )
+    assert resposta.status_code == 201
+    assert len(gravacoes) == 1
+    estado_salvo = json.loads((tmp_path / "estado_api.json").read_text(encoding="utf-8"))
+    assert [rotina["data_referencia"] for rotina in estado_salvo["rotinas"]] == [hoje.isoformat()]
+
+
 def test_api_perfil_sensorial(tmp_path):
     app = create_app(
         {
@@ -153,6 +836,23 @@ def test_api_perfil_sensorial(tmp_path):
     assert perfil["hiperfocos"] == ["dinossauros"]
 
 
+def test_api_cache_de_perfil_sensorial_acompanha_troca_do_perfil_ativo(tmp_path):
+    client = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    ).test_client()
+    _, id_crianca, _, id_crianca_outra = _criar_familia_com_perfil_sensorial(client)
+    assert client.get(f"/criancas/{id_crianca}/perfil-sensorial").status_code == 200
+
+    # Payload invalido: nada e gravado, mas o perfil ativo passa a ser o da outra familia.
+    resposta = client.put(f"/criancas/{id_crianca_outra}/perfil-sensorial", json={"hiperfocos": 5})
+    assert resposta.status_code == 400
+
+    assert client.get(f"/criancas/{id_crianca}/perfil-sensorial").status_code == 404
+
+
 def test_api_retorna_erro_para_payload_invalido(tmp_path):
     app = create_app(
         {
@@ -808,6 +1508,51 @@ def test_web_calendario_seleciona_data(tmp_path):
     assert "2026-03-06" in resposta.get_data(as_text=True)
 
 
+def test_web_pagina_inicial_guarda_data_do_calendario_na_sessao_com_trava_de_leitura(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+    estado = app.extensions["teapoio_estado"]
+    client.post(
+        "/web/responsavel/cadastrar",
+        data={
+            "nome": "Maria Silva",
+            "data_nascimento": "01/01/1985",
+            "email": "maria@example.com",
+            "senha": "maria123",
+        },
+    )
+    client.post(
+        "/web/crianca/cadastrar",
+        data={"nome": "Ana Souza", "data_nascimento": "10/07/2015", "nivel_suporte": "2"},
+    )
+    data_inicial = estado.data_calendario
+    gravacoes = estado.gravacoes
+    respostas = []
+
+    # Com a trava de leitura ocupada, so uma rota de leitura consegue terminar.
+    with estado.trava.leitura():
+        leitura = threading.Thread(
+            target=lambda: respostas.append(
+                client.get("/?secao=rotina&data_rotina=2026-03-06")
+            )
+        )
+        leitura.start()
+        leitura.join(timeout=5)
+        assert not leitura.is_alive()
+
+    assert respostas[0].status_code == 200
+    assert "2026-03-06" in respostas[0].get_data(as_text=True)
+    assert estado.data_calendario == data_inicial
+    assert estado.gravacoes == gravacoes
+    with client.session_transaction() as sessao:
+        assert sessao["data_calendario"] == "2026-03-06"
+
+
 def test_web_rotina_mostra_evolucao_periodo(tmp_path):
     app = create_app(
         {
@@ -856,7 +1601,242 @@ def test_web_rotina_mostra_evolucao_periodo(tmp_path):
     assert resposta.status_code == 200
     assert "Evolucao por periodo" in resposta.get_data(as_text=True)
 
-def test_web_salva_observacao_rapida_item_rotina(tmp_path):
+def test_web_salva_observacao_rapida_item_rotina(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+
+    cadastro_responsavel = client.post(
+        "/web/responsavel/cadastrar",
+        data={
+            "nome": "Maria Silva",
+            "data_nascimento": "01/01/1985",
+            "email": "maria@example.com",
+            "senha": "maria123",
+        },
+        follow_redirects=False,
+    )
+    assert cadastro_responsavel.status_code == 302
+
+    cadastro_crianca = client.post(
+        "/web/crianca/cadastrar",
+        data={
+            "nome": "Ana Souza",
+            "data_nascimento": "10/07/2015",
+            "nivel_suporte": "2",
+        },
+        follow_redirects=False,
+    )
+    assert cadastro_crianca.status_code == 302
+
+    base = date.today().isoformat()
+    item_rotina = client.post(
+        "/web/rotina/item",
+        data={
+            "data": base,
+            "nome": "Anotar algo",
+            "horario": "08:00",
+        },
+        follow_redirects=False,
+    )
+    assert item_rotina.status_code == 302
+
+    resposta = client.post(
+        "/web/rotina/item/observacao",
+        data={
+            "data": base,
+            "indice": "0",
+            "observacao": "Teve boa resposta ao estimulo.",
+        },
+        follow_redirects=True,
+    )
+    assert resposta.status_code == 200
+    texto = resposta.get_data(as_text=True)
+    assert "Observacao salva com sucesso." in texto
+    assert "Teve boa resposta ao estimulo." in texto
+
+
+def test_web_mostra_alerta_tempo_item_pendente(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+
+    cadastro = client.post(
+        "/web/responsavel/cadastrar",
+        data={
+            "nome": "Maria Silva",
+            "data_nascimento": "01/01/1985",
+            "email": "maria@example.com",
+            "senha": "maria123",
+        },
+        follow_redirects=False,
+    )
+    assert cadastro.status_code == 302
+
+    cadastro_crianca = client.post(
+        "/web/crianca/cadastrar",
+        data={
+            "nome": "Ana Souza",
+            "data_nascimento": "10/07/2015",
+            "nivel_suporte": "2",
+        },
+        follow_redirects=False,
+    )
+    assert cadastro_crianca.status_code == 302
+
+    base = date.today().isoformat()
+    horario_futuro = (datetime.now() + timedelta(minutes=10)).strftime("%H:%M")
+    client.post(
+        "/web/rotina/item",
+        data={
+            "data": base,
+            "nome": "Tarefa com horario futuro",
+            "horario": horario_futuro,
+        },
+        follow_redirects=False,
+    )
+
+    resposta = client.get(f"/?secao=rotina&data_rotina={base}")
+    texto = resposta.get_data(as_text=True)
+    assert resposta.status_code == 200
+    assert "Falta" in texto
+    assert "Atrasada ha" not in texto
+
+
+def test_web_exporta_relatorio_pdf(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+
+    cadastro = client.post(
+        "/web/responsavel/cadastrar",
+        data={
+            "nome": "Maria Silva",
+            "data_nascimento": "01/01/1985",
+            "email": "maria@example.com",
+            "senha": "maria123",
+        },
+        follow_redirects=False,
+    )
+    assert cadastro.status_code == 302
+
+    cadastro_crianca = client.post(
+        "/web/crianca/cadastrar",
+        data={
+            "nome": "Ana Souza",
+            "data_nascimento": "10/07/2015",
+            "nivel_suporte": "2",
+        },
+        follow_redirects=False,
+    )
+    assert cadastro_crianca.status_code == 302
+
+    pagina = client.get("/?secao=criancas")
+    id_crianca = _extrair_primeiro_id_crianca_html(pagina.get_data(as_text=True))
+
+    hoje = date.today()
+    base = hoje.replace(day=1).isoformat()
+    dia_2 = hoje.replace(day=2).isoformat()
+    dia_3 = hoje.replace(day=3).isoformat()
+
+    client.post(
+        "/web/rotina/sentimento",
+        data={"data": base, "sentimento": "bem"},
+        follow_redirects=False,
+    )
+    client.post(
+        "/web/rotina/sentimento",
+        data={"data": dia_2, "sentimento": "bem"},
+        follow_redirects=False,
+    )
+    client.post(
+        "/web/rotina/sentimento",
+        data={"data": dia_3, "sentimento": "cansativo"},
+        follow_redirects=False,
+    )
+
+    resposta = client.get(f"/web/relatorio/pdf?id_crianca={id_crianca}&data={base}")
+
+    assert resposta.status_code == 200
+    assert "application/pdf" in resposta.content_type
+    assert "attachment;" in resposta.headers.get("Content-Disposition", "")
+    assert resposta.data.startswith(b"%PDF")
+    assert len(resposta.data) > 1200
+
+
+def test_web_exporta_relatorio_pdf_anual_paginado_com_detalhe_diario(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+
+    client.post(
+        "/web/responsavel/cadastrar",
+        data={
+            "nome": "Maria Silva",
+            "data_nascimento": "01/01/1985",
+            "email": "maria@example.com",
+            "senha": "maria123",
+        },
+        follow_redirects=False,
+    )
+    client.post(
+        "/web/crianca/cadastrar",
+        data={
+            "nome": "Ana Souza",
+            "data_nascimento": "10/07/2015",
+            "nivel_suporte": "2",
+        },
+        follow_redirects=False,
+    )
+    pagina = client.get("/?secao=criancas")
+    id_crianca = _extrair_primeiro_id_crianca_html(pagina.get_data(as_text=True))
+
+    ano = date.today().year - 1
+    inicio = date(ano, 1, 1)
+    for deslocamento in range(0, 360, 4):
+        dia = (inicio + timedelta(days=deslocamento)).isoformat()
+        for horario in ("08:00", "12:00"):
+            resposta_item = client.post(
+                f"/rotinas/{id_crianca}/itens",
+                json={"data": dia, "nome": "Atividade", "horario": horario},
+            )
+            assert resposta_item.status_code == 201
+
+    resposta = client.get(
+        f"/web/relatorio/pdf?id_crianca={id_crianca}&data={ano}-12-31&periodo=ano"
+    )
+
+    assert resposta.status_code == 200
+    assert resposta.is_streamed
+    assert "application/pdf" in resposta.content_type
+    assert f"relatorio_{id_crianca}_ano_{ano}-12-31.pdf" in resposta.headers["Content-Disposition"]
+    pdf = resposta.data
+    assert pdf.startswith(b"%PDF")
+    assert pdf.rstrip().endswith(b"%%EOF")
+    assert b"RESUMO ANUAL" in pdf
+    assert b"DETALHE POR DIA" in pdf
+    ultimo_dia = inicio + timedelta(days=356)
+    assert ultimo_dia.strftime("%d/%m/%Y").encode() in pdf
+    assert pdf.count(b"/Type /Page ") > 3
+
+
+def test_web_relatorio_pdf_recusa_periodo_invalido(tmp_path):
     app = create_app(
         {
             "TESTING": True,
@@ -865,7 +1845,7 @@ def test_web_salva_observacao_rapida_item_rotina(tmp_path):
     )
     client = app.test_client()
 
-    cadastro_responsavel = client.post(
+    client.post(
         "/web/responsavel/cadastrar",
         data={
             "nome": "Maria Silva",
@@ -875,9 +1855,7 @@ def test_web_salva_observacao_rapida_item_rotina(tmp_path):
         },
         follow_redirects=False,
     )
-    assert cadastro_responsavel.status_code == 302
-
-    cadastro_crianca = client.post(
+    client.post(
         "/web/crianca/cadastrar",
         data={
             "nome": "Ana Souza",
@@ -886,45 +1864,23 @@ def test_web_salva_observacao_rapida_item_rotina(tmp_path):
         },
         follow_redirects=False,
     )
-    assert cadastro_crianca.status_code == 302
 
-    base = date.today().isoformat()
-    item_rotina = client.post(
-        "/web/rotina/item",
-        data={
-            "data": base,
-            "nome": "Anotar algo",
-            "horario": "08:00",
-        },
-        follow_redirects=False,
-    )
-    assert item_rotina.status_code == 302
+    resposta = client.get("/web/relatorio/pdf?periodo=decada")
 
-    resposta = client.post(
-        "/web/rotina/item/observacao",
-        data={
-            "data": base,
-            "indice": "0",
-            "observacao": "Teve boa resposta ao estimulo.",
-        },
-        follow_redirects=True,
-    )
-    assert resposta.status_code == 200
-    texto = resposta.get_data(as_text=True)
-    assert "Observacao salva com sucesso." in texto
-    assert "Teve boa resposta ao estimulo." in texto
+    assert resposta.status_code == 302
 
 
-def test_web_mostra_alerta_tempo_item_pendente(tmp_path):
+def test_web_relatorio_pdf_reaproveita_cache_e_responde_etag(tmp_path):
     app = create_app(
         {
             "TESTING": True,
             "DATA_FILE": str(tmp_path / "estado_api.json"),
+            "RELATORIO_CACHE_DIR": str(tmp_path / "cache_pdf"),
         }
     )
     client = app.test_client()
 
-    cadastro = client.post(
+    client.post(
         "/web/responsavel/cadastrar",
         data={
             "nome": "Maria Silva",
@@ -934,9 +1890,7 @@ def test_web_mostra_alerta_tempo_item_pendente(tmp_path):
         },
         follow_redirects=False,
     )
-    assert cadastro.status_code == 302
-
-    cadastro_crianca = client.post(
+    client.post(
         "/web/crianca/cadastrar",
         data={
             "nome": "Ana Souza",
@@ -945,90 +1899,294 @@ def test_web_mostra_alerta_tempo_item_pendente(tmp_path):
         },
         follow_redirects=False,
     )
-    assert cadastro_crianca.status_code == 302
+    pagina = client.get("/?secao=criancas")
+    id_crianca = _extrair_primeiro_id_crianca_html(pagina.get_data(as_text=True))
+    base = date.today().replace(day=1).isoformat()
+    url = f"/web/relatorio/pdf?id_crianca={id_crianca}&data={base}"
+
+    primeira = client.get(url)
+    etag = primeira.headers["ETag"]
+    conteudo = primeira.data
+    arquivos = list((tmp_path / "cache_pdf").glob("*.pdf"))
+
+    segunda = client.get(url)
+    nao_modificada = client.get(url, headers={"If-None-Match": etag})
+
+    assert len(arquivos) == 1
+    assert arquivos[0].read_bytes() == conteudo
+    assert segunda.status_code == 200
+    assert "Last-Modified" not in primeira.headers
+    assert "Last-Modified" in segunda.headers
+    assert segunda.headers["ETag"] == etag
+    assert segunda.data == conteudo
+    assert "attachment;" in segunda.headers.get("Content-Disposition", "")
+    assert nao_modificada.status_code == 304
 
-    base = date.today().isoformat()
-    horario_futuro = (datetime.now() + timedelta(minutes=10)).strftime("%H:%M")
     client.post(
-        "/web/rotina/item",
-        data={
-            "data": base,
-            "nome": "Tarefa com horario futuro",
-            "horario": horario_futuro,
-        },
+        "/web/rotina/sentimento",
+        data={"data": base, "sentimento": "bem"},
         follow_redirects=False,
     )
+    alterada = client.get(url, headers={"If-None-Match": etag})
 
-    resposta = client.get(f"/?secao=rotina&data_rotina={base}")
-    texto = resposta.get_data(as_text=True)
-    assert resposta.status_code == 200
-    assert "Falta" in texto
-    assert "Atrasada ha" not in texto
+    assert alterada.status_code == 200
+    assert alterada.headers["ETag"] != etag
+    assert alterada.data.startswith(b"%PDF")
 
 
-def test_web_exporta_relatorio_pdf(tmp_path):
+def test_api_enfileira_relatorio_e_disponibiliza_download(tmp_path):
     app = create_app(
         {
             "TESTING": True,
             "DATA_FILE": str(tmp_path / "estado_api.json"),
+            "RELATORIO_CACHE_DIR": str(tmp_path / "cache_pdf"),
         }
     )
     client = app.test_client()
 
-    cadastro = client.post(
-        "/web/responsavel/cadastrar",
-        data={
-            "nome": "Maria Silva",
-            "data_nascimento": "01/01/1985",
-            "email": "maria@example.com",
-            "senha": "maria123",
-        },
-        follow_redirects=False,
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+    data_ref = date.today().replace(day=1).isoformat()
+
+    resposta = client.post(
+        "/relatorios",
+        json={"id_crianca": id_crianca, "data": data_ref, "periodo": "trimestre"},
+    )
+    assert resposta.status_code == 202
+    tarefa = resposta.get_json()["tarefa"]
+    assert tarefa["periodo"] == "trimestre"
+    assert resposta.headers["Location"] == resposta.get_json()["url_status"]
+
+    limite = time.monotonic() + 10
+    status = client.get(resposta.get_json()["url_status"]).get_json()
+    while status["tarefa"]["status"] in ("pendente", "processando") and time.monotonic() < limite:
+        time.sleep(0.02)
+        status = client.get(resposta.get_json()["url_status"]).get_json()
+
+    assert status["tarefa"]["status"] == "concluido"
+    download = client.get(status["url_download"])
+    assert download.status_code == 200
+    assert "application/pdf" in download.content_type
+    assert download.data.startswith(b"%PDF")
+    assert tarefa["nome_arquivo"] in download.headers["Content-Disposition"]
+    assert len(list((tmp_path / "cache_pdf").glob("*.pdf"))) == 1
+
+
+def test_api_relatorio_enfileirado_valida_entrada(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
     )
-    assert cadastro.status_code == 302
+    client = app.test_client()
 
-    cadastro_crianca = client.post(
-        "/web/crianca/cadastrar",
-        data={
-            "nome": "Ana Souza",
-            "data_nascimento": "10/07/2015",
-            "nivel_suporte": "2",
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+
+    assert client.post("/relatorios", json={"id_crianca": "000000"}).status_code == 404
+    assert (
+        client.post(
+            "/relatorios",
+            json={"id_crianca": id_crianca, "periodo": "semestre"},
+        ).status_code
+        == 400
+    )
+    assert client.get("/relatorios/inexistente").status_code == 404
+    assert client.get("/relatorios/inexistente/pdf").status_code == 404
+
+
+def _criar_familia_com_perfil_sensorial(client):
+    """Cria duas familias; o perfil ativo fica com a primeira, com perfil sensorial."""
+    resposta = client.post(
+        "/responsaveis",
+        json={
+            "nome": "Joao Lima",
+            "data_nascimento": "02/02/1980",
+            "email": "joao@example.com",
+            "senha": "joao1234",
         },
-        follow_redirects=False,
     )
-    assert cadastro_crianca.status_code == 302
+    id_outro = resposta.get_json()["responsavel"]["id_responsavel"]
+    id_crianca_outra = _criar_crianca(client, id_outro)
 
-    pagina = client.get("/?secao=criancas")
-    id_crianca = _extrair_primeiro_id_crianca_html(pagina.get_data(as_text=True))
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+    resposta = client.put(
+        f"/criancas/{id_crianca}/perfil-sensorial",
+        json={"hiperfocos": ["dinossauros"]},
+    )
+    assert resposta.status_code == 200
+    return id_responsavel, id_crianca, id_outro, id_crianca_outra
 
-    hoje = date.today()
-    base = hoje.replace(day=1).isoformat()
-    dia_2 = hoje.replace(day=2).isoformat()
-    dia_3 = hoje.replace(day=3).isoformat()
 
-    client.post(
-        "/web/rotina/sentimento",
-        data={"data": base, "sentimento": "bem"},
-        follow_redirects=False,
+def test_api_relatorio_enfileirado_nao_troca_perfil_ativo(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+            "RELATORIO_CACHE_DIR": str(tmp_path / "cache_pdf"),
+        }
     )
-    client.post(
-        "/web/rotina/sentimento",
-        data={"data": dia_2, "sentimento": "bem"},
-        follow_redirects=False,
+    client = app.test_client()
+    estado = app.extensions["teapoio_estado"]
+    id_responsavel, id_crianca, _, id_crianca_outra = _criar_familia_com_perfil_sensorial(client)
+
+    resposta = client.post("/relatorios", json={"id_crianca": id_crianca_outra})
+
+    assert resposta.status_code == 202
+    assert estado.perfil.responsavel.id_responsavel == id_responsavel
+    assert estado.perfil.obter_perfil_sensorial(id_crianca) is not None
+    _criar_crianca(client, id_responsavel)
+    estado_salvo = json.loads((tmp_path / "estado_api.json").read_text(encoding="utf-8"))
+    assert [item["id_crianca"] for item in estado_salvo["perfil"]["perfis_sensoriais"]] == [id_crianca]
+
+
+def test_api_exporta_relatorios_em_lote_para_responsavel(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+            "RELATORIO_CACHE_DIR": str(tmp_path / "cache_pdf"),
+            "RELATORIO_PROCESSOS": 2,
+        }
     )
-    client.post(
-        "/web/rotina/sentimento",
-        data={"data": dia_3, "sentimento": "cansativo"},
-        follow_redirects=False,
+    client = app.test_client()
+
+    id_responsavel = _criar_responsavel(client)
+    ids_criancas = [_criar_crianca(client, id_responsavel) for _ in range(3)]
+    data_ref = date.today().replace(day=1).isoformat()
+
+    resposta = client.post(
+        "/relatorios/lote",
+        json={"id_responsavel": id_responsavel, "data": data_ref},
     )
 
-    resposta = client.get(f"/web/relatorio/pdf?id_crianca={id_crianca}&data={base}")
+    assert resposta.status_code == 200
+    assert "application/zip" in resposta.content_type
+    with zipfile.ZipFile(io.BytesIO(resposta.data)) as arquivo_zip:
+        nomes = sorted(arquivo_zip.namelist())
+        assert nomes == sorted(f"relatorio_{id_crianca}_{data_ref}.pdf" for id_crianca in ids_criancas)
+        assert all(arquivo_zip.read(nome).startswith(b"%PDF") for nome in nomes)
+    assert len(list((tmp_path / "cache_pdf").glob("*.pdf"))) == 3
+
+    estado_salvo = json.loads((tmp_path / "estado_api.json").read_text(encoding="utf-8"))
+    assert estado_salvo["rotinas"] == []
+
+    repetida = client.post("/relatorios/lote", json={"data": data_ref})
+    assert repetida.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(repetida.data)) as arquivo_zip:
+        assert len(arquivo_zip.namelist()) == 3
+
+
+def test_api_exporta_relatorios_em_lote_sem_trocar_perfil_ativo(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+            "RELATORIO_CACHE_DIR": str(tmp_path / "cache_pdf"),
+        }
+    )
+    client = app.test_client()
+    estado = app.extensions["teapoio_estado"]
+    id_responsavel, id_crianca, _, _ = _criar_familia_com_perfil_sensorial(client)
+
+    resposta = client.post("/relatorios/lote", json={})
 
     assert resposta.status_code == 200
-    assert "application/pdf" in resposta.content_type
-    assert "attachment;" in resposta.headers.get("Content-Disposition", "")
-    assert resposta.data.startswith(b"%PDF")
-    assert len(resposta.data) > 1200
+    with zipfile.ZipFile(io.BytesIO(resposta.data)) as arquivo_zip:
+        assert len(arquivo_zip.namelist()) == 2
+    assert estado.perfil.responsavel.id_responsavel == id_responsavel
+    assert estado.perfil.obter_perfil_sensorial(id_crianca) is not None
+    # A trava de leitura foi liberada pela propria rota.
+    with estado.trava.escrita():
+        pass
+
+
+def test_api_exporta_relatorios_em_lote_valida_responsavel(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    client = app.test_client()
+
+    assert client.post("/relatorios/lote", json={"id_responsavel": "x"}).status_code == 404
+    assert client.post("/relatorios/lote", json={}).status_code == 404
+
+
+def test_api_nao_perde_alteracoes_com_requisicoes_concorrentes(tmp_path):
+    app = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    )
+    id_responsavel = _criar_responsavel(app.test_client())
+    id_crianca = _criar_crianca(app.test_client(), id_responsavel)
+    falhas: list[int] = []
+
+    def _adicionar_itens(indice_thread: int) -> None:
+        client = app.test_client()
+        for indice in range(10):
+            resposta = client.post(
+                f"/rotinas/{id_crianca}/itens",
+                json={
+                    "data": "2026-03-07",
+                    "nome": f"Atividade {indice_thread}-{indice}",
+                    "horario": f"{8 + indice_thread:02d}:{indice * 5:02d}",
+                },
+            )
+            if resposta.status_code != 201:
+                falhas.append(resposta.status_code)
+            client.get(f"/rotinas/{id_crianca}?data=2026-03-07")
+
+    threads = [threading.Thread(target=_adicionar_itens, args=(indice,)) for indice in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert falhas == []
+    rotina = app.test_client().get(f"/rotinas/{id_crianca}?data=2026-03-07").get_json()["rotina"]
+    assert len(rotina["itens"]) == 80
+
+    estado_salvo = json.loads((tmp_path / "estado_api.json").read_text(encoding="utf-8"))
+    assert len(estado_salvo["rotinas"][0]["itens"]) == 80
+
+
+def test_api_multiprocesso_recarrega_alteracoes_de_outro_worker(tmp_path):
+    config = {
+        "TESTING": True,
+        "DATA_FILE": str(tmp_path / "estado_api.json"),
+        "MULTIPROCESSO": True,
+    }
+    worker_a = create_app(config).test_client()
+    worker_b = create_app(config).test_client()
+
+    id_responsavel = _criar_responsavel(worker_a)
+
+    resposta = worker_b.get(f"/responsaveis/{id_responsavel}")
+    assert resposta.status_code == 200
+
+    id_crianca = _criar_crianca(worker_b, id_responsavel)
+    resposta_item = worker_a.post(
+        f"/rotinas/{id_crianca}/itens",
+        json={"data": "2026-03-07", "nome": "Escovar os dentes", "horario": "08:00"},
+    )
+    assert resposta_item.status_code == 201
+
+    criancas = worker_b.get(f"/responsaveis/{id_responsavel}/criancas").get_json()
+    assert [item["id_crianca"] for item in criancas["criancas"]] == [id_crianca]
+    rotina = worker_b.get(f"/rotinas/{id_crianca}?data=2026-03-07").get_json()["rotina"]
+    assert [item["nome"] for item in rotina["itens"]] == ["Escovar os dentes"]
+
+    estado_salvo = json.loads((tmp_path / "estado_api.json").read_text(encoding="utf-8"))
+    assert len(estado_salvo["responsaveis"]) == 1
+    assert len(estado_salvo["responsaveis"][0]["criancas"]) == 1
+    assert len(estado_salvo["rotinas"][0]["itens"]) == 1
+    assert (tmp_path / "estado_api.json.versao").exists()
 
 
 def test_api_adiciona_item_rotina_com_tags_e_observacao(tmp_path):
@@ -1168,3 +2326,139 @@ def test_web_salva_tags_no_item_rotina(tmp_path):
     assert "Observacao salva com sucesso." in texto
     assert "#higiene" in texto
     assert "#manha" in texto
+
+
+def test_api_backend_journal_persiste_alteracoes(tmp_path):
+    arquivo = tmp_path / "estado_api.json"
+    config = {
+        "TESTING": True,
+        "DATA_FILE": str(arquivo),
+        "DATA_BACKEND": "journal",
+    }
+    client = create_app(config).test_client()
+
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+    client.post(
+        f"/rotinas/{id_crianca}/itens",
+        json={"data": "2026-03-07", "nome": "Escovar os dentes", "horario": "08:00"},
+    )
+    client.patch(
+        f"/rotinas/{id_crianca}/itens/0/status",
+        json={"data": "2026-03-07", "status": 1},
+    )
+
+    assert (tmp_path / "estado_api.json.journal").exists()
+
+    client_reiniciado = create_app(config).test_client()
+    resposta = client_reiniciado.get(f"/rotinas/{id_crianca}?data=2026-03-07")
+    assert resposta.status_code == 200
+    assert resposta.get_json()["rotina"]["itens"][0]["status"] == ItemRotina.STATUS_CONCLUIDO
+
+
+def test_api_backend_sqlite_persiste_alteracoes(tmp_path):
+    config = {
+        "TESTING": True,
+        "DATA_FILE": str(tmp_path / "estado_api.json"),
+        "DATA_BACKEND": "sqlite",
+        "SQLITE_FILE": str(tmp_path / "estado_api.sqlite3"),
+    }
+    client = create_app(config).test_client()
+
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+    client.post(
+        f"/rotinas/{id_crianca}/itens",
+        json={"data": "2026-03-07", "nome": "Escovar os dentes", "horario": "08:00"},
+    )
+
+    assert (tmp_path / "estado_api.sqlite3").exists()
+
+    client_reiniciado = create_app(config).test_client()
+    resposta = client_reiniciado.get(f"/rotinas/{id_crianca}?data=2026-03-07")
+    assert resposta.status_code == 200
+    assert resposta.get_json()["rotina"]["itens"][0]["nome"] == "Escovar os dentes"
+
+
+def test_api_backend_familias_grava_apenas_a_familia_alterada(tmp_path):
+    config = {
+        "TESTING": True,
+        "DATA_FILE": str(tmp_path / "estado_api.json"),
+        "DATA_BACKEND": "familias",
+    }
+    client = create_app(config).test_client()
+
+    id_responsavel = _criar_responsavel(client)
+    id_crianca = _criar_crianca(client, id_responsavel)
+    resposta = client.post(
+        "/responsaveis",
+        json={
+            "nome": "Joao Lima",
+            "data_nascimento": "02/02/1980",
+            "email": "joao@example.com",
+            "senha": "joao1234",
+        },
+    )
+    id_outro = resposta.get_json()["responsavel"]["id_responsavel"]
+
+    diretorio = tmp_path / "estado_api.familias"
+    arquivo_outro = diretorio / f"familia_{id_outro}.json"
+    conteudo_outro = arquivo_outro.read_bytes()
+    client.post(
+        f"/rotinas/{id_crianca}/itens",
+        json={"data": "2026-03-07", "nome": "Escovar os dentes", "horario": "08:00"},
+    )
+
+    assert arquivo_outro.read_bytes() == conteudo_outro
+    assert b"Escovar os dentes" in (diretorio / f"familia_{id_responsavel}.json").read_bytes()
+    assert not (tmp_path / "estado_api.json").exists()
+
+    client_reiniciado = create_app(config).test_client()
+    resposta = client_reiniciado.get(f"/rotinas/{id_crianca}?data=2026-03-07")
+    assert resposta.status_code == 200
+    assert resposta.get_json()["rotina"]["itens"][0]["nome"] == "Escovar os dentes"
+
+
+def test_api_libera_email_antigo_apos_edicao_do_responsavel(tmp_path):
+    client = create_app(
+        {
+            "TESTING": True,
+            "DATA_FILE": str(tmp_path / "estado_api.json"),
+        }
+    ).test_client()
+
+    client.post(
+        "/web/responsavel/cadastrar",
+        data={
+            "nome": "Maria Silva",
+            "data_nascimento": "01/01/1985",
+            "email": "maria@example.com",
+            "senha": "maria123",
+        },
+    )
+    client.post(
+        "/web/responsavel/editar",
+        data={"nome": "", "data_nascimento": "", "email": "maria.souza@example.com"},
+    )
+
+    duplicado = client.post(
+        "/responsaveis",
+        json={
+            "nome": "Joana Lima",
+            "data_nascimento": "02/02/1990",
+            "email": "maria.souza@example.com",
+            "senha": "joana123",
+        },
+    )
+    liberado = client.post(
+        "/responsaveis",
+        json={
+            "nome": "Joana Lima",
+            "data_nascimento": "02/02/1990",
+            "email": "maria@example.com",
+            "senha": "joana123",
+        },
+    )
+
+    assert duplicado.status_code == 400
+    assert liberado.status_code == 201
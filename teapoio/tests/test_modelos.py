@@ -4,6 +4,7 @@ from teapoio.domain.models.responsavel import Responsavel
 from teapoio.domain.models.crianca import Crianca
 from teapoio.domain.models.perfil_sensorial import PerfilSensorial
 from teapoio.domain.models.pessoa import Pessoa
+from teapoio.domain.models.indice_cadastros import IndiceCadastros
 from datetime import datetime
 
 
@@ -212,4 +213,85 @@ def test_perfil_adiciona_e_busca_perfil_sensorial_da_crianca():
     perfil.adicionar_perfil_sensorial(perfil_sensorial)
 
     assert perfil.obter_perfil_sensorial(c.id_crianca) is not None
-    assert perfil.obter_perfil_sensorial(c.id_crianca).hiperfocos == ["quebra-cabeça"]
\ No newline at end of file
+    assert perfil.obter_perfil_sensorial(c.id_crianca).hiperfocos == ["quebra-cabeça"]
+
+# TESTES DO INDICE DE CADASTROS
+def test_indice_cadastros_busca_por_id_email_e_responsavel():
+    """Valida se o índice de cadastros encontra responsáveis e crianças por id, email e vínculo"""
+    r = Responsavel(
+        nome="Carlos Souza",
+        data_nascimento="20/05/1985",
+        email="carlos@example.com",
+        senha="carlos123"
+    )
+    c = Crianca(
+        nome="Ana Souza",
+        data_nascimento="10/07/2015",
+        responsavel=r,
+        nivel_suporte=2
+    )
+    indice = IndiceCadastros(responsaveis=[r], criancas=[c])
+
+    assert indice.buscar_responsavel(r.id_responsavel) is r
+    assert indice.buscar_responsavel_por_email("CARLOS@example.com") is r
+    assert indice.buscar_crianca(c.id_crianca) is c
+    assert indice.listar_criancas_responsavel(r.id_responsavel) == [c]
+
+    indice.remover_crianca(c.id_crianca)
+    assert indice.buscar_crianca(c.id_crianca) is None
+    assert indice.listar_criancas_responsavel(r.id_responsavel) == []
+
+
+def test_indice_cadastros_reindexa_email_alterado():
+    """Valida se o índice de cadastros acompanha a alteração de email do responsável"""
+    r = Responsavel(
+        nome="Carlos Souza",
+        data_nascimento="20/05/1985",
+        email="carlos@example.com",
+        senha="carlos123"
+    )
+    indice = IndiceCadastros(responsaveis=[r])
+
+    r.email = "carlos.souza@example.com"
+
+    assert indice.buscar_responsavel_por_email("carlos@example.com") is None
+    assert indice.buscar_responsavel_por_email("carlos.souza@example.com") is r
+
+
+def test_indice_cadastros_pagina_responsaveis_por_nome_e_prefixo():
+    """Valida se o índice de cadastros pagina responsáveis em ordem de nome e filtra por prefixo sem acento"""
+    nomes = ["Érica Lima", "Carlos Souza", "Bruna Alves", "Eduardo Reis", "Ana Costa"]
+    responsaveis = [
+        Responsavel(
+            nome=nome,
+            data_nascimento="20/05/1985",
+            email=f"{nome.split()[1].lower()}@example.com",
+            senha="senha123",
+        )
+        for nome in nomes
+    ]
+    indice = IndiceCadastros(responsaveis=responsaveis)
+
+    pagina, proxima = indice.paginar_responsaveis(limite=2)
+    assert [r.nome for r in pagina] == ["Ana Costa", "Bruna Alves"]
+    pagina, proxima = indice.paginar_responsaveis(limite=2, apos=proxima)
+    assert [r.nome for r in pagina] == ["Carlos Souza", "Eduardo Reis"]
+    pagina, proxima = indice.paginar_responsaveis(limite=2, apos=proxima)
+    assert [r.nome for r in pagina] == ["Érica Lima"]
+    assert proxima is None
+
+    pagina, _ = indice.paginar_responsaveis(limite=10, prefixo_nome="e")
+    assert [r.nome for r in pagina] == ["Eduardo Reis", "Érica Lima"]
+
+    responsaveis[1].nome = "Eliana Souza"
+    pagina, _ = indice.paginar_responsaveis(limite=10, prefixo_nome="E", prefixo_email="sou")
+    assert [r.nome for r in pagina] == ["Eliana Souza"]
+
+    indice.remover_responsavel(responsaveis[0].id_responsavel)
+    pagina, _ = indice.paginar_responsaveis(limite=10, ordem=IndiceCadastros.ORDEM_EMAIL)
+    assert [r.email for r in pagina] == [
+        "alves@example.com",
+        "costa@example.com",
+        "reis@example.com",
+        "souza@example.com",
+    ]
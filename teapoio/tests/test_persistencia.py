@@ -1,13 +1,31 @@
 from datetime import date
 import json
+import os
+import threading
 
+import pytest
+
+from teapoio.application.services.servico_relatorios import ServicoRelatorios
 from teapoio.domain.models.Perfil import Perfil
 from teapoio.domain.models.crianca import Crianca
 from teapoio.domain.models.item_rotina import ItemRotina
+from teapoio.domain.models.modelo_rotina import ModeloRotina
 from teapoio.domain.models.perfil_sensorial import PerfilSensorial
 from teapoio.domain.models.responsavel import Responsavel
 from teapoio.domain.models.rotina import Rotina
+from teapoio.infrastructure.cache_relatorios import CacheArtefatosRelatorio
+from teapoio.infrastructure.cache_respostas import CacheRespostas
+from teapoio.infrastructure.mixins.exportavel_json import (
+    CodecJsonOrjson,
+    CodecJsonPadrao,
+    obter_codec_json,
+    orjson,
+)
+from teapoio.infrastructure.persistencia_adiada import PersistidorAdiado
 from teapoio.infrastructure.persistence.Relatorio import RepositorioRelatorio
+from teapoio.infrastructure.persistence.repositorio_familias import RepositorioRelatorioFamilias
+from teapoio.infrastructure.persistence.repositorio_journal import RepositorioRelatorioJournal
+from teapoio.infrastructure.persistence.repositorio_sqlite import RepositorioRelatorioSqlite
 
 
 def test_repositorio_salva_e_carrega_estado_completo(tmp_path):
@@ -149,3 +167,828 @@ def test_repositorio_salva_aviso_quando_responsavel_nao_tem_crianca(tmp_path):
     responsavel_json = payload["responsaveis"][0]
     assert responsavel_json["criancas"] == []
     assert responsavel_json["aviso_crianca"] == "crianca nao cadastrada"
+
+
+def _estado_exemplo():
+    responsavel = Responsavel(
+        nome="Maria Souza",
+        data_nascimento="01/01/1985",
+        email="maria@example.com",
+        senha="maria123",
+    )
+    crianca = Crianca(
+        nome="Ana Souza",
+        data_nascimento="10/07/2015",
+        responsavel=responsavel,
+        nivel_suporte=2,
+    )
+    rotina = Rotina(id_crianca=crianca.id_crianca, data_referencia=date(2026, 3, 1))
+    rotina.adicionar_item(ItemRotina(nome="Escovar os dentes", horario="08:00"))
+    return responsavel, crianca, rotina
+
+
+def test_repositorio_journal_registra_apenas_alteracoes(tmp_path):
+    """Valida se o repositório com journal grava no log apenas os registros alterados, sem reescrever o snapshot"""
+    arquivo = tmp_path / "estado.json"
+    repositorio = RepositorioRelatorioJournal(caminho_arquivo=arquivo)
+    repositorio.carregar_estado()
+    snapshot_inicial = arquivo.read_text(encoding="utf-8")
+
+    responsavel, crianca, rotina = _estado_exemplo()
+    repositorio.salvar_estado(
+        responsaveis=[responsavel],
+        criancas=[crianca],
+        rotinas=[rotina],
+        perfil=None,
+        data_calendario=date(2026, 3, 1),
+    )
+    linhas_iniciais = repositorio.caminho_journal.read_text(encoding="utf-8").splitlines()
+
+    rotina.marcar_status(0, 1)
+    repositorio.salvar_estado(
+        responsaveis=[responsavel],
+        criancas=[crianca],
+        rotinas=[rotina],
+        perfil=None,
+        data_calendario=date(2026, 3, 1),
+    )
+    linhas = repositorio.caminho_journal.read_text(encoding="utf-8").splitlines()
+    novas_linhas = [json.loads(linha) for linha in linhas[len(linhas_iniciais):]]
+
+    assert arquivo.read_text(encoding="utf-8") == snapshot_inicial
+    assert len(novas_linhas) == 1
+    assert novas_linhas[0]["tipo"] == "rotina"
+    assert novas_linhas[0]["dados"]["itens"][0]["status"] == ItemRotina.STATUS_CONCLUIDO
+
+
+def test_repositorios_carregam_rotinas_sob_demanda(tmp_path):
+    """Valida se a carga sob demanda só monta as rotinas acessadas, regrava as demais intactas e registra remoções"""
+    responsavel, crianca, rotina = _estado_exemplo()
+    outra = Rotina(id_crianca=crianca.id_crianca, data_referencia=date(2026, 3, 2))
+    outra.adicionar_item(ItemRotina(nome="Almoco", horario="12:00"))
+
+    for classe in (RepositorioRelatorio, RepositorioRelatorioJournal):
+        arquivo = tmp_path / f"estado_{classe.__name__}.json"
+        classe(caminho_arquivo=arquivo).salvar_estado(
+            responsaveis=[responsavel],
+            criancas=[crianca],
+            rotinas=[rotina, outra],
+            perfil=None,
+            data_calendario=date(2026, 3, 1),
+        )
+
+        servico = ServicoRelatorios(classe(caminho_arquivo=arquivo, rotinas_sob_demanda=True))
+        estado = servico.carregar_estado_inicial()
+        rotinas = estado["rotinas"]
+        assert len(rotinas) == 2
+        assert rotinas.carregadas() == []
+
+        rotinas.buscar(crianca.id_crianca, date(2026, 3, 1)).marcar_status(0, 1)
+        assert servico.salvar_estado_atual(**estado) is True
+        assert len(rotinas.carregadas()) == 1
+
+        recarregado = classe(caminho_arquivo=arquivo).carregar_estado()
+        itens = {item.data_referencia.day: item.itens[0] for item in recarregado["rotinas"]}
+        assert itens[1].status == ItemRotina.STATUS_CONCLUIDO
+        assert itens[2].nome == "Almoco"
+
+        rotinas.remover_crianca(crianca.id_crianca)
+        assert servico.salvar_estado_atual(**estado) is True
+        assert classe(caminho_arquivo=arquivo).carregar_estado()["rotinas"] == []
+
+def test_carga_sob_demanda_nao_marca_rotinas_montadas_como_alteradas(tmp_path):
+    """Valida se montar rotinas pendentes não gera gravação e se alterações e remoções posteriores ainda são detectadas"""
+    responsavel, crianca, rotina = _estado_exemplo()
+    outra = Rotina(id_crianca=crianca.id_crianca, data_referencia=date(2026, 3, 2))
+    arquivo = tmp_path / "estado.json"
+    RepositorioRelatorio(caminho_arquivo=arquivo).salvar_estado(
+        responsaveis=[responsavel],
+        criancas=[crianca],
+        rotinas=[rotina, outra],
+        perfil=None,
+        data_calendario=date(2026, 3, 1),
+    )
+    conteudo = arquivo.read_bytes()
+
+    servico = ServicoRelatorios(RepositorioRelatorio(caminho_arquivo=arquivo, rotinas_sob_demanda=True))
+    estado = servico.carregar_estado_inicial()
+    rotinas = estado["rotinas"]
+    assert len(rotinas.rotinas_da_crianca(crianca.id_crianca)) == 2
+    assert servico.salvar_estado_atual(**estado) is False
+    assert arquivo.read_bytes() == conteudo
+
+    rotinas.buscar(crianca.id_crianca, date(2026, 3, 2)).adicionar_item(
+        ItemRotina(nome="Almoco", horario="12:00")
+    )
+    assert servico.salvar_estado_atual(**estado) is True
+    assert servico.salvar_estado_atual(**estado) is False
+
+    estado["criancas"][0].nome = "Ana Clara"
+    rotinas.remover(crianca.id_crianca, date(2026, 3, 1))
+    assert servico.salvar_estado_atual(**estado) is True
+    recarregado = RepositorioRelatorio(caminho_arquivo=arquivo).carregar_estado()
+    assert recarregado["criancas"][0].nome == "Ana Clara"
+    assert [item.data_referencia for item in recarregado["rotinas"]] == [date(2026, 3, 2)]
+    assert recarregado["rotinas"][0].itens[0].nome == "Almoco"
+
+
+def test_repositorio_journal_reaplica_log_sobre_snapshot(tmp_path):
+    """Valida se o carregamento reaplica o journal sobre o snapshot, incluindo remoções"""
+    arquivo = tmp_path / "estado.json"
+    repositorio = RepositorioRelatorioJournal(caminho_arquivo=arquivo)
+    responsavel, crianca, rotina = _estado_exemplo()
+    repositorio.salvar_estado(
+        responsaveis=[responsavel],
+        criancas=[crianca],
+        rotinas=[rotina],
+        perfil=None,
+        data_calendario=date(2026, 3, 1),
+    )
+    repositorio.salvar_estado(
+        responsaveis=[responsavel],
+        criancas=[crianca],
+        rotinas=[],
+        perfil=None,
+        data_calendario=date(2026, 3, 5),
+    )
+
+    estado = RepositorioRelatorioJournal(caminho_arquivo=arquivo).carregar_estado()
+
+    assert [item.id_responsavel for item in estado["responsaveis"]] == [responsavel.id_responsavel]
+    assert [item.id_crianca for item in estado["criancas"]] == [crianca.id_crianca]
+    assert estado["rotinas"] == []
+    assert estado["data_calendario"] == date(2026, 3, 5)
+
+
+def test_repositorio_journal_compacta_ao_atingir_limite(tmp_path):
+    """Valida se o journal é compactado no snapshot ao atingir o limite de registros"""
+    arquivo = tmp_path / "estado.json"
+    repositorio = RepositorioRelatorioJournal(caminho_arquivo=arquivo, limite_registros=2)
+    responsavel, crianca, rotina = _estado_exemplo()
+    repositorio.salvar_estado(
+        responsaveis=[responsavel],
+        criancas=[crianca],
+        rotinas=[rotina],
+        perfil=None,
+        data_calendario=date(2026, 3, 1),
+    )
+
+    assert repositorio.caminho_journal.read_text(encoding="utf-8") == ""
+    with arquivo.open("r", encoding="utf-8") as arquivo_json:
+        payload = json.load(arquivo_json)
+    assert payload["responsaveis"][0]["criancas"][0]["id_crianca"] == crianca.id_crianca
+    assert len(payload["rotinas"]) == 1
+
+    estado = RepositorioRelatorio(caminho_arquivo=arquivo).carregar_estado()
+    assert len(estado["rotinas"]) == 1
+
+
+def test_repositorio_journal_ignora_linha_truncada(tmp_path):
+    """Valida se uma linha truncada no fim do journal é descartada no carregamento sem afetar os registros seguintes"""
+    arquivo = tmp_path / "estado.json"
+    repositorio = RepositorioRelatorioJournal(caminho_arquivo=arquivo)
+    responsavel, crianca, rotina = _estado_exemplo()
+    repositorio.salvar_estado(
+        responsaveis=[responsavel],
+        criancas=[crianca],
+        rotinas=[rotina],
+        perfil=None,
+        data_calendario=date(2026, 3, 1),
+    )
+    with repositorio.caminho_journal.open("a", encoding="utf-8") as journal:
+        journal.write('{"op":"upsert","tipo":"rot')
+
+    reaberto = RepositorioRelatorioJournal(caminho_arquivo=arquivo)
+    estado = reaberto.carregar_estado()
+
+    assert len(estado["rotinas"]) == 1
+    assert reaberto.caminho_journal.read_bytes().endswith(b"\n")
+
+    # O registro seguinte nao pode ser perdido por ficar colado a linha truncada.
+    crianca_carregada = estado["criancas"][0]
+    crianca_carregada.nivel_suporte = 3
+    reaberto.salvar_estado(
+        responsaveis=estado["responsaveis"],
+        criancas=estado["criancas"],
+        rotinas=estado["rotinas"],
+        perfil=None,
+        data_calendario=date(2026, 3, 1),
+    )
+    estado_final = RepositorioRelatorioJournal(caminho_arquivo=arquivo).carregar_estado()
+    assert estado_final["criancas"][0].nivel_suporte == 3
+
+
+def test_repositorio_sqlite_salva_e_carrega_estado_completo(tmp_path):
+    """Valida se o repositório SQLite salva e carrega o estado completo, incluindo perfil sensorial e emoções"""
+    arquivo = tmp_path / "estado.sqlite3"
+    responsavel, crianca, rotina = _estado_exemplo()
+    rotina.atualizar_sentimento_dia("bem")
+    rotina.registrar_emocao("feliz", 4)
+    perfil = Perfil(responsavel=responsavel, criancas=[crianca])
+    perfil.adicionar_perfil_sensorial(
+        PerfilSensorial(
+            id_crianca=crianca.id_crianca,
+            nome=crianca.nome,
+            data_nascimento="10/07/2015",
+            hipersensibilidades=["som alto"],
+        )
+    )
+
+    RepositorioRelatorioSqlite(caminho_arquivo=arquivo).salvar_estado(
+        responsaveis=[responsavel],
+        criancas=[crianca],
+        rotinas=[rotina],
+        perfil=perfil,
+        data_calendario=date(2026, 3, 2),
+    )
+    estado = RepositorioRelatorioSqlite(caminho_arquivo=arquivo).carregar_estado()
+
+    assert [item.email for item in estado["responsaveis"]] == ["maria@example.com"]
+    assert [item.id_crianca for item in estado["criancas"]] == [crianca.id_crianca]
+    rotina_carregada = estado["rotinas"][0]
+    assert rotina_carregada.sentimento_dia == rotina.sentimento_dia
+    assert rotina_carregada.obter_emocoes() == {"feliz": 4}
+    assert rotina_carregada.itens[0].nome == "Escovar os dentes"
+    perfil_sensorial = estado["perfil"].obter_perfil_sensorial(crianca.id_crianca)
+    assert perfil_sensorial.hipersensibilidades == ["som alto"]
+    assert estado["data_calendario"] == date(2026, 3, 2)
+
+
+def test_repositorios_preservam_versao_da_rotina_e_id_dos_itens(tmp_path):
+    """Valida se os repositórios JSON e SQLite preservam a versão da rotina e o identificador estável dos itens"""
+    responsavel, crianca, rotina = _estado_exemplo()
+    rotina.marcar_status(0, 1)
+    id_item = rotina.itens[0].id_item
+    versao = rotina.versao
+
+    for repositorio in (
+        RepositorioRelatorio(caminho_arquivo=tmp_path / "estado.json"),
+        RepositorioRelatorioSqlite(caminho_arquivo=tmp_path / "estado.sqlite3"),
+    ):
+        repositorio.salvar_estado(
+            responsaveis=[responsavel],
+            criancas=[crianca],
+            rotinas=[rotina],
+            perfil=Perfil(responsavel=responsavel, criancas=[crianca]),
+            data_calendario=date(2026, 3, 1),
+        )
+        rotina_carregada = repositorio.carregar_estado()["rotinas"][0]
+
+        assert rotina_carregada.versao == versao
+        assert rotina_carregada.itens[0].id_item == id_item
+        assert rotina_carregada.indice_item(id_item) == 0
+
+        rotina_carregada.marcar_status(0, 2)
+        assert rotina_carregada.versao == versao + 1
+
+
+def test_repositorios_preservam_modelos_de_rotina_da_crianca(tmp_path):
+    """Valida se os repositórios JSON e SQLite preservam os modelos de rotina cadastrados para a criança"""
+    responsavel, crianca, rotina = _estado_exemplo()
+    crianca.salvar_modelo_rotina(ModeloRotina.a_partir_rotina("Manha", rotina))
+
+    for repositorio in (
+        RepositorioRelatorio(caminho_arquivo=tmp_path / "estado.json"),
+        RepositorioRelatorioSqlite(caminho_arquivo=tmp_path / "estado.sqlite3"),
+    ):
+        repositorio.salvar_estado(
+            responsaveis=[responsavel],
+            criancas=[crianca],
+            rotinas=[rotina],
+            perfil=None,
+            data_calendario=date(2026, 3, 1),
+        )
+        crianca_carregada = repositorio.carregar_estado()["criancas"][0]
+
+        modelo = crianca_carregada.obter_modelo_rotina("Manha")
+        assert modelo == crianca.obter_modelo_rotina("Manha")
+        assert [item["nome"] for item in modelo.itens] == ["Escovar os dentes"]
+
+
+def test_repositorio_sqlite_grava_apenas_linhas_alteradas(tmp_path):
+    """Valida se o repositório SQLite atualiza somente a rotina alterada e remove registros excluídos"""
+    arquivo = tmp_path / "estado.sqlite3"
+    repositorio = RepositorioRelatorioSqlite(caminho_arquivo=arquivo)
+    repositorio.carregar_estado()
+    responsavel, crianca, rotina = _estado_exemplo()
+    outra_rotina = Rotina(id_crianca=crianca.id_crianca, data_referencia=date(2026, 3, 2))
+    repositorio.salvar_estado(
+        responsaveis=[responsavel],
+        criancas=[crianca],
+        rotinas=[rotina, outra_rotina],
+        perfil=None,
+        data_calendario=date(2026, 3, 1),
+    )
+
+    comandos = []
+    conectar_original = repositorio._conectar
+
+    def _conectar_rastreado():
+        conexao = conectar_original()
+        conexao.set_trace_callback(comandos.append)
+        return conexao
+
+    repositorio._conectar = _conectar_rastreado
+    rotina.marcar_status(0, 1)
+    repositorio.salvar_estado(
+        responsaveis=[responsavel],
+        criancas=[crianca],
+        rotinas=[rotina],
+        perfil=None,
+        data_calendario=date(2026, 3, 1),
+    )
+
+    assert not any("responsaveis" in comando or "criancas" in comando for comando in comandos)
+    estado = RepositorioRelatorioSqlite(caminho_arquivo=arquivo).carregar_estado()
+    assert [item.data_referencia for item in estado["rotinas"]] == [date(2026, 3, 1)]
+    assert estado["rotinas"][0].itens[0].status == ItemRotina.STATUS_CONCLUIDO
+
+
+def test_repositorio_sqlite_migra_estado_do_json(tmp_path):
+    """Valida se um banco SQLite novo é populado uma única vez a partir do JSON legado"""
+    arquivo_json = tmp_path / "estado.json"
+    responsavel, crianca, rotina = _estado_exemplo()
+    RepositorioRelatorio(caminho_arquivo=arquivo_json).salvar_estado(
+        responsaveis=[responsavel],
+        criancas=[crianca],
+        rotinas=[rotina],
+        perfil=None,
+        data_calendario=date(2026, 3, 1),
+    )
+
+    arquivo_sqlite = tmp_path / "estado.sqlite3"
+    estado = RepositorioRelatorioSqlite(
+        caminho_arquivo=arquivo_sqlite,
+        caminho_json_migracao=arquivo_json,
+    ).carregar_estado()
+
+    assert [item.id_responsavel for item in estado["responsaveis"]] == [responsavel.id_responsavel]
+    assert len(estado["rotinas"]) == 1
+
+    RepositorioRelatorio(caminho_arquivo=arquivo_json).salvar_estado(
+        responsaveis=[],
+        criancas=[],
+        rotinas=[],
+        perfil=None,
+        data_calendario=date(2026, 3, 1),
+    )
+    estado_reaberto = RepositorioRelatorioSqlite(
+        caminho_arquivo=arquivo_sqlite,
+        caminho_json_migracao=arquivo_json,
+    ).carregar_estado()
+    assert len(estado_reaberto["responsaveis"]) == 1
+
+
+def test_cache_relatorios_remove_arquivos_menos_usados_ao_exceder_limite(tmp_path):
+    """Valida se o cache de PDFs grava por chave de conteúdo e remove os arquivos menos usados acima do limite"""
+    cache = CacheArtefatosRelatorio(tmp_path / "cache", limite_bytes=250)
+    chaves = [CacheArtefatosRelatorio.calcular_chave([f"relatorio {indice}"]) for indice in range(3)]
+
+    for indice, chave in enumerate(chaves[:2]):
+        assert b"".join(cache.gravar(chave, [b"%PDF", b"x" * 96])) == b"%PDF" + b"x" * 96
+        os.utime(cache.buscar(chave), (indice, indice))
+
+    # Acessar o primeiro arquivo o torna o mais recente.
+    assert cache.buscar(chaves[0]) is not None
+    list(cache.gravar(chaves[2], [b"%PDF", b"x" * 96]))
+
+    assert cache.buscar(chaves[0]) is not None
+    assert cache.buscar(chaves[1]) is None
+    assert cache.buscar(chaves[2]).read_bytes() == b"%PDF" + b"x" * 96
+    assert CacheArtefatosRelatorio.calcular_chave(["a", "b"]) != CacheArtefatosRelatorio.calcular_chave(["ab"])
+
+
+def test_cache_relatorios_descarta_geracao_interrompida(tmp_path):
+    """Valida se uma geração de PDF interrompida não deixa arquivo no cache"""
+    cache = CacheArtefatosRelatorio(tmp_path / "cache")
+    chave = CacheArtefatosRelatorio.calcular_chave(["relatorio"])
+
+    gerador = cache.gravar(chave, iter([b"%PDF", b"parte"]))
+    next(gerador)
+    gerador.close()
+
+    assert cache.buscar(chave) is None
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+def test_cache_respostas_invalida_por_geracao_e_preserva_data_sem_mudanca(tmp_path):
+    """Valida se o cache de respostas descarta entradas de outra geração e só avança a data quando o conteúdo muda"""
+    cache = CacheRespostas(limite_entradas=2)
+
+    primeira = cache.registrar("a", 1, b'{"x": 1}', "application/json")
+    assert cache.buscar("a", 1) == primeira
+    assert cache.buscar("a", 2) is None
+
+    mesma = cache.registrar("a", 2, b'{"x": 1}', "application/json")
+    assert mesma.etag == primeira.etag
+    assert mesma.modificado_em == primeira.modificado_em
+
+    alterada = cache.registrar("a", 3, b'{"x": 2}', "application/json")
+    assert alterada.etag != primeira.etag
+
+    cache.registrar("b", 3, b"{}", "application/json")
+    cache.registrar("c", 3, b"{}", "application/json")
+    assert len(cache) == 2
+    assert cache.buscar("a", 3) is None
+
+
+def test_persistidor_adiado_agrupa_gravacoes_por_janela_e_limite():
+    """Valida se o persistidor agrupa marcações em uma gravação e grava o restante ao encerrar"""
+    gravacoes = []
+    gravou = threading.Event()
+
+    def gravar():
+        gravacoes.append(1)
+        gravou.set()
+
+    persistidor = PersistidorAdiado(gravar, janela_segundos=60, limite_marcacoes=3)
+    persistidor.marcar()
+    persistidor.marcar()
+    assert gravacoes == []
+    assert persistidor.pendentes == 2
+
+    persistidor.marcar()
+    assert gravou.wait(5)
+    assert gravacoes == [1]
+
+    persistidor.marcar()
+    persistidor.encerrar()
+    assert gravacoes == [1, 1]
+    assert persistidor.pendentes == 0
+
+    curto = PersistidorAdiado(gravar, janela_segundos=0.01, limite_marcacoes=100)
+    gravou.clear()
+    curto.marcar()
+    assert gravou.wait(5)
+    curto.encerrar()
+    assert len(gravacoes) == 3
+
+
+def test_codecs_json_gravam_compacto_e_indentam_sob_demanda(tmp_path):
+    """Valida se os codecs JSON gravam o mesmo estado, compacto por padrão e indentado quando pedido"""
+    codecs = [CodecJsonPadrao()]
+    if orjson is not None:
+        codecs.append(CodecJsonOrjson())
+
+    estados = []
+    for codec in codecs:
+        arquivo = tmp_path / f"estado_{codec.nome}.json"
+        repositorio = RepositorioRelatorio(caminho_arquivo=arquivo, codec_json=codec)
+        estado = repositorio.carregar_estado()
+        responsavel = Responsavel(
+            nome="José Araújo",
+            data_nascimento="01/01/1985",
+            email="jose@example.com",
+            senha="jose1234",
+        )
+        repositorio.salvar_estado(
+            responsaveis=[responsavel],
+            criancas=[],
+            rotinas=[],
+            perfil=None,
+            data_calendario=estado["data_calendario"],
+        )
+        conteudo = arquivo.read_bytes()
+        assert b"\n " not in conteudo
+        assert conteudo.endswith(b"\n")
+        assert "José Araújo".encode("utf-8") in conteudo
+        estados.append(json.loads(conteudo)["responsaveis"][0]["nome"])
+
+        indentado = RepositorioRelatorio(caminho_arquivo=arquivo, codec_json=codec, json_indentado=True)
+        indentado.salvar_estado(
+            responsaveis=[responsavel],
+            criancas=[],
+            rotinas=[],
+            perfil=None,
+            data_calendario=estado["data_calendario"],
+        )
+        assert b'\n  "responsaveis"' in arquivo.read_bytes()
+        assert indentado.carregar_estado()["responsaveis"][0].nome == "José Araújo"
+
+    assert set(estados) == {"José Araújo"}
+    assert isinstance(obter_codec_json("json"), CodecJsonPadrao)
+    with pytest.raises(ValueError):
+        obter_codec_json("yaml")
+
+
+def test_repositorio_restaura_sem_validar_apenas_payload_da_aplicacao(tmp_path):
+    """Valida se registros com a versão de esquema da aplicação são restaurados sem revalidação e os demais continuam validados"""
+    arquivo = tmp_path / "estado.json"
+    responsavel, crianca, rotina = _estado_exemplo()
+    RepositorioRelatorio(caminho_arquivo=arquivo).salvar_estado(
+        responsaveis=[responsavel],
+        criancas=[crianca],
+        rotinas=[rotina],
+        perfil=None,
+        data_calendario=date(2026, 3, 1),
+    )
+    payload = json.loads(arquivo.read_text(encoding="utf-8"))
+    assert payload["versao_esquema"] == 1
+
+    # Dados que a validacao de entrada recusaria.
+    payload["responsaveis"][0]["nome"] = "Maria 2"
+    payload["rotinas"][0]["itens"][0]["horario"] = "8h"
+    arquivo.write_text(json.dumps(payload), encoding="utf-8")
+
+    estado = RepositorioRelatorio(caminho_arquivo=arquivo).carregar_estado()
+    assert estado["responsaveis"][0].nome == "Maria 2"
+    assert estado["rotinas"][0].itens[0].horario == "8h"
+    assert estado["criancas"][0].id_crianca == crianca.id_crianca
+    assert estado["rotinas"][0].itens[0].id_item == rotina.itens[0].id_item
+
+    arquivo_sqlite = tmp_path / "estado.sqlite3"
+    importado = RepositorioRelatorioSqlite(
+        caminho_arquivo=arquivo_sqlite,
+        caminho_json_migracao=arquivo,
+    ).carregar_estado()
+    assert importado["responsaveis"] == []
+    assert importado["rotinas"][0].itens == []
+
+    del payload["versao_esquema"]
+    arquivo.write_text(json.dumps(payload), encoding="utf-8")
+    legado = RepositorioRelatorio(caminho_arquivo=arquivo).carregar_estado()
+    assert legado["responsaveis"] == []
+    assert legado["rotinas"][0].itens == []
+
+    # Registro fora da forma esperada cai na validacao completa.
+    payload["versao_esquema"] = 1
+    payload["responsaveis"][0]["nome"] = "Maria Souza"
+    payload["rotinas"][0]["itens"][0]["horario"] = "08:00"
+    del payload["rotinas"][0]["itens"][0]["tags"]
+    arquivo.write_text(json.dumps(payload), encoding="utf-8")
+    corrigido = RepositorioRelatorio(caminho_arquivo=arquivo).carregar_estado()
+    assert corrigido["responsaveis"][0].nome == "Maria Souza"
+    assert corrigido["rotinas"][0].itens[0].tags == []
+
+
+def test_compactacao_nao_torna_confiaveis_registros_recusados_de_arquivo_legado(tmp_path):
+    """Valida se registros recusados ao carregar um arquivo legado não são regravados com a versão de esquema e não voltam ao recarregar"""
+    responsavel, crianca, rotina = _estado_exemplo()
+    invalido = {
+        "id_responsavel": "999999",
+        "nome": "Pedro Lima",
+        "data_nascimento": "01/01/1980",
+        "email": "not-an-email",
+        "senha": "pedro123",
+        "criancas": [],
+    }
+
+    for classe in (RepositorioRelatorioJournal, RepositorioRelatorioFamilias):
+        arquivo = tmp_path / f"estado_{classe.__name__}.json"
+        RepositorioRelatorio(caminho_arquivo=arquivo).salvar_estado(
+            responsaveis=[responsavel],
+            criancas=[crianca],
+            rotinas=[rotina],
+            perfil=None,
+            data_calendario=date(2026, 3, 1),
+        )
+        opcoes = {"limite_registros": 1} if classe is RepositorioRelatorioJournal else {}
+        caminho_legado = arquivo
+        if classe is RepositorioRelatorioFamilias:
+            # Migra o arquivo unico e torna legado o arquivo da familia.
+            repositorio = classe(caminho_arquivo=arquivo)
+            repositorio.carregar_estado()
+            caminho_legado = repositorio.caminho_familia(responsavel.id_responsavel)
+        payload = json.loads(caminho_legado.read_text(encoding="utf-8"))
+        del payload["versao_esquema"]
+        payload["responsaveis"].append(invalido)
+        caminho_legado.write_text(json.dumps(payload), encoding="utf-8")
+
+        servico = ServicoRelatorios(classe(caminho_arquivo=arquivo, **opcoes))
+        estado = servico.carregar_estado_inicial()
+        assert [item.id_responsavel for item in estado["responsaveis"]] == [responsavel.id_responsavel]
+
+        estado["responsaveis"][0].nome = "Maria Souza Lima"
+        assert servico.salvar_estado_atual(**estado) is True
+        assert b"not-an-email" not in caminho_legado.read_bytes()
+        assert json.loads(caminho_legado.read_text(encoding="utf-8"))["versao_esquema"] == 1
+
+        recarregado = classe(caminho_arquivo=arquivo).carregar_estado()
+        assert [item.nome for item in recarregado["responsaveis"]] == ["Maria Souza Lima"]
+
+
+def test_repositorio_familias_divide_estado_e_grava_apenas_familia_alterada(tmp_path):
+    """Valida se o repositório por família migra o arquivo único, mantém o índice e regrava só a família alterada"""
+    arquivo = tmp_path / "estado.json"
+    responsavel, crianca, rotina = _estado_exemplo()
+    outro = Responsavel(
+        nome="Joao Lima",
+        data_nascimento="02/02/1980",
+        email="joao@example.com",
+        senha="joao1234",
+    )
+    RepositorioRelatorio(caminho_arquivo=arquivo).salvar_estado(
+        responsaveis=[responsavel, outro],
+        criancas=[crianca],
+        rotinas=[rotina],
+        perfil=None,
+        data_calendario=date(2026, 3, 1),
+    )
+
+    repositorio = RepositorioRelatorioFamilias(caminho_arquivo=arquivo)
+    servico = ServicoRelatorios(repositorio)
+    estado = servico.carregar_estado_inicial()
+    assert [item.id_responsavel for item in estado["responsaveis"]] == [
+        responsavel.id_responsavel,
+        outro.id_responsavel,
+    ]
+    assert len(estado["rotinas"]) == 1
+
+    diretorio = tmp_path / "estado.familias"
+    arquivo_familia = repositorio.caminho_familia(responsavel.id_responsavel)
+    arquivo_outro = repositorio.caminho_familia(outro.id_responsavel)
+    assert sorted(caminho.name for caminho in diretorio.iterdir()) == sorted(
+        ["indice.json", arquivo_familia.name, arquivo_outro.name]
+    )
+    payload_familia = json.loads(arquivo_familia.read_text(encoding="utf-8"))
+    assert payload_familia["responsaveis"][0]["criancas"][0]["id_crianca"] == crianca.id_crianca
+    assert len(payload_familia["rotinas"]) == 1
+    assert repositorio.id_responsavel_por_email("JOAO@example.com") == outro.id_responsavel
+    indice = json.loads((diretorio / "indice.json").read_text(encoding="utf-8"))
+    assert [entrada["id_responsavel"] for entrada in indice["familias"]] == [
+        responsavel.id_responsavel,
+        outro.id_responsavel,
+    ]
+    reaberto = RepositorioRelatorioFamilias(caminho_arquivo=arquivo).carregar_estado()
+    assert [item.id_responsavel for item in reaberto["responsaveis"]] == [
+        responsavel.id_responsavel,
+        outro.id_responsavel,
+    ]
+    assert repositorio.id_responsavel_da_crianca(crianca.id_crianca) == responsavel.id_responsavel
+
+    conteudo_outro = arquivo_outro.read_bytes()
+    conteudo_indice = (diretorio / "indice.json").read_bytes()
+    rotina_carregada = estado["rotinas"][0]
+    rotina_carregada.adicionar_item(ItemRotina(nome="Almoco", horario="12:00"))
+    assert servico.salvar_estado_atual(
+        responsaveis=estado["responsaveis"],
+        criancas=estado["criancas"],
+        rotinas=estado["rotinas"],
+        perfil=estado["perfil"],
+        data_calendario=estado["data_calendario"],
+    )
+    assert arquivo_outro.read_bytes() == conteudo_outro
+    assert (diretorio / "indice.json").read_bytes() == conteudo_indice
+    assert b"Almoco" in arquivo_familia.read_bytes()
+
+    familia = RepositorioRelatorioFamilias(caminho_arquivo=arquivo).carregar_familia(
+        responsavel.id_responsavel
+    )
+    assert [item.id_crianca for item in familia["criancas"]] == [crianca.id_crianca]
+    assert [item.nome for item in familia["rotinas"][0].itens] == ["Escovar os dentes", "Almoco"]
+
+    estado["responsaveis"].remove(estado["responsaveis"][1])
+    servico.salvar_estado_atual(
+        responsaveis=estado["responsaveis"],
+        criancas=estado["criancas"],
+        rotinas=estado["rotinas"],
+        perfil=estado["perfil"],
+        data_calendario=estado["data_calendario"],
+    )
+    assert not arquivo_outro.exists()
+    assert repositorio.id_responsavel_por_email("joao@example.com") is None
+
+    recarregado = RepositorioRelatorioFamilias(caminho_arquivo=arquivo).carregar_estado()
+    assert [item.id_responsavel for item in recarregado["responsaveis"]] == [responsavel.id_responsavel]
+    assert len(recarregado["rotinas"][0].itens) == 2
+    assert recarregado["data_calendario"] == date(2026, 3, 1)
+
+
+def test_repositorio_familias_atualiza_so_entradas_alteradas_do_indice(tmp_path, monkeypatch):
+    """Valida se o salvamento por família atualiza só as entradas do índice das chaves alteradas"""
+    arquivo = tmp_path / "estado.json"
+    responsavel, crianca, rotina = _estado_exemplo()
+    outro = Responsavel(
+        nome="Joao Lima",
+        data_nascimento="02/02/1980",
+        email="joao@example.com",
+        senha="joao1234",
+    )
+    repositorio = RepositorioRelatorioFamilias(caminho_arquivo=arquivo)
+    estado = {
+        "responsaveis": [responsavel, outro],
+        "criancas": [crianca],
+        "rotinas": [rotina],
+        "perfil": None,
+        "data_calendario": date(2026, 3, 1),
+    }
+    repositorio.salvar_estado(**estado)
+    caminho_indice = tmp_path / "estado.familias" / "indice.json"
+    conteudo_indice = caminho_indice.read_bytes()
+
+    def _montar_indice_completo(*_args, **_kwargs):
+        raise AssertionError("o indice nao deve ser refeito a cada salvamento")
+
+    monkeypatch.setattr(RepositorioRelatorioFamilias, "_montar_indice", _montar_indice_completo)
+    responsavel.nome = "Maria Souza Lima"
+    repositorio.salvar_estado(**estado)
+    assert caminho_indice.read_bytes() == conteudo_indice
+
+    outro.email = "joao.lima@example.com"
+    repositorio.salvar_estado(**estado)
+    indice = json.loads(caminho_indice.read_text(encoding="utf-8"))
+    assert [entrada["email"] for entrada in indice["familias"]] == [
+        "maria@example.com",
+        "joao.lima@example.com",
+    ]
+    assert repositorio.id_responsavel_por_email("joao@example.com") is None
+    assert repositorio.id_responsavel_por_email("joao.lima@example.com") == outro.id_responsavel
+
+    crianca.id_responsavel = outro.id_responsavel
+    repositorio.salvar_estado(**estado)
+    assert repositorio.id_responsavel_da_crianca(crianca.id_crianca) == outro.id_responsavel
+    assert json.loads(caminho_indice.read_text(encoding="utf-8"))["criancas"] == {
+        crianca.id_crianca: outro.id_responsavel
+    }
+
+    estado["responsaveis"].remove(outro)
+    repositorio.salvar_estado(**estado)
+    assert repositorio.id_responsavel_da_crianca(crianca.id_crianca) is None
+    assert repositorio.id_responsavel_por_email("joao.lima@example.com") is None
+
+
+def test_repositorio_familias_guarda_perfil_no_arquivo_da_familia(tmp_path):
+    """Valida se o perfil ativo fica no arquivo da família do responsável e fora do índice"""
+    arquivo = tmp_path / "estado.json"
+    responsavel, crianca, rotina = _estado_exemplo()
+    outro = Responsavel(
+        nome="Joao Lima",
+        data_nascimento="02/02/1980",
+        email="joao@example.com",
+        senha="joao1234",
+    )
+    perfil = Perfil(responsavel=responsavel, criancas=[crianca])
+    perfil.adicionar_perfil_sensorial(
+        PerfilSensorial(
+            id_crianca=crianca.id_crianca,
+            nome=crianca.nome,
+            data_nascimento="10/07/2015",
+            hipersensibilidades=["som alto"],
+        )
+    )
+    repositorio = RepositorioRelatorioFamilias(caminho_arquivo=arquivo)
+    repositorio.salvar_estado(
+        responsaveis=[responsavel, outro],
+        criancas=[crianca],
+        rotinas=[rotina],
+        perfil=perfil,
+        data_calendario=date(2026, 3, 1),
+    )
+
+    caminho_indice = tmp_path / "estado.familias" / "indice.json"
+    arquivo_familia = repositorio.caminho_familia(responsavel.id_responsavel)
+    arquivo_outro = repositorio.caminho_familia(outro.id_responsavel)
+    assert "perfil" not in json.loads(caminho_indice.read_text(encoding="utf-8"))
+    assert json.loads(arquivo_familia.read_text(encoding="utf-8"))["perfil"]["id_responsavel"] == (
+        responsavel.id_responsavel
+    )
+    assert "perfil" not in json.loads(arquivo_outro.read_text(encoding="utf-8"))
+
+    recarregado = RepositorioRelatorioFamilias(caminho_arquivo=arquivo).carregar_estado()
+    perfil_sensorial = recarregado["perfil"].obter_perfil_sensorial(crianca.id_crianca)
+    assert perfil_sensorial.hipersensibilidades == ["som alto"]
+    familia = RepositorioRelatorioFamilias(caminho_arquivo=arquivo).carregar_familia(
+        responsavel.id_responsavel
+    )
+    assert familia["perfil"].responsavel.id_responsavel == responsavel.id_responsavel
+    assert familia["data_calendario"] == date(2026, 3, 1)
+
+    conteudo_indice = caminho_indice.read_bytes()
+    repositorio.salvar_estado(
+        responsaveis=[responsavel, outro],
+        criancas=[crianca],
+        rotinas=[rotina],
+        perfil=Perfil(responsavel=outro, criancas=[]),
+        data_calendario=date(2026, 3, 1),
+    )
+    assert caminho_indice.read_bytes() == conteudo_indice
+    assert "perfil" not in json.loads(arquivo_familia.read_text(encoding="utf-8"))
+    assert RepositorioRelatorioFamilias(caminho_arquivo=arquivo).carregar_estado()[
+        "perfil"
+    ].responsavel.id_responsavel == outro.id_responsavel
+
+
+def test_repositorio_familias_migra_perfil_de_indice_antigo(tmp_path):
+    """Valida se o perfil guardado em um índice antigo passa para o arquivo da família"""
+    arquivo = tmp_path / "estado.json"
+    responsavel, crianca, rotina = _estado_exemplo()
+    repositorio = RepositorioRelatorioFamilias(caminho_arquivo=arquivo)
+    repositorio.salvar_estado(
+        responsaveis=[responsavel],
+        criancas=[crianca],
+        rotinas=[rotina],
+        perfil=Perfil(responsavel=responsavel, criancas=[crianca]),
+        data_calendario=date(2026, 3, 1),
+    )
+    caminho_indice = tmp_path / "estado.familias" / "indice.json"
+    arquivo_familia = repositorio.caminho_familia(responsavel.id_responsavel)
+    payload_familia = json.loads(arquivo_familia.read_text(encoding="utf-8"))
+    indice = json.loads(caminho_indice.read_text(encoding="utf-8"))
+    indice["perfil"] = payload_familia.pop("perfil")
+    arquivo_familia.write_text(json.dumps(payload_familia), encoding="utf-8")
+    caminho_indice.write_text(json.dumps(indice), encoding="utf-8")
+
+    estado = RepositorioRelatorioFamilias(caminho_arquivo=arquivo).carregar_estado()
+    assert estado["perfil"].responsavel.id_responsavel == responsavel.id_responsavel
+    assert "perfil" not in json.loads(caminho_indice.read_text(encoding="utf-8"))
+    assert "perfil" in json.loads(arquivo_familia.read_text(encoding="utf-8"))
@@ -1,6 +1,17 @@
-from datetime import date
+from datetime import date, datetime
+import io
+import zipfile
 
 from teapoio.application.services.servico_relatorios import ServicoRelatorios
+from teapoio.domain.models.item_rotina import ItemRotina
+from teapoio.domain.models.rotina import Rotina
+from teapoio.infrastructure.cache_relatorios import CacheArtefatosRelatorio
+from teapoio.infrastructure.exportacao_lote import ExportadorLoteRelatorios
+from teapoio.infrastructure.relatorio_pdf import (
+	RelatorioPreparado,
+	gerar_pdf_paginado,
+	intervalo_periodo,
+)
 
 
 class RepositorioFake:
@@ -62,3 +73,126 @@ def test_servico_relatorios_delega_salvamento_para_repositorio():
 	assert repositorio.salvamento["data_calendario"] == date(2026, 3, 6)
 
 
+
+
+class RepositorioIncrementalFake(RepositorioFake):
+	def __init__(self, estado_inicial=None):
+		"""Repositório fake que também aceita salvamento incremental, registrando as alterações recebidas"""
+		super().__init__(estado_inicial)
+		self.alteracoes = []
+
+	def salvar_alteracoes(self, alteracoes):
+		"""Simula o salvamento incremental, armazenando as alterações recebidas"""
+		self.alteracoes.append(alteracoes)
+
+
+def _estado_com_rotinas():
+	rotina_1 = Rotina(id_crianca="123456", data_referencia=date(2026, 3, 6))
+	rotina_1.adicionar_item(ItemRotina(nome="Escovar os dentes", horario="08:00"))
+	rotina_2 = Rotina(id_crianca="123456", data_referencia=date(2026, 3, 7))
+	return {
+		"responsaveis": [],
+		"criancas": [],
+		"rotinas": [rotina_1, rotina_2],
+		"perfil": None,
+		"data_calendario": date(2026, 3, 6),
+	}
+
+
+def test_servico_relatorios_nao_salva_quando_nada_mudou():
+	"""Valida se o serviço de relatórios não aciona o repositório quando nenhuma entidade foi alterada"""
+	estado = _estado_com_rotinas()
+	repositorio = RepositorioFake(estado_inicial=estado)
+	servico = ServicoRelatorios(repositorio=repositorio)
+	servico.carregar_estado_inicial()
+
+	estado["rotinas"][0].marcar_status(0, 3)
+	estado["rotinas"][0].atualizar_sentimento_dia(None)
+	servico.salvar_estado_atual(**estado)
+
+	assert repositorio.salvamento is None
+
+
+def test_servico_relatorios_envia_apenas_entidades_alteradas():
+	"""Valida se o serviço de relatórios entrega ao repositório incremental apenas a rotina alterada"""
+	estado = _estado_com_rotinas()
+	repositorio = RepositorioIncrementalFake(estado_inicial=estado)
+	servico = ServicoRelatorios(repositorio=repositorio)
+	servico.carregar_estado_inicial()
+
+	estado["rotinas"][0].itens[0].atualizar_observacao("Com apoio visual")
+	servico.salvar_estado_atual(**estado)
+
+	assert repositorio.salvamento is None
+	assert len(repositorio.alteracoes) == 1
+	assert repositorio.alteracoes[0].rotinas == [estado["rotinas"][0]]
+	assert repositorio.alteracoes[0].data_calendario is None
+
+
+def test_servico_relatorios_informa_rotinas_removidas():
+	"""Valida se o serviço de relatórios informa ao repositório incremental as rotinas removidas"""
+	estado = _estado_com_rotinas()
+	repositorio = RepositorioIncrementalFake(estado_inicial=estado)
+	servico = ServicoRelatorios(repositorio=repositorio)
+	servico.carregar_estado_inicial()
+
+	estado["rotinas"] = estado["rotinas"][:1]
+	servico.salvar_estado_atual(**estado)
+
+	assert repositorio.alteracoes[0].rotinas == []
+	assert repositorio.alteracoes[0].chaves_rotinas_removidas == [("123456", date(2026, 3, 7))]
+
+
+def test_gerar_pdf_paginado_quebra_paginas_sem_descartar_linhas():
+	"""Valida se o gerador paginado abre novas páginas em vez de descartar linhas e mantém o xref consistente"""
+	linhas = (f"Linha {indice}" for indice in range(300))
+	pdf = b"".join(gerar_pdf_paginado(linhas, []))
+
+	assert pdf.startswith(b"%PDF")
+	assert b"(Linha 0)" in pdf
+	assert b"(Linha 299)" in pdf
+	assert pdf.count(b"/Type /Page ") == 6
+
+	inicio_xref = int(pdf.rsplit(b"startxref", 1)[1].split()[0])
+	assert pdf[inicio_xref:].startswith(b"xref")
+	entradas = pdf[inicio_xref:].split(b"\n")[3:]
+	for numero, entrada in enumerate(entradas, start=1):
+		if not entrada.endswith(b" n "):
+			break
+		assert pdf[int(entrada[:10]):].startswith(f"{numero} 0 obj".encode("ascii"))
+
+
+def test_intervalo_periodo_relatorio():
+	"""Valida se os intervalos de mês, trimestre e ano do relatório são calculados corretamente"""
+	data_base = date(2024, 5, 20)
+
+	assert intervalo_periodo(data_base, "mes") == (date(2024, 5, 1), date(2024, 5, 31))
+	assert intervalo_periodo(data_base, "trimestre") == (date(2024, 4, 1), date(2024, 6, 30))
+	assert intervalo_periodo(data_base, "ano") == (date(2024, 1, 1), date(2024, 12, 31))
+
+
+def test_exportador_lote_inclui_relatorios_identicos_mesmo_sem_cache(tmp_path):
+	"""Valida se relatórios de conteúdo idêntico entram todos no ZIP mesmo quando o cache descarta o PDF"""
+	cache = CacheArtefatosRelatorio(tmp_path / "cache", limite_bytes=1)
+	relatorios = [
+		RelatorioPreparado(
+			periodo="mes",
+			nome_arquivo=f"relatorio_{indice}.pdf",
+			linhas=("Sem rotinas no periodo",),
+			distribuicao_sentimentos=(),
+		)
+		for indice in range(3)
+	]
+	destino = io.BytesIO()
+
+	total = ExportadorLoteRelatorios(cache, max_processos=1).exportar_zip(
+		relatorios,
+		destino,
+		gerado_em=datetime(2026, 3, 1, 8, 0),
+	)
+
+	assert cache.buscar(relatorios[0].chave) is None
+	with zipfile.ZipFile(io.BytesIO(destino.getvalue())) as arquivo_zip:
+		assert sorted(arquivo_zip.namelist()) == [item.nome_arquivo for item in relatorios]
+		assert len({arquivo_zip.read(nome) for nome in arquivo_zip.namelist()}) == 1
+	assert total == 3
@@ -1,8 +1,12 @@
 import pytest
 from datetime import date
 
+from teapoio.application.services.servico_rotinas import AlteracaoLoteRotina, ServicoRotinas
+from teapoio.domain.models.agregador_evolucao import AgregadorEvolucao
 from teapoio.domain.models.evolucao import Evolucao
+from teapoio.domain.models.indice_rotinas import IndiceRotinas
 from teapoio.domain.models.item_rotina import ItemRotina
+from teapoio.domain.models.modelo_rotina import ModeloRotina
 from teapoio.domain.models.rotina import Rotina
 
 
@@ -296,4 +300,177 @@ def test_item_rotina_aceita_none_para_observacao_e_tags():
     """Valida se passar None para observação ou tags as inicializa com os valores padrão (vazios)"""
     item = ItemRotina("Estudar", "14:00", observacao=None, tags=None)
     assert item.observacao == ""
-    assert item.tags == []
\ No newline at end of file
+    assert item.tags == []
+def test_indice_rotinas_busca_por_crianca_e_data_em_ordem():
+    """Valida se o índice de rotinas busca por criança e data e mantém as datas de cada criança ordenadas"""
+    rotina_dia_5 = Rotina("123456", date(2026, 3, 5))
+    rotina_dia_1 = Rotina("123456", date(2026, 3, 1))
+    rotina_outra = Rotina("654321", date(2026, 3, 3))
+    indice = IndiceRotinas([rotina_dia_5, rotina_outra, rotina_dia_1])
+
+    assert indice.buscar(123456, date(2026, 3, 1)) is rotina_dia_1
+    assert indice.buscar("123456", date(2026, 3, 2)) is None
+    assert indice.rotinas_da_crianca("123456") == [rotina_dia_1, rotina_dia_5]
+    assert list(indice) == [rotina_dia_5, rotina_outra, rotina_dia_1]
+
+    assert indice.remover_crianca("123456") == [rotina_dia_1, rotina_dia_5]
+    assert list(indice) == [rotina_outra]
+
+def test_servico_rotinas_obter_ou_criar_usa_indice():
+    """Valida se o serviço de rotinas reutiliza a rotina indexada e indexa as rotinas que cria"""
+    servico = ServicoRotinas()
+    indice = IndiceRotinas()
+
+    rotina, criada = servico.obter_ou_criar_rotina(indice, "123456", date(2026, 3, 1))
+    mesma_rotina, criada_novamente = servico.obter_ou_criar_rotina(indice, 123456, date(2026, 3, 1))
+
+    assert criada is True
+    assert criada_novamente is False
+    assert mesma_rotina is rotina
+    assert indice.buscar("123456", date(2026, 3, 1)) is rotina
+
+def test_indice_rotinas_consulta_periodo_inclusivo():
+    """Valida se a consulta por período retorna apenas as rotinas da criança dentro do intervalo, incluindo as pontas"""
+    rotinas = [Rotina("123456", date(2026, 3, dia)) for dia in (28, 1, 7, 8, 15)]
+    indice = IndiceRotinas(rotinas + [Rotina("654321", date(2026, 3, 3))])
+
+    periodo = indice.rotinas_no_periodo("123456", date(2026, 3, 1), date(2026, 3, 8))
+
+    assert [rotina.data_referencia.day for rotina in periodo] == [1, 7, 8]
+    assert indice.rotinas_no_periodo("123456", date(2026, 3, 9), date(2026, 3, 14)) == []
+    assert indice.rotinas_no_periodo("123456", date(2026, 3, 8), date(2026, 3, 1)) == []
+
+def test_agregador_evolucao_atualiza_semana_e_mes_incrementalmente():
+    """Valida se os agregados de semana e mês acompanham inclusão, mudança de status e remoção de itens"""
+    agregador = AgregadorEvolucao()
+    indice = IndiceRotinas(observadores=[agregador])
+    segunda = Rotina("123456", date(2026, 3, 2))
+    domingo = Rotina("123456", date(2026, 3, 8))
+    indice.append(segunda)
+    indice.append(domingo)
+
+    segunda.adicionar_item(ItemRotina("Escovar os dentes", "08:00"))
+    domingo.adicionar_item(ItemRotina("Ler um livro", "20:00"))
+    domingo.marcar_status(0, 1)
+
+    semana = agregador.evolucao_semana("123456", date(2026, 3, 4))
+    assert (semana.total_itens, semana.concluidos, semana.pendentes) == (2, 1, 1)
+    assert agregador.evolucao_mes("123456", date(2026, 3, 31)).total_itens == 2
+    assert agregador.evolucao_semana("123456", date(2026, 3, 9)).total_itens == 0
+
+    segunda.remover_item(0)
+    indice.remover_crianca("123456")
+
+    assert agregador.evolucao_mes("123456", date(2026, 3, 1)) == Evolucao.vazia()
+
+
+def test_indice_rotinas_monta_pendentes_apenas_quando_acessadas():
+    """Valida se rotinas pendentes são montadas só no acesso, avisando o agregador, e se registros inválidos saem do índice"""
+    montadas = []
+
+    def carregar(registro):
+        montadas.append(registro["dia"])
+        if registro["dia"] == 9:
+            return None
+        rotina = Rotina("123456", date(2026, 3, registro["dia"]))
+        rotina.adicionar_item(ItemRotina("Escovar os dentes", "08:00"))
+        return rotina
+
+    agregador = AgregadorEvolucao()
+    indice = IndiceRotinas(observadores=[agregador])
+    for dia in (2, 3, 9, 20):
+        indice.adicionar_pendente("123456", date(2026, 3, dia), {"dia": dia}, carregar)
+
+    assert len(indice) == 4
+    assert montadas == []
+    assert indice.carregadas() == []
+
+    indice.carregar_periodo("123456", date(2026, 3, 1), date(2026, 3, 8))
+    assert montadas == [2, 3]
+    assert agregador.evolucao_semana("123456", date(2026, 3, 2)).total_itens == 2
+    assert [chave[1].day for chave in indice.chaves()] == [2, 3, 9, 20]
+    assert [registro["dia"] for *_, registro in indice.pendentes()] == [9, 20]
+
+    assert indice.buscar("123456", date(2026, 3, 9)) is None
+    assert len(indice) == 3
+    assert indice.buscar("123456", date(2026, 3, 2)).itens[0].nome == "Escovar os dentes"
+    assert montadas == [2, 3, 9]
+
+    removidas = indice.remover_crianca("123456")
+    assert [rotina.data_referencia.day for rotina in removidas] == [2, 3, 20]
+    assert agregador.evolucao_mes("123456", date(2026, 3, 1)) == Evolucao.vazia()
+
+def test_servico_rotinas_aplica_lote_inteiro_ou_nada():
+    """Valida se o lote de alterações é aplicado por completo e se um erro em qualquer rotina não altera nenhuma"""
+    servico = ServicoRotinas()
+    indice = IndiceRotinas()
+    rotina, _ = servico.obter_ou_criar_rotina(indice, "123456", date(2026, 3, 1))
+    servico.adicionar_item(rotina, "Escovar os dentes", "08:00")
+    servico.adicionar_item(rotina, "Almoco", "12:00")
+    id_almoco = rotina.itens[1].id_item
+
+    with pytest.raises(ValueError, match="Alteracao 2"):
+        servico.aplicar_lote(
+            indice,
+            [
+                AlteracaoLoteRotina("123456", date(2026, 3, 1), remover=[0]),
+                AlteracaoLoteRotina(
+                    "123456",
+                    date(2026, 3, 2),
+                    adicionar=[{"nome": "A", "horario": "07:00"}, {"nome": "B", "horario": "07:00"}],
+                ),
+            ],
+        )
+    assert [item.nome for item in rotina.itens] == ["Escovar os dentes", "Almoco"]
+    assert indice.buscar("123456", date(2026, 3, 2)) is None
+
+    with pytest.raises(ValueError, match="Alteracao 1"):
+        servico.aplicar_lote(indice, [AlteracaoLoteRotina("123456", date(2026, 3, 5))])
+    assert indice.buscar("123456", date(2026, 3, 5)) is None
+
+    afetadas = servico.aplicar_lote(
+        indice,
+        [
+            AlteracaoLoteRotina(
+                "123456",
+                date(2026, 3, 1),
+                adicionar=[{"nome": "Acordar", "horario": "08:00"}, {"nome": "Jantar", "horario": "19:00"}],
+                status=[(id_almoco, 1)],
+                remover=[0],
+            ),
+            AlteracaoLoteRotina(
+                "123456",
+                date(2026, 3, 2),
+                adicionar=[{"nome": "Acordar", "horario": "07:00"}],
+            ),
+        ],
+    )
+
+    assert afetadas[0] is rotina
+    assert [item.nome for item in rotina.itens] == ["Acordar", "Almoco", "Jantar"]
+    assert rotina.itens[1].status == ItemRotina.STATUS_CONCLUIDO
+    assert [item.nome for item in indice.buscar("123456", date(2026, 3, 2)).itens] == ["Acordar"]
+
+
+def test_servico_rotinas_aplica_modelo_sem_duplicar_horarios():
+    """Valida se o modelo de rotina cria as rotinas do intervalo e mantém itens já existentes no mesmo horário"""
+    servico = ServicoRotinas()
+    indice = IndiceRotinas()
+    modelo = ModeloRotina(
+        "Manha",
+        [ItemRotina("Escovar os dentes", "08:00"), ItemRotina("Acordar", "07:00")],
+    )
+    existente, _ = servico.obter_ou_criar_rotina(indice, "123456", date(2026, 3, 2))
+    servico.adicionar_item(existente, "Banho", "07:00")
+
+    alteradas = servico.aplicar_modelo(indice, "123456", modelo, date(2026, 3, 1), date(2026, 3, 3))
+
+    assert [rotina.data_referencia.day for rotina in alteradas] == [1, 2, 3]
+    assert [item.nome for item in existente.itens] == ["Banho", "Escovar os dentes"]
+    assert [item.nome for item in indice.buscar("123456", date(2026, 3, 3)).itens] == ["Acordar", "Escovar os dentes"]
+    assert servico.aplicar_modelo(indice, "123456", modelo, date(2026, 3, 1), date(2026, 3, 3)) == []
+
+    with pytest.raises(ValueError):
+        servico.aplicar_modelo(indice, "123456", modelo, date(2026, 1, 1), date(2027, 1, 2))
+    with pytest.raises(ValueError):
+        ModeloRotina("Repetido", [ItemRotina("A", "07:00"), ItemRotina("B", "07:00")])